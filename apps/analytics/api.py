@@ -0,0 +1,108 @@
+# apps/analytics/api.py
+import hmac
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from uuid import UUID
+
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from ninja import Router
+from ninja.errors import AuthorizationError, HttpError
+from ninja.security import HttpBearer, django_auth
+
+from apps.institutions.models import InstitutionUser
+
+from .instrumentation import request_metrics
+from .models import Statistic
+from .rollups import VERIFICATION_METRICS, period_end
+from .schemas import VerificationStatsSchema
+
+router = Router(tags=["Statistiques"])
+
+
+class MetricsTokenAuth(HttpBearer):
+    """Jeton du collecteur Prometheus (PERFORMANCE_METRICS['METRICS_TOKEN'])."""
+
+    def authenticate(self, request, token):
+        expected = request_metrics.config['METRICS_TOKEN']
+        if expected and hmac.compare_digest(token, expected):
+            return token
+
+Metric = Statistic.MetricType
+
+DEFAULT_RANGES = {
+    Statistic.Period.HOURLY: timedelta(days=2),
+    Statistic.Period.DAILY: timedelta(days=30),
+    Statistic.Period.MONTHLY: timedelta(days=365),
+}
+
+
+@router.get("/verifications", response=VerificationStatsSchema, auth=django_auth)
+def verification_stats(
+    request: HttpRequest,
+    period: Literal['HOURLY', 'DAILY', 'MONTHLY'] = 'DAILY',
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    institution_id: Optional[UUID] = None,
+):
+    """
+    Vérifications par période (UTC), au total et par résultat et méthode.
+    Lit uniquement les agrégats précalculés : les dernières minutes peuvent manquer.
+    Sans institution_id (réservé au staff) : somme de toutes les institutions.
+    """
+    if not request.user.is_staff and (institution_id is None or not InstitutionUser.objects.filter(
+        user=request.user, institution_id=institution_id, is_active=True
+    ).exists()):
+        raise AuthorizationError()
+
+    end = end or timezone.now()
+    start = start or end - DEFAULT_RANGES[period]
+    if start >= end:
+        raise HttpError(400, "La date de début doit précéder la date de fin.")
+
+    stats = Statistic.objects.filter(
+        period_type=period, metric_type__in=VERIFICATION_METRICS,
+        period_start__gte=start, period_start__lt=end,
+    )
+    if institution_id is not None:
+        stats = stats.filter(institution_id=institution_id)
+
+    points = {}
+    for metric, period_start, value, breakdown in stats.values_list(
+        'metric_type', 'period_start', 'value', 'breakdown'
+    ).order_by('period_start'):
+        point = points.setdefault(period_start, {
+            'period_start': period_start, 'period_end': period_end(period, period_start),
+            'total': 0, 'success': 0, 'failed': 0, 'results': Counter(), 'methods': Counter(),
+        })
+        if metric == Metric.VERIFICATIONS_TOTAL:
+            point['total'] += value
+            point['results'].update(breakdown.get('results', {}))
+            point['methods'].update(breakdown.get('methods', {}))
+        elif metric == Metric.VERIFICATIONS_SUCCESS:
+            point['success'] += value
+        else:
+            point['failed'] += value
+
+    return {
+        'period': period,
+        'institution_id': str(institution_id) if institution_id else None,
+        'start': start,
+        'end': end,
+        'total': sum(point['total'] for point in points.values()),
+        'success': sum(point['success'] for point in points.values()),
+        'failed': sum(point['failed'] for point in points.values()),
+        'points': list(points.values()),
+    }
+
+
+@router.get("/metrics", auth=[MetricsTokenAuth(), django_auth], include_in_schema=False)
+def prometheus_metrics(request: HttpRequest):
+    """
+    Métriques de performance du processus qui répond, au format texte Prometheus.
+    Chaque worker a ses propres compteurs : à collecter par worker.
+    """
+    if not isinstance(request.auth, str) and not request.user.is_staff:
+        raise AuthorizationError()
+    return HttpResponse(request_metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
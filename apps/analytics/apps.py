@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.analytics'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .instrumentation import install_db_wrapper
+        connection_created.connect(install_db_wrapper, dispatch_uid='analytics_db_wrapper')
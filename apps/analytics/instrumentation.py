@@ -0,0 +1,325 @@
+# apps/analytics/instrumentation.py
+import atexit
+import inspect
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import PerformanceMetric
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 60,  # Secondes ; 0 = pas de thread de vidage (flush() explicite)
+    'LATENCY_BUCKETS_MS': (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+    'EXCLUDED_PREFIXES': ('/static/', '/__debug__/'),
+    'METRICS_TOKEN': '',
+}
+
+UNMATCHED = '<unmatched>'  # Requêtes sans route (404) : une seule série
+
+
+class RequestSample:
+    """Mesures de la requête en cours, alimentées par le wrapper SQL, les caches et le hook Ninja."""
+
+    __slots__ = ('queries', 'db_seconds', 'cache', 'handler_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.cache = [0, 0]  # [hits, misses], voir apps.core.cache.request_cache_counters
+        self.handler_seconds = 0.0
+
+
+current_sample: ContextVar[Optional[RequestSample]] = ContextVar('current_sample', default=None)
+
+
+# ==========================================
+# SONDES (SQL, NINJA)
+# ==========================================
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """Wrapper d'exécution SQL : compte les requêtes et leur durée pour la requête HTTP en cours."""
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.db_seconds += time.perf_counter() - started
+
+
+def install_db_wrapper(sender, connection, **kwargs) -> None:
+    """Receveur de connection_created : installe le wrapper une fois par connexion."""
+    if db_execute_wrapper not in connection.execute_wrappers:
+        # En tête : les wrappers temporaires (connection.execute_wrapper()) sont retirés par pop()
+        connection.execute_wrappers.insert(0, db_execute_wrapper)
+
+
+def instrument_operation(view_func):
+    """
+    Décorateur d'opération Ninja (api_v1.add_decorator) : mesure le temps passé
+    dans la fonction de l'endpoint, hors authentification, validation et sérialisation.
+    """
+    if inspect.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            sample = current_sample.get()
+            started = time.perf_counter()
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                if sample is not None:
+                    sample.handler_seconds += time.perf_counter() - started
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        sample = current_sample.get()
+        started = time.perf_counter()
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            if sample is not None:
+                sample.handler_seconds += time.perf_counter() - started
+    return wrapper
+
+
+# ==========================================
+# AGRÉGATION
+# ==========================================
+
+class EndpointStats:
+    """Compteurs cumulés d'un endpoint (méthode, route)."""
+
+    __slots__ = (
+        'count', 'errors', 'seconds', 'handler_seconds', 'buckets',
+        'queries', 'db_seconds', 'cache_hits', 'cache_misses',
+    )
+    FIELDS = __slots__
+
+    def __init__(self, bucket_count: int):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.handler_seconds = 0.0
+        self.buckets = [0] * (bucket_count + 1)  # Dernier seau : au-delà de la plus grande borne
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def copy(self) -> 'EndpointStats':
+        other = EndpointStats.__new__(EndpointStats)
+        for field in self.FIELDS:
+            setattr(other, field, getattr(self, field))
+        other.buckets = list(self.buckets)
+        return other
+
+    def minus(self, previous: Optional['EndpointStats']) -> 'EndpointStats':
+        """Différence avec un instantané antérieur (fenêtre écoulée depuis)."""
+        delta = self.copy()
+        if previous is not None:
+            for field in self.FIELDS:
+                if field != 'buckets':
+                    setattr(delta, field, getattr(self, field) - getattr(previous, field))
+            delta.buckets = [a - b for a, b in zip(self.buckets, previous.buckets)]
+        return delta
+
+
+class RequestMetrics:
+    """
+    Agrégateur en mémoire des mesures de requêtes, par processus.
+
+    Chaque requête ne fait qu'incrémenter, sous un verrou, les compteurs
+    cumulés de son endpoint : histogramme de latence à seaux fixes, erreurs,
+    requêtes SQL et leur durée, accès aux caches. Un thread de vidage écrit
+    toutes les FLUSH_INTERVAL secondes une ligne PerformanceMetric par endpoint
+    actif (différence avec l'instantané précédent, p95/p99 estimés depuis
+    l'histogramme). Les compteurs cumulés alimentent l'export Prometheus.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.bounds = tuple(ms / 1000 for ms in self.config['LATENCY_BUCKETS_MS'])
+        self.flushed = 0
+        self._pid = None
+
+    def _start(self) -> None:
+        """Initialise l'état du processus (au premier usage, et après un fork)."""
+        self._pid = os.getpid()
+        self.worker = f"{socket.gethostname()}:{self._pid}"
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], EndpointStats] = {}
+        self._flushed_totals: Dict[Tuple[str, str], EndpointStats] = {}
+        self._window_start = timezone.now()
+        self._window_started = time.monotonic()
+        self._stopped = threading.Event()
+        if self.config['FLUSH_INTERVAL']:
+            self._thread = threading.Thread(target=self._run, name='performance-metrics-flusher', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def record(self, method: str, endpoint: str, status: int, seconds: float, sample: RequestSample) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        bucket = bisect_left(self.bounds, seconds)
+        with self._lock:
+            stats = self._totals.get((method, endpoint))
+            if stats is None:
+                stats = self._totals[(method, endpoint)] = EndpointStats(len(self.bounds))
+            stats.count += 1
+            if status >= 500:
+                stats.errors += 1
+            stats.seconds += seconds
+            stats.handler_seconds += sample.handler_seconds
+            stats.buckets[bucket] += 1
+            stats.queries += sample.queries
+            stats.db_seconds += sample.db_seconds
+            stats.cache_hits += sample.cache[0]
+            stats.cache_misses += sample.cache[1]
+
+    def snapshot(self) -> Dict[Tuple[str, str], EndpointStats]:
+        """Copie des compteurs cumulés depuis le démarrage du processus."""
+        if self._pid != os.getpid():
+            return {}
+        with self._lock:
+            return {key: stats.copy() for key, stats in self._totals.items()}
+
+    def percentile(self, buckets: List[int], q: float) -> float:
+        """Quantile estimé (ms) par interpolation linéaire dans le seau qui le contient."""
+        rank = q * sum(buckets)
+        cumulative = 0
+        for index, count in enumerate(buckets):
+            if count and cumulative + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else lower
+                return (lower + (upper - lower) * (rank - cumulative) / count) * 1000
+            cumulative += count
+        return 0.0
+
+    # ------------------------------------------
+    # Vidage
+    # ------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.config['FLUSH_INTERVAL']):
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                # Fenêtre conservée : elle sera incluse dans le prochain vidage
+                logger.error(f"Échec de l'écriture des métriques de performance: {e}", exc_info=True)
+            finally:
+                close_old_connections()
+
+    def flush(self) -> int:
+        """Écrit une ligne PerformanceMetric par endpoint actif depuis le dernier vidage."""
+        if self._pid != os.getpid():
+            return 0
+        with self._flush_lock:
+            totals = self.snapshot()
+            interval = time.monotonic() - self._window_started
+            rows = []
+            for (method, endpoint), stats in totals.items():
+                delta = stats.minus(self._flushed_totals.get((method, endpoint)))
+                if not delta.count:
+                    continue
+                rows.append(PerformanceMetric(
+                    endpoint=endpoint[:255],
+                    method=method,
+                    avg_response_time_ms=delta.seconds / delta.count * 1000,
+                    p95_response_time_ms=self.percentile(delta.buckets, 0.95),
+                    p99_response_time_ms=self.percentile(delta.buckets, 0.99),
+                    latency_histogram={
+                        str(ms): count
+                        for ms, count in zip((*self.config['LATENCY_BUCKETS_MS'], '+Inf'), delta.buckets) if count
+                    },
+                    request_count=delta.count,
+                    error_count=delta.errors,
+                    db_query_count=delta.queries,
+                    db_time_ms=delta.db_seconds * 1000,
+                    cache_hits=delta.cache_hits,
+                    cache_misses=delta.cache_misses,
+                    timestamp=self._window_start,
+                    interval_seconds=round(interval, 3),
+                    worker=self.worker,
+                ))
+            PerformanceMetric.objects.bulk_create(rows)
+            self._flushed_totals = totals
+            self._window_start = timezone.now()
+            self._window_started = time.monotonic()
+            self.flushed += len(rows)
+            return len(rows)
+
+    def stop(self) -> None:
+        """Arrête le thread de vidage après un dernier vidage (atexit)."""
+        if self._pid != os.getpid() or self._stopped.is_set():
+            return
+        self._stopped.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Échec de l'écriture des métriques de performance: {e}")
+
+    # ------------------------------------------
+    # Export Prometheus
+    # ------------------------------------------
+
+    def render_prometheus(self) -> str:
+        """Compteurs cumulés du processus au format texte Prometheus (version 0.0.4)."""
+        totals = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, samples) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(method: str, endpoint: str, extra: str = '') -> str:
+            endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            return f'{{method="{method}",endpoint="{endpoint}"{extra}}}'
+
+        def counter(name: str, help_text: str, field: str) -> None:
+            family(name, 'counter', help_text, (
+                f"{name}{labels(method, endpoint)} {getattr(stats, field)}" for (method, endpoint), stats in totals
+            ))
+
+        counter('letscheck_http_requests_total', "Requêtes HTTP traitées.", 'count')
+        counter('letscheck_http_request_errors_total', "Réponses HTTP 5xx.", 'errors')
+
+        histogram = []
+        for (method, endpoint), stats in totals:
+            cumulative = 0
+            for bound, count in zip((*self.bounds, None), stats.buckets):
+                cumulative += count
+                le = '+Inf' if bound is None else f'{bound:g}'
+                bucket_labels = labels(method, endpoint, f',le="{le}"')
+                histogram.append(f"letscheck_http_request_duration_seconds_bucket{bucket_labels} {cumulative}")
+            histogram.append(f"letscheck_http_request_duration_seconds_sum{labels(method, endpoint)} {stats.seconds:.6f}")
+            histogram.append(f"letscheck_http_request_duration_seconds_count{labels(method, endpoint)} {stats.count}")
+        family('letscheck_http_request_duration_seconds', 'histogram', "Durée des requêtes HTTP.", histogram)
+
+        counter('letscheck_http_handler_seconds_total', "Temps passé dans les fonctions des endpoints Ninja.", 'handler_seconds')
+        counter('letscheck_db_queries_total', "Requêtes SQL exécutées.", 'queries')
+        counter('letscheck_db_query_seconds_total', "Durée cumulée des requêtes SQL.", 'db_seconds')
+        counter('letscheck_cache_hits_total', "Accès aux caches trouvés.", 'cache_hits')
+        counter('letscheck_cache_misses_total', "Accès aux caches manqués.", 'cache_misses')
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics(getattr(settings, 'PERFORMANCE_METRICS', None))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:53
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('institutions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Statistic',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('metric_type', models.CharField(choices=[('VERIF_TOTAL', 'Vérifications totales'), ('VERIF_SUCCESS', 'Vérifications réussies'), ('VERIF_FAILED', 'Vérifications échouées'), ('DOC_SIGNED', 'Documents signés'), ('DOC_REVOKED', 'Documents révoqués'), ('KEY_CREATED', 'Clés créées'), ('KEY_ROTATED', 'Clés pivotées'), ('REPORTS', 'Signalements reçus'), ('INST_ACTIVE', 'Institutions actives')], max_length=20)),
+                ('value', models.BigIntegerField()),
+                ('period_type', models.CharField(choices=[('HOURLY', 'Horaire'), ('DAILY', 'Journalier'), ('WEEKLY', 'Hebdomadaire'), ('MONTHLY', 'Mensuel'), ('YEARLY', 'Annuel')], max_length=10)),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('breakdown', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='institutions.institution')),
+            ],
+            options={
+                'db_table': 'analytics_statistics',
+                'indexes': [models.Index(fields=['metric_type', 'period_start'], name='analytics_s_metric__484124_idx'), models.Index(fields=['institution', 'metric_type'], name='analytics_s_institu_8df352_idx'), models.Index(fields=['period_type', 'metric_type', 'period_start'], name='analytics_s_period__24d0ea_idx')],
+                'unique_together': {('institution', 'metric_type', 'period_type', 'period_start')},
+            },
+        ),
+    ]
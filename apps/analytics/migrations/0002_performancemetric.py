@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:57
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerformanceMetric',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('endpoint', models.CharField(max_length=255)),
+                ('method', models.CharField(max_length=10)),
+                ('avg_response_time_ms', models.FloatField()),
+                ('p95_response_time_ms', models.FloatField()),
+                ('p99_response_time_ms', models.FloatField()),
+                ('latency_histogram', models.JSONField(blank=True, default=dict)),
+                ('request_count', models.BigIntegerField()),
+                ('error_count', models.BigIntegerField()),
+                ('db_query_count', models.BigIntegerField(default=0)),
+                ('db_time_ms', models.FloatField(default=0)),
+                ('cache_hits', models.BigIntegerField(default=0)),
+                ('cache_misses', models.BigIntegerField(default=0)),
+                ('timestamp', models.DateTimeField()),
+                ('interval_seconds', models.FloatField()),
+                ('worker', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'db_table': 'analytics_performance',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['endpoint', 'timestamp'], name='analytics_p_endpoin_1e1565_idx')],
+            },
+        ),
+    ]
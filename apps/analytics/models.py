@@ -1,3 +1,103 @@
 from django.db import models
+from apps.institutions.models import Institution
+import uuid
 
-# Create your models here.
+
+class Statistic(models.Model):
+    """Agrégation de métriques pour tableaux de bord"""
+
+    class MetricType(models.TextChoices):
+        VERIFICATIONS_TOTAL = 'VERIF_TOTAL', 'Vérifications totales'
+        VERIFICATIONS_SUCCESS = 'VERIF_SUCCESS', 'Vérifications réussies'
+        VERIFICATIONS_FAILED = 'VERIF_FAILED', 'Vérifications échouées'
+        DOCUMENTS_SIGNED = 'DOC_SIGNED', 'Documents signés'
+        DOCUMENTS_REVOKED = 'DOC_REVOKED', 'Documents révoqués'
+        KEYS_CREATED = 'KEY_CREATED', 'Clés créées'
+        KEYS_ROTATED = 'KEY_ROTATED', 'Clés pivotées'
+        REPORTS_RECEIVED = 'REPORTS', 'Signalements reçus'
+        INSTITUTIONS_ACTIVE = 'INST_ACTIVE', 'Institutions actives'
+
+    class Period(models.TextChoices):
+        HOURLY = 'HOURLY', 'Horaire'
+        DAILY = 'DAILY', 'Journalier'
+        WEEKLY = 'WEEKLY', 'Hebdomadaire'
+        MONTHLY = 'MONTHLY', 'Mensuel'
+        YEARLY = 'YEARLY', 'Annuel'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Scope (par institution ; vide = vérifications de hashes inconnus)
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='statistics'
+    )
+
+    # Métrique
+    metric_type = models.CharField(max_length=20, choices=MetricType.choices)
+    value = models.BigIntegerField()
+
+    # Période (UTC)
+    period_type = models.CharField(max_length=10, choices=Period.choices)
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+
+    # Métadonnées
+    breakdown = models.JSONField(default=dict, blank=True)  # Détails supplémentaires
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'analytics_statistics'
+        unique_together = ['institution', 'metric_type', 'period_type', 'period_start']
+        indexes = [
+            models.Index(fields=['metric_type', 'period_start']),
+            models.Index(fields=['institution', 'metric_type']),
+            models.Index(fields=['period_type', 'metric_type', 'period_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.metric_type} {self.period_type} {self.period_start:%Y-%m-%d %H:%M} = {self.value}"
+
+
+class PerformanceMetric(models.Model):
+    """Métriques de performance système (agrégées par fenêtre, par endpoint et par processus)"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # API endpoints
+    endpoint = models.CharField(max_length=255)  # Route (ex. api/v1/verify/<document_hash>)
+    method = models.CharField(max_length=10)  # GET, POST, etc.
+
+    # Performance
+    avg_response_time_ms = models.FloatField()
+    p95_response_time_ms = models.FloatField()
+    p99_response_time_ms = models.FloatField()
+    latency_histogram = models.JSONField(default=dict, blank=True)  # {borne en ms: nombre de requêtes}
+
+    # Volume
+    request_count = models.BigIntegerField()
+    error_count = models.BigIntegerField()
+
+    # Base de données et caches
+    db_query_count = models.BigIntegerField(default=0)
+    db_time_ms = models.FloatField(default=0)
+    cache_hits = models.BigIntegerField(default=0)
+    cache_misses = models.BigIntegerField(default=0)
+
+    # Période (début de la fenêtre)
+    timestamp = models.DateTimeField()
+    interval_seconds = models.FloatField()
+    worker = models.CharField(max_length=100, blank=True)  # hôte:pid
+
+    class Meta:
+        db_table = 'analytics_performance'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['endpoint', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} {self.timestamp:%Y-%m-%d %H:%M} p95={self.p95_response_time_ms:.1f}ms"
@@ -0,0 +1,226 @@
+# apps/analytics/rollups.py
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from apps.documents.models import DocumentVerification
+
+from .models import Statistic
+
+logger = logging.getLogger('app')
+
+Metric = Statistic.MetricType
+Period = Statistic.Period
+
+DEFAULTS = {
+    'REPROCESS_HOURS': 2,
+    'BACKFILL_CHUNK_HOURS': 24,
+    'LATE_DAYS': 7,
+}
+
+VERIFICATION_METRICS = (Metric.VERIFICATIONS_TOTAL, Metric.VERIFICATIONS_SUCCESS, Metric.VERIFICATIONS_FAILED)
+
+# (début de période, institution_id) -> {'results': Counter, 'methods': Counter}
+Buckets = Dict[Tuple[datetime, Optional[str]], Dict[str, Counter]]
+
+
+def hour_start(value: datetime) -> datetime:
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(value: datetime) -> datetime:
+    return hour_start(value).replace(hour=0)
+
+
+def month_start(value: datetime) -> datetime:
+    return day_start(value).replace(day=1)
+
+
+def period_end(period_type: str, start: datetime) -> datetime:
+    if period_type == Period.HOURLY:
+        return start + timedelta(hours=1)
+    if period_type == Period.DAILY:
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+class VerificationRollup:
+    """
+    Agrégats incrémentaux des vérifications (Statistic) : horaires, journaliers, mensuels, en UTC.
+
+    - Les agrégats horaires sont recalculés (et non incrémentés) pour les heures
+      postérieures au filigrane, qui est la dernière heure déjà agrégée moins
+      REPROCESS_HOURS : les vérifications écrites en différé (journal différé,
+      reprise du spool) sont ainsi comptées, et un passage répété est idempotent.
+    - Écritures plus tardives (spool rejoué, débordement confié à Huey) : reconcile(),
+      quotidien, recalcule les heures des LATE_DAYS derniers jours dont le nombre de
+      vérifications diffère de l'agrégat. Au-delà, une vérification écrite plus tard
+      n'est comptée que par un appel explicite (reconcile(days=...)).
+    - Les agrégats journaliers et mensuels des périodes touchées sont recalculés
+      à partir des agrégats horaires, sans relire le journal des vérifications.
+    - L'API de statistiques ne lit que ces agrégats.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    def watermark(self) -> Optional[datetime]:
+        """Début de la première heure à (re)calculer, ou None si aucune vérification."""
+        latest = Statistic.objects.filter(
+            period_type=Period.HOURLY, metric_type=Metric.VERIFICATIONS_TOTAL
+        ).aggregate(latest=Max('period_start'))['latest']
+        if latest is not None:
+            return latest - timedelta(hours=self.config['REPROCESS_HOURS'])
+        earliest = DocumentVerification.objects.aggregate(earliest=Min('timestamp'))['earliest']
+        return hour_start(earliest) if earliest is not None else None
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Met à jour les agrégats jusqu'à maintenant ; retourne le nombre de lignes écrites par période."""
+        now = now or timezone.now()
+        start = self.watermark()
+        written = {Period.HOURLY: 0, Period.DAILY: 0, Period.MONTHLY: 0}
+        if start is None:
+            return written
+
+        # Rattrapage par tranches : chaque requête GROUP BY reste bornée
+        step = timedelta(hours=self.config['BACKFILL_CHUNK_HOURS'])
+        chunk_start = start
+        while chunk_start <= now:
+            chunk_end = min(chunk_start + step, hour_start(now) + timedelta(hours=1))
+            self._apply(self._hourly_buckets(chunk_start, chunk_end), written)
+            chunk_start = chunk_end
+
+        logger.info(f"Agrégats de vérifications mis à jour depuis {start:%Y-%m-%d %H:%M}: {written}")
+        return written
+
+    def reconcile(self, now: Optional[datetime] = None, days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Recalcule les heures antérieures au filigrane (sur days jours, LATE_DAYS par défaut)
+        dont le nombre de vérifications ne correspond plus à l'agrégat horaire ; retourne
+        le nombre de lignes écrites par période.
+        """
+        now = now or timezone.now()
+        written = {Period.HOURLY: 0, Period.DAILY: 0, Period.MONTHLY: 0}
+        end = self.watermark()
+        if end is None:
+            return written
+        start = hour_start(now) - timedelta(days=self.config['LATE_DAYS'] if days is None else days)
+
+        counts = dict(DocumentVerification.objects.filter(
+            timestamp__gte=start, timestamp__lt=end
+        ).annotate(
+            hour=TruncHour('timestamp', tzinfo=dt_timezone.utc)
+        ).values('hour').annotate(count=Count('id')).values_list('hour', 'count').order_by())
+        rolled_up = dict(Statistic.objects.filter(
+            period_type=Period.HOURLY, metric_type=Metric.VERIFICATIONS_TOTAL,
+            period_start__gte=start, period_start__lt=end,
+        ).values('period_start').annotate(total=Sum('value')).values_list('period_start', 'total').order_by())
+
+        stale = sorted(hour for hour, count in counts.items() if rolled_up.get(hour) != count)
+        for hour in stale:
+            self._apply(self._hourly_buckets(hour, hour + timedelta(hours=1)), written)
+        if stale:
+            logger.info(f"Agrégats de vérifications : {len(stale)} heures recalculées (écritures tardives): {written}")
+        return written
+
+    def _apply(self, hourly: Buckets, written: Dict[str, int]) -> None:
+        """Écrit des agrégats horaires et recalcule les jours et mois touchés."""
+        with transaction.atomic():
+            written[Period.HOURLY] += self._save(Period.HOURLY, hourly)
+            days = {day_start(hour) for hour, _ in hourly}
+            written[Period.DAILY] += self._save(Period.DAILY, self._roll_up(Period.HOURLY, days, day_start))
+            months = {month_start(day) for day in days}
+            written[Period.MONTHLY] += self._save(
+                Period.MONTHLY, self._roll_up(Period.DAILY, months, month_start)
+            )
+
+    # ------------------------------------------
+    # Calcul
+    # ------------------------------------------
+
+    @staticmethod
+    def _hourly_buckets(start: datetime, end: datetime) -> Buckets:
+        rows = DocumentVerification.objects.filter(
+            timestamp__gte=start, timestamp__lt=end
+        ).annotate(
+            hour=TruncHour('timestamp', tzinfo=dt_timezone.utc)
+        ).values(
+            'hour', 'document__institution_id', 'result', 'method'
+        ).annotate(count=Count('id')).order_by()
+
+        buckets: Buckets = defaultdict(lambda: {'results': Counter(), 'methods': Counter()})
+        for row in rows:
+            institution_id = row['document__institution_id']
+            bucket = buckets[(row['hour'], str(institution_id) if institution_id else None)]
+            bucket['results'][row['result']] += row['count']
+            bucket['methods'][row['method']] += row['count']
+        return buckets
+
+    @staticmethod
+    def _roll_up(source_period: str, targets: Iterable[datetime], truncate) -> Buckets:
+        """Somme des agrégats source_period (VERIF_TOTAL et sa ventilation) sur les périodes cibles."""
+        buckets: Buckets = defaultdict(lambda: {'results': Counter(), 'methods': Counter()})
+        for target in targets:
+            end = period_end(Period.DAILY if source_period == Period.HOURLY else Period.MONTHLY, target)
+            rows = Statistic.objects.filter(
+                period_type=source_period, metric_type=Metric.VERIFICATIONS_TOTAL,
+                period_start__gte=target, period_start__lt=end,
+            ).values_list('period_start', 'institution_id', 'breakdown')
+            for start, institution_id, breakdown in rows:
+                bucket = buckets[(truncate(start), str(institution_id) if institution_id else None)]
+                bucket['results'].update(breakdown.get('results', {}))
+                bucket['methods'].update(breakdown.get('methods', {}))
+        return buckets
+
+    @staticmethod
+    def _values(bucket: Dict[str, Counter]) -> Dict[str, Tuple[int, dict]]:
+        results = bucket['results']
+        total = sum(results.values())
+        success = results.get(DocumentVerification.Result.AUTHENTIC, 0)
+        return {
+            Metric.VERIFICATIONS_TOTAL: (total, {'results': dict(results), 'methods': dict(bucket['methods'])}),
+            Metric.VERIFICATIONS_SUCCESS: (success, {}),
+            Metric.VERIFICATIONS_FAILED: (total - success, {}),
+        }
+
+    @staticmethod
+    def _save(period_type: str, buckets: Buckets) -> int:
+        """Écrit (création ou mise à jour) les agrégats d'une période en deux requêtes groupées."""
+        if not buckets:
+            return 0
+        starts = {start for start, _ in buckets}
+        existing = {
+            (stat.period_start, str(stat.institution_id) if stat.institution_id else None, stat.metric_type): stat
+            for stat in Statistic.objects.filter(
+                period_type=period_type, period_start__in=starts, metric_type__in=VERIFICATION_METRICS
+            )
+        }
+        to_create, to_update = [], []
+        for (start, institution_id), bucket in buckets.items():
+            for metric, (value, breakdown) in VerificationRollup._values(bucket).items():
+                stat = existing.get((start, institution_id, metric))
+                if stat is None:
+                    to_create.append(Statistic(
+                        institution_id=institution_id, metric_type=metric, value=value, breakdown=breakdown,
+                        period_type=period_type, period_start=start, period_end=period_end(period_type, start),
+                    ))
+                elif stat.value != value or stat.breakdown != breakdown:
+                    stat.value = value
+                    stat.breakdown = breakdown
+                    stat.updated_at = timezone.now()
+                    to_update.append(stat)
+        Statistic.objects.bulk_create(to_create)
+        Statistic.objects.bulk_update(to_update, ['value', 'breakdown', 'updated_at'])
+        return len(to_create) + len(to_update)
+
+
+verification_rollup = VerificationRollup(getattr(settings, 'ANALYTICS_ROLLUP', None))
@@ -0,0 +1,26 @@
+# apps/analytics/schemas.py
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from ninja import Schema
+
+
+class VerificationStatPointSchema(Schema):
+    period_start: datetime
+    period_end: datetime
+    total: int
+    success: int
+    failed: int
+    results: Dict[str, int]
+    methods: Dict[str, int]
+
+
+class VerificationStatsSchema(Schema):
+    period: str
+    institution_id: Optional[str] = None
+    start: datetime
+    end: datetime
+    total: int
+    success: int
+    failed: int
+    points: List[VerificationStatPointSchema]
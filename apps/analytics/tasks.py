@@ -0,0 +1,34 @@
+# apps/analytics/tasks.py
+import logging
+
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task, lock_task
+
+from apps.core.queues import PRIORITY_BULK, PRIORITY_DEFAULT
+
+from .rollups import verification_rollup
+
+logger = logging.getLogger('app')
+
+
+# ==========================================
+# TÂCHES HUEY (BACKGROUND TASKS)
+# ==========================================
+
+@db_periodic_task(crontab(minute='*/5'), priority=PRIORITY_DEFAULT)
+@lock_task('analytics-verification-rollup')
+def rollup_verifications():
+    """
+    Met à jour les agrégats de vérifications à partir du filigrane (un seul passage à la fois).
+    """
+    verification_rollup.run()
+
+
+@db_periodic_task(crontab(hour='4', minute='15'), priority=PRIORITY_BULK)
+@lock_task('analytics-verification-rollup')
+def reconcile_verification_rollups():
+    """
+    Recompte les heures des derniers jours, antérieures au filigrane, et recalcule
+    celles qui ont reçu des vérifications après leur agrégation.
+    """
+    verification_rollup.reconcile()
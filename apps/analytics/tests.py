@@ -1,3 +1,222 @@
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.cryptography.models import CryptographicKey
+from apps.documents.models import DocumentVerification, SignedDocument
+from apps.institutions.models import Institution, InstitutionUser
+
+from .instrumentation import RequestMetrics
+from .models import PerformanceMetric, Statistic
+from .rollups import VerificationRollup
+
+Result = DocumentVerification.Result
+Method = DocumentVerification.Method
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class AnalyticsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.institution = Institution.objects.create(
+            name="Université de Test", legal_name="Université de Test", slug="univ-test",
+            type=Institution.Type.UNIVERSITY, email="contact@univ-test.cm",
+            address_line1="BP 1", city="Maroua", postal_code="000", country_code="CM",
+            status=Institution.Status.ACTIVE,
+        )
+        key = CryptographicKey.objects.create(
+            institution=cls.institution, public_key="pem", fingerprint="f" * 64,
+            algorithm=CryptographicKey.Algorithm.ECDSA_P384, key_size=384,
+            expires_at=timezone.now() + timedelta(days=365),
+        )
+        cls.document = SignedDocument.objects.create(
+            institution=cls.institution, key=key, document_hash="a" * 64,
+            signature="sig", file_type=SignedDocument.FileType.PDF,
+        )
+
+    def verify(self, timestamp, result=Result.AUTHENTIC, method=Method.HASH_INPUT, known=True):
+        return DocumentVerification.objects.create(
+            document=self.document if known else None, provided_hash="a" * 64, verifier_ip="127.0.0.1",
+            method=method, result=result, timestamp=timestamp,
+        )
+
+    def value(self, period_type, start, metric=Statistic.MetricType.VERIFICATIONS_TOTAL, institution=True):
+        return Statistic.objects.get(
+            period_type=period_type, period_start=start, metric_type=metric,
+            institution=self.institution if institution else None,
+        ).value
+
+
+class VerificationRollupTestCase(AnalyticsTestCase):
+
+    def setUp(self):
+        self.rollup = VerificationRollup({'BACKFILL_CHUNK_HOURS': 6})
+
+    def test_hourly_daily_and_monthly_rollups(self):
+        self.verify(utc(2026, 1, 31, 23, 10))
+        self.verify(utc(2026, 1, 31, 23, 50), result=Result.REVOKED, method=Method.QR_SCAN)
+        self.verify(utc(2026, 2, 1, 8, 0))
+        self.verify(utc(2026, 2, 1, 8, 30), result=Result.NOT_FOUND, known=False)
+        self.rollup.run(now=utc(2026, 2, 1, 9, 0))
+
+        Period, Metric = Statistic.Period, Statistic.MetricType
+        self.assertEqual(self.value(Period.HOURLY, utc(2026, 1, 31, 23)), 2)
+        self.assertEqual(self.value(Period.HOURLY, utc(2026, 1, 31, 23), Metric.VERIFICATIONS_FAILED), 1)
+        self.assertEqual(self.value(Period.DAILY, utc(2026, 2, 1), Metric.VERIFICATIONS_SUCCESS), 1)
+        self.assertEqual(self.value(Period.DAILY, utc(2026, 2, 1), institution=False), 1)
+        self.assertEqual(self.value(Period.MONTHLY, utc(2026, 1, 1)), 2)
+        self.assertEqual(
+            Statistic.objects.get(
+                period_type=Period.MONTHLY, period_start=utc(2026, 1, 1),
+                metric_type=Metric.VERIFICATIONS_TOTAL, institution=self.institution,
+            ).breakdown,
+            {'results': {'AUTHENTIC': 1, 'REVOKED': 1}, 'methods': {'HASH_INPUT': 1, 'QR_SCAN': 1}},
+        )
+
+    def test_rerun_is_idempotent_and_counts_late_rows(self):
+        self.verify(utc(2026, 3, 10, 10, 5))
+        self.rollup.run(now=utc(2026, 3, 10, 11, 0))
+        rows = Statistic.objects.count()
+        self.assertEqual(self.rollup.run(now=utc(2026, 3, 10, 11, 0))[Statistic.Period.HOURLY], 0)
+        self.assertEqual(Statistic.objects.count(), rows)
+
+        # Écriture différée : horodatée dans une heure déjà agrégée
+        self.verify(utc(2026, 3, 10, 10, 40))
+        self.rollup.run(now=utc(2026, 3, 10, 11, 5))
+        self.assertEqual(self.value(Statistic.Period.HOURLY, utc(2026, 3, 10, 10)), 2)
+        self.assertEqual(self.value(Statistic.Period.MONTHLY, utc(2026, 3, 1)), 2)
+
+    def test_reconcile_counts_rows_written_after_the_reprocess_window(self):
+        self.verify(utc(2026, 3, 8, 9, 0))
+        self.verify(utc(2026, 3, 10, 12, 0))
+        self.rollup.run(now=utc(2026, 3, 10, 13, 0))
+        # Filigrane, comptage horaire du journal, sommes des agrégats horaires
+        with self.assertNumQueries(3):
+            self.assertEqual(self.rollup.reconcile(now=utc(2026, 3, 10, 13, 0))[Statistic.Period.HOURLY], 0)
+
+        # Spool rejoué deux jours plus tard : heure antérieure au filigrane, ignorée par run()
+        self.verify(utc(2026, 3, 8, 9, 30), result=Result.REVOKED)
+        self.verify(utc(2026, 3, 1, 9, 30))  # Au-delà de LATE_DAYS
+        self.rollup.run(now=utc(2026, 3, 10, 13, 5))
+        self.assertEqual(self.value(Statistic.Period.HOURLY, utc(2026, 3, 8, 9)), 1)
+
+        self.rollup.reconcile(now=utc(2026, 3, 10, 13, 5))
+        self.assertEqual(self.value(Statistic.Period.HOURLY, utc(2026, 3, 8, 9)), 2)
+        self.assertEqual(
+            self.value(Statistic.Period.DAILY, utc(2026, 3, 8), Statistic.MetricType.VERIFICATIONS_FAILED), 1
+        )
+        self.assertEqual(self.value(Statistic.Period.MONTHLY, utc(2026, 3, 1)), 3)
+        self.assertEqual(self.rollup.reconcile(now=utc(2026, 3, 10, 13, 5), days=10)[Statistic.Period.HOURLY], 3)
+        self.assertEqual(self.value(Statistic.Period.MONTHLY, utc(2026, 3, 1)), 4)
+
+    def test_only_rows_after_the_watermark_are_read(self):
+        self.verify(utc(2026, 3, 1, 0, 0))
+        self.rollup.run(now=utc(2026, 3, 10, 0, 0))
+        self.assertEqual(self.rollup.watermark(), utc(2026, 2, 28, 22))
+        self.verify(utc(2026, 3, 10, 12, 0))
+        self.rollup.run(now=utc(2026, 3, 10, 13, 0))
+        self.assertEqual(self.rollup.watermark(), utc(2026, 3, 10, 10))
+        self.assertEqual(self.value(Statistic.Period.MONTHLY, utc(2026, 3, 1)), 2)
+
+
+class VerificationStatsApiTestCase(AnalyticsTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        User = get_user_model()
+        cls.staff = User.objects.create_user(username="staff", password="x", is_staff=True)
+        cls.member = User.objects.create_user(username="membre", password="x")
+        cls.outsider = User.objects.create_user(username="autre", password="x")
+        InstitutionUser.objects.create(
+            institution=cls.institution, user=cls.member, role=InstitutionUser.Role.VIEWER
+        )
+
+    def setUp(self):
+        self.verify(utc(2026, 4, 2, 9, 0))
+        self.verify(utc(2026, 4, 2, 9, 30), result=Result.NOT_FOUND, known=False)
+        VerificationRollup().run(now=utc(2026, 4, 3, 0, 0))
+        self.url = "/api/v1/analytics/verifications"
+        self.params = {'period': 'DAILY', 'start': '2026-04-01T00:00:00Z', 'end': '2026-04-05T00:00:00Z'}
+
+    def test_staff_reads_rollups_only(self):
+        self.client.force_login(self.staff)
+        DocumentVerification.objects.all().delete()
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['total'], data['success'], data['failed']), (2, 1, 1))
+        self.assertEqual(data['points'][0]['results'], {'AUTHENTIC': 1, 'NOT_FOUND': 1})
+
+    def test_member_reads_own_institution(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(self.url, self.params).status_code, 403)
+        response = self.client.get(self.url, {**self.params, 'institution_id': str(self.institution.pk)})
+        self.assertEqual(response.json()['total'], 1)
+
+        self.client.force_login(self.outsider)
+        response = self.client.get(self.url, {**self.params, 'institution_id': str(self.institution.pk)})
+        self.assertEqual(response.status_code, 403)
+
+
+class PerformanceInstrumentationTestCase(AnalyticsTestCase):
+
+    def setUp(self):
+        self.metrics = RequestMetrics({'FLUSH_INTERVAL': 0, 'METRICS_TOKEN': 'secret'})
+        patcher = mock.patch('apps.analytics.middleware.request_metrics', self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.route = 'api/v1/verify/<document_hash>'
+
+    def test_requests_are_aggregated_per_route(self):
+        for _ in range(3):
+            self.client.get(f"/api/v1/verify/{self.document.document_hash}")
+        stats = self.metrics.snapshot()[('GET', self.route)]
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(sum(stats.buckets), 3)
+        self.assertGreater(stats.handler_seconds, 0)
+        self.assertGreater(stats.queries, 0)
+        self.assertGreater(stats.cache_hits, 0)  # Instantané du document mis en cache à la première requête
+
+    def test_flush_writes_one_row_per_window(self):
+        self.client.get(f"/api/v1/verify/{'b' * 64}")
+        self.client.get(f"/api/v1/verify/{'c' * 64}")
+        self.assertEqual(self.metrics.flush(), 1)
+        row = PerformanceMetric.objects.get(endpoint=self.route)
+        self.assertEqual((row.method, row.request_count, row.error_count), ('GET', 2, 0))
+        self.assertLessEqual(row.avg_response_time_ms, row.p99_response_time_ms * 2)
+        self.assertEqual(sum(row.latency_histogram.values()), 2)
+
+        self.assertEqual(self.metrics.flush(), 0)  # Aucune requête depuis
+        self.client.get(f"/api/v1/verify/{'b' * 64}")
+        self.metrics.flush()
+        self.assertEqual(
+            list(PerformanceMetric.objects.filter(endpoint=self.route).values_list('request_count', flat=True)), [1, 2]
+        )
+
+    def test_prometheus_endpoint(self):
+        self.client.get(f"/api/v1/verify/{'b' * 64}")
+        with mock.patch('apps.analytics.api.request_metrics', self.metrics):
+            self.assertEqual(self.client.get("/api/v1/analytics/metrics").status_code, 401)
+            response = self.client.get("/api/v1/analytics/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn(f'letscheck_http_requests_total{{method="GET",endpoint="{self.route}"}} 1', body)
+        self.assertIn(
+            f'letscheck_http_request_duration_seconds_bucket{{method="GET",endpoint="{self.route}",le="+Inf"}} 1', body
+        )
 
-# Create your tests here.
+    def test_overhead_stays_in_microseconds(self):
+        out = StringIO()
+        call_command('benchmark_instrumentation', iterations=2000, queries=200, json=True, stdout=out)
+        self.assertLess(json.loads(out.getvalue())['request_overhead_us'], 100)
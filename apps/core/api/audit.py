@@ -0,0 +1,52 @@
+# apps/core/api/audit.py
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from django.http import HttpRequest
+from ninja import Router
+from ninja.errors import AuthorizationError, HttpError
+from ninja.security import django_auth
+
+from apps.core.audit import audit_log_store
+from apps.core.models import AuditLog
+
+from .schemas import AuditLogPageSchema
+
+router = Router(tags=["Audit"])
+
+
+@router.get("/logs", response=AuditLogPageSchema, auth=django_auth)
+def list_audit_logs(
+    request: HttpRequest,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    action_type: Optional[AuditLog.ActionType] = None,
+    resource_type: Optional[AuditLog.ResourceType] = None,
+    resource_id: Optional[UUID] = None,
+    user_id: Optional[UUID] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """
+    Journal d'audit, du plus récent au plus ancien (réservé au staff).
+    Pagination par curseur : passer next_cursor de la réponse précédente en paramètre cursor.
+    """
+    if not request.user.is_staff:
+        raise AuthorizationError()
+
+    logs = AuditLog.objects.all()
+    if action_type:
+        logs = logs.filter(action_type=action_type)
+    if resource_type:
+        logs = logs.filter(resource_type=resource_type)
+    if resource_id:
+        logs = logs.filter(resource_id=resource_id)
+    if user_id:
+        logs = logs.filter(user_id=user_id)
+
+    try:
+        items, next_cursor = audit_log_store.page(logs, limit=limit, cursor=cursor, since=since, until=until)
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    return {'items': items, 'next_cursor': next_cursor}
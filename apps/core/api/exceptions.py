@@ -5,4 +5,22 @@ class BaseAPIException(Exception):
     default_detail = "Une erreur interne est survenue."
 
     def __init__(self, detail=None):
-        self.detail = detail or self.default_detail
\ No newline at end of file
+        self.detail = detail or self.default_detail
+
+
+class BadRequestException(BaseAPIException):
+    """Requête incohérente."""
+    status_code = 400
+    default_detail = "Requête invalide."
+
+
+class ConflictException(BaseAPIException):
+    """La ressource existe déjà."""
+    status_code = 409
+    default_detail = "La ressource existe déjà."
+
+
+class PayloadTooLargeException(BaseAPIException):
+    """Corps de requête ou fichier trop volumineux."""
+    status_code = 413
+    default_detail = "Le fichier dépasse la taille maximale autorisée."
@@ -0,0 +1,120 @@
+# apps/core/api/exports.py
+from datetime import datetime
+from typing import Iterator, Literal, Optional
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import HttpRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from ninja import Router
+from ninja.errors import AuthorizationError, HttpError
+from ninja.security import django_auth
+
+from apps.core.exports import CONTENT_TYPES, data_export, file_name
+from apps.core.models import ExportJob
+from apps.core.tasks import run_export
+from apps.institutions.models import InstitutionUser
+
+from .schemas import ExportJobCreateSchema, ExportJobSchema
+
+router = Router(tags=["Exports"])
+
+Dataset = Literal['audit_logs', 'verifications', 'statistics']
+Format = Literal['csv', 'ndjson']
+
+
+def check_access(request: HttpRequest, dataset: str, institution_id: Optional[UUID]) -> None:
+    """Journal d'audit : staff uniquement. Autres exports : staff, ou membre actif de l'institution filtrée."""
+    if request.user.is_staff:
+        return
+    if dataset == 'audit_logs' or institution_id is None or not InstitutionUser.objects.filter(
+        user=request.user, institution_id=institution_id, is_active=True
+    ).exists():
+        raise AuthorizationError()
+
+
+def streaming_response(request: HttpRequest, chunks: Iterator[bytes], fmt: str, name: str) -> StreamingHttpResponse:
+    """
+    Réponse en flux sans mise en mémoire : sous ASGI, Django lit entièrement un itérateur
+    synchrone avant d'envoyer la réponse ; les morceaux sont alors lus un par un dans le
+    thread des requêtes ORM.
+    """
+    if isinstance(request, ASGIRequest):
+        read = sync_to_async(next, thread_sensitive=True)
+
+        async def async_chunks(source):
+            while (chunk := await read(source, None)) is not None:
+                yield chunk
+
+        chunks = async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{name}"'
+    return response
+
+
+@router.post("/jobs", response={202: ExportJobSchema}, auth=django_auth)
+def create_export_job(request: HttpRequest, payload: ExportJobCreateSchema):
+    """Export en tâche de fond, écrit dans le stockage des exports ; suivi par GET /exports/jobs/{id}."""
+    check_access(request, payload.dataset, payload.institution_id)
+    if payload.since and payload.until and payload.since >= payload.until:
+        raise HttpError(400, "La date de début doit précéder la date de fin.")
+    try:
+        job = data_export.create_job(
+            request.user, payload.dataset, payload.format, payload.gzip,
+            payload.since, payload.until, payload.institution_id,
+        )
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    transaction.on_commit(lambda: run_export(job.pk))
+    return 202, job
+
+
+def get_job(request: HttpRequest, job_id: UUID) -> ExportJob:
+    job = get_object_or_404(ExportJob, pk=job_id)
+    if not request.user.is_staff and job.user_id != request.user.pk:
+        raise AuthorizationError()
+    return job
+
+
+@router.get("/jobs/{job_id}", response=ExportJobSchema, auth=django_auth)
+def export_job(request: HttpRequest, job_id: UUID):
+    return get_job(request, job_id)
+
+
+@router.get("/jobs/{job_id}/download", auth=django_auth)
+def download_export_job(request: HttpRequest, job_id: UUID):
+    """Fichier d'un export terminé (409 tant qu'il n'est pas terminé)."""
+    job = get_job(request, job_id)
+    if job.status != ExportJob.Status.COMPLETED:
+        raise HttpError(409, "L'export n'est pas terminé.")
+    return streaming_response(
+        request, data_export.job_chunks(job), job.format, file_name(job.dataset, job.format, job.compressed)
+    )
+
+
+# Après /jobs : le chemin /{dataset} intercepterait /jobs
+@router.get("/{dataset}", auth=django_auth)
+def export_dataset(
+    request: HttpRequest,
+    dataset: Dataset,
+    format: Format = 'csv',
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    institution_id: Optional[UUID] = None,
+):
+    """
+    Export en flux (CSV ou NDJSON, gzip en option), trié par horodatage.
+    Mémoire constante quelle que soit la période ; pour les très gros exports,
+    préférer POST /exports/jobs (reprise après interruption).
+    """
+    check_access(request, dataset, institution_id)
+    if since and until and since >= until:
+        raise HttpError(400, "La date de début doit précéder la date de fin.")
+    try:
+        chunks = data_export.stream(dataset, format, since, until, institution_id, compress=gzip)
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    return streaming_response(request, chunks, format, file_name(dataset, format, gzip))
@@ -1,5 +1,8 @@
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+from uuid import UUID
+
 from ninja import Schema
-from typing import List
 
 class ErrorDetail(Schema):
     field: str
@@ -28,3 +31,42 @@ class GenericErrorResponse(Schema):
     detail: str
     error_type: str | None = None
     error_message: str | None = None
+
+class AuditLogSchema(Schema):
+    id: UUID
+    timestamp: datetime
+    user_id: Optional[UUID] = None
+    action_type: str
+    resource_type: str
+    resource_id: Optional[UUID] = None
+    ip_address: str
+    user_agent: str
+    success: bool
+    details: Dict[str, Any]
+
+class AuditLogPageSchema(Schema):
+    items: List[AuditLogSchema]
+    # À repasser en paramètre cursor pour la page suivante ; None en fin de journal
+    next_cursor: Optional[str] = None
+
+class ExportJobCreateSchema(Schema):
+    dataset: Literal['audit_logs', 'verifications', 'statistics']
+    format: Literal['csv', 'ndjson'] = 'csv'
+    gzip: bool = True
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    institution_id: Optional[UUID] = None
+
+class ExportJobSchema(Schema):
+    id: UUID
+    dataset: str
+    format: str
+    compressed: bool
+    filters: Dict[str, Any]
+    status: str
+    rows: int
+    parts: int
+    error: str
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
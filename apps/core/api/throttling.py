@@ -0,0 +1,147 @@
+# apps/core/api/throttling.py
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Optional
+
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.http import HttpRequest
+from ninja.throttling import BaseThrottle
+
+from apps.core.cache import LRUCache
+from apps.core.ratelimit import parse_rate, rate_limiter
+
+logger = logging.getLogger('app')
+
+TIERS = ('ip', 'api_key', 'institution')
+
+# Institution de rattachement par utilisateur (ou None), par processus
+memberships = LRUCache(maxsize=10000, ttl=300)
+_membership_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ratelimit-membership')
+_loading = set()
+_loading_lock = threading.Lock()
+_UNKNOWN = object()
+
+
+def load_membership(user_id) -> Optional[str]:
+    """Institution de la première adhésion active de l'utilisateur (requête en base)."""
+    from apps.institutions.models import InstitutionUser
+
+    institution_id = InstitutionUser.objects.filter(user_id=user_id, is_active=True).order_by(
+        'created_at'
+    ).values_list('institution_id', flat=True).first()
+    return str(institution_id) if institution_id else None
+
+
+def _fill_membership(user_id) -> None:
+    try:
+        memberships.set(user_id, load_membership(user_id))
+    except Exception as e:
+        logger.warning(f"Adhésion de l'utilisateur {user_id} non chargée: {e}")
+    finally:
+        with _loading_lock:
+            _loading.discard(user_id)
+
+
+def institution_of(user: AbstractBaseUser) -> Optional[str]:
+    """
+    Institution de la première adhésion active de l'utilisateur (mise en cache).
+
+    Opération async : Ninja appelle les throttles depuis la boucle, qui ne doit
+    pas attendre la base. En l'absence d'entrée, l'adhésion est chargée dans un
+    thread et None est retourné : le palier institution s'applique dès la requête
+    suivante (les paliers ip et api_key restent appliqués).
+    """
+    institution_id = memberships.get(user.pk, _UNKNOWN)
+    if institution_id is not _UNKNOWN:
+        return institution_id
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        institution_id = load_membership(user.pk)
+        memberships.set(user.pk, institution_id)
+        return institution_id
+
+    with _loading_lock:
+        if user.pk in _loading:
+            return None
+        _loading.add(user.pk)
+    _membership_executor.submit(_fill_membership, user.pk)
+    return None
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    Throttle Django Ninja adossé au limiteur partagé (apps.core.ratelimit), par palier :
+
+    - ip : requêtes anonymes, par adresse IP ;
+    - api_key : requêtes authentifiées, par identité (utilisateur de session ou jeton) ;
+    - institution : requêtes des membres d'une institution, budget commun.
+
+    Une requête est soumise à chaque palier qui la concerne. Une opération groupée
+    (vérification par lot) est admise dès qu'il reste une unité, puis le reste de
+    son coût est imputé via charge_throttles() une fois le corps validé.
+
+    Ninja appelle allow_request() de façon synchrone, y compris pour les opérations
+    async : l'admission y coûte un aller-retour Redis bloquant (un EVALSHA, borné
+    par socket_timeout en production), assumé pour garder une limite exacte entre
+    workers. Un client refusé est ensuite rejeté localement, sans aller-retour,
+    jusqu'à la fin de son attente.
+    """
+
+    def __init__(self, tier: str, rate: Optional[str] = None):
+        if tier not in TIERS:
+            raise ValueError(f"Palier de limitation inconnu: {tier}")
+        self.tier = tier
+        self.rate = rate or rate_limiter.config['TIERS'][tier]
+        self.num_requests, self.duration = parse_rate(self.rate)
+        # Instance partagée entre threads et requêtes async : attente propre au contexte
+        self._wait: ContextVar[Optional[float]] = ContextVar(f'throttle_wait_{tier}', default=None)
+
+    def get_cache_key(self, request: HttpRequest) -> Optional[str]:
+        auth = getattr(request, 'auth', None)
+        if self.tier == 'ip':
+            ident = self.get_ident(request) if auth is None else None
+        elif self.tier == 'api_key':
+            if isinstance(auth, AbstractBaseUser):
+                ident = f"user:{auth.pk}"
+            elif auth is not None:
+                ident = hashlib.sha256(str(auth).encode()).hexdigest()
+            else:
+                ident = None
+        else:
+            ident = institution_of(auth) if isinstance(auth, AbstractBaseUser) else None
+        return f"throttle_{self.tier}_{ident}" if ident else None
+
+    def allow_request(self, request: HttpRequest) -> bool:
+        key = self.get_cache_key(request)
+        if key is None:
+            return True
+
+        allowed, wait = rate_limiter.hit(key, self.num_requests, self.duration)
+        self._wait.set(wait)
+        if allowed:
+            if not hasattr(request, 'weighted_throttles'):
+                request.weighted_throttles = []
+            request.weighted_throttles.append((self, key))
+        return allowed
+
+    def charge(self, key: str, cost: int) -> None:
+        """Impute un coût supplémentaire à un client déjà admis."""
+        rate_limiter.charge(key, self.num_requests, self.duration, cost)
+
+    def wait(self) -> Optional[float]:
+        return self._wait.get()
+
+
+def charge_throttles(request: HttpRequest, cost: int) -> None:
+    """
+    Impute le coût d'une opération groupée aux throttles ayant admis la requête.
+    Une unité a déjà été consommée à l'admission.
+    """
+    for throttle, key in getattr(request, 'weighted_throttles', []):
+        throttle.charge(key, cost - 1)
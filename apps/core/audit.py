@@ -0,0 +1,312 @@
+# apps/core/audit.py
+import base64
+import gzip
+import json
+import logging
+import re
+import tempfile
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .models import AuditLog
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'MONTHS_AHEAD': 2,  # Partitions mensuelles créées à l'avance
+    'RETENTION_MONTHS': 12,  # Mois conservés en base par l'archivage
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {},
+    'PAGE_SIZE': 50,
+    'MAX_PAGE_SIZE': 500,
+    'SCAN_WINDOW': 3600,  # Secondes de la première fenêtre lue par page
+    'EXPORT_CHUNK_SIZE': 5000,
+}
+
+TABLE = AuditLog._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_PATTERN = re.compile(rf'^{TABLE}_y(\d{{4}})m(\d{{2}})$')
+ARCHIVE_FIELDS = [field.attname for field in AuditLog._meta.concrete_fields]
+
+
+def month_start(value: datetime) -> datetime:
+    """Premier instant (UTC) du mois de value."""
+    value = value.astimezone(dt_timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    year, month = divmod(start.month - 1 + months, 12)
+    return start.replace(year=start.year + year, month=month + 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{TABLE}_y{start.year}m{start.month:02d}"
+
+
+def encode_cursor(log: AuditLog) -> str:
+    """Curseur opaque de pagination : (timestamp, id) de la dernière entrée servie."""
+    raw = f"{log.timestamp.isoformat()}|{log.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, pk = raw.split('|')
+        return datetime.fromisoformat(timestamp), UUID(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Curseur de pagination invalide.") from e
+
+
+class AuditLogStore:
+    """
+    Stockage du journal d'audit, en ajout seul.
+
+    - PostgreSQL : table partitionnée par mois sur timestamp (migration
+      core.0003), partitions créées à l'avance par une tâche quotidienne,
+      partition DEFAULT en filet de sécurité ; index BRIN sur timestamp
+      (quelques pages pour des centaines de millions de lignes) en plus des
+      index composites du modèle. Autres bases : table unique, index B-tree
+      sur timestamp.
+    - Pagination par curseur (timestamp, id) au lieu d'OFFSET : une page lit
+      des fenêtres de temps croissantes à partir du curseur, chacune servie par
+      l'index BRIN (ou par un index composite si la requête est filtrée), sans
+      jamais trier la table entière.
+    - Archivage : les mois sortis de la rétention sont exportés en NDJSON gzip
+      dans le stockage configuré, puis leur partition est détachée et supprimée
+      (suppression par plage sous SQLite).
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    @cached_property
+    def storage(self):
+        return import_string(self.config['STORAGE_BACKEND'])(**self.config['STORAGE_OPTIONS'])
+
+    # ------------------------------------------------------------------
+    # Partitions
+    # ------------------------------------------------------------------
+
+    def is_partitioned(self) -> bool:
+        if connection.vendor != 'postgresql':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = %s AND pg_table_is_visible(c.oid)", [TABLE]
+            )
+            return cursor.fetchone() is not None
+
+    def _attached(self) -> List[str]:
+        """Noms des partitions rattachées à la table (PostgreSQL)."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+                [TABLE],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def partitions(self) -> List[Tuple[str, datetime, datetime]]:
+        """Partitions mensuelles existantes (nom, début, fin), de la plus ancienne à la plus récente."""
+        if not self.is_partitioned():
+            return []
+        partitions = []
+        for name in self._attached():
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                start = datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)
+                partitions.append((name, start, add_months(start, 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def ensure_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Crée les partitions du mois courant et des MONTHS_AHEAD suivants ; retourne celles créées.
+        Un mois en échec (verrou, ligne inattendue) est journalisé et retenté au passage suivant.
+        """
+        if not self.is_partitioned():
+            return []
+        attached = set(self._attached())
+        has_default = DEFAULT_PARTITION in attached
+        current = month_start(now or timezone.now())
+        created = []
+        for offset in range(self.config['MONTHS_AHEAD'] + 1):
+            start = add_months(current, offset)
+            name = partition_name(start)
+            if name in attached:
+                continue
+            try:
+                self._create_partition(name, start, add_months(start, 1), has_default)
+            except DatabaseError as e:
+                logger.error(f"Création de la partition d'audit {name} impossible: {e}", exc_info=True)
+                continue
+            created.append(name)
+        if created:
+            logger.info(f"Partitions d'audit créées: {', '.join(created)}")
+        return created
+
+    def _create_partition(self, name: str, start: datetime, end: datetime, has_default: bool) -> None:
+        """
+        Crée la partition [start, end). Les lignes de ce mois tombées dans la partition
+        DEFAULT (horodatages en avance, tâche en retard) y feraient échouer le CREATE :
+        DEFAULT est alors détachée, ses lignes du mois déplacées dans la nouvelle
+        partition, puis rattachée, dans une seule transaction.
+        """
+        quote = connection.ops.quote_name
+        create = (
+            f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(TABLE)} "
+            f"FOR VALUES FROM (%s) TO (%s)"
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            misplaced = False
+            if has_default:
+                cursor.execute(
+                    f"SELECT EXISTS (SELECT 1 FROM {quote(DEFAULT_PARTITION)} "
+                    f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s)", [start, end]
+                )
+                misplaced = cursor.fetchone()[0]
+            if not misplaced:
+                cursor.execute(create, [start, end])
+                return
+
+            cursor.execute(f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(DEFAULT_PARTITION)}")
+            cursor.execute(create, [start, end])
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} "
+                f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s RETURNING *) "
+                f"INSERT INTO {quote(name)} SELECT * FROM moved", [start, end]
+            )
+            moved = cursor.rowcount
+            cursor.execute(f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(DEFAULT_PARTITION)} DEFAULT")
+        logger.warning(f"Partition d'audit {name}: {moved} entrées déplacées depuis la partition DEFAULT")
+
+    # ------------------------------------------------------------------
+    # Pagination par curseur
+    # ------------------------------------------------------------------
+
+    def page(self, queryset=None, limit: Optional[int] = None, cursor: Optional[str] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None) -> Tuple[List[AuditLog], Optional[str]]:
+        """
+        Page d'entrées, de la plus récente à la plus ancienne, après le curseur.
+
+        Returns:
+            (entrées, curseur de la page suivante ou None)
+
+        Raises:
+            ValueError: curseur invalide
+        """
+        limit = max(1, min(limit or self.config['PAGE_SIZE'], self.config['MAX_PAGE_SIZE']))
+        queryset = (queryset if queryset is not None else AuditLog.objects.all()).order_by('-timestamp', '-id')
+        if since is not None:
+            queryset = queryset.filter(timestamp__gte=since)
+        if until is not None:
+            queryset = queryset.filter(timestamp__lt=until)
+
+        top = until or timezone.now()
+        if cursor:
+            timestamp, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+            top = timestamp
+
+        floor = since or self.oldest()
+        if floor is None:
+            return [], None
+
+        logs: List[AuditLog] = []
+        window = timedelta(seconds=self.config['SCAN_WINDOW'])
+        lower = top - window
+        while len(logs) < limit:
+            if lower <= floor:
+                logs += queryset[:limit - len(logs)]
+                break
+            logs += queryset.filter(timestamp__gte=lower)[:limit - len(logs)]
+            # Fenêtre suivante, quatre fois plus large, strictement plus ancienne
+            queryset = queryset.filter(timestamp__lt=lower)
+            window *= 4
+            lower -= window
+
+        return logs, encode_cursor(logs[-1]) if len(logs) == limit else None
+
+    def oldest(self) -> Optional[datetime]:
+        """Borne basse du journal : début de la plus ancienne partition, sinon plus ancienne entrée."""
+        partitions = self.partitions()
+        if partitions:
+            return partitions[0][1]
+        return AuditLog.objects.aggregate(oldest=Min('timestamp'))['oldest']
+
+    # ------------------------------------------------------------------
+    # Archivage
+    # ------------------------------------------------------------------
+
+    def archive(self, before: Optional[datetime] = None, dry_run: bool = False) -> List[Dict[str, Any]]:
+        """
+        Exporte puis supprime les mois antérieurs à before (par défaut :
+        RETENTION_MONTHS mois avant le mois courant).
+
+        Returns:
+            une entrée par mois : name, start, rows, file
+        """
+        cutoff = month_start(before or add_months(month_start(timezone.now()), -self.config['RETENTION_MONTHS']))
+        archived = []
+        for name, start, end in self._months_before(cutoff):
+            entry = {'name': name, 'start': start, 'rows': None, 'file': f"{name}.ndjson.gz"}
+            if dry_run:
+                entry['rows'] = AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end).count()
+            else:
+                entry['rows'] = self._export(start, end, entry['file'])
+                self._drop(name, start, end)
+                logger.info(f"Journal d'audit archivé: {name} ({entry['rows']} entrées) -> {entry['file']}")
+            archived.append(entry)
+        return archived
+
+    def _months_before(self, cutoff: datetime) -> List[Tuple[str, datetime, datetime]]:
+        if self.is_partitioned():
+            return [partition for partition in self.partitions() if partition[2] <= cutoff]
+        oldest = AuditLog.objects.filter(timestamp__lt=cutoff).aggregate(oldest=Min('timestamp'))['oldest']
+        months = []
+        start = month_start(oldest) if oldest else cutoff
+        while start < cutoff:
+            months.append((partition_name(start), start, add_months(start, 1)))
+            start = add_months(start, 1)
+        return months
+
+    def _export(self, start: datetime, end: datetime, path: str) -> int:
+        """Écrit les entrées du mois en NDJSON gzip (ordre chronologique) ; retourne leur nombre."""
+        rows = 0
+        logs = AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by('timestamp', 'id')
+        with tempfile.TemporaryFile() as spool:
+            with gzip.GzipFile(fileobj=spool, mode='wb') as archive:
+                for row in logs.values(*ARCHIVE_FIELDS).iterator(chunk_size=self.config['EXPORT_CHUNK_SIZE']):
+                    archive.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')).encode() + b'\n')
+                    rows += 1
+            spool.seek(0)
+            # Nouvelle tentative après un échec entre export et suppression : l'export est refait
+            if self.storage.exists(path):
+                self.storage.delete(path)
+            self.storage.save(path, File(spool))
+        return rows
+
+    def _drop(self, name: str, start: datetime, end: datetime) -> None:
+        if not self.is_partitioned():
+            AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end).delete()
+            return
+        quote = connection.ops.quote_name
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}")
+            cursor.execute(f"DROP TABLE {quote(name)}")
+
+
+audit_log_store = AuditLogStore(getattr(settings, 'AUDIT_LOG', None))
@@ -0,0 +1,160 @@
+# apps/core/cache.py
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache
+
+# Compteurs [hits, misses] de la requête en cours (apps.analytics.instrumentation), None hors requête
+request_cache_counters: ContextVar[Optional[List[int]]] = ContextVar('request_cache_counters', default=None)
+
+
+def count_cache_access(hits: int = 0, misses: int = 0) -> None:
+    """Impute des accès à un cache à la requête en cours, si elle est instrumentée."""
+    counters = request_cache_counters.get()
+    if counters is not None:
+        counters[0] += hits
+        counters[1] += misses
+
+
+class LRUCache:
+    """
+    Cache LRU en mémoire locale au processus, borné en taille et avec expiration (TTL).
+    Thread-safe : un même cache peut être partagé par les threads d'un worker.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        """
+        Args:
+            maxsize: Nombre maximal d'entrées conservées (éviction LRU au-delà)
+            ttl: Durée de vie par défaut d'une entrée, en secondes
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retourne la valeur associée à la clé, ou default si absente ou expirée."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        counters = request_cache_counters.get()
+        if counters is not None:
+            counters[entry is None] += 1
+        return default if entry is None else entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Ajoute ou remplace une entrée, en évinçant les moins récemment utilisées."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Statistiques d'utilisation du cache (taille, hits, misses, évictions)."""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _ABSENT) is not _ABSENT
+
+
+_ABSENT = object()
+
+
+class AsyncCache:
+    """
+    Accès async à un cache Django, pour les vues async.
+
+    - RedisCache : client redis.asyncio natif, mêmes clés et même sérialisation
+      que le client sync de Django (les deux lisent et écrivent les mêmes entrées).
+      Un client par boucle d'événements.
+    - Autres backends (locmem en développement et tests) : méthodes a*() de Django,
+      exécutées dans un thread.
+    """
+
+    def __init__(self, alias: str = 'default'):
+        self.alias = alias
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _redis(self):
+        cache = self.cache
+        if not isinstance(cache, RedisCache):
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            from redis import asyncio as aioredis
+            # Premier serveur : le primaire, comme les écritures du client sync
+            client = self._clients[loop] = aioredis.Redis.from_url(cache._servers[0])
+        return client
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        client = self._redis()
+        if client is None:
+            return await self.cache.aget(key, default)
+        value = await client.get(self.cache.make_and_validate_key(key))
+        return default if value is None else self.cache._cache._serializer.loads(value)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        client = self._redis()
+        if client is None:
+            return await self.cache.aget_many(keys)
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await client.mget([self.cache.make_and_validate_key(key) for key in keys])
+        loads = self.cache._cache._serializer.loads
+        return {key: loads(value) for key, value in zip(keys, values) if value is not None}
+
+    async def set(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> None:
+        client = self._redis()
+        if client is None:
+            return await self.cache.aset(key, value, timeout)
+        key = self.cache.make_and_validate_key(key)
+        timeout = self.cache.get_backend_timeout(timeout)
+        if timeout == 0:
+            await client.delete(key)
+        else:
+            await client.set(key, self.cache._cache._serializer.dumps(value), ex=timeout)
@@ -0,0 +1,337 @@
+# apps/core/exports.py
+import csv
+import io
+import json
+import logging
+import tempfile
+import zlib
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Min, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .models import ExportJob
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'CHUNK_SIZE': 2000,  # Lignes lues par aller-retour (iterator / curseur côté serveur)
+    'WINDOW': 86400,  # Secondes de la fenêtre de temps triée par requête
+    'BUFFER_BYTES': 64 * 1024,  # Taille des morceaux envoyés
+    'COMPRESS_LEVEL': 6,
+    'PART_ROWS': 1000000,  # Lignes par fichier d'un export en tâche de fond
+    'STALE_AFTER': 900,  # Secondes sans nouvelle partie avant reprise d'un export
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {},
+}
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+CONTENT_TYPES = {CSV: 'text/csv; charset=utf-8', NDJSON: 'application/x-ndjson'}
+
+
+class Dataset(NamedTuple):
+    model: str  # app_label.Model
+    time_field: str  # Ordre de l'export, avec id
+    fields: Tuple[str, ...]
+    institution_field: Optional[str] = None  # Filtre institution_id (None : réservé au staff)
+
+
+DATASETS = {
+    'audit_logs': Dataset('core.AuditLog', 'timestamp', (
+        'id', 'timestamp', 'user_id', 'action_type', 'resource_type', 'resource_id',
+        'ip_address', 'user_agent', 'success', 'details',
+    )),
+    # Sans IP ni user agent des vérifieurs : l'export est ouvert aux institutions
+    'verifications': Dataset('documents.DocumentVerification', 'timestamp', (
+        'id', 'timestamp', 'document_id', 'provided_hash', 'method', 'result',
+        'verifier_country', 'verification_duration_ms',
+    ), 'document__institution'),
+    'statistics': Dataset('analytics.Statistic', 'period_start', (
+        'id', 'period_start', 'period_end', 'period_type', 'metric_type', 'institution_id', 'value', 'breakdown',
+    ), 'institution'),
+}
+
+
+def file_name(dataset: str, fmt: str, compressed: bool) -> str:
+    return f"{dataset}.{fmt}{'.gz' if compressed else ''}"
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = DEFAULTS['COMPRESS_LEVEL']) -> Iterator[bytes]:
+    """Compression gzip au fil de l'eau (un seul compresseur, mémoire constante)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return value
+
+
+class DataExport:
+    """
+    Exports CSV / NDJSON du journal d'audit, des vérifications et des statistiques,
+    en mémoire constante quel que soit le nombre de lignes.
+
+    - Lecture : fenêtres de temps successives (WINDOW), chacune triée par
+      (horodatage, id) et lue par tranches de CHUNK_SIZE avec iterator()
+      (curseur côté serveur sous PostgreSQL) ; aucun tri de la table entière
+      (index BRIN du journal d'audit).
+    - Écriture : lignes encodées dans un tampon réutilisé, envoyé par morceaux
+      de BUFFER_BYTES, éventuellement compressés en gzip au fil de l'eau.
+    - Exports en tâche de fond (ExportJob) : fichiers de PART_ROWS lignes dans
+      le stockage des exports, point de reprise (clé de la dernière ligne) après
+      chaque partie. Les parties gzip se concatènent en un fichier gzip valide.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    @cached_property
+    def storage(self):
+        return import_string(self.config['STORAGE_BACKEND'])(**self.config['STORAGE_OPTIONS'])
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def dataset(name: str) -> Dataset:
+        """
+        Raises:
+            ValueError: export inconnu
+        """
+        if name not in DATASETS:
+            raise ValueError(f"Export inconnu: {name}")
+        return DATASETS[name]
+
+    def queryset(self, name: str, institution_id: Optional[UUID] = None):
+        """
+        Raises:
+            ValueError: export inconnu, ou sans filtre par institution
+        """
+        dataset = self.dataset(name)
+        queryset = apps.get_model(dataset.model).objects.order_by()
+        if institution_id is not None:
+            if dataset.institution_field is None:
+                raise ValueError(f"L'export {name} ne se filtre pas par institution.")
+            queryset = queryset.filter(**{f'{dataset.institution_field}_id': institution_id})
+        return queryset
+
+    def rows(self, name: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+             institution_id: Optional[UUID] = None, after: Optional[Tuple[datetime, Any]] = None) -> Iterator[tuple]:
+        """
+        Lignes (valeurs de Dataset.fields) dans l'ordre (horodatage, id), après la clé after.
+        """
+        dataset = self.dataset(name)
+        time_field = dataset.time_field
+        queryset = self.queryset(name, institution_id)
+        until = until or timezone.now()
+        if after is not None:
+            lower = after[0]
+        else:
+            bounded = queryset.filter(**{f'{time_field}__gte': since}) if since else queryset
+            lower = bounded.aggregate(oldest=Min(time_field))['oldest']
+            if lower is None:
+                return
+
+        window = timedelta(seconds=self.config['WINDOW'])
+        while lower < until:
+            upper = min(lower + window, until)
+            rows = queryset.filter(**{f'{time_field}__gte': lower, f'{time_field}__lt': upper})
+            if after is not None:
+                rows = rows.filter(Q(**{f'{time_field}__gt': after[0]}) | Q(**{time_field: after[0], 'id__gt': after[1]}))
+                after = None
+            yield from rows.order_by(time_field, 'id').values_list(*dataset.fields).iterator(
+                chunk_size=self.config['CHUNK_SIZE']
+            )
+            lower = upper
+
+    def encode(self, name: str, fmt: str, rows: Iterable[tuple], header: bool = True) -> Iterator[bytes]:
+        """Morceaux d'environ BUFFER_BYTES des lignes encodées (UTF-8)."""
+        fields = self.dataset(name).fields
+        limit = self.config['BUFFER_BYTES']
+        buffer = io.StringIO()
+        if fmt == CSV:
+            writer = csv.writer(buffer)
+            if header:
+                writer.writerow(fields)
+            write = lambda row: writer.writerow([_csv_value(value) for value in row])  # noqa: E731
+        elif fmt == NDJSON:
+            encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+            write = lambda row: buffer.write(encoder.encode(dict(zip(fields, row))) + '\n')  # noqa: E731
+        else:
+            raise ValueError(f"Format d'export inconnu: {fmt}")
+
+        for row in rows:
+            write(row)
+            if buffer.tell() >= limit:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def stream(self, name: str, fmt: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+               institution_id: Optional[UUID] = None, compress: bool = False) -> Iterator[bytes]:
+        """Export complet, en flux (réponse HTTP, commande export_data)."""
+        # Validation avant le premier morceau : une erreur ne peut plus être signalée une fois l'envoi commencé
+        self.queryset(name, institution_id)
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Format d'export inconnu: {fmt}")
+        chunks = self.encode(name, fmt, self.rows(name, since, until, institution_id))
+        return gzip_chunks(chunks, self.config['COMPRESS_LEVEL']) if compress else chunks
+
+    # ------------------------------------------------------------------
+    # Exports en tâche de fond (ExportJob)
+    # ------------------------------------------------------------------
+
+    def create_job(self, user, name: str, fmt: str, compressed: bool = True, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None, institution_id: Optional[UUID] = None) -> ExportJob:
+        """
+        Raises:
+            ValueError: export ou format inconnu, filtre par institution impossible
+        """
+        self.queryset(name, institution_id)
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Format d'export inconnu: {fmt}")
+        now = timezone.now()
+        return ExportJob.objects.create(
+            user=user, dataset=name, format=fmt, compressed=compressed, updated_at=now,
+            filters={
+                'since': since.isoformat() if since else None,
+                # Borne haute figée : les lignes arrivées pendant l'export ne décalent pas les reprises
+                'until': (until or now).isoformat(),
+                'institution_id': str(institution_id) if institution_id else None,
+            },
+        )
+
+    def part_name(self, job: ExportJob, part: int) -> str:
+        return f"exports/{job.pk}/part-{part:05d}.{file_name(job.dataset, job.format, job.compressed).split('.', 1)[1]}"
+
+    def claim(self, job: ExportJob) -> bool:
+        """Prend l'export (en attente, en échec, ou sans progrès depuis STALE_AFTER) ; False s'il est déjà pris."""
+        now = timezone.now()
+        stale = now - timedelta(seconds=self.config['STALE_AFTER'])
+        claimed = ExportJob.objects.filter(pk=job.pk).filter(
+            Q(status__in=[ExportJob.Status.PENDING, ExportJob.Status.FAILED])
+            | Q(status=ExportJob.Status.RUNNING, updated_at__lt=stale)
+        ).update(status=ExportJob.Status.RUNNING, updated_at=now, error='')
+        if claimed:
+            job.refresh_from_db()
+        return bool(claimed)
+
+    def run_job(self, job: ExportJob) -> ExportJob:
+        """
+        Exécute ou reprend un export, à partir de son dernier point de reprise.
+        Une erreur laisse l'export en échec (FAILED), repris par l'appel suivant.
+        """
+        if not self.claim(job):
+            logger.info(f"Export {job.pk} déjà pris ou terminé ({job.status})")
+            return job
+        try:
+            self._run(job)
+        except Exception as e:
+            ExportJob.objects.filter(pk=job.pk).update(
+                status=ExportJob.Status.FAILED, error=str(e)[:1000], updated_at=timezone.now()
+            )
+            logger.error(f"Export {job.pk} interrompu après {job.parts} parties: {e}", exc_info=True)
+            raise
+        return job
+
+    def _run(self, job: ExportJob) -> None:
+        filters = job.filters
+        time_field = self.dataset(job.dataset).time_field
+        after = None
+        if job.checkpoint:
+            after = (datetime.fromisoformat(job.checkpoint[0]), job.checkpoint[1])
+        rows = self.rows(
+            job.dataset,
+            since=datetime.fromisoformat(filters['since']) if filters.get('since') else None,
+            until=datetime.fromisoformat(filters['until']),
+            institution_id=filters.get('institution_id'),
+            after=after,
+        )
+        fields = self.dataset(job.dataset).fields
+        key = (fields.index(time_field), fields.index('id'))
+
+        while True:
+            part = job.parts + 1
+            written, last = self._write_part(job, part, islice(rows, self.config['PART_ROWS']), key)
+            if written or part == 1:
+                job.parts = part
+                job.rows += written
+                if last is not None:
+                    job.checkpoint = [last[0].isoformat(), str(last[1])]
+                job.updated_at = timezone.now()
+                job.save(update_fields=['parts', 'rows', 'checkpoint', 'updated_at'])
+            if written < self.config['PART_ROWS']:
+                break
+
+        job.status = ExportJob.Status.COMPLETED
+        job.completed_at = job.updated_at = timezone.now()
+        job.save(update_fields=['status', 'completed_at', 'updated_at'])
+        logger.info(f"Export {job.pk} ({job.dataset}) terminé: {job.rows} lignes, {job.parts} parties")
+
+    def _write_part(self, job: ExportJob, part: int, rows: Iterable[tuple], key: Tuple[int, int]):
+        """Écrit une partie dans le stockage ; retourne (lignes, clé de la dernière ligne)."""
+        state = {'written': 0, 'last': None}
+
+        def counted():
+            for row in rows:
+                state['written'] += 1
+                state['last'] = (row[key[0]], row[key[1]])
+                yield row
+
+        chunks = self.encode(job.dataset, job.format, counted(), header=part == 1)
+        if job.compressed:
+            chunks = gzip_chunks(chunks, self.config['COMPRESS_LEVEL'])
+        with tempfile.TemporaryFile() as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+            if state['written'] or part == 1:
+                spool.seek(0)
+                path = self.part_name(job, part)
+                # Reprise après un échec entre l'écriture et le point de reprise : la partie est refaite
+                if self.storage.exists(path):
+                    self.storage.delete(path)
+                self.storage.save(path, File(spool))
+        return state['written'], state['last']
+
+    def job_chunks(self, job: ExportJob) -> Iterator[bytes]:
+        """Fichier complet d'un export terminé : ses parties, lues par morceaux."""
+        for part in range(1, job.parts + 1):
+            with self.storage.open(self.part_name(job, part), 'rb') as handle:
+                while True:
+                    data = handle.read(self.config['BUFFER_BYTES'])
+                    if not data:
+                        break
+                    yield data
+
+    def stale_jobs(self) -> Iterator[UUID]:
+        """Exports à (re)lancer : jamais démarrés ou sans progrès depuis STALE_AFTER."""
+        stale = timezone.now() - timedelta(seconds=self.config['STALE_AFTER'])
+        return ExportJob.objects.filter(
+            status__in=[ExportJob.Status.PENDING, ExportJob.Status.RUNNING], updated_at__lt=stale
+        ).values_list('pk', flat=True).iterator()
+
+
+data_export = DataExport(getattr(settings, 'DATA_EXPORT', None))
@@ -0,0 +1,40 @@
+# apps/core/management/commands/archive_audit_logs.py
+import json
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.core.audit import audit_log_store
+
+
+class Command(BaseCommand):
+    help = "Exporte en NDJSON gzip puis supprime les mois du journal d'audit sortis de la rétention"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before', help="Mois AAAA-MM : archive les mois antérieurs (défaut : AUDIT_LOG['RETENTION_MONTHS'])"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Liste les mois concernés sans rien modifier")
+        parser.add_argument('--json', action='store_true', help="Affiche le rapport complet en JSON")
+
+    def handle(self, *args, **options):
+        before = None
+        if options['before']:
+            try:
+                before = datetime.strptime(options['before'], '%Y-%m').replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                raise CommandError("--before attend un mois au format AAAA-MM")
+
+        archived = audit_log_store.archive(before=before, dry_run=options['dry_run'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(archived, cls=DjangoJSONEncoder, indent=2))
+            return
+        if not archived:
+            self.stdout.write("Aucun mois à archiver")
+            return
+        verb = "à archiver" if options['dry_run'] else "archivées"
+        for entry in archived:
+            self.stdout.write(f"{entry['name']}: {entry['rows']} entrées {verb} -> {entry['file']}")
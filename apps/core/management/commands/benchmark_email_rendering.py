@@ -0,0 +1,83 @@
+# apps/core/management/commands/benchmark_email_rendering.py
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from apps.core.services.email_renderer import EmailSkeleton, render_email
+
+TEMPLATE_NAME = 'emails/notification.html'
+
+SHARED_CONTEXT = {
+    'notification_title': "Votre clé de signature expire bientôt",
+    'notification_message': "La clé utilisée pour signer vos documents expire dans 7 jours.",
+    'action_url': 'https://enspmhub.com/keys',
+    'action_text': "Gérer mes clés",
+}
+
+
+def render_legacy(context):
+    """Rendu d'origine de send_email_sync : contexte global recalculé, render_to_string, strip_tags."""
+    context.update({
+        'site_name': getattr(settings, 'SITE_NAME', "Let'sCheck"),
+        'site_url': getattr(settings, 'SITE_URL', 'http://localhost:8000'),
+        'support_email': getattr(settings, 'SUPPORT_EMAIL', 'support@letscheck'),
+        'current_year': __import__('datetime').datetime.now().year,
+    })
+    html = render_to_string(TEMPLATE_NAME, context)
+    return html, strip_tags(html)
+
+
+class Command(BaseCommand):
+    help = f"Micro-benchmark du rendu de {TEMPLATE_NAME} (avant / après cache et squelette)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10000)
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        names = [f"Utilisateur {i}" for i in range(iterations)]
+
+        def legacy():
+            for name in names:
+                render_legacy({**SHARED_CONTEXT, 'user_name': name})
+
+        def cached():
+            for name in names:
+                render_email(TEMPLATE_NAME, {**SHARED_CONTEXT, 'user_name': name})
+
+        def skeleton():
+            skeleton = EmailSkeleton(TEMPLATE_NAME, SHARED_CONTEXT, ['user_name'])
+            for name in names:
+                skeleton.render({'user_name': name})
+
+        # Préchauffage : compilation du template hors mesure pour toutes les variantes
+        render_email(TEMPLATE_NAME, {**SHARED_CONTEXT, 'user_name': ''})
+
+        results = []
+        for label, run in (('render_to_string', legacy), ('cached', cached), ('skeleton', skeleton)):
+            started = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - started
+            results.append({
+                'variant': label,
+                'iterations': iterations,
+                'seconds': round(seconds, 3),
+                'us_per_email': round(seconds / iterations * 1e6, 1),
+                'emails_per_sec': round(iterations / seconds),
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        baseline = results[0]['seconds']
+        self.stdout.write(f"{'variante':<18} {'s':>8} {'µs/email':>10} {'emails/s':>10} {'gain':>6}")
+        for r in results:
+            self.stdout.write(
+                f"{r['variant']:<18} {r['seconds']:>8.3f} {r['us_per_email']:>10.1f} "
+                f"{r['emails_per_sec']:>10} {baseline / r['seconds']:>5.1f}x"
+            )
@@ -0,0 +1,133 @@
+# apps/core/management/commands/benchmark_queue.py
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from huey import MemoryHuey, PriorityRedisHuey, SqliteHuey
+
+BACKENDS = ('memory', 'sqlite', 'redis', 'fakeredis')
+
+# Backends dont la file n'est visible que du processus qui l'a créée
+IN_PROCESS_BACKENDS = ('memory', 'fakeredis')
+
+
+def benchmark_job(items):
+    """Travail unitaire simulé : un hash SHA-256 par élément."""
+    for item in items:
+        hashlib.sha256(item.encode()).digest()
+    return len(items)
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit soutenu (tâches/s) de la file Huey pour chaque backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', action='append', choices=BACKENDS,
+                            help="Backend à mesurer (répétable ; défaut : tous les backends disponibles)")
+        parser.add_argument('--tasks', type=int, default=2000, help="Nombre de tâches à exécuter")
+        parser.add_argument('--batch-size', type=int, default=1, help="Éléments traités par tâche")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--worker-type', choices=('thread', 'process'), default='thread')
+        parser.add_argument('--redis-url', default=None, help="Défaut : HUEY_BACKENDS['redis']['url']")
+        parser.add_argument('--timeout', type=float, default=300, help="Durée max par backend (secondes)")
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        backends = options['backend'] or [b for b in BACKENDS if self._available(b)]
+        results = []
+        for backend in backends:
+            if options['worker_type'] == 'process' and backend in IN_PROCESS_BACKENDS:
+                self.stderr.write(f"{backend}: ignoré, incompatible avec des workers 'process'")
+                continue
+            with tempfile.TemporaryDirectory() as tmpdir:
+                huey = self._create_huey(backend, tmpdir, options['redis_url'])
+                results.append(self._run(backend, huey, options))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'backend':<10} {'workers':>12} {'tâches':>8} {'enqueue/s':>11} {'tâches/s':>10} {'éléments/s':>11}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['backend']:<10} {r['workers']:>12} {r['tasks']:>8} "
+                f"{r['enqueue_per_sec']:>11.0f} {r['tasks_per_sec']:>10.0f} {r['items_per_sec']:>11.0f}"
+            )
+
+    @staticmethod
+    def _available(backend):
+        module = {'redis': 'redis', 'fakeredis': 'fakeredis'}.get(backend)
+        if module is None:
+            return True
+        try:
+            __import__(module)
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _create_huey(backend, tmpdir, redis_url):
+        name = 'benchmark'
+        if backend == 'memory':
+            return MemoryHuey(name, utc=True)
+        if backend == 'sqlite':
+            return SqliteHuey(name, filename=os.path.join(tmpdir, 'huey.db'), utc=True)
+        if backend == 'redis':
+            url = redis_url or settings.HUEY_BACKENDS['redis']['url']
+            return PriorityRedisHuey(name, url=url, utc=True)
+        try:
+            import fakeredis
+            import redis
+        except ImportError:
+            raise CommandError("fakeredis n'est pas installé (pip install fakeredis)")
+        pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer())
+        return PriorityRedisHuey(name, connection_pool=pool, utc=True)
+
+    def _run(self, backend, huey, options):
+        job = huey.task(name='benchmark_job')(benchmark_job)
+        huey.flush()
+
+        batch_size = options['batch_size']
+        payloads = [
+            [f"{i}-{j}" for j in range(batch_size)]
+            for i in range(options['tasks'])
+        ]
+
+        started = time.perf_counter()
+        for payload in payloads:
+            job(payload)
+        enqueue_seconds = time.perf_counter() - started
+
+        consumer = huey.create_consumer(
+            workers=options['workers'], worker_type=options['worker_type'],
+            periodic=False, initial_delay=0.001, max_delay=0.01, check_worker_health=False,
+        )
+        started = time.perf_counter()
+        consumer.start()
+        try:
+            deadline = started + options['timeout']
+            while huey.result_count() < len(payloads):
+                if time.perf_counter() > deadline:
+                    raise CommandError(f"{backend}: délai dépassé ({huey.result_count()}/{len(payloads)} tâches)")
+                time.sleep(0.005)
+            drain_seconds = time.perf_counter() - started
+        finally:
+            consumer.stop(graceful=True)
+            huey.flush()
+
+        return {
+            'backend': backend,
+            'workers': f"{options['workers']}x{options['worker_type']}",
+            'tasks': len(payloads),
+            'batch_size': batch_size,
+            'enqueue_seconds': round(enqueue_seconds, 3),
+            'drain_seconds': round(drain_seconds, 3),
+            'enqueue_per_sec': len(payloads) / enqueue_seconds,
+            'tasks_per_sec': len(payloads) / drain_seconds,
+            'items_per_sec': len(payloads) * batch_size / drain_seconds,
+        }
@@ -0,0 +1,123 @@
+# apps/core/management/commands/benchmark_startup.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+PROFILES = ['config.settings.development', 'config.settings.production']
+
+# Exécuté dans un interpréteur neuf par profil : rien n'est importé d'avance
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+import django
+django.setup()
+setup_ms = (time.perf_counter() - started) * 1000
+setup_rss_kb = rss_kb()
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from wsgiref.util import setup_testing_defaults
+
+application = import_string(settings.WSGI_APPLICATION)
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': 'localhost', 'wsgi.url_scheme': 'https'}
+setup_testing_defaults(environ)
+statuses = []
+response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+b''.join(response)
+if hasattr(response, 'close'):
+    response.close()
+
+print(json.dumps({
+    'setup_ms': round(setup_ms, 1),
+    'first_request_ms': round((time.perf_counter() - started) * 1000, 1),
+    'setup_rss_mb': round(setup_rss_kb / 1024, 1),
+    'rss_mb': round(rss_kb() / 1024, 1),
+    'status': statuses[0] if statuses else None,
+    'installed_apps': len(settings.INSTALLED_APPS),
+    'middleware': len(settings.MIDDLEWARE),
+    'modules': len(sys.modules),
+    'debug_toolbar': 'debug_toolbar' in sys.modules,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le démarrage de chaque profil de configuration dans un processus neuf : "
+        "durée de django.setup(), délai jusqu'à la première réponse, mémoire résidente"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settings-module', action='append', dest='profiles',
+                            help=f"Module de configuration (répétable ; défaut : {', '.join(PROFILES)})")
+        parser.add_argument('--runs', type=int, default=5, help="Processus lancés par profil (médiane retenue)")
+        # Défaut : route de l'API sans accès à la base (401), middlewares et Ninja compris
+        parser.add_argument('--path', default='/api/v1/analytics/metrics', help="Chemin de la première requête")
+        parser.add_argument('--output', help="Ajoute les résultats à ce fichier NDJSON (suivi dans le temps)")
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        results = [self.measure(profile, options['runs'], options['path']) for profile in options['profiles'] or PROFILES]
+
+        if options['output']:
+            output = Path(options['output'])
+            output.parent.mkdir(parents=True, exist_ok=True)
+            measured_at = timezone.now().isoformat()
+            with open(output, 'a', encoding='utf-8') as f:
+                for result in results:
+                    f.write(json.dumps({'measured_at': measured_at, **result}) + '\n')
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'profil':<30} {'setup ms':>9} {'1re réponse ms':>15} {'processus ms':>13} "
+            f"{'RSS setup Mo':>13} {'RSS Mo':>7} {'modules':>8}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['profile']:<30} {r['setup_ms']:>9} {r['first_request_ms']:>15} {r['process_ms']:>13} "
+                f"{r['setup_rss_mb']:>13} {r['rss_mb']:>7} {r['modules']:>8}"
+            )
+
+    def measure(self, profile: str, runs: int, path: str) -> dict:
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': profile}
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, '-c', PROBE, path], env=env, cwd=settings.BASE_DIR,
+                capture_output=True, text=True,
+            )
+            process_ms = (time.perf_counter() - started) * 1000
+            if completed.returncode != 0:
+                raise CommandError(f"Démarrage de {profile} impossible:\n{completed.stderr[-2000:]}")
+            sample = json.loads(completed.stdout.strip().splitlines()[-1])
+            sample['process_ms'] = round(process_ms, 1)
+            samples.append(sample)
+
+        result = {'profile': profile, 'runs': runs, 'status': samples[-1]['status']}
+        for field in ('setup_ms', 'first_request_ms', 'process_ms', 'setup_rss_mb', 'rss_mb'):
+            result[field] = round(statistics.median(s[field] for s in samples), 1)
+        for field in ('installed_apps', 'middleware', 'modules', 'debug_toolbar'):
+            result[field] = samples[-1][field]
+        return result
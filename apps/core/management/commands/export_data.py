@@ -0,0 +1,79 @@
+# apps/core/management/commands/export_data.py
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from apps.core.exports import CONTENT_TYPES, DATASETS, data_export
+from apps.core.models import ExportJob
+
+
+def parse_date(value: str) -> datetime:
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"Date invalide : {value} (format ISO 8601 attendu)")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporte le journal d'audit, les vérifications ou les statistiques en CSV/NDJSON, en flux "
+        "(mémoire constante), ou en export par parties dans le stockage des exports (--job, reprise par --resume)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', nargs='?', choices=sorted(DATASETS))
+        parser.add_argument('--format', choices=sorted(CONTENT_TYPES), default='csv')
+        parser.add_argument('--gzip', action='store_true', help="Compression gzip au fil de l'eau")
+        parser.add_argument('--since', type=parse_date, help="Date ISO 8601 (incluse)")
+        parser.add_argument('--until', type=parse_date, help="Date ISO 8601 (exclue ; défaut : maintenant)")
+        parser.add_argument('--institution', help="Identifiant de l'institution (vérifications, statistiques)")
+        parser.add_argument('--output', help="Fichier de sortie (défaut : sortie standard)")
+        parser.add_argument('--job', action='store_true', help="Export par parties dans le stockage des exports")
+        parser.add_argument('--resume', metavar='JOB_ID', help="Reprend un export interrompu")
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            job = ExportJob.objects.filter(pk=options['resume']).first()
+            if job is None:
+                raise CommandError(f"Export introuvable : {options['resume']}")
+            self.run_job(job)
+            return
+        if not options['dataset']:
+            raise CommandError("Précisez le jeu de données à exporter")
+
+        if options['job']:
+            try:
+                job = data_export.create_job(
+                    None, options['dataset'], options['format'], options['gzip'],
+                    options['since'], options['until'], options['institution'],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.run_job(job)
+            return
+
+        try:
+            chunks = data_export.stream(
+                options['dataset'], options['format'], options['since'], options['until'],
+                options['institution'], compress=options['gzip'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+
+    def run_job(self, job: ExportJob) -> None:
+        data_export.run_job(job)
+        job.refresh_from_db()
+        self.stderr.write(
+            f"Export {job.pk} : {job.status}, {job.rows} lignes en {job.parts} parties "
+            f"(exports/{job.pk}/ dans le stockage des exports)"
+        )
@@ -0,0 +1,82 @@
+# apps/core/management/commands/perf_suite.py
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.perf.cases import CASES, load_context
+from apps.core.perf.seed import SyntheticData
+from apps.core.perf.suite import DEFAULTS, PerfSuite
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure les chemins critiques (vérifications, signatures, enregistrement en masse, statistiques, "
+        "emails, erreurs de l'API) sur les données de seed_perf_data, écrit les résultats en JSON "
+        "et échoue en cas de régression par rapport à la référence"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--case', action='append', choices=list(CASES), dest='cases',
+                            help="Cas à mesurer (répétable ; défaut : tous)")
+        parser.add_argument('--seed', type=int, default=0, help="Graine utilisée par seed_perf_data")
+        parser.add_argument('--rounds', type=int, default=DEFAULTS['ROUNDS'])
+        parser.add_argument('--warmup', type=int, default=DEFAULTS['WARMUP'])
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'var', 'perf', 'results.json'),
+                            help="Fichier des résultats")
+        parser.add_argument('--baseline', default=os.path.join(settings.BASE_DIR, 'perf', 'baseline.json'),
+                            help="Référence comparée")
+        parser.add_argument('--tolerance', type=float, default=DEFAULTS['TOLERANCE'],
+                            help="Hausse de la médiane tolérée (0.25 = +25 %%)")
+        parser.add_argument('--save-baseline', action='store_true', help="Enregistre les résultats comme référence")
+
+    def handle(self, *args, **options):
+        suite = PerfSuite({'ROUNDS': options['rounds'], 'WARMUP': options['warmup'], 'TOLERANCE': options['tolerance']})
+        try:
+            context = load_context(SyntheticData({'SEED': options['seed']}))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        report = suite.run(context, options['cases'])
+        self.write(options['output'], report)
+        if options['save_baseline']:
+            self.write(options['baseline'], report)
+
+        baseline = None
+        if os.path.exists(options['baseline']):
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+        references = baseline['results'] if baseline else {}
+
+        self.stdout.write(
+            f"{context.documents} documents, {suite.config['ROUNDS']} passages par cas -> {options['output']}"
+        )
+        self.stdout.write(f"{'cas':<22} {'médiane µs':>11} {'p95 µs':>10} {'ops/s':>9} {'référence µs':>13}")
+        for name, result in report['results'].items():
+            reference = references.get(name, {}).get('median_us')
+            self.stdout.write(
+                f"{name:<22} {result['median_us']:>11} {result['p95_us']:>10} {result['ops_per_sec']!s:>9} "
+                f"{reference!s:>13}"
+            )
+
+        if baseline is None:
+            self.stdout.write(f"Aucune référence ({options['baseline']}) : --save-baseline pour l'enregistrer")
+            return
+        if baseline.get('dataset') != report['dataset'] or baseline.get('environment') != report['environment']:
+            self.stdout.write("Attention : référence mesurée sur un autre jeu de données ou un autre environnement")
+        regressions = suite.compare(report, baseline)
+        if regressions:
+            for r in regressions:
+                self.stderr.write(
+                    f"Régression {r['case']} : {r['baseline_us']} -> {r['median_us']} µs (+{r['change']:.0%})"
+                )
+            raise CommandError(f"{len(regressions)} régression(s) au-delà de +{suite.config['TOLERANCE']:.0%}")
+        self.stdout.write(f"Aucune régression au-delà de +{suite.config['TOLERANCE']:.0%}")
+
+    @staticmethod
+    def write(path: str, report) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
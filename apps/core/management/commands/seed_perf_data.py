@@ -0,0 +1,53 @@
+# apps/core/management/commands/seed_perf_data.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.perf.seed import DEFAULTS, SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        "Insère le jeu de données synthétique reproductible des mesures de performance (perf_suite) : "
+        "institutions, clés, documents signés et vérifications. À lancer sur une base jetable (DATABASE_URL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=DEFAULTS['SEED'], help="Graine du jeu de données")
+        parser.add_argument('--institutions', type=int, default=DEFAULTS['INSTITUTIONS'])
+        parser.add_argument('--keys-per-institution', type=int, default=DEFAULTS['KEYS_PER_INSTITUTION'])
+        parser.add_argument('--documents', type=int, default=DEFAULTS['DOCUMENTS'])
+        parser.add_argument('--verifications', type=int, default=DEFAULTS['VERIFICATIONS'])
+        parser.add_argument('--days', type=int, default=DEFAULTS['DAYS'], help="Période couverte par les vérifications")
+        parser.add_argument('--batch-size', type=int, default=DEFAULTS['BATCH_SIZE'], help="Lignes par bulk_create")
+        parser.add_argument('--json', action='store_true', help="Affiche le rapport en JSON")
+
+    def handle(self, *args, **options):
+        data = SyntheticData({
+            'SEED': options['seed'],
+            'INSTITUTIONS': options['institutions'],
+            'KEYS_PER_INSTITUTION': options['keys_per_institution'],
+            'DOCUMENTS': options['documents'],
+            'VERIFICATIONS': options['verifications'],
+            'DAYS': options['days'],
+            'BATCH_SIZE': options['batch_size'],
+        })
+        every = max(options['batch_size'], (options['documents'] + options['verifications']) // 50)
+
+        def progress(table, done, total):
+            if done % every < options['batch_size'] or done == total:
+                self.stderr.write(f"{table}: {done}/{total}")
+
+        try:
+            report = data.seed(progress=None if options['json'] else progress)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f"Graine {report['seed']} : {report['institutions']} institutions, {report['keys']} clés, "
+            f"{report['documents']} documents, {report['verifications']} vérifications, "
+            f"{report['statistics']} agrégats en {report['seconds']}s"
+        )
@@ -0,0 +1,62 @@
+# apps/core/middleware.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.middleware.csrf import get_token
+from inertia.middleware import InertiaMiddleware as BaseInertiaMiddleware
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+# Versions compatibles async des middlewares tiers synchrones. Sous ASGI, un seul
+# middleware sync dans MIDDLEWARE fait passer chaque requête par un thread
+# (sync_to_async) et annule le bénéfice des vues async.
+
+
+class AsyncCapableMixin:
+    sync_capable = True
+    async_capable = True
+
+    def _init_async_mode(self, get_response) -> None:
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+
+class WhiteNoiseMiddleware(AsyncCapableMixin, BaseWhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware compatible async (même logique que WhiteNoiseMiddleware.__call__)."""
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self._init_async_mode(get_response)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class InertiaMiddleware(AsyncCapableMixin, BaseInertiaMiddleware):
+    """InertiaMiddleware compatible async (même logique que InertiaMiddleware.__call__)."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._init_async_mode(get_response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        get_token(request)
+
+        if not self.is_inertia_request(request):
+            return response
+        if self.is_non_post_redirect(request, response):
+            response.status_code = 303
+        if self.is_stale(request):
+            # Accès à la session (messages) : hors de la boucle d'événements
+            return await sync_to_async(self.force_refresh)(request)
+        return response
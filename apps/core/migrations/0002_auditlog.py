@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:43
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLog',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('action_type', models.CharField(choices=[('LOGIN', 'Connexion'), ('LOGOUT', 'Déconnexion'), ('LOGIN_FAILED', 'Échec connexion'), ('SIGN', 'Signature document'), ('VERIFY', 'Vérification document'), ('REVOKE', 'Révocation document'), ('KEY_CREATED', 'Création clé'), ('KEY_ROTATED', 'Rotation clé'), ('KEY_REVOKED', 'Révocation clé'), ('INST_VALID', 'Institution validée'), ('INST_SUSP', 'Institution suspendue'), ('USER_UPD', 'Utilisateur modifié')], max_length=20)),
+                ('resource_type', models.CharField(choices=[('USER', 'Utilisateur'), ('INSTITUTION', 'Institution'), ('DOCUMENT', 'Document'), ('KEY', 'Clé cryptographique'), ('SYSTEM', 'Système')], max_length=20)),
+                ('resource_id', models.UUIDField(blank=True, null=True)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True)),
+                ('success', models.BooleanField(default=True)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'core_audit_logs',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['user', 'timestamp'], name='core_audit__user_id_607f52_idx'), models.Index(fields=['action_type', 'timestamp'], name='core_audit__action__ce3a8f_idx'), models.Index(fields=['resource_type', 'resource_id'], name='core_audit__resourc_625fee_idx')],
+            },
+        ),
+    ]
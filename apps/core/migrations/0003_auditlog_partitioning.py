@@ -0,0 +1,103 @@
+# Generated by Django 5.2.9 on 2026-10-17 02:32
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+TABLE = 'core_audit_logs'
+MONTHS_AHEAD = 2
+
+
+def month_start(value):
+    value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(start, months):
+    year, month = divmod(start.month - 1 + months, 12)
+    return start.replace(year=start.year + year, month=month + 1)
+
+
+def partition_table(apps, schema_editor):
+    """
+    PostgreSQL : remplace la table par une table partitionnée par mois sur
+    timestamp (clé primaire (id, timestamp), exigée par le partitionnement),
+    avec une partition par mois de données existantes (y compris horodatées
+    dans le futur), le mois courant et les suivants, une partition DEFAULT et
+    un index BRIN sur timestamp.
+    Autres bases : table unique, index B-tree sur timestamp.
+    """
+    quote = schema_editor.quote_name
+    execute = schema_editor.execute
+    if schema_editor.connection.vendor != 'postgresql':
+        execute(f"CREATE INDEX {quote(TABLE + '_timestamp')} ON {quote(TABLE)} (\"timestamp\")")
+        return
+    AuditLog = apps.get_model('core', 'AuditLog')
+
+    execute(f"ALTER TABLE {quote(TABLE)} RENAME TO {quote(TABLE + '_unpartitioned')}")
+    execute(
+        f"CREATE TABLE {quote(TABLE)} (LIKE {quote(TABLE + '_unpartitioned')} INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE (\"timestamp\")"
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(\"timestamp\"), MAX(\"timestamp\") FROM {quote(TABLE + '_unpartitioned')}")
+        oldest, newest = cursor.fetchone()
+    current = month_start(datetime.now(timezone.utc))
+    start = month_start(oldest) if oldest else current
+    # Jusqu'au mois de la dernière entrée : la partition DEFAULT reste vide
+    last = max(add_months(current, MONTHS_AHEAD), month_start(newest) if newest else current)
+    while start <= last:
+        execute(
+            f"CREATE TABLE {quote(f'{TABLE}_y{start.year}m{start.month:02d}')} PARTITION OF {quote(TABLE)} "
+            f"FOR VALUES FROM (%s) TO (%s)", [start, add_months(start, 1)]
+        )
+        start = add_months(start, 1)
+    execute(f"CREATE TABLE {quote(TABLE + '_default')} PARTITION OF {quote(TABLE)} DEFAULT")
+
+    execute(f"INSERT INTO {quote(TABLE)} SELECT * FROM {quote(TABLE + '_unpartitioned')}")
+    execute(f"DROP TABLE {quote(TABLE + '_unpartitioned')}")
+
+    execute(f"ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY (id, \"timestamp\")")
+    user_field = AuditLog._meta.get_field('user')
+    execute(schema_editor._create_fk_sql(AuditLog, user_field, '_fk_%(to_table)s_%(to_column)s'))
+    for index in AuditLog._meta.indexes:
+        schema_editor.add_index(AuditLog, index)
+    execute(f"CREATE INDEX {quote(TABLE + '_timestamp_brin')} ON {quote(TABLE)} USING brin (\"timestamp\")")
+
+
+def unpartition_table(apps, schema_editor):
+    """Retour à une table unique (clé primaire id, sans index sur timestamp)."""
+    quote = schema_editor.quote_name
+    execute = schema_editor.execute
+    if schema_editor.connection.vendor != 'postgresql':
+        execute(f"DROP INDEX {quote(TABLE + '_timestamp')}")
+        return
+    AuditLog = apps.get_model('core', 'AuditLog')
+
+    execute(f"ALTER TABLE {quote(TABLE)} RENAME TO {quote(TABLE + '_partitioned')}")
+    execute(f"CREATE TABLE {quote(TABLE)} (LIKE {quote(TABLE + '_partitioned')} INCLUDING DEFAULTS)")
+    execute(f"INSERT INTO {quote(TABLE)} SELECT * FROM {quote(TABLE + '_partitioned')}")
+    execute(f"DROP TABLE {quote(TABLE + '_partitioned')} CASCADE")
+
+    execute(f"ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY (id)")
+    user_field = AuditLog._meta.get_field('user')
+    execute(schema_editor._create_fk_sql(AuditLog, user_field, '_fk_%(to_table)s_%(to_column)s'))
+    schema_editor.execute(schema_editor._create_index_sql(AuditLog, fields=[user_field]))
+    for index in AuditLog._meta.indexes:
+        schema_editor.add_index(AuditLog, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_auditlog'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='auditlog',
+            options={},
+        ),
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
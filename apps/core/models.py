@@ -1,3 +1,136 @@
+from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
+import uuid
 
-# Create your models here.
+
+class User(AbstractUser):
+    """Utilisateur étendu avec rôles et statuts"""
+
+    class Role(models.TextChoices):
+        ADMIN = 'ADMIN', 'Administrateur Système'
+        INSTITUTION = 'INSTITUTION', 'Utilisateur Institution'
+        PUBLIC = 'PUBLIC', 'Utilisateur Public'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'En attente de validation'
+        ACTIVE = 'ACTIVE', 'Actif'
+        SUSPENDED = 'SUSPENDED', 'Suspendu'
+        REVOKED = 'REVOKED', 'Révoqué'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    role = models.CharField(max_length=20, choices=Role.choices, default=Role.PUBLIC)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    phone = models.CharField(max_length=20, blank=True, null=True)
+    email_verified = models.BooleanField(default=False)
+    two_factor_enabled = models.BooleanField(default=False)
+    last_login_ip = models.GenericIPAddressField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'core_users'
+        indexes = [
+            models.Index(fields=['email']),
+            models.Index(fields=['status', 'role']),
+        ]
+
+
+class AuditLog(models.Model):
+    """
+    Journal d'audit immuable de toutes les actions.
+    Partitionné par mois sous PostgreSQL (migration 0003) ; lecture par
+    pagination sur curseur et archivage : apps.core.audit.
+    """
+
+    class ActionType(models.TextChoices):
+        # Authentification
+        LOGIN = 'LOGIN', 'Connexion'
+        LOGOUT = 'LOGOUT', 'Déconnexion'
+        LOGIN_FAILED = 'LOGIN_FAILED', 'Échec connexion'
+
+        # Documents
+        SIGN = 'SIGN', 'Signature document'
+        VERIFY = 'VERIFY', 'Vérification document'
+        REVOKE = 'REVOKE', 'Révocation document'
+
+        # Clés
+        KEY_CREATED = 'KEY_CREATED', 'Création clé'
+        KEY_ROTATED = 'KEY_ROTATED', 'Rotation clé'
+        KEY_REVOKED = 'KEY_REVOKED', 'Révocation clé'
+
+        # Administration
+        INSTITUTION_VALIDATED = 'INST_VALID', 'Institution validée'
+        INSTITUTION_SUSPENDED = 'INST_SUSP', 'Institution suspendue'
+        USER_UPDATED = 'USER_UPD', 'Utilisateur modifié'
+
+    class ResourceType(models.TextChoices):
+        USER = 'USER', 'Utilisateur'
+        INSTITUTION = 'INSTITUTION', 'Institution'
+        DOCUMENT = 'DOCUMENT', 'Document'
+        KEY = 'KEY', 'Clé cryptographique'
+        SYSTEM = 'SYSTEM', 'Système'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    action_type = models.CharField(max_length=20, choices=ActionType.choices)
+    resource_type = models.CharField(max_length=20, choices=ResourceType.choices)
+    resource_id = models.UUIDField(null=True, blank=True)
+    ip_address = models.GenericIPAddressField()
+    user_agent = models.TextField(blank=True)
+    success = models.BooleanField(default=True)
+    details = models.JSONField(default=dict, blank=True)  # Données supplémentaires
+    # Horodatage de l'action (fourni par l'écriture différée, pas l'heure d'insertion)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        db_table = 'core_audit_logs'
+        # Pas d'ordre par défaut : un tri implicite sur la table entière à chaque requête
+        indexes = [
+            models.Index(fields=['user', 'timestamp']),
+            models.Index(fields=['action_type', 'timestamp']),
+            models.Index(fields=['resource_type', 'resource_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.action_type} by {self.user} at {self.timestamp}"
+
+
+class ExportJob(models.Model):
+    """
+    Export volumineux (CSV/NDJSON) exécuté par Huey et écrit par parties dans le
+    stockage des exports : un point de reprise est enregistré après chaque partie
+    (apps.core.exports).
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'En attente'
+        RUNNING = 'RUNNING', 'En cours'
+        COMPLETED = 'COMPLETED', 'Terminé'
+        FAILED = 'FAILED', 'Échec'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='export_jobs')
+    dataset = models.CharField(max_length=30)
+    format = models.CharField(max_length=10)
+    compressed = models.BooleanField(default=True)
+    filters = models.JSONField(default=dict, blank=True)  # since, until, institution_id
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    rows = models.BigIntegerField(default=0)
+    parts = models.PositiveIntegerField(default=0)  # Parties écrites dans le stockage
+    checkpoint = models.JSONField(null=True, blank=True)  # Clé (horodatage, id) de la dernière ligne écrite
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)  # Mis à jour à chaque partie (reprise des exports bloqués)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'core_export_jobs'
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"Export {self.dataset} ({self.format}) {self.status}"
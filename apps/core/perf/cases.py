@@ -0,0 +1,208 @@
+# apps/core/perf/cases.py
+import hashlib
+import json
+import random
+from datetime import timedelta
+from itertools import cycle, islice
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from django.db import transaction
+from django.http import Http404
+from django.test import RequestFactory
+from django.utils import timezone
+from ninja.errors import AuthenticationError, AuthorizationError, HttpError, ValidationError
+
+from apps.analytics.api import verification_stats
+from apps.analytics.rollups import VerificationRollup, day_start
+from apps.core.api.exceptions import PayloadTooLargeException
+from apps.core.models import User
+from apps.core.services.email_service import EmailService
+from apps.cryptography.models import CryptographicKey
+from apps.cryptography.services import SignatureService
+from apps.documents.ingest import document_ingest
+from apps.documents.models import DocumentVerification, SignedDocument
+from apps.verifications.services import VerificationService
+from config.api import api_v1
+
+from .seed import SLUG_PREFIX, SyntheticData
+
+
+class Context(NamedTuple):
+    """Échantillon du jeu de données synthétique partagé par les cas mesurés."""
+    data: SyntheticData
+    documents: int  # Documents enregistrés
+    known: List[str]  # Hashes de documents enregistrés
+    unknown: List[str]  # Hashes jamais enregistrés
+    signatures: List[Tuple[Any, str, str, str]]  # (clé analysée, algorithme, signature, hash)
+    key: CryptographicKey  # Clé numéro 0 (sa clé privée se recalcule : data.private_key(0))
+
+
+class Case(NamedTuple):
+    name: str
+    operations: int  # Opérations par passage mesuré
+    build: Callable[[Context, int], Callable[[], None]]  # Retourne la fonction d'un passage
+    description: str
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, operations: int):
+    def register(build):
+        CASES[name] = Case(name, operations, build, (build.__doc__ or '').strip())
+        return build
+    return register
+
+
+def load_context(data: SyntheticData, size: int = 2000) -> Context:
+    """
+    Raises:
+        ValueError: jeu de données absent (seed_perf_data)
+    """
+    keys = data.keys()
+    if not keys:
+        raise ValueError("Aucune donnée synthétique dans cette base : lancer seed_perf_data.")
+    documents = SignedDocument.objects.filter(institution__slug__startswith=SLUG_PREFIX).count()
+    rng = random.Random(f"{data.config['SEED']}:context")
+    known = [data.document_hash(index) for index in rng.sample(range(documents), min(size, documents))]
+    unknown = [hashlib.sha256(f"miss:{rng.getrandbits(64)}".encode()).hexdigest() for _ in range(size)]
+
+    public_keys = {}
+    signatures = []
+    for document_hash, signature, pem, algorithm in SignedDocument.objects.filter(
+        document_hash__in=known[:200]
+    ).values_list('document_hash', 'signature', 'key__public_key', 'key__algorithm'):
+        if pem not in public_keys:
+            public_keys[pem] = SignatureService.load_public_key(pem)
+        signatures.append((public_keys[pem], algorithm, signature, document_hash))
+    return Context(data, documents, known, unknown, signatures, keys[0])
+
+
+# ==========================================
+# CHEMINS CRITIQUES MESURÉS
+# ==========================================
+
+@case('verify_hash_hit', 100)
+def verify_hash_hit(context: Context, operations: int):
+    """VerificationService.verify_hash d'un document enregistré, instantané déjà en cache."""
+    known = context.known[:operations]
+    for document_hash in known:
+        VerificationService.lookup(document_hash)
+    hashes = cycle(known)
+
+    def run():
+        for document_hash in islice(hashes, operations):
+            VerificationService.verify_hash(document_hash, DocumentVerification.Method.API, '10.0.0.1', 'perf')
+    return run
+
+
+@case('verify_hash_miss', 100)
+def verify_hash_miss(context: Context, operations: int):
+    """VerificationService.verify_hash d'un hash inconnu (écarté par le filtre de hashes)."""
+    hashes = cycle(context.unknown)
+
+    def run():
+        for document_hash in islice(hashes, operations):
+            VerificationService.verify_hash(document_hash, DocumentVerification.Method.API, '10.0.0.1', 'perf')
+    return run
+
+
+@case('signature_validation', 50)
+def signature_validation(context: Context, operations: int):
+    """SignatureService.verify_with_public_key : vérification cryptographique seule, clé déjà analysée."""
+    samples = cycle(context.signatures)
+
+    def run():
+        for public_key, algorithm, signature, document_hash in islice(samples, operations):
+            SignatureService.verify_with_public_key(public_key, algorithm, signature, document_hash)
+    return run
+
+
+@case('bulk_ingest', 1000)
+def bulk_ingest(context: Context, operations: int):
+    """document_ingest.run sur un flux NDJSON de documents neufs (transaction annulée après chaque passage)."""
+    private_key = context.data.private_key(context.key.metadata['perf_key'])
+    lines = []
+    for number in range(operations):
+        document_hash = hashlib.sha256(f"ingest:{context.data.config['SEED']}:{number}".encode()).hexdigest()
+        lines.append(json.dumps({
+            'document_hash': document_hash, 'signature': context.data.sign(private_key, document_hash),
+            'key_fingerprint': context.key.fingerprint, 'file_type': SignedDocument.FileType.PDF,
+        }).encode())
+    institution = context.key.institution
+
+    def run():
+        with transaction.atomic():
+            summary = {}
+            for _ in document_ingest.run(institution, lines, summary=summary):
+                pass
+            assert summary['created'] == operations, summary
+            transaction.set_rollback(True)
+    return run
+
+
+@case('analytics_rollup', 1)
+def analytics_rollup(context: Context, operations: int):
+    """
+    Agrégation horaire d'une journée du journal des vérifications (requête GROUP BY de
+    VerificationRollup). Journée fixe, antérieure aux vérifications écrites par les autres cas.
+    """
+    end = day_start(timezone.now()) - timedelta(days=1)
+    start = end - timedelta(days=1)
+
+    def run():
+        for _ in range(operations):
+            VerificationRollup._hourly_buckets(start, end)
+    return run
+
+
+@case('analytics_stats', 20)
+def analytics_stats(context: Context, operations: int):
+    """Endpoint GET /analytics/verifications (jours, mois), toutes institutions puis par institution."""
+    request = RequestFactory().get('/api/v1/analytics/verifications')
+    request.user = User(username='perf', is_staff=True)
+    queries = cycle([
+        {'period': 'DAILY'}, {'period': 'MONTHLY'},
+        {'period': 'DAILY', 'institution_id': context.key.institution_id},
+    ])
+
+    def run():
+        for params in islice(queries, operations):
+            verification_stats(request, **params)
+    return run
+
+
+@case('email_rendering', 100)
+def email_rendering(context: Context, operations: int):
+    """EmailService.build_message : rendu HTML et texte de emails/notification.html."""
+    recipients = cycle(range(1000))
+
+    def run():
+        for number in islice(recipients, operations):
+            EmailService.build_message(
+                subject="Votre clé de signature expire bientôt", to_emails=[f"user{number}@perf.invalid"],
+                template_name='emails/notification.html',
+                context={
+                    'user_name': f"Utilisateur {number}",
+                    'notification_title': "Votre clé de signature expire bientôt",
+                    'notification_message': "La clé utilisée pour signer vos documents expire dans 7 jours.",
+                    'action_url': 'https://enspmhub.com/keys', 'action_text': "Gérer mes clés",
+                },
+            )
+    return run
+
+
+@case('api_error_handlers', 600)
+def api_error_handlers(context: Context, operations: int):
+    """Gestionnaires d'erreurs de api_v1 (422, 401, 403, 404, HttpError, BaseAPIException)."""
+    request = RequestFactory().post('/api/v1/verify/hash')
+    errors = cycle([
+        ValidationError([{'loc': ('body', 'payload', 'document_hash'), 'msg': "Hash invalide", 'type': 'value_error'}]),
+        AuthenticationError(), AuthorizationError(), Http404(),
+        HttpError(409, "L'export n'est pas terminé."), PayloadTooLargeException(),
+    ])
+
+    def run():
+        for exc in islice(errors, operations):
+            api_v1.on_exception(request, exc)
+    return run
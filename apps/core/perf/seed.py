@@ -0,0 +1,212 @@
+# apps/core/perf/seed.py
+import base64
+import hashlib
+import logging
+import random
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from django.utils import timezone
+
+from apps.analytics.rollups import verification_rollup
+from apps.cryptography.models import CryptographicKey
+from apps.documents.hash_filter import document_filter
+from apps.documents.models import DocumentVerification, SignedDocument
+from apps.documents.phash import to_db
+from apps.institutions.models import Institution
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'SEED': 0,
+    'INSTITUTIONS': 20,
+    'KEYS_PER_INSTITUTION': 2,
+    'DOCUMENTS': 2000000,
+    'VERIFICATIONS': 5000000,
+    'DAYS': 90,  # Période couverte par les vérifications
+    'HIT_RATIO': 0.85,  # Part des vérifications portant sur un document enregistré
+    'REVOKED_EVERY': 100,  # Un document révoqué sur N
+    'BATCH_SIZE': 5000,
+}
+
+SLUG_PREFIX = 'perf-'
+COUNTRIES = ('CM', 'CM', 'CM', 'FR', 'NG', 'TD', 'GA', 'CA', 'US', '')
+
+
+class SyntheticData:
+    """
+    Jeu de données synthétique reproductible pour les mesures de performance :
+    institutions, clés ECDSA P-256, documents signés et journal des vérifications.
+
+    Tout est dérivé de SEED : hashes, identifiants et clés privées
+    (ec.derive_private_key) se recalculent à partir du rang, sans rien garder
+    en mémoire ; les mesures retrouvent ainsi documents et clés sans les relire.
+    Insertion par bulk_create, par tranches de BATCH_SIZE : ni signaux post_save,
+    ni tâches de rendu. Les institutions sont reconnaissables à leur slug (perf-).
+    À utiliser sur une base jetable.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    def _derive(self, *parts) -> bytes:
+        return hashlib.sha256(':'.join(map(str, ('perf', self.config['SEED']) + parts)).encode()).digest()
+
+    def document_hash(self, index: int) -> str:
+        return self._derive('document', index).hex()
+
+    def document_id(self, index: int) -> uuid.UUID:
+        return uuid.UUID(bytes=self._derive('document-id', index)[:16], version=4)
+
+    def unknown_hash(self, index: int) -> str:
+        """Hash d'un document jamais enregistré."""
+        return self._derive('unknown', index).hex()
+
+    def is_revoked(self, index: int) -> bool:
+        return index % self.config['REVOKED_EVERY'] == 0
+
+    def private_key(self, number: int) -> ec.EllipticCurvePrivateKey:
+        # 255 bits : toujours inférieur à l'ordre de P-256
+        secret = int.from_bytes(self._derive('key', number), 'big') >> 1
+        return ec.derive_private_key(secret or 1, ec.SECP256R1())
+
+    @staticmethod
+    def sign(private_key: ec.EllipticCurvePrivateKey, document_hash: str) -> str:
+        """Signature ECDSA-SHA384 en base64, comme les signatures vérifiées par SignatureService."""
+        return base64.b64encode(private_key.sign(document_hash.encode(), ec.ECDSA(hashes.SHA384()))).decode()
+
+    def institutions(self):
+        return Institution.objects.filter(slug__startswith=SLUG_PREFIX)
+
+    def keys(self) -> List[CryptographicKey]:
+        """Clés du jeu de données, dans l'ordre de leur numéro (metadata['perf_key'])."""
+        keys = CryptographicKey.objects.filter(institution__slug__startswith=SLUG_PREFIX).select_related('institution')
+        return sorted(keys, key=lambda key: key.metadata['perf_key'])
+
+    def exists(self) -> bool:
+        return self.institutions().exists()
+
+    # ------------------------------------------------------------------
+    # Insertion
+    # ------------------------------------------------------------------
+
+    def seed(self, progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Insère le jeu de données complet ; retourne les volumes et la durée.
+
+        Raises:
+            ValueError: jeu de données déjà présent dans la base
+        """
+        if self.exists():
+            raise ValueError("Les données synthétiques sont déjà présentes dans cette base.")
+        started = time.perf_counter()
+        progress = progress or (lambda table, done, total: None)
+
+        keys = self._seed_keys(self._seed_institutions())
+        documents = self._bulk_insert(SignedDocument, self._documents(keys), self.config['DOCUMENTS'], progress)
+        verifications = self._bulk_insert(
+            DocumentVerification, self._verifications(), self.config['VERIFICATIONS'], progress
+        )
+        # Filtre de hashes et index perceptuel des autres workers : relecture des nouveaux documents
+        document_filter.notify_new_documents()
+        # L'API de statistiques ne lit que les agrégats
+        statistics = verification_rollup.run()
+
+        report = {
+            'seed': self.config['SEED'],
+            'institutions': len({key.institution_id for key in keys}),
+            'keys': len(keys),
+            'documents': documents,
+            'verifications': verifications,
+            'statistics': sum(statistics.values()),
+            'seconds': round(time.perf_counter() - started, 1),
+        }
+        logger.info(f"Données synthétiques insérées: {report}")
+        return report
+
+    def _seed_institutions(self) -> List[Institution]:
+        types = Institution.Type.values
+        return Institution.objects.bulk_create([
+            Institution(
+                name=f"Institution de mesure {number}", legal_name=f"Institution de mesure {number}",
+                slug=f"{SLUG_PREFIX}{self.config['SEED']}-{number}", type=types[number % len(types)],
+                email=f"contact{number}@perf.invalid", address_line1="BP 1", city="Maroua",
+                postal_code="000", country_code='CM', status=Institution.Status.ACTIVE,
+            )
+            for number in range(self.config['INSTITUTIONS'])
+        ])
+
+    def _seed_keys(self, institutions: List[Institution]) -> List[CryptographicKey]:
+        keys = []
+        expires_at = timezone.now() + timedelta(days=365)
+        for number in range(len(institutions) * self.config['KEYS_PER_INSTITUTION']):
+            pem = self.private_key(number).public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode()
+            keys.append(CryptographicKey(
+                institution=institutions[number % len(institutions)], public_key=pem,
+                fingerprint=hashlib.sha256(pem.encode()).hexdigest(),
+                algorithm=CryptographicKey.Algorithm.ECDSA_P256, key_size=256,
+                expires_at=expires_at, metadata={'perf_key': number},
+            ))
+        return CryptographicKey.objects.bulk_create(keys)
+
+    def _documents(self, keys: List[CryptographicKey]) -> Iterator[SignedDocument]:
+        rng = random.Random(f"{self.config['SEED']}:documents")
+        private_keys = [self.private_key(number) for number in range(len(keys))]
+        file_types = SignedDocument.FileType.values
+        now = timezone.now()
+        for index in range(self.config['DOCUMENTS']):
+            key = keys[index % len(keys)]
+            document_hash = self.document_hash(index)
+            revoked = self.is_revoked(index)
+            yield SignedDocument(
+                id=self.document_id(index), institution_id=key.institution_id, key=key,
+                document_hash=document_hash, signature=self.sign(private_keys[index % len(keys)], document_hash),
+                file_type=file_types[rng.randrange(len(file_types))], original_filename=f"document-{index}.pdf",
+                file_size=rng.randint(20000, 5000000), perceptual_hash=to_db(rng.getrandbits(64)),
+                status=SignedDocument.Status.REVOKED if revoked else SignedDocument.Status.ACTIVE,
+                revoked_at=now if revoked else None,
+            )
+
+    def _verifications(self) -> Iterator[DocumentVerification]:
+        rng = random.Random(f"{self.config['SEED']}:verifications")
+        methods = DocumentVerification.Method.values
+        Result = DocumentVerification.Result
+        now = timezone.now()
+        span = self.config['DAYS'] * 86400
+        for _ in range(self.config['VERIFICATIONS']):
+            if rng.random() < self.config['HIT_RATIO']:
+                index = rng.randrange(self.config['DOCUMENTS'])
+                document_id, provided_hash = self.document_id(index), self.document_hash(index)
+                result = Result.REVOKED if self.is_revoked(index) else Result.AUTHENTIC
+            else:
+                document_id, provided_hash = None, self.unknown_hash(rng.getrandbits(32))
+                result = Result.NOT_FOUND
+            yield DocumentVerification(
+                document_id=document_id, provided_hash=provided_hash,
+                verifier_ip=f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                verifier_user_agent='perf', verifier_country=rng.choice(COUNTRIES),
+                method=methods[rng.randrange(len(methods))], result=result,
+                timestamp=now - timedelta(seconds=rng.random() * span),
+                verification_duration_ms=rng.randint(1, 40),
+            )
+
+    def _bulk_insert(self, model, objects: Iterator, total: int, progress) -> int:
+        batch, done = [], 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.config['BATCH_SIZE']:
+                model.objects.bulk_create(batch)
+                done += len(batch)
+                batch = []
+                progress(model._meta.db_table, done, total)
+        if batch:
+            model.objects.bulk_create(batch)
+            done += len(batch)
+            progress(model._meta.db_table, done, total)
+        return done
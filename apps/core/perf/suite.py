@@ -0,0 +1,108 @@
+# apps/core/perf/suite.py
+import os
+import platform
+import statistics
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import django
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.verifications.log_pipeline import verification_log
+
+from .cases import CASES, Context
+
+DEFAULTS = {
+    'ROUNDS': 20,  # Passages mesurés par cas
+    'WARMUP': 2,  # Passages de chauffe (caches, templates, clés analysées)
+    'TOLERANCE': 0.25,  # Hausse de la médiane tolérée par rapport à la référence
+}
+
+
+class PerfSuite:
+    """
+    Mesure les chemins critiques (CASES) sur le jeu de données synthétique et
+    compare les résultats à une référence enregistrée.
+
+    Chaque cas est mesuré en ROUNDS passages de `operations` opérations après
+    WARMUP passages de chauffe ; le rapport donne le temps par opération
+    (médiane, minimum, p95) en microsecondes. Une régression est une médiane
+    supérieure de plus de TOLERANCE à celle de la référence.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    def run(self, context: Context, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        # Comme en production (et sous pytest-django) : sans requêtes SQL conservées par DEBUG.
+        # Comme perf/conftest.py : journal des vérifications écrit entre les cas par flush(),
+        # pas par le thread de vidage au milieu des passages mesurés.
+        log_config = verification_log.config
+        saved = {key: log_config[key] for key in ('FLUSH_INTERVAL_MS', 'BATCH_SIZE')}
+        log_config.update({'FLUSH_INTERVAL_MS': 24 * 3600 * 1000, 'BATCH_SIZE': log_config['MAX_PENDING']})
+        try:
+            with override_settings(DEBUG=False):
+                results = self._measure(context, names)
+        finally:
+            log_config.update(saved)
+
+        return {
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+            },
+            'dataset': {'seed': context.data.config['SEED'], 'documents': context.documents},
+            'config': {key: self.config[key] for key in ('ROUNDS', 'WARMUP')},
+            'results': results,
+        }
+
+    def _measure(self, context: Context, names: Optional[Iterable[str]]) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for name in names or CASES:
+            case = CASES[name]
+            run = case.build(context, case.operations)
+            for _ in range(self.config['WARMUP']):
+                run()
+            per_operation = []
+            for _ in range(self.config['ROUNDS']):
+                started = time.perf_counter()
+                run()
+                per_operation.append((time.perf_counter() - started) / case.operations * 1e6)
+            per_operation.sort()
+            median = statistics.median(per_operation)
+            results[name] = {
+                'operations': case.operations,
+                'rounds': len(per_operation),
+                'median_us': round(median, 2),
+                'min_us': round(per_operation[0], 2),
+                'p95_us': round(per_operation[int(0.95 * (len(per_operation) - 1))], 2),
+                'ops_per_sec': round(1e6 / median) if median else None,
+            }
+            # Vérifications journalisées en différé : écrites avant le cas suivant, hors mesure
+            verification_log.flush()
+        return results
+
+    def compare(self, report: Dict[str, Any], baseline: Dict[str, Any],
+                tolerance: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Régressions de report par rapport à baseline (cas absents de l'un ou de l'autre ignorés)."""
+        tolerance = self.config['TOLERANCE'] if tolerance is None else tolerance
+        regressions = []
+        for name, result in report['results'].items():
+            reference = baseline.get('results', {}).get(name)
+            if not reference or not reference['median_us']:
+                continue
+            change = result['median_us'] / reference['median_us'] - 1
+            if change > tolerance:
+                regressions.append({
+                    'case': name,
+                    'baseline_us': reference['median_us'],
+                    'median_us': result['median_us'],
+                    'change': round(change, 3),
+                })
+        return regressions
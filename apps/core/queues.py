@@ -0,0 +1,14 @@
+# apps/core/queues.py
+"""
+Priorités des tâches Huey : la plus grande valeur est exécutée en premier.
+Respectées par les backends sqlite, memory et redis (PriorityRedisHuey).
+"""
+
+# Journal des vérifications : ne doit jamais attendre derrière un envoi de masse
+PRIORITY_CRITICAL = 100
+
+# Emails unitaires, maintenance courante
+PRIORITY_DEFAULT = 50
+
+# Envois groupés, reconstructions complètes
+PRIORITY_BULK = 10
@@ -0,0 +1,173 @@
+# apps/core/ratelimit.py
+import hashlib
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+
+from .cache import LRUCache
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIERS': {
+        'ip': '10/s',
+        'api_key': '100/s',
+        'institution': '300/s',
+    },
+    'LOCAL_BLOCK_MAXSIZE': 10000,
+    'FAIL_OPEN': True,
+}
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+# GCRA en une seule opération atomique côté Redis, horloge du serveur Redis
+# (pas de décalage entre workers). Temps en microsecondes.
+# ARGV : intervalle par unité, capacité (fenêtre), coût, admission (1) ou imputation forcée (0).
+# Retour : {admis, attente en µs}
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local excess = tat - now - (capacity - interval)
+if tonumber(ARGV[4]) == 1 and excess > 0 then
+    return {0, math.ceil(excess)}
+end
+tat = tat + tonumber(ARGV[3]) * interval
+redis.call('SET', KEYS[1], string.format('%.0f', tat), 'PX', math.ceil((tat - now) / 1000) + 1)
+return {1, 0}
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'100/s', '1000/h', '30/5m' -> (nombre de requêtes, période en secondes)."""
+    try:
+        count, rest = rate.split('/', 1)
+        for unit, seconds in sorted(PERIODS.items(), key=lambda item: -len(item[0])):
+            if rest.endswith(unit):
+                multiplier = rest[:-len(unit)]
+                return int(count), (int(multiplier) if multiplier else 1) * seconds
+        return int(count), int(rest)
+    except (ValueError, AttributeError):
+        raise ValueError(f"Format de débit invalide: {rate!r}") from None
+
+
+class RateLimiter:
+    """
+    Limiteur de débit partagé par tous les workers, sans lecture-modification-écriture.
+
+    - Redis : GCRA (un horodatage TAT par client) mis à jour par un script Lua,
+      donc atomique quel que soit le nombre de workers.
+    - Autres backends : fenêtre glissante approchée (compteur de la fenêtre courante
+      + part de la précédente) avec incr() atomique ; une requête refusée est
+      décomptée. Atomique sur locmem (un processus) et memcached, pas sur le
+      cache en base de données.
+    - Un client refusé est retenu localement jusqu'à la fin de son attente : ses
+      requêtes suivantes sont rejetées sans aller-retour vers le cache.
+    - Si le cache est indisponible, les requêtes sont admises (FAIL_OPEN).
+
+    Une requête est admise s'il reste au moins une unité ; le coût restant d'une
+    opération groupée est imputé ensuite par charge().
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        # clé -> échéance (time.monotonic) du blocage local
+        self.blocked = LRUCache(maxsize=self.config['LOCAL_BLOCK_MAXSIZE'], ttl=60)
+        self._script_sha = hashlib.sha1(GCRA_SCRIPT.encode()).hexdigest()
+
+    @property
+    def cache(self):
+        return caches[self.config['ALIAS']]
+
+    def hit(self, key: str, limit: int, period: int, cost: int = 1) -> Tuple[bool, Optional[float]]:
+        """Admet ou refuse une requête ; retourne (admise, attente conseillée en secondes)."""
+        deadline = self.blocked.get(key)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                return False, remaining
+
+        try:
+            allowed, wait = self._apply(key, limit, period, cost, admit=True)
+        except Exception as e:
+            if not self.config['FAIL_OPEN']:
+                raise
+            logger.warning(f"Limitation de débit indisponible, requête admise: {e}")
+            return True, None
+
+        if not allowed and wait:
+            self.blocked.set(key, time.monotonic() + wait, ttl=wait)
+        return allowed, wait
+
+    def charge(self, key: str, limit: int, period: int, cost: int) -> None:
+        """Impute un coût supplémentaire à un client déjà admis (sans contrôle)."""
+        if cost <= 0:
+            return
+        try:
+            self._apply(key, limit, period, cost, admit=False)
+        except Exception as e:
+            if not self.config['FAIL_OPEN']:
+                raise
+            logger.warning(f"Limitation de débit indisponible, coût non imputé: {e}")
+
+    def _apply(self, key: str, limit: int, period: int, cost: int, admit: bool) -> Tuple[bool, Optional[float]]:
+        cache = self.cache
+        if isinstance(cache, RedisCache):
+            return self._gcra(cache, key, limit, period, cost, admit)
+        return self._sliding_window(cache, key, limit, period, cost, admit)
+
+    # ------------------------------------------
+    # Algorithmes
+    # ------------------------------------------
+
+    def _gcra(self, cache, key: str, limit: int, period: int, cost: int, admit: bool) -> Tuple[bool, Optional[float]]:
+        from redis.exceptions import NoScriptError
+
+        key = cache.make_and_validate_key(key)
+        client = cache._cache.get_client(key, write=True)
+        capacity = period * 1_000_000
+        args = (max(1, capacity // limit), capacity, cost, int(admit))
+        try:
+            allowed, wait = client.evalsha(self._script_sha, 1, key, *args)
+        except NoScriptError:
+            allowed, wait = client.eval(GCRA_SCRIPT, 1, key, *args)
+        return bool(allowed), (wait / 1_000_000 if not allowed else None)
+
+    @staticmethod
+    def _sliding_window(cache, key: str, limit: int, period: int, cost: int, admit: bool) -> Tuple[bool, Optional[float]]:
+        slot, elapsed = divmod(time.time(), period)
+        current = f"{key}:{int(slot)}"
+        cache.add(current, 0, period * 2 + 1)
+        try:
+            count = cache.incr(current, cost)
+        except ValueError:
+            # Entrée expirée entre add() et incr()
+            cache.add(current, 0, period * 2 + 1)
+            count = cache.incr(current, cost)
+        if not admit:
+            return True, None
+
+        previous = cache.get(f"{key}:{int(slot) - 1}", 0)
+        weighted = previous * (1 - elapsed / period)
+        before = weighted + count - cost
+        # Au moins une unité entière disponible
+        if before <= limit - 1:
+            return True, None
+
+        cache.decr(current, cost)
+        excess = before - limit + 1
+        # La part de la fenêtre précédente décroît linéairement ; sinon attendre la fenêtre suivante
+        if weighted >= excess:
+            return False, excess * period / previous
+        return False, period - elapsed
+
+
+rate_limiter = RateLimiter(getattr(settings, 'RATE_LIMITING', None))
@@ -0,0 +1,158 @@
+# apps/core/services/email_renderer.py
+import logging
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.utils.autoreload import file_changed
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import SafeData
+
+logger = logging.getLogger('app')
+
+# Marqueur des champs propres à chaque destinataire dans un squelette
+FIELD_MARKER = '\x1e{}\x1e'
+
+# Balises de template : {{ ... }} et {% ... %}
+TEMPLATE_TAG = re.compile(r'\{\{.*?\}\}|\{%.*?%\}', re.DOTALL)
+
+
+@lru_cache(maxsize=None)
+def site_context() -> Dict[str, Any]:
+    """Variables globales des emails, calculées une fois par processus."""
+    return {
+        'site_name': getattr(settings, 'SITE_NAME', "Let'sCheck"),
+        'site_url': getattr(settings, 'SITE_URL', 'http://localhost:8000'),
+        'support_email': getattr(settings, 'SUPPORT_EMAIL', 'support@letscheck'),
+    }
+
+
+@lru_cache(maxsize=128)
+def compiled_template(template_name: str):
+    """Template compilé, conservé pour la durée du processus."""
+    return get_template(template_name)
+
+
+def _template_sources(template) -> List[str]:
+    """
+    Sources d'un template et des templates qu'il étend ou inclut.
+
+    Raises:
+        ValueError: template parent ou inclus désigné par une variable
+    """
+    sources = [template.source]
+    for node in template.nodelist.get_nodes_by_type((ExtendsNode, IncludeNode)):
+        name = (node.parent_name if isinstance(node, ExtendsNode) else node.template).var
+        if not isinstance(name, str):
+            raise ValueError("Template parent ou inclus variable")
+        sources += _template_sources(get_template(name).template)
+    return sources
+
+
+@lru_cache(maxsize=128)
+def substitutable_field(template_name: str, field: str) -> bool:
+    """
+    Le champ n'apparaît-il dans le template que sous la forme {{ field }} (ni filtre,
+    ni condition, ni argument de balise, ni autoescape off) ? Seul un tel champ
+    peut être remplacé dans un squelette par sa valeur échappée.
+    """
+    try:
+        sources = _template_sources(compiled_template(template_name).template)
+    except ValueError:
+        return False
+    name = re.compile(rf'\b{re.escape(field)}\b')
+    bare = re.compile(rf'\{{\{{\s*{re.escape(field)}\s*\}}\}}')
+    found = False
+    for source in sources:
+        for tag in TEMPLATE_TAG.findall(source):
+            if tag.startswith('{%') and 'autoescape' in tag:
+                return False
+            if name.search(tag):
+                if not bare.fullmatch(tag):
+                    return False
+                found = True
+    return found
+
+
+def _reset_templates(sender, file_path, **kwargs):
+    # runserver : un template modifié doit être recompilé
+    compiled_template.cache_clear()
+    substitutable_field.cache_clear()
+
+
+file_changed.connect(_reset_templates)
+
+
+def email_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """Contexte complet d'un email : contexte fourni + variables globales du site."""
+    return {**context, **site_context(), 'current_year': date.today().year}
+
+
+def render_email(template_name: str, context: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Rend un email.
+
+    Returns:
+        tuple (html, texte brut)
+    """
+    html = compiled_template(template_name).render(email_context(context))
+    return html, strip_tags(html)
+
+
+class EmailSkeleton:
+    """
+    Email rendu une seule fois pour un envoi groupé, avec un marqueur à la place
+    de chaque champ propre au destinataire (nom, lien...). Chaque email du groupe
+    n'est plus qu'une substitution de chaînes, sans rendu de template ni strip_tags.
+
+    Les champs par destinataire doivent être affichés tels quels dans le template
+    ({{ user_name }}), sans condition ni filtre (substitutable_field), et leurs
+    valeurs des chaînes non vides et non marquées sûres (supports).
+
+    Raises:
+        ValueError: champ utilisé autrement que par {{ field }} dans le template
+    """
+
+    def __init__(self, template_name: str, context: Dict[str, Any], fields: Iterable[str]):
+        self.fields = tuple(fields)
+        refused = [field for field in self.fields if not substitutable_field(template_name, field)]
+        if refused:
+            raise ValueError(f"Champs filtrés ou conditionnels dans le template: {refused}")
+        markers = {field: FIELD_MARKER.format(field) for field in self.fields}
+        html = compiled_template(template_name).render(email_context({**context, **markers}))
+        self.html_parts = self._split(html)
+        self.text_parts = self._split(strip_tags(html))
+
+    def _split(self, content: str):
+        # Alternance [texte, champ, texte, champ, ..., texte]
+        parts = content.split('\x1e')
+        unknown = set(parts[1::2]) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Marqueurs inattendus dans le squelette: {unknown}")
+        return parts
+
+    @staticmethod
+    def _fill(parts, values: Dict[str, str]) -> str:
+        filled = parts[:]
+        for i in range(1, len(filled), 2):
+            # Échappé comme l'aurait fait le rendu du template (strip_tags conserve les entités)
+            filled[i] = escape(values[filled[i]])
+        return ''.join(filled)
+
+    def render(self, values: Dict[str, str]) -> Tuple[str, str]:
+        """Email d'un destinataire : tuple (html, texte brut), identique à render_email."""
+        return self._fill(self.html_parts, values), self._fill(self.text_parts, values)
+
+    @staticmethod
+    def supports(values: Dict[str, Any]) -> bool:
+        """
+        Les valeurs peuvent-elles être substituées sans rendu du template ? Chaînes non
+        vides seulement : une chaîne sûre (mark_safe) ne serait pas échappée au rendu.
+        """
+        return all(
+            isinstance(value, str) and value and not isinstance(value, SafeData) for value in values.values()
+        )
@@ -1,12 +1,14 @@
 # apps/core/services/email_service.py
 import logging
-from typing import List, Optional, Dict, Any
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from typing import List, Optional, Dict, Any, Tuple
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
-from django.utils.html import strip_tags
 from huey.contrib.djhuey import task
 
+from apps.core.queues import PRIORITY_BULK, PRIORITY_DEFAULT
+
+from .email_renderer import EmailSkeleton, render_email
+
 logger = logging.getLogger('app')
 
 class EmailService:
@@ -15,6 +17,50 @@ class EmailService:
     Utilise Huey pour l'envoi asynchrone en arrière-plan.
     """
     
+    @staticmethod
+    def build_message(
+        subject: str,
+        to_emails: List[str],
+        template_name: str,
+        context: Dict[str, Any],
+        from_email: Optional[str] = None,
+        cc_emails: Optional[List[str]] = None,
+        bcc_emails: Optional[List[str]] = None,
+        attachments: Optional[List[tuple]] = None,
+        connection=None,
+        rendered: Optional[Tuple[str, str]] = None
+    ) -> EmailMultiAlternatives:
+        """
+        Construit l'email (HTML + texte brut) sans l'envoyer.
+        Même signature que send_email_sync, plus la connexion SMTP à utiliser
+        et le contenu (html, texte) déjà rendu le cas échéant (envoi groupé).
+        """
+        # Utiliser l'email par défaut si non spécifié
+        from_email = from_email or settings.DEFAULT_FROM_EMAIL
+        
+        # Rendre le template HTML (template compilé en cache, variables globales ajoutées)
+        html_content, text_content = rendered or render_email(template_name, context)
+        
+        # Créer l'email
+        email = EmailMultiAlternatives(
+            subject=subject,
+            body=text_content,
+            from_email=from_email,
+            to=to_emails,
+            cc=cc_emails or [],
+            bcc=bcc_emails or [],
+            connection=connection
+        )
+        
+        # Attacher la version HTML
+        email.attach_alternative(html_content, "text/html")
+        
+        # Ajouter les pièces jointes si présentes
+        if attachments:
+            for filename, content, mimetype in attachments:
+                email.attach(filename, content, mimetype)
+        return email
+    
     @staticmethod
     def send_email_sync(
         subject: str,
@@ -43,40 +89,17 @@ class EmailService:
             bool: True si l'envoi a réussi, False sinon
         """
         try:
-            # Utiliser l'email par défaut si non spécifié
-            from_email = from_email or settings.DEFAULT_FROM_EMAIL
-            # Ajouter les variables globales au contexte
-            context.update({
-                'site_name': getattr(settings, 'SITE_NAME', "Let'sCheck"),
-                'site_url': getattr(settings, 'SITE_URL', 'http://localhost:8000'),
-                'support_email': getattr(settings, 'SUPPORT_EMAIL', 'support@letscheck'),
-                'current_year': __import__('datetime').datetime.now().year,
-            })
-            
-            # Rendre le template HTML
-            html_content = render_to_string(template_name, context)
-            
-            # Générer la version texte brut
-            text_content = strip_tags(html_content)
-            
-            # Créer l'email
-            email = EmailMultiAlternatives(
+            email = EmailService.build_message(
                 subject=subject,
-                body=text_content,
+                to_emails=to_emails,
+                template_name=template_name,
+                context=context,
                 from_email=from_email,
-                to=to_emails,
-                cc=cc_emails or [],
-                bcc=bcc_emails or []
+                cc_emails=cc_emails,
+                bcc_emails=bcc_emails,
+                attachments=attachments
             )
             
-            # Attacher la version HTML
-            email.attach_alternative(html_content, "text/html")
-            
-            # Ajouter les pièces jointes si présentes
-            if attachments:
-                for filename, content, mimetype in attachments:
-                    email.attach(filename, content, mimetype)
-            
             # Envoyer l'email
             email.send(fail_silently=False)
             
@@ -116,12 +139,118 @@ class EmailService:
         )
         logger.info(f"Email '{subject}' planifié pour envoi asynchrone à {', '.join(to_emails)}")
 
+    
+    @staticmethod
+    def send_bulk_sync(
+        subject: str,
+        recipients: List[Dict[str, Any]],
+        template_name: str,
+        from_email: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, bool]:
+        """
+        Envoie un email par destinataire sur une seule connexion SMTP réutilisée.
+        
+        Le template est rendu une seule fois avec le contexte commun (squelette) ;
+        les champs de chaque destinataire sont ensuite substitués. Un destinataire
+        dont le contexte contient autre chose que des chaînes est rendu entièrement.
+        
+        Args:
+            subject: Sujet par défaut des emails
+            recipients: Liste de dicts {'email': ..., 'context': {...}, 'subject': ... (optionnel)}
+            template_name: Nom du template HTML commun
+            from_email: Email de l'expéditeur (utilise DEFAULT_FROM_EMAIL si None)
+            context: Contexte commun à tous les destinataires
+            
+        Returns:
+            dict: {email: True si envoyé, False sinon}
+        """
+        context = context or {}
+        skeletons = {}
+        results = {}
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for recipient in recipients:
+                to_email = recipient['email']
+                try:
+                    fields = recipient.get('context', {})
+                    rendered = None
+                    if EmailSkeleton.supports(fields):
+                        keys = tuple(sorted(fields))
+                        if keys not in skeletons:
+                            skeletons[keys] = EmailService._skeleton(template_name, context, keys)
+                        if skeletons[keys] is not None:
+                            rendered = skeletons[keys].render(fields)
+                    email = EmailService.build_message(
+                        subject=recipient.get('subject', subject),
+                        to_emails=[to_email],
+                        template_name=template_name,
+                        context={**context, **fields},
+                        from_email=from_email,
+                        connection=connection,
+                        rendered=rendered
+                    )
+                    results[to_email] = connection.send_messages([email]) == 1
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'envoi de l'email '{subject}' à {to_email}: {str(e)}")
+                    results[to_email] = False
+                    # Connexion possiblement rompue : on la rouvre pour la suite du groupe
+                    connection.close()
+                    connection.open()
+        except Exception as e:
+            logger.error(f"Connexion SMTP impossible pour l'envoi groupé '{subject}': {str(e)}", exc_info=True)
+            for recipient in recipients:
+                results.setdefault(recipient['email'], False)
+        finally:
+            connection.close()
+        
+        sent = sum(results.values())
+        logger.info(f"Envoi groupé '{subject}': {sent}/{len(recipients)} emails envoyés")
+        return results
+    
+    @staticmethod
+    def _skeleton(template_name: str, context: Dict[str, Any], fields: tuple) -> Optional[EmailSkeleton]:
+        """Squelette d'un envoi groupé, ou None si le template ne s'y prête pas."""
+        try:
+            return EmailSkeleton(template_name, context, fields)
+        except ValueError as e:
+            logger.warning(f"Squelette impossible pour {template_name}, rendu complet par destinataire: {e}")
+            return None
+    
+    @staticmethod
+    def send_bulk(
+        subject: str,
+        recipients: List[Dict[str, Any]],
+        template_name: str,
+        from_email: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        group_size: Optional[int] = None
+    ) -> list:
+        """
+        Envoie un email par destinataire en arrière-plan, par groupes de
+        EMAIL_BULK['GROUP_SIZE'] destinataires (une tâche Huey et une connexion SMTP par groupe).
+        Même arguments que send_bulk_sync.
+        
+        Returns:
+            list: Résultats Huey, un par groupe ; chacun donne {email: bool}
+        """
+        group_size = group_size or settings.EMAIL_BULK['GROUP_SIZE']
+        handles = [
+            send_bulk_email_task(subject, recipients[start:start + group_size], template_name, from_email, context)
+            for start in range(0, len(recipients), group_size)
+        ]
+        logger.info(
+            f"Envoi groupé '{subject}' planifié: {len(recipients)} destinataires, {len(handles)} tâches"
+        )
+        return handles
+
 
 # ==========================================
 # TÂCHES HUEY (BACKGROUND TASKS)
 # ==========================================
 
-@task(retries=3, retry_delay=60)
+@task(retries=3, retry_delay=60, priority=PRIORITY_DEFAULT)
 def send_email_task(
     subject: str,
     to_emails: List[str],
@@ -148,6 +277,28 @@ def send_email_task(
     )
 
 
+@task(priority=PRIORITY_BULK)
+def send_bulk_email_task(
+    subject: str,
+    recipients: List[Dict[str, Any]],
+    template_name: str,
+    from_email: Optional[str] = None,
+    context: Optional[Dict[str, Any]] = None
+):
+    """
+    Tâche Huey pour l'envoi d'un groupe d'emails sur une connexion SMTP unique.
+    Pas de réessai automatique : les destinataires déjà servis recevraient un doublon.
+    Retourne {email: bool} par destinataire.
+    """
+    return EmailService.send_bulk_sync(
+        subject=subject,
+        recipients=recipients,
+        template_name=template_name,
+        from_email=from_email,
+        context=context
+    )
+
+
 # ==========================================
 # FONCTIONS UTILITAIRES PRÉDÉFINIES
 # ==========================================
@@ -0,0 +1,44 @@
+# apps/core/tasks.py
+import logging
+
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task, db_task
+
+from .audit import audit_log_store
+from .exports import data_export
+from .models import ExportJob
+from .queues import PRIORITY_BULK, PRIORITY_DEFAULT
+
+logger = logging.getLogger('app')
+
+
+# ==========================================
+# TÂCHES HUEY (BACKGROUND TASKS)
+# ==========================================
+
+@db_periodic_task(crontab(hour='1', minute='15'), priority=PRIORITY_DEFAULT)
+def ensure_audit_partitions():
+    """
+    Crée à l'avance les partitions mensuelles du journal d'audit (PostgreSQL ;
+    sans effet sous SQLite). Les écritures ne tombent ainsi jamais dans la partition DEFAULT.
+    """
+    return audit_log_store.ensure_partitions()
+
+
+@db_task(retries=2, retry_delay=60, priority=PRIORITY_BULK)
+def run_export(job_id):
+    """Exécute (ou reprend depuis son dernier point de reprise) un export en tâche de fond."""
+    job = ExportJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return None
+    return data_export.run_job(job).rows
+
+
+@db_periodic_task(crontab(minute='*/10'), priority=PRIORITY_DEFAULT)
+def resume_stale_exports():
+    """Relance les exports interrompus (worker arrêté, tâche perdue) : reprise à la dernière partie écrite."""
+    count = 0
+    for job_id in data_export.stale_jobs():
+        run_export(job_id)
+        count += 1
+    return count
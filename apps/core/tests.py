@@ -1,3 +1,512 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from multiprocessing import get_context
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core import mail
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as default_cache
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.safestring import mark_safe
+
+from apps.cryptography.services import SignatureService
+from apps.institutions.models import Institution, InstitutionUser
+
+from .audit import DEFAULT_PARTITION, TABLE, AuditLogStore, add_months, month_start, partition_name
+from .exports import DataExport
+from .api.throttling import RateLimitThrottle, _membership_executor, memberships
+from .cache import LRUCache
+from .models import AuditLog, ExportJob
+from .perf.cases import CASES, load_context
+from .perf.seed import SyntheticData
+from .perf.suite import PerfSuite
+from .ratelimit import RateLimiter, parse_rate
+from .services.email_renderer import EmailSkeleton, render_email
+from .services.email_service import EmailService
+
+
+class LRUCacheTestCase(SimpleTestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entries_expire_after_ttl(self):
+        cache = LRUCache(maxsize=10, ttl=5)
+        with mock.patch('apps.core.cache.time.monotonic', return_value=100.0):
+            cache.set('a', 1)
+        with mock.patch('apps.core.cache.time.monotonic', return_value=104.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('apps.core.cache.time.monotonic', return_value=105.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+REDIS_URL = os.environ.get('RATE_LIMIT_TEST_REDIS_URL')
+
+
+def hit_from_worker(args):
+    """Exécuté dans un processus distinct : requêtes admises sur une même clé."""
+    key, attempts = args
+    limiter = RateLimiter({'ALIAS': 'ratelimit'})
+    return sum(limiter.hit(key, 100, 60)[0] for _ in range(attempts))
+
+
+class RateLimiterTestCase(SimpleTestCase):
+
+    def setUp(self):
+        default_cache.clear()
+        self.limiter = RateLimiter()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/s'), (10, 1))
+        self.assertEqual(parse_rate('1000/h'), (1000, 3600))
+        self.assertEqual(parse_rate('30/5min'), (30, 300))
+        with self.assertRaises(ValueError):
+            parse_rate('dix/s')
+
+    def test_limit_holds_across_concurrent_workers(self):
+        admitted = []
+        barrier = threading.Barrier(16)
+
+        def worker():
+            barrier.wait()
+            admitted.append(sum(self.limiter.hit('client', 100, 60)[0] for _ in range(50)))
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(admitted), 100)
+
+    def test_rejected_client_is_blocked_locally(self):
+        self.limiter.hit('client', 1, 60)
+        allowed, wait = self.limiter.hit('client', 1, 60)
+        self.assertFalse(allowed)
+        self.assertGreater(wait, 0)
+        with mock.patch.object(self.limiter, '_apply') as apply:
+            self.assertFalse(self.limiter.hit('client', 1, 60)[0])
+        apply.assert_not_called()
+
+    def test_charge_consumes_capacity(self):
+        self.assertTrue(self.limiter.hit('client', 10, 60)[0])
+        self.limiter.charge('client', 10, 60, 9)
+        self.assertFalse(self.limiter.hit('client', 10, 60)[0])
+
+    def test_unavailable_cache_admits_requests(self):
+        with mock.patch.object(self.limiter, '_apply', side_effect=ConnectionError):
+            self.assertEqual(self.limiter.hit('client', 1, 60), (True, None))
+
+    @unittest.skipUnless(REDIS_URL, "RATE_LIMIT_TEST_REDIS_URL non défini")
+    def test_limit_holds_across_processes_on_redis(self):
+        caches = {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'ratelimit': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL},
+        }
+        key = f"test_{os.getpid()}"
+        with override_settings(CACHES=caches):
+            with ProcessPoolExecutor(max_workers=8, mp_context=get_context('fork')) as pool:
+                admitted = sum(pool.map(hit_from_worker, [(key, 50)] * 8))
+        self.assertEqual(admitted, 100)
+
+
+class RateLimitThrottleTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='membre', password='x')
+        cls.institution = Institution.objects.create(
+            name="Université de Test", legal_name="Université de Test", slug="univ-test",
+            type=Institution.Type.UNIVERSITY, email="contact@univ-test.cm",
+            address_line1="BP 1", city="Maroua", postal_code="000", country_code="CM",
+            status=Institution.Status.ACTIVE,
+        )
+        InstitutionUser.objects.create(institution=cls.institution, user=cls.user, role=InstitutionUser.Role.SIGNER)
+
+    def setUp(self):
+        memberships.clear()
+        self.request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+
+    def keys(self, auth):
+        self.request.auth = auth
+        return [RateLimitThrottle(tier).get_cache_key(self.request) for tier in ('ip', 'api_key', 'institution')]
+
+    def test_anonymous_requests_are_limited_per_ip(self):
+        self.assertEqual(self.keys(None), ['throttle_ip_10.0.0.1', None, None])
+
+    def test_members_share_their_institution_budget(self):
+        self.assertEqual(self.keys(self.user), [
+            None, f"throttle_api_key_user:{self.user.pk}", f"throttle_institution_{self.institution.pk}",
+        ])
+
+    def test_async_lookup_does_not_wait_for_the_database(self):
+        institution_id = str(self.institution.pk)
+        with mock.patch('apps.core.api.throttling.load_membership', return_value=institution_id) as load:
+            async def lookup():
+                return self.keys(self.user)[2]
+
+            # Adhésion inconnue : chargée en arrière-plan, palier institution appliqué ensuite
+            self.assertIsNone(async_to_sync(lookup)())
+            _membership_executor.submit(lambda: None).result()
+            self.assertEqual(async_to_sync(lookup)(), f"throttle_institution_{institution_id}")
+        load.assert_called_once_with(self.user.pk)
+
+    def test_tokens_are_limited_per_token(self):
+        ip, api_key, institution = self.keys('jeton')
+        self.assertIsNone(ip)
+        self.assertTrue(api_key.startswith('throttle_api_key_'))
+        self.assertNotIn('jeton', api_key)
+        self.assertIsNone(institution)
+
+
+class BenchmarkQueueCommandTestCase(SimpleTestCase):
+
+    def test_reports_throughput_per_backend(self):
+        out = StringIO()
+        call_command('benchmark_queue', backend=['memory', 'sqlite'], tasks=20, batch_size=5,
+                     workers=2, json=True, stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual([r['backend'] for r in results], ['memory', 'sqlite'])
+        for result in results:
+            self.assertEqual(result['tasks'], 20)
+            self.assertGreater(result['tasks_per_sec'], 0)
+
+
+class BenchmarkStartupCommandTestCase(SimpleTestCase):
+
+    def test_production_profile_leaves_out_debug_tooling(self):
+        out = StringIO()
+        # Cache partagé exigé par la configuration de production (aucune connexion au démarrage)
+        with mock.patch.dict(os.environ, {'CACHE_URL': 'redis://localhost:6379/1'}):
+            call_command('benchmark_startup', profiles=['config.settings.production'], runs=1, json=True, stdout=out)
+        result = json.loads(out.getvalue())[0]
+        self.assertFalse(result['debug_toolbar'])
+        self.assertEqual(result['status'], '401 Unauthorized')
+        self.assertGreater(result['first_request_ms'], result['setup_ms'])
+
+
+class BulkEmailTestCase(SimpleTestCase):
+
+    def recipients(self, count):
+        return [
+            {'email': f"user{i}@univ-test.cm", 'context': {
+                'user_name': f"Utilisateur {i}", 'notification_title': "Clé expirante",
+                'notification_message': "Votre clé expire bientôt.",
+            }}
+            for i in range(count)
+        ]
+
+    def test_send_bulk_sync_reuses_one_connection(self):
+        with mock.patch('apps.core.services.email_service.get_connection', wraps=get_connection) as connection_factory:
+            results = EmailService.send_bulk_sync("Clé expirante", self.recipients(3), 'emails/notification.html')
+        connection_factory.assert_called_once()
+        self.assertEqual(results, {f"user{i}@univ-test.cm": True for i in range(3)})
+        self.assertEqual([m.to for m in mail.outbox], [[f"user{i}@univ-test.cm"] for i in range(3)])
+        self.assertIn("Utilisateur 1", mail.outbox[1].alternatives[0][0])
+
+    def test_send_bulk_sync_reports_failures_per_recipient(self):
+        send_messages = EmailBackend.send_messages
+
+        def flaky(backend, messages):
+            if messages[0].to == ["user1@univ-test.cm"]:
+                raise OSError("550 boîte inexistante")
+            return send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', flaky):
+            results = EmailService.send_bulk_sync("Clé expirante", self.recipients(3), 'emails/notification.html')
+        self.assertEqual(list(results.values()), [True, False, True])
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_send_bulk_groups_recipients_into_tasks(self):
+        with mock.patch('apps.core.services.email_service.send_bulk_email_task') as send_task:
+            handles = EmailService.send_bulk("Clé expirante", self.recipients(5), 'emails/notification.html',
+                                             group_size=2)
+        self.assertEqual(len(handles), 3)
+        self.assertEqual([len(c.args[1]) for c in send_task.call_args_list], [2, 2, 1])
+
+    def test_skeleton_matches_full_rendering(self):
+        shared = {'notification_title': "Clé expirante", 'notification_message': "Expire dans 7 jours."}
+        skeleton = EmailSkeleton('emails/notification.html', shared, ['user_name'])
+        for name in ("Awa", "O'Neil <admin>"):
+            self.assertEqual(
+                skeleton.render({'user_name': name}),
+                render_email('emails/notification.html', {**shared, 'user_name': name}),
+            )
+        # |safe et {% if %} : pas de squelette pour ces champs
+        for field in ('notification_message', 'action_url'):
+            with self.assertRaises(ValueError):
+                EmailSkeleton('emails/notification.html', shared, [field])
+        self.assertFalse(EmailSkeleton.supports({'user_name': mark_safe("<em>Awa</em>")}))
+        self.assertFalse(EmailSkeleton.supports({'user_name': ""}))
+
+        recipients = [
+            {'email': "html@univ-test.cm", 'context': {
+                'user_name': "Awa", 'notification_message': mark_safe("<strong>Clé</strong> expirée"),
+                'action_url': "https://enspmhub.com/keys", 'action_text': "Gérer mes clés",
+            }},
+            {'email': "sans-lien@univ-test.cm", 'context': {
+                'user_name': "Issa", 'notification_message': "<strong>Clé</strong> expirée",
+                'action_url': "", 'action_text': "Gérer mes clés",
+            }},
+            {'email': "sur@univ-test.cm", 'context': {'user_name': mark_safe("<em>Awa</em>")}},
+        ]
+        EmailService.send_bulk_sync("Clé expirante", recipients, 'emails/notification.html', context=shared)
+        for recipient, message in zip(recipients, mail.outbox):
+            html, text = render_email('emails/notification.html', {**shared, **recipient['context']})
+            self.assertEqual((message.alternatives[0][0], message.body), (html, text))
+        self.assertIn("<strong>Clé</strong>", mail.outbox[0].alternatives[0][0])
+        self.assertNotIn('class="button"', mail.outbox[1].alternatives[0][0])
+
+    def test_send_bulk_sync_renders_template_once(self):
+        recipients = [{'email': f"user{i}@univ-test.cm", 'context': {'user_name': f"Utilisateur {i}"}} for i in range(5)]
+        with mock.patch('apps.core.services.email_renderer.strip_tags', wraps=strip_tags) as strip:
+            EmailService.send_bulk_sync("Clé expirante", recipients, 'emails/notification.html', context={
+                'notification_title': "Clé expirante", 'notification_message': "Votre clé expire bientôt.",
+            })
+        self.assertEqual(strip.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+
+class AuditLogStoreTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create_user('auditeur', 'auditeur@enspm.cm', 'x', is_staff=True)
+        now = timezone.now()
+        # Entrées sur deux mois, dont des horodatages identiques (départage par id)
+        offsets = [timedelta(minutes=i) for i in range(10)] + [timedelta(days=d) for d in range(1, 61, 4)]
+        cls.logs = AuditLog.objects.bulk_create([
+            AuditLog(action_type=AuditLog.ActionType.VERIFY, resource_type=AuditLog.ResourceType.DOCUMENT,
+                     ip_address='127.0.0.1', timestamp=now - offset)
+            for offset in offsets + offsets[:3]
+        ])
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        self.store = AuditLogStore({'STORAGE_OPTIONS': {'location': self.archive_dir}, 'SCAN_WINDOW': 60})
+
+    def test_keyset_pages_cover_the_log_in_order(self):
+        expected = list(AuditLog.objects.order_by('-timestamp', '-id').values_list('pk', flat=True))
+        seen, cursor = [], None
+        while True:
+            logs, cursor = self.store.page(limit=7, cursor=cursor)
+            seen += [log.pk for log in logs]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_page_stops_at_since_and_rejects_bad_cursor(self):
+        since = timezone.now() - timedelta(days=10)
+        logs, cursor = self.store.page(limit=100, since=since)
+        self.assertIsNone(cursor)
+        self.assertEqual(len(logs), AuditLog.objects.filter(timestamp__gte=since).count())
+        with self.assertRaises(ValueError):
+            self.store.page(cursor='pas-un-curseur')
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', "Partitionnement PostgreSQL uniquement")
+    def test_missing_partition_takes_over_rows_from_default(self):
+        # Au-delà de MONTHS_AHEAD : l'entrée tombe dans la partition DEFAULT
+        later = add_months(month_start(timezone.now()), self.store.config['MONTHS_AHEAD'] + 3)
+        log = AuditLog.objects.create(action_type=AuditLog.ActionType.VERIFY,
+                                      resource_type=AuditLog.ResourceType.DOCUMENT,
+                                      ip_address='127.0.0.1', timestamp=later + timedelta(days=2))
+
+        def partition_of(pk):
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT tableoid::regclass::text FROM {TABLE} WHERE id = %s", [pk])
+                return cursor.fetchone()[0]
+
+        self.assertEqual(partition_of(log.pk), DEFAULT_PARTITION)
+        self.assertIn(partition_name(later), self.store.ensure_partitions(now=later))
+        self.assertEqual(partition_of(log.pk), partition_name(later))
+        self.assertIn(DEFAULT_PARTITION, self.store._attached())
+        self.assertEqual(AuditLog.objects.filter(pk=log.pk).count(), 1)
+
+    def test_archive_exports_then_deletes_old_months(self):
+        cutoff = month_start(timezone.now())
+        old = AuditLog.objects.filter(timestamp__lt=cutoff)
+        expected = {str(pk) for pk in old.values_list('pk', flat=True)}
+        archived = self.store.archive(before=cutoff)
+        self.assertFalse(old.exists())
+        self.assertEqual(sum(entry['rows'] for entry in archived), len(expected))
+        exported = set()
+        for entry in archived:
+            with gzip.open(os.path.join(self.archive_dir, entry['file'])) as f:
+                exported |= {json.loads(line)['id'] for line in f}
+        self.assertEqual(exported, expected)
+        self.assertEqual(AuditLog.objects.count(), len(self.logs) - len(expected))
+
+    def test_api_is_staff_only_and_paginates(self):
+        self.client.force_login(self.staff)
+        first = self.client.get('/api/v1/audit/logs', {'limit': 20}).json()
+        self.assertEqual(len(first['items']), 20)
+        second = self.client.get('/api/v1/audit/logs', {'limit': 20, 'cursor': first['next_cursor']}).json()
+        self.assertEqual(len(second['items']), len(self.logs) - 20)
+        self.assertIsNone(second['next_cursor'])
+        self.assertEqual(self.client.get('/api/v1/audit/logs', {'cursor': '%%%'}).status_code, 400)
+
+        self.staff.is_staff = False
+        self.staff.save()
+        self.assertEqual(self.client.get('/api/v1/audit/logs').status_code, 403)
+
+
+class DataExportTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create_user('exporteur', 'exporteur@enspm.cm', 'x', is_staff=True)
+        now = timezone.now()
+        # Horodatages identiques en fin de liste : départage par id, y compris entre deux parties
+        offsets = [timedelta(hours=7 * i) for i in range(40)] + [timedelta(0)] * 5
+        AuditLog.objects.bulk_create([
+            AuditLog(action_type=AuditLog.ActionType.LOGIN, resource_type=AuditLog.ResourceType.USER,
+                     ip_address='127.0.0.1', details={'i': i}, timestamp=now - offset)
+            for i, offset in enumerate(offsets)
+        ])
+
+    def setUp(self):
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir)
+        self.export = DataExport({
+            'STORAGE_OPTIONS': {'location': self.export_dir},
+            'CHUNK_SIZE': 4, 'WINDOW': 3600, 'BUFFER_BYTES': 256, 'PART_ROWS': 10,
+        })
+
+    def test_stream_gzips_rows_in_order(self):
+        content = gzip.decompress(b''.join(self.export.stream('audit_logs', 'csv', compress=True))).decode()
+        lines = content.splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'timestamp', 'user_id'])
+        expected = [str(pk) for pk in AuditLog.objects.order_by('timestamp', 'id').values_list('pk', flat=True)]
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], expected)
+
+        lines = b''.join(self.export.stream('audit_logs', 'ndjson')).splitlines()
+        self.assertEqual(json.loads(lines[-1])['id'], expected[-1])
+        with self.assertRaises(ValueError):
+            self.export.stream('audit_logs', 'csv', institution_id='c0ffee00-0000-0000-0000-000000000000')
+
+    def test_interrupted_job_resumes_from_last_part(self):
+        expected = gzip.decompress(b''.join(self.export.stream('audit_logs', 'csv', compress=True)))
+        job = self.export.create_job(self.staff, 'audit_logs', 'csv', compressed=True)
+        save = self.export.storage.save
+        calls = []
+
+        def flaky(name, content):
+            calls.append(name)
+            if len(calls) == 3:
+                raise OSError("disque plein")
+            return save(name, content)
+
+        with mock.patch.object(self.export.storage, 'save', side_effect=flaky):
+            with self.assertRaises(OSError):
+                self.export.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.parts, job.rows), (ExportJob.Status.FAILED, 2, 20))
+
+        # Lignes arrivées après la création : hors de l'export (borne haute figée)
+        AuditLog.objects.create(action_type=AuditLog.ActionType.LOGOUT, resource_type=AuditLog.ResourceType.USER,
+                                ip_address='127.0.0.1')
+        self.export.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.parts, job.rows), (ExportJob.Status.COMPLETED, 5, 45))
+        self.assertEqual(gzip.decompress(b''.join(self.export.job_chunks(job))), expected)
+
+    def test_api_checks_access_and_runs_jobs(self):
+        user = get_user_model().objects.create_user('lecteur', 'lecteur@enspm.cm', 'x')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get('/api/v1/exports/audit_logs').status_code, 403)
+        self.assertEqual(self.client.get('/api/v1/exports/verifications').status_code, 403)
+
+        self.client.force_login(self.staff)
+        response = self.client.get('/api/v1/exports/audit_logs', {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), AuditLog.objects.count())
+
+        with mock.patch('apps.core.api.exports.data_export', self.export), \
+                mock.patch('apps.core.api.exports.run_export') as run_export:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/api/v1/exports/jobs', {'dataset': 'audit_logs'},
+                                            content_type='application/json')
+            self.assertEqual(response.status_code, 202)
+            job = ExportJob.objects.get(pk=response.json()['id'])
+            run_export.assert_called_once_with(job.pk)
+            self.assertEqual(self.client.get(f'/api/v1/exports/jobs/{job.pk}/download').status_code, 409)
+            self.export.run_job(job)
+            response = self.client.get(f'/api/v1/exports/jobs/{job.pk}/download')
+            self.assertEqual(len(gzip.decompress(b''.join(response.streaming_content)).splitlines()),
+                             AuditLog.objects.count() + 1)
+
+
+class PerfSuiteTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = SyntheticData({
+            'INSTITUTIONS': 2, 'KEYS_PER_INSTITUTION': 1, 'DOCUMENTS': 40, 'VERIFICATIONS': 80, 'DAYS': 2,
+        })
+        cls.report = cls.data.seed()
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def test_seed_is_reproducible_and_signed(self):
+        self.assertEqual((self.report['documents'], self.report['verifications']), (40, 80))
+        self.assertGreater(self.report['statistics'], 0)
+        with self.assertRaises(ValueError):
+            self.data.seed()
+        context = load_context(self.data, size=10)
+        self.assertEqual(context.documents, 40)
+        self.assertTrue(all(
+            SignatureService.verify_with_public_key(*sample) for sample in context.signatures
+        ))
+
+    def test_suite_measures_every_case_and_flags_regressions(self):
+        suite = PerfSuite({'ROUNDS': 1, 'WARMUP': 0})
+        report = suite.run(load_context(self.data, size=10))
+        self.assertEqual(set(report['results']), set(CASES))
+        self.assertTrue(all(result['median_us'] > 0 for result in report['results'].values()))
+
+        baseline = {'results': {name: dict(result) for name, result in report['results'].items()}}
+        self.assertEqual(suite.compare(report, baseline), [])
+        baseline['results']['email_rendering']['median_us'] /= 2
+        self.assertEqual([r['case'] for r in suite.compare(report, baseline)], ['email_rendering'])
+
+    def test_command_writes_results_and_fails_on_regression(self):
+        output = os.path.join(self.output_dir, 'results.json')
+        baseline = os.path.join(self.output_dir, 'baseline.json')
+        options = {'cases': ['api_error_handlers'], 'rounds': 2, 'output': output, 'baseline': baseline,
+                   'stdout': StringIO(), 'stderr': StringIO()}
+        call_command('perf_suite', save_baseline=True, **options)
+        with open(output) as f:
+            self.assertIn('api_error_handlers', json.load(f)['results'])
+
+        with open(baseline) as f:
+            reference = json.load(f)
+        reference['results']['api_error_handlers']['median_us'] /= 100
+        with open(baseline, 'w') as f:
+            json.dump(reference, f)
+        with self.assertRaises(CommandError):
+            call_command('perf_suite', **options)
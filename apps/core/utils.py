@@ -0,0 +1,10 @@
+# apps/core/utils.py
+from django.http import HttpRequest
+
+
+def get_client_ip(request: HttpRequest) -> str:
+    """Retourne l'adresse IP du client, en tenant compte du proxy (X-Forwarded-For)."""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or '0.0.0.0'
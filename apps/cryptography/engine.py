@@ -0,0 +1,121 @@
+# apps/cryptography/engine.py
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+from apps.core.cache import LRUCache
+
+from .models import CryptographicKey
+from .services import SignatureService
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'KEY_CACHE_SIZE': 1000,
+    'KEY_TTL': 3600,
+    'OUTCOME_CACHE_SIZE': 100000,
+    'OUTCOME_TTL': 3600,
+}
+
+
+class SignatureEngine:
+    """
+    Moteur de vérification des signatures utilisé par les vérifications publiques.
+
+    - Les clés publiques analysées (load_pem_public_key, coûteux en RSA-4096)
+      sont conservées par empreinte dans un cache LRU local au processus.
+      L'entrée garde le PEM d'origine : une clé dont le contenu a changé sous
+      la même empreinte est ré-analysée, y compris dans les autres processus.
+    - Le résultat de chaque vérification est mémorisé par
+      (hash, empreinte de la signature, empreinte de la clé, génération).
+    - invalidate(fingerprint), appelé à la révocation ou à la rotation d'une clé,
+      oublie la clé analysée et rend inaccessibles ses résultats mémorisés.
+
+    Le statut de la clé (révoquée, expirée) n'est pas évalué ici : il l'est par
+    VerificationService.resolve_result à partir de l'instantané du document.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.keys = LRUCache(maxsize=self.config['KEY_CACHE_SIZE'], ttl=self.config['KEY_TTL'])
+        self.outcomes = LRUCache(maxsize=self.config['OUTCOME_CACHE_SIZE'], ttl=self.config['OUTCOME_TTL'])
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def load_key(self, fingerprint: str, public_key_pem: str):
+        """
+        Retourne la clé publique analysée, depuis le cache si son PEM n'a pas changé.
+
+        Raises:
+            ValueError: PEM illisible
+        """
+        entry = self.keys.get(fingerprint)
+        if entry is not None and entry[0] == public_key_pem:
+            return entry[1]
+        if entry is not None:
+            logger.warning(f"Contenu de la clé {fingerprint[:16]} modifié, nouvelle analyse")
+            self._bump_generation(fingerprint)
+        public_key = SignatureService.load_public_key(public_key_pem)
+        self.keys.set(fingerprint, (public_key_pem, public_key))
+        return public_key
+
+    def verify(
+        self,
+        fingerprint: str,
+        public_key_pem: str,
+        algorithm: str,
+        signature_b64: str,
+        document_hash: str
+    ) -> bool:
+        """
+        Vérifie une signature ; mêmes arguments que SignatureService.verify,
+        plus l'empreinte de la clé (clé des caches).
+        """
+        try:
+            public_key = self.load_key(fingerprint, public_key_pem)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Clé publique {fingerprint[:16]} illisible: {e}")
+            return False
+
+        outcome_key = (
+            document_hash,
+            hashlib.blake2b(signature_b64.encode(), digest_size=16).digest(),
+            fingerprint,
+            self._generations.get(fingerprint, 0),
+        )
+        outcome = self.outcomes.get(outcome_key)
+        if outcome is None:
+            outcome = SignatureService.verify_with_public_key(public_key, algorithm, signature_b64, document_hash)
+            self.outcomes.set(outcome_key, outcome)
+        return outcome
+
+    def verify_with_key(self, key: CryptographicKey, signature_b64: str, document_hash: str) -> bool:
+        """Vérifie une signature émise avec une CryptographicKey."""
+        return self.verify(key.fingerprint, key.public_key, key.algorithm, signature_b64, document_hash)
+
+    # ------------------------------------------
+    # Invalidation
+    # ------------------------------------------
+
+    def invalidate(self, fingerprint: str) -> None:
+        """Oublie une clé (révocation, rotation) et ses résultats mémorisés."""
+        self.keys.delete(fingerprint)
+        self._bump_generation(fingerprint)
+
+    def _bump_generation(self, fingerprint: str) -> None:
+        # Les anciennes entrées deviennent inaccessibles et sortent du LRU d'elles-mêmes
+        with self._lock:
+            self._generations[fingerprint] = self._generations.get(fingerprint, 0) + 1
+
+    def clear(self) -> None:
+        self.keys.clear()
+        self.outcomes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'keys': self.keys.stats(), 'outcomes': self.outcomes.stats()}
+
+
+signature_engine = SignatureEngine(getattr(settings, 'SIGNATURE_ENGINE', None))
@@ -0,0 +1,204 @@
+# apps/cryptography/lifecycle.py
+import html
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from apps.core.services.email_service import EmailService
+
+from .engine import signature_engine
+from .models import CryptographicKey
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'WARNING_DAYS': 30,
+    'CHUNK_SIZE': 1000,
+    'NOTIFY': True,
+    'ACTION_URL': None,  # Lien « Gérer mes clés » des emails (None = SITE_URL)
+}
+
+Status = CryptographicKey.Status
+
+
+class KeyLifecycle:
+    """
+    Transitions de statut des clés selon leur date d'expiration, en un passage :
+
+    - ACTIVE / EXPIRING_SOON -> EXPIRED : expires_at dépassé ;
+    - ACTIVE -> EXPIRING_SOON : expiration dans moins de WARNING_DAYS jours ;
+    - EXPIRING_SOON -> ACTIVE : expiration repoussée au-delà de la fenêtre.
+
+    Chaque transition est une requête de fenêtre sur l'index (status, expires_at),
+    qui ne lit que les clés concernées, suivie d'UPDATE ... RETURNING groupés qui
+    revérifient le statut : une clé révoquée entre-temps n'est ni écrasée, ni
+    comptée, ni signalée. Les UPDATE n'émettent pas post_save : les clés analysées
+    du moteur de signature sont oubliées ici ; les instantanés de vérification en
+    cache restent justes, resolve_result évaluant expires_at à chaque appel.
+
+    Les avertissements sont regroupés par institution (un email par
+    administrateur, toutes clés confondues) et envoyés par EmailService.send_bulk :
+    une tâche Huey par groupe de destinataires, pas une par clé.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Applique les transitions dues et planifie les avertissements.
+
+        Returns:
+            dict du bilan (compteurs par transition, emails, durée)
+        """
+        now = now or timezone.now()
+        started = time.perf_counter()
+        horizon = now + timedelta(days=self.config['WARNING_DAYS'])
+
+        expired = self._transition(
+            CryptographicKey.objects.filter(status__in=[Status.ACTIVE, Status.EXPIRING_SOON], expires_at__lte=now),
+            Status.EXPIRED,
+        )
+        expiring = self._transition(
+            CryptographicKey.objects.filter(status=Status.ACTIVE, expires_at__gt=now, expires_at__lte=horizon),
+            Status.EXPIRING_SOON,
+        )
+        renewed = self._transition(
+            CryptographicKey.objects.filter(status=Status.EXPIRING_SOON, expires_at__gt=horizon),
+            Status.ACTIVE,
+        )
+
+        for key in expired + expiring + renewed:
+            signature_engine.invalidate(key['fingerprint'])
+
+        emails = 0
+        if self.config['NOTIFY'] and (expired or expiring):
+            emails = self.notify(expired, expiring)
+
+        report = {
+            'expired': len(expired),
+            'expiring_soon': len(expiring),
+            'renewed': len(renewed),
+            'emails': emails,
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"Cycle de vie des clés: {report}")
+        return report
+
+    def _transition(self, queryset, status: str) -> List[Dict[str, Any]]:
+        """
+        Passe au statut donné les clés de la fenêtre ; retourne les clés effectivement
+        modifiées (pk, empreinte, institution, échéance, statut précédent).
+        """
+        keys = list(queryset.order_by().values('pk', 'fingerprint', 'institution_id', 'expires_at', 'status'))
+        chunk_size = self.config['CHUNK_SIZE']
+        updated = []
+        # UPDATE indépendants : un passage interrompu est repris au suivant
+        for start in range(0, len(keys), chunk_size):
+            by_status = defaultdict(list)
+            for key in keys[start:start + chunk_size]:
+                by_status[key['status']].append(key)
+            for previous, chunk in by_status.items():
+                # Statut revérifié : une transition ou révocation concurrente l'emporte
+                ids = self._update_status([key['pk'] for key in chunk], previous, status)
+                updated.extend(key for key in chunk if key['pk'] in ids)
+        return updated
+
+    @staticmethod
+    def _update_status(ids: List[Any], previous: str, status: str) -> Set[Any]:
+        """Passe de previous à status les clés données ; retourne les pk des lignes modifiées."""
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            # Sans UPDATE ... RETURNING : une requête par clé
+            return {
+                pk for pk in ids
+                if CryptographicKey.objects.filter(pk=pk, status=previous).update(status=status)
+            }
+        meta = CryptographicKey._meta
+        pk_field = meta.pk
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {quote(meta.db_table)} SET {quote('status')} = %s "
+                f"WHERE {quote(pk_field.column)} IN ({', '.join(['%s'] * len(ids))}) AND {quote('status')} = %s "
+                f"RETURNING {quote(pk_field.column)}",
+                [status, *(pk_field.get_db_prep_value(pk, connection) for pk in ids), previous],
+            )
+            return {pk_field.to_python(row[0]) for row in cursor.fetchall()}
+
+    def notify(self, expired: List[Dict[str, Any]], expiring: List[Dict[str, Any]]) -> int:
+        """
+        Un email par administrateur d'institution concernée (à défaut, à l'adresse
+        de l'institution) ; retourne le nombre de destinataires.
+        """
+        from apps.institutions.models import Institution, InstitutionUser
+
+        keys_by_institution = defaultdict(lambda: {'expired': [], 'expiring': []})
+        for key in expired:
+            keys_by_institution[key['institution_id']]['expired'].append(key)
+        for key in expiring:
+            keys_by_institution[key['institution_id']]['expiring'].append(key)
+
+        institutions = Institution.objects.filter(pk__in=list(keys_by_institution)).values_list('pk', 'name', 'email')
+        admins = defaultdict(list)
+        for institution_id, email, first_name, last_name, username in InstitutionUser.objects.filter(
+            institution_id__in=list(keys_by_institution), role=InstitutionUser.Role.ADMIN, is_active=True,
+            user__is_active=True,
+        ).exclude(user__email='').values_list(
+            'institution_id', 'user__email', 'user__first_name', 'user__last_name', 'user__username'
+        ):
+            admins[institution_id].append((email, f"{first_name} {last_name}".strip() or username))
+
+        # Le message (HTML) est commun à l'institution : contexte partagé, rendu normalement
+        action_url = self.config['ACTION_URL'] or settings.SITE_URL
+        sent = 0
+        for institution_id, institution_name, institution_email in institutions:
+            recipients = [
+                {'email': email, 'context': {'user_name': name}}
+                for email, name in admins.get(institution_id) or [(institution_email, institution_name)]
+                if email
+            ]
+            if not recipients:
+                continue
+            EmailService.send_bulk(
+                subject="Clés de signature : expiration",
+                recipients=recipients,
+                template_name='emails/notification.html',
+                context={
+                    'notification_title': "Vos clés de signature arrivent à expiration",
+                    'notification_message': self._message(institution_name, keys_by_institution[institution_id]),
+                    'action_url': action_url,
+                    'action_text': "Gérer mes clés",
+                },
+            )
+            sent += len(recipients)
+        return sent
+
+    @staticmethod
+    def _message(institution_name: str, keys: Dict[str, List[Dict[str, Any]]]) -> str:
+        """Corps HTML de l'avertissement d'une institution (seul le nom est à échapper)."""
+        def rows(items, label):
+            return ''.join(
+                f"<li><code>{key['fingerprint'][:16]}</code> : {label} {key['expires_at']:%d/%m/%Y}</li>"
+                for key in items
+            )
+
+        message = f"Clés de signature de <strong>{html.escape(institution_name)}</strong> :"
+        if keys['expiring']:
+            message += (
+                f"<ul>{rows(sorted(keys['expiring'], key=lambda key: key['expires_at']), 'expire le')}</ul>"
+                "Pensez à effectuer leur rotation avant l'échéance : une clé expirée ne permet plus "
+                "de signer, et ses documents sont signalés comme signés par une clé expirée."
+            )
+        if keys['expired']:
+            message += f"<ul>{rows(keys['expired'], 'a expiré le')}</ul>"
+        return mark_safe(message)
+
+
+key_lifecycle = KeyLifecycle(getattr(settings, 'KEY_LIFECYCLE', None))
@@ -0,0 +1,91 @@
+# apps/cryptography/management/commands/benchmark_signatures.py
+import base64
+import hashlib
+import json
+import time
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+from django.core.management.base import BaseCommand
+
+from apps.cryptography.engine import SignatureEngine
+from apps.cryptography.models import CryptographicKey
+from apps.cryptography.services import RSA_ALGORITHMS, SignatureService
+
+Algorithm = CryptographicKey.Algorithm
+
+PRIVATE_KEYS = {
+    Algorithm.RSA_2048: lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    Algorithm.RSA_4096: lambda: rsa.generate_private_key(public_exponent=65537, key_size=4096),
+    Algorithm.ECDSA_P256: lambda: ec.generate_private_key(ec.SECP256R1()),
+    Algorithm.ECDSA_P384: lambda: ec.generate_private_key(ec.SECP384R1()),
+}
+
+
+def sign(private_key, algorithm, document_hash):
+    if algorithm in RSA_ALGORITHMS:
+        signature = private_key.sign(
+            document_hash.encode(),
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+            hashes.SHA256(),
+        )
+    else:
+        signature = private_key.sign(document_hash.encode(), ec.ECDSA(hashes.SHA384()))
+    return base64.b64encode(signature).decode()
+
+
+class Command(BaseCommand):
+    help = "Compare les vérifications de signature par seconde : à froid, clé en cache, résultat mémorisé"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500, help="Vérifications par mesure")
+        parser.add_argument('--algorithm', action='append', choices=[a.value for a in Algorithm],
+                            help="Algorithme à mesurer (répétable ; défaut : tous)")
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        results = []
+        for algorithm in options['algorithm'] or [a.value for a in Algorithm]:
+            private_key = PRIVATE_KEYS[algorithm]()
+            pem = private_key.public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode()
+            fingerprint = hashlib.sha256(pem.encode()).hexdigest()
+            samples = []
+            for i in range(iterations):
+                document_hash = hashlib.sha256(f"document-{i}".encode()).hexdigest()
+                samples.append((document_hash, sign(private_key, algorithm, document_hash)))
+
+            engine = SignatureEngine()
+
+            def cold():
+                # Comportement d'origine : analyse du PEM à chaque vérification
+                for document_hash, signature in samples:
+                    assert SignatureService.verify(pem, algorithm, signature, document_hash)
+
+            def cached_key():
+                # Clé analysée en cache, documents tous différents (aucun résultat mémorisé)
+                for document_hash, signature in samples:
+                    assert engine.verify(fingerprint, pem, algorithm, signature, document_hash)
+
+            def memoized():
+                # Vérifications répétées des mêmes documents
+                for document_hash, signature in samples:
+                    assert engine.verify(fingerprint, pem, algorithm, signature, document_hash)
+
+            row = {'algorithm': algorithm, 'iterations': iterations}
+            for label, run in (('cold', cold), ('cached_key', cached_key), ('memoized', memoized)):
+                started = time.perf_counter()
+                run()
+                row[f'{label}_per_sec'] = round(iterations / (time.perf_counter() - started))
+            results.append(row)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'algorithme':<12} {'froid/s':>10} {'clé cache/s':>12} {'mémorisé/s':>12}")
+        for r in results:
+            self.stdout.write(
+                f"{r['algorithm']:<12} {r['cold_per_sec']:>10} {r['cached_key_per_sec']:>12} {r['memoized_per_sec']:>12}"
+            )
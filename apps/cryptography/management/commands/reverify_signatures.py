@@ -0,0 +1,44 @@
+# apps/cryptography/management/commands/reverify_signatures.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cryptography.reverification import MODES, signature_reverification
+
+
+class Command(BaseCommand):
+    help = "Re-vérifie en parallèle les signatures des documents d'une clé, d'une institution ou de tous"
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument('--key', help="UUID de la clé (rotation, compromission)")
+        scope.add_argument('--institution', help="UUID de l'institution (audit)")
+        scope.add_argument('--all', action='store_true', help="Tous les documents")
+        parser.add_argument('--mode', choices=MODES, default=None, help="Défaut : SIGNATURE_REVERIFICATION['MODE']")
+        parser.add_argument('--workers', type=int, default=None, help="Défaut : nombre de cœurs")
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--json', action='store_true', help="Affiche le rapport complet en JSON")
+
+    def handle(self, *args, **options):
+        try:
+            report = signature_reverification.run(
+                key_id=options['key'],
+                institution_id=options['institution'],
+                mode=options['mode'],
+                workers=options['workers'],
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
+            return
+        self.stdout.write(
+            f"{report['total']} signatures vérifiées en {report['seconds']}s "
+            f"({report['per_second']}/s, {report['mode']} x{report['workers']})"
+        )
+        self.stdout.write(f"Valides: {report['valid']}  Invalides: {report['invalid']}")
+        self.stdout.write(f"Rapport: {report['report_path']}")
+        if report['invalid']:
+            self.stdout.write(self.style.WARNING(f"{report['invalid']} signatures invalides"))
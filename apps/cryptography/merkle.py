@@ -0,0 +1,136 @@
+# apps/cryptography/merkle.py
+"""
+Arbres de Merkle des lots de documents (une signature par lot).
+
+Construction de la RFC 6962 (Certificate Transparency) : feuille =
+SHA-256(0x00 || hash du document), nœud = SHA-256(0x01 || gauche || droite),
+un nœud sans voisin en fin de niveau remonte tel quel. Les préfixes
+distinguent feuilles et nœuds internes (pas de seconde préimage).
+
+La racine (hexadécimal, minuscules) est signée par l'institution exactement
+comme un hash de document (SignatureService).
+"""
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+NODE_SIZE = 32
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+LEFT = 'left'
+RIGHT = 'right'
+
+# Étape d'une preuve d'inclusion : (côté du voisin, hash du voisin en hexadécimal)
+ProofStep = Tuple[str, str]
+
+
+def leaf_hash(document_hash: str) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(document_hash)).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def level_sizes(leaf_count: int) -> List[int]:
+    """Nombre de nœuds de chaque niveau, des feuilles à la racine."""
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+class MerkleTree:
+    """
+    Arbre complet, stocké niveau par niveau : chaque niveau est une suite de
+    nœuds de 32 octets (2N nœuds au plus pour N feuilles). Une preuve
+    d'inclusion se lit par simple découpage, en O(log N).
+    """
+
+    def __init__(self, levels: List[bytes]):
+        self.levels = levels
+
+    @classmethod
+    def build(cls, document_hashes: Iterable[str]) -> 'MerkleTree':
+        """
+        Raises:
+            ValueError: lot vide ou hash non hexadécimal
+        """
+        nodes = [leaf_hash(document_hash) for document_hash in document_hashes]
+        if not nodes:
+            raise ValueError("Un arbre de Merkle a au moins une feuille.")
+        levels = [b''.join(nodes)]
+        while len(nodes) > 1:
+            parents = [node_hash(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+            if len(nodes) % 2:
+                parents.append(nodes[-1])
+            nodes = parents
+            levels.append(b''.join(nodes))
+        return cls(levels)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, leaf_count: int) -> 'MerkleTree':
+        """
+        Raises:
+            ValueError: taille incohérente avec le nombre de feuilles
+        """
+        levels = []
+        offset = 0
+        for size in level_sizes(leaf_count):
+            levels.append(bytes(data[offset:offset + size * NODE_SIZE]))
+            offset += size * NODE_SIZE
+        if offset != len(data):
+            raise ValueError(f"Arbre de Merkle de {len(data)} octets incohérent avec {leaf_count} feuilles")
+        return cls(levels)
+
+    def to_bytes(self) -> bytes:
+        return b''.join(self.levels)
+
+    @property
+    def leaf_count(self) -> int:
+        return len(self.levels[0]) // NODE_SIZE
+
+    @property
+    def root(self) -> str:
+        return self.levels[-1].hex()
+
+    def node(self, level: int, index: int) -> bytes:
+        return self.levels[level][index * NODE_SIZE:(index + 1) * NODE_SIZE]
+
+    def proof(self, index: int) -> List[ProofStep]:
+        """
+        Preuve d'inclusion de la feuille index : voisins de la feuille à la racine.
+
+        Raises:
+            IndexError: feuille hors de l'arbre
+        """
+        if not 0 <= index < self.leaf_count:
+            raise IndexError(f"Feuille {index} hors d'un arbre de {self.leaf_count} feuilles")
+        steps = []
+        for level in range(len(self.levels) - 1):
+            size = len(self.levels[level]) // NODE_SIZE
+            if index % 2:
+                steps.append((LEFT, self.node(level, index - 1).hex()))
+            elif index + 1 < size:
+                steps.append((RIGHT, self.node(level, index + 1).hex()))
+            index //= 2
+        return steps
+
+
+def root_from_proof(document_hash: str, proof: Iterable[ProofStep]) -> Optional[str]:
+    """Racine obtenue à partir d'une feuille et de sa preuve (None si la preuve est mal formée)."""
+    try:
+        node = leaf_hash(document_hash)
+        for side, sibling in proof:
+            sibling = bytes.fromhex(sibling)
+            if len(sibling) != NODE_SIZE or side not in (LEFT, RIGHT):
+                return None
+            node = node_hash(sibling, node) if side == LEFT else node_hash(node, sibling)
+    except (ValueError, TypeError):
+        return None
+    return node.hex()
+
+
+def verify_proof(document_hash: str, proof: Iterable[ProofStep], root: str) -> bool:
+    """Vrai si la preuve rattache le hash du document à la racine (log2(N) hachages)."""
+    return root_from_proof(document_hash, proof) == root.lower()
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cryptography', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cryptographickey',
+            index=models.Index(fields=['status', 'expires_at'], name='cryptograph_status_5b25f3_idx'),
+        ),
+    ]
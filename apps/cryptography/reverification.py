@@ -0,0 +1,221 @@
+# apps/cryptography/reverification.py
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.documents.models import DocumentBatch, SignedDocument
+
+from .models import CryptographicKey
+from .services import SignatureService
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'MODE': 'process',
+    'WORKERS': None,  # None = nombre de cœurs
+    'CHUNK_SIZE': 1000,
+    'MAX_REPORTED_FAILURES': 1000,
+    'REPORT_DIR': 'var/reports/reverification',
+}
+
+MODES = ('process', 'thread', 'serial')
+
+# Clés analysées du worker courant : {key_id: (algorithm, clé publique)}
+_worker_keys: Dict[str, Tuple[str, Any]] = {}
+
+
+def _parse_keys(keys: Dict[str, Tuple[str, str]]) -> Dict[str, Tuple[str, Any]]:
+    parsed = {}
+    for key_id, (algorithm, public_key_pem) in keys.items():
+        try:
+            parsed[key_id] = (algorithm, SignatureService.load_public_key(public_key_pem))
+        except (ValueError, TypeError) as e:
+            logger.error(f"Clé publique {key_id} illisible: {e}")
+            parsed[key_id] = (algorithm, None)
+    return parsed
+
+
+def _init_worker(keys: Dict[str, Tuple[str, str]]) -> None:
+    """Initialisation d'un processus du pool : chaque clé est analysée une seule fois."""
+    global _worker_keys
+    _worker_keys = _parse_keys(keys)
+
+
+def _verify_chunk(rows: List[Tuple[str, str, str, str]]) -> Tuple[int, List[Tuple[str, str, str]]]:
+    """
+    Vérifie une tranche de documents (id, hash, signature, key_id).
+    Fonction de module : exécutée telle quelle par les processus du pool.
+
+    Returns:
+        tuple (nombre de signatures valides, [(id, hash, motif)] des échecs)
+    """
+    valid = 0
+    failures = []
+    for document_id, document_hash, signature, key_id in rows:
+        algorithm, public_key = _worker_keys.get(key_id, (None, None))
+        if public_key is None:
+            failures.append((document_id, document_hash, 'KEY_UNREADABLE'))
+        elif SignatureService.verify_with_public_key(public_key, algorithm, signature, document_hash):
+            valid += 1
+        else:
+            failures.append((document_id, document_hash, 'INVALID_SIGNATURE'))
+    return valid, failures
+
+
+class SignatureReverification:
+    """
+    Re-vérification en masse des signatures (rotation de clé, audit d'institution).
+
+    Les documents sont lus par tranches (curseur côté serveur sous PostgreSQL)
+    et répartis sur un pool de processus : chaque processus analyse les clés
+    une fois à son démarrage, puis ne fait que du calcul, sans accès à la base.
+    Le mode 'thread' convient aussi : cryptography libère le GIL pendant les
+    vérifications. Le nombre de tranches en vol est borné : la mémoire reste
+    constante quelle que soit la taille de la sélection.
+
+    Un lot signé par sa racine de Merkle compte pour une signature (id du lot,
+    racine) : ses documents n'ont pas de signature propre.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    def run(
+        self,
+        key_id=None,
+        institution_id=None,
+        mode: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        write_report: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Re-vérifie les signatures des documents d'une clé, d'une institution, ou de tous.
+
+        Returns:
+            dict du rapport (compteurs, débit, échecs)
+        """
+        mode = mode or self.config['MODE']
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu: {mode} (choix: {', '.join(MODES)})")
+        if mode == 'process' and multiprocessing.current_process().daemon:
+            # Worker Huey en processus (démon) : il ne peut pas lancer de processus enfants
+            logger.info("Re-vérification dans un processus démon : threads au lieu de processus")
+            mode = 'thread'
+        workers = workers or self.config['WORKERS'] or os.cpu_count() or 1
+        chunk_size = chunk_size or self.config['CHUNK_SIZE']
+
+        documents = SignedDocument.objects.order_by().filter(batch__isnull=True)
+        batches = DocumentBatch.objects.order_by()
+        keys = CryptographicKey.objects.all()
+        if key_id is not None:
+            documents = documents.filter(key_id=key_id)
+            batches = batches.filter(key_id=key_id)
+            keys = keys.filter(pk=key_id)
+        if institution_id is not None:
+            documents = documents.filter(institution_id=institution_id)
+            batches = batches.filter(institution_id=institution_id)
+            keys = keys.filter(institution_id=institution_id)
+        key_material = {str(pk): (algorithm, pem) for pk, algorithm, pem in keys.values_list(
+            'pk', 'algorithm', 'public_key'
+        )}
+
+        started_at = timezone.now()
+        started = time.perf_counter()
+        report = {
+            'key_id': str(key_id) if key_id else None,
+            'institution_id': str(institution_id) if institution_id else None,
+            'mode': mode,
+            'workers': workers if mode != 'serial' else 1,
+            'chunk_size': chunk_size,
+            'started_at': started_at.isoformat(),
+            'total': 0,
+            'valid': 0,
+            'invalid': 0,
+            'failures': [],
+        }
+        rows = itertools.chain(
+            documents.values_list('id', 'document_hash', 'signature', 'key_id').iterator(chunk_size=chunk_size),
+            batches.values_list('id', 'merkle_root', 'signature', 'key_id').iterator(chunk_size=chunk_size),
+        )
+        chunks = self._chunks(rows, chunk_size)
+        for valid, failures in self._execute(mode, workers, key_material, chunks):
+            self._accumulate(report, valid, failures)
+
+        seconds = time.perf_counter() - started
+        report['seconds'] = round(seconds, 3)
+        report['per_second'] = round(report['total'] / seconds) if seconds else None
+        report['finished_at'] = timezone.now().isoformat()
+        if write_report:
+            report['report_path'] = str(self._write_report(report))
+        logger.info(
+            f"Re-vérification ({mode}, {report['workers']} workers): {report['total']} signatures, "
+            f"{report['invalid']} invalides, {report['per_second']}/s"
+        )
+        return report
+
+    @staticmethod
+    def _chunks(rows, chunk_size: int) -> Iterator[List[Tuple[str, str, str, str]]]:
+        chunk = []
+        for document_id, document_hash, signature, key_id in rows:
+            chunk.append((str(document_id), document_hash, signature, str(key_id)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _execute(mode: str, workers: int, key_material, chunks):
+        if mode == 'serial':
+            _init_worker(key_material)
+            for chunk in chunks:
+                yield _verify_chunk(chunk)
+            return
+
+        if mode == 'process':
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(key_material,))
+        else:
+            _init_worker(key_material)
+            executor = ThreadPoolExecutor(max_workers=workers)
+        with executor:
+            # Au plus deux tranches en vol par worker : lecture en base et calcul se recouvrent
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(_verify_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in pending:
+                yield future.result()
+
+    def _accumulate(self, report: Dict[str, Any], valid: int, failures) -> None:
+        report['total'] += valid + len(failures)
+        report['valid'] += valid
+        report['invalid'] += len(failures)
+        room = self.config['MAX_REPORTED_FAILURES'] - len(report['failures'])
+        report['failures'].extend(
+            {'document_id': document_id, 'document_hash': document_hash, 'reason': reason}
+            for document_id, document_hash, reason in failures[:max(room, 0)]
+        )
+
+    def _write_report(self, report: Dict[str, Any]) -> Path:
+        report_dir = Path(self.config['REPORT_DIR'])
+        report_dir.mkdir(parents=True, exist_ok=True)
+        scope = report['key_id'] or report['institution_id'] or 'all'
+        path = report_dir / f"reverification-{scope}-{timezone.now():%Y%m%d-%H%M%S}.json"
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        return path
+
+
+signature_reverification = SignatureReverification(getattr(settings, 'SIGNATURE_REVERIFICATION', None))
@@ -0,0 +1,87 @@
+# apps/cryptography/services.py
+import base64
+import binascii
+import logging
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, padding
+
+from .models import CryptographicKey
+
+logger = logging.getLogger('app')
+
+RSA_ALGORITHMS = {CryptographicKey.Algorithm.RSA_2048, CryptographicKey.Algorithm.RSA_4096}
+ECDSA_ALGORITHMS = {CryptographicKey.Algorithm.ECDSA_P256, CryptographicKey.Algorithm.ECDSA_P384}
+
+
+class SignatureService:
+    """
+    Vérification des signatures numériques émises par les institutions.
+    - RSA: RSA-PSS avec MGF1-SHA256
+    - ECDSA: ECDSA-SHA384
+    Le message signé est le hash SHA-256 (hexadécimal) du document.
+    """
+
+    @staticmethod
+    def load_public_key(public_key_pem: str):
+        """
+        Analyse une clé publique PEM (opération coûteuse, à mettre en cache : voir engine.py).
+
+        Raises:
+            ValueError: PEM illisible
+        """
+        return serialization.load_pem_public_key(public_key_pem.encode())
+
+    @staticmethod
+    def verify(public_key_pem: str, algorithm: str, signature_b64: str, document_hash: str) -> bool:
+        """
+        Vérifie une signature contre la clé publique PEM fournie.
+
+        Args:
+            public_key_pem: Clé publique au format PEM
+            algorithm: Algorithme de la clé (CryptographicKey.Algorithm)
+            signature_b64: Signature encodée en base64
+            document_hash: Hash SHA-256 du document (message signé)
+
+        Returns:
+            bool: True si la signature est valide, False sinon
+        """
+        try:
+            public_key = SignatureService.load_public_key(public_key_pem)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Clé publique illisible pour le hash {document_hash[:16]}: {e}")
+            return False
+        return SignatureService.verify_with_public_key(public_key, algorithm, signature_b64, document_hash)
+
+    @staticmethod
+    def verify_with_public_key(public_key, algorithm: str, signature_b64: str, document_hash: str) -> bool:
+        """
+        Vérifie une signature contre une clé publique déjà analysée.
+        Mêmes arguments que verify, la clé étant un objet cryptography.
+        """
+        try:
+            signature = base64.b64decode(signature_b64, validate=True)
+        except (ValueError, TypeError, binascii.Error) as e:
+            logger.warning(f"Signature illisible pour le hash {document_hash[:16]}: {e}")
+            return False
+
+        try:
+            if algorithm in RSA_ALGORITHMS:
+                public_key.verify(
+                    signature,
+                    document_hash.encode(),
+                    padding.PSS(
+                        mgf=padding.MGF1(hashes.SHA256()),
+                        salt_length=padding.PSS.MAX_LENGTH
+                    ),
+                    hashes.SHA256()
+                )
+            elif algorithm in ECDSA_ALGORITHMS:
+                public_key.verify(signature, document_hash.encode(), ec.ECDSA(hashes.SHA384()))
+            else:
+                logger.warning(f"Algorithme de signature non supporté: {algorithm}")
+                return False
+        except (InvalidSignature, TypeError, AttributeError):
+            return False
+        return True
@@ -0,0 +1,14 @@
+# apps/cryptography/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .engine import signature_engine
+from .models import CryptographicKey
+
+
+@receiver(post_save, sender=CryptographicKey)
+@receiver(post_delete, sender=CryptographicKey)
+def invalidate_parsed_key(sender, instance: CryptographicKey, created: bool = False, **kwargs):
+    """Une clé révoquée, remplacée ou supprimée ne doit plus être servie par le moteur de vérification."""
+    if not created:
+        signature_engine.invalidate(instance.fingerprint)
@@ -0,0 +1,37 @@
+# apps/cryptography/tasks.py
+import logging
+
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task, db_task
+
+from apps.core.queues import PRIORITY_BULK, PRIORITY_DEFAULT
+
+from .lifecycle import key_lifecycle
+from .reverification import signature_reverification
+
+logger = logging.getLogger('app')
+
+
+# ==========================================
+# TÂCHES HUEY (BACKGROUND TASKS)
+# ==========================================
+
+@db_task(priority=PRIORITY_BULK)
+def reverify_signatures_task(key_id=None, institution_id=None):
+    """
+    Re-vérifie les signatures d'une clé ou d'une institution (rotation, audit).
+    Retourne le rapport (sans la liste détaillée des échecs, conservée dans le fichier de rapport).
+    """
+    report = signature_reverification.run(key_id=key_id, institution_id=institution_id)
+    if report['invalid']:
+        logger.warning(f"Re-vérification: {report['invalid']} signatures invalides, voir {report['report_path']}")
+    return {k: v for k, v in report.items() if k != 'failures'}
+
+
+@db_periodic_task(crontab(minute='*/15'), priority=PRIORITY_DEFAULT)
+def update_key_statuses():
+    """
+    Fait passer les clés à EXPIRING_SOON ou EXPIRED selon leur échéance et prévient
+    les administrateurs des institutions concernées (un email par administrateur).
+    """
+    return key_lifecycle.run()
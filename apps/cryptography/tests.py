@@ -1,3 +1,299 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+import multiprocessing
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.core.services.email_service import EmailService
+from apps.documents.models import SignedDocument
+from apps.institutions.models import Institution, InstitutionUser
+
+from .engine import SignatureEngine, signature_engine
+from .lifecycle import KeyLifecycle
+from .merkle import MerkleTree, leaf_hash, node_hash, verify_proof
+from .models import CryptographicKey
+from .reverification import MODES, SignatureReverification, signature_reverification
+from .services import SignatureService
+from .tasks import reverify_signatures_task
+
+
+def make_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def public_pem(private_key) -> str:
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+
+class CryptographyTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.private_key = ec.generate_private_key(ec.SECP384R1())
+        cls.pem = public_pem(cls.private_key)
+        cls.institution = Institution.objects.create(
+            name="Université de Test", legal_name="Université de Test", slug="univ-test",
+            type=Institution.Type.UNIVERSITY, email="contact@univ-test.cm",
+            address_line1="BP 1", city="Maroua", postal_code="000", country_code="CM",
+            status=Institution.Status.ACTIVE,
+        )
+        cls.key = CryptographicKey.objects.create(
+            institution=cls.institution, public_key=cls.pem, fingerprint=make_hash(cls.pem.encode()),
+            algorithm=CryptographicKey.Algorithm.ECDSA_P384, key_size=384,
+            expires_at=timezone.now() + timedelta(days=365),
+        )
+        cls.document_hash = make_hash(b"diplome")
+        cls.signature = cls.sign(cls.document_hash)
+
+    @classmethod
+    def sign(cls, document_hash: str, private_key=None) -> str:
+        signature = (private_key or cls.private_key).sign(document_hash.encode(), ec.ECDSA(hashes.SHA384()))
+        return base64.b64encode(signature).decode()
+
+
+class SignatureEngineTestCase(CryptographyTestCase):
+
+    def setUp(self):
+        self.engine = SignatureEngine()
+
+    def test_public_key_is_parsed_once(self):
+        with mock.patch.object(SignatureService, 'load_public_key', wraps=SignatureService.load_public_key) as load:
+            for content in (b"a", b"b", b"c"):
+                document_hash = make_hash(content)
+                self.assertTrue(self.engine.verify_with_key(self.key, self.sign(document_hash), document_hash))
+        load.assert_called_once()
+
+    def test_outcomes_are_memoized(self):
+        self.assertTrue(self.engine.verify_with_key(self.key, self.signature, self.document_hash))
+        self.assertFalse(self.engine.verify_with_key(self.key, self.signature, make_hash(b"falsifie")))
+        with mock.patch.object(SignatureService, 'verify_with_public_key') as verify:
+            self.assertTrue(self.engine.verify_with_key(self.key, self.signature, self.document_hash))
+            self.assertFalse(self.engine.verify_with_key(self.key, self.signature, make_hash(b"falsifie")))
+        verify.assert_not_called()
+
+    def test_changed_public_key_is_reparsed(self):
+        """Même empreinte, autre contenu (autre processus) : ni clé ni résultat périmés"""
+        self.assertTrue(self.engine.verify_with_key(self.key, self.signature, self.document_hash))
+        other = ec.generate_private_key(ec.SECP384R1())
+        self.assertFalse(self.engine.verify(
+            self.key.fingerprint, public_pem(other), self.key.algorithm, self.signature, self.document_hash
+        ))
+
+    def test_revocation_invalidates_cached_key(self):
+        signature_engine.verify_with_key(self.key, self.signature, self.document_hash)
+        self.assertIn(self.key.fingerprint, signature_engine.keys)
+        self.key.status = CryptographicKey.Status.REVOKED
+        self.key.save()
+        self.assertNotIn(self.key.fingerprint, signature_engine.keys)
+        with mock.patch.object(SignatureService, 'verify_with_public_key', return_value=True) as verify:
+            signature_engine.verify_with_key(self.key, self.signature, self.document_hash)
+        verify.assert_called_once()
+
+    def test_unreadable_public_key_is_rejected(self):
+        self.assertFalse(self.engine.verify(
+            'inconnue', 'pas une clé', CryptographicKey.Algorithm.RSA_4096, self.signature, self.document_hash
+        ))
+
+
+class SignatureReverificationTestCase(CryptographyTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.documents = []
+        for i in range(25):
+            document_hash = make_hash(f"document-{i}".encode())
+            # Le document 7 porte la signature d'un autre document
+            signature = cls.sign(make_hash(b"autre") if i == 7 else document_hash)
+            cls.documents.append(SignedDocument.objects.create(
+                institution=cls.institution, key=cls.key, document_hash=document_hash,
+                signature=signature, file_type=SignedDocument.FileType.PDF,
+            ))
+
+    def setUp(self):
+        self.report_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.report_dir.cleanup)
+        self.reverification = SignatureReverification({'REPORT_DIR': self.report_dir.name})
+
+    def test_every_mode_finds_the_tampered_document(self):
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                report = self.reverification.run(key_id=self.key.pk, mode=mode, workers=2, chunk_size=4)
+                self.assertEqual((report['total'], report['valid'], report['invalid']), (25, 24, 1))
+                self.assertEqual(report['failures'][0]['document_id'], str(self.documents[7].pk))
+                with open(report['report_path']) as f:
+                    self.assertEqual(json.load(f)['invalid'], 1)
+
+    def test_task_runs_inside_daemon_worker_process(self):
+        # Worker Huey de type process : processus démon, sans processus enfants possibles
+        def worker(results):
+            with mock.patch.dict(signature_reverification.config, {'REPORT_DIR': self.report_dir.name}):
+                report = reverify_signatures_task.call_local(key_id=self.key.pk)
+            results.put((report['mode'], report['invalid']))
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        process = context.Process(target=worker, args=(results,), daemon=True)
+        process.start()
+        process.join(60)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(results.get(timeout=5), ('thread', 1))
+
+    def test_documents_are_streamed_in_chunks(self):
+        with self.assertNumQueries(3):  # clés + documents + lots
+            report = self.reverification.run(
+                institution_id=self.institution.pk, mode='serial', chunk_size=10, write_report=False
+            )
+        self.assertEqual(report['total'], 25)
+
+
+class KeyLifecycleTestCase(CryptographyTestCase):
+
+    def make_institutions(self, count: int, keys_per_institution: int = 2, admin: bool = True):
+        institutions = Institution.objects.bulk_create([
+            Institution(
+                name=f"Institution {i}", legal_name=f"Institution {i}", slug=f"inst-{count}-{i}",
+                type=Institution.Type.UNIVERSITY, email=f"contact{i}@inst.cm", address_line1="BP 1",
+                city="Maroua", postal_code="000", country_code="CM", status=Institution.Status.ACTIVE,
+            )
+            for i in range(count)
+        ])
+        now = timezone.now()
+        CryptographicKey.objects.bulk_create([
+            CryptographicKey(
+                institution=institution, public_key="-", fingerprint=make_hash(f"{institution.slug}-{k}".encode()),
+                algorithm=CryptographicKey.Algorithm.ECDSA_P384, key_size=384,
+                # Une clé expirée, une qui expire dans la fenêtre d'avertissement
+                expires_at=now + (timedelta(days=-1) if k == 0 else timedelta(days=10)),
+            )
+            for institution in institutions for k in range(keys_per_institution)
+        ])
+        if admin:
+            users = get_user_model().objects.bulk_create([
+                get_user_model()(username=f"admin-{institution.slug}", email=f"admin@{institution.slug}.cm")
+                for institution in institutions
+            ])
+            InstitutionUser.objects.bulk_create([
+                InstitutionUser(institution=institution, user=user, role=InstitutionUser.Role.ADMIN)
+                for institution, user in zip(institutions, users)
+            ])
+        return institutions
+
+    def test_transitions_and_one_email_per_institution_admin(self):
+        institutions = self.make_institutions(3)
+        renewed = CryptographicKey.objects.create(
+            institution=self.institution, public_key="-", fingerprint=make_hash(b"renouvelee"),
+            algorithm=CryptographicKey.Algorithm.ECDSA_P384, key_size=384,
+            status=CryptographicKey.Status.EXPIRING_SOON, expires_at=timezone.now() + timedelta(days=400),
+        )
+        revoked = CryptographicKey.objects.filter(institution=institutions[0], expires_at__lt=timezone.now()).get()
+        revoked.status = CryptographicKey.Status.REVOKED
+        revoked.save()
+
+        # Envoi synchrone : le corps HTML réellement rendu est vérifié
+        with mock.patch('apps.cryptography.lifecycle.EmailService.send_bulk',
+                        side_effect=EmailService.send_bulk_sync) as send_bulk:
+            report = KeyLifecycle().run()
+
+        self.assertEqual((report['expired'], report['expiring_soon'], report['renewed']), (2, 3, 1))
+        statuses = dict(CryptographicKey.objects.values_list('fingerprint', 'status'))
+        self.assertEqual(statuses[revoked.fingerprint], CryptographicKey.Status.REVOKED)
+        self.assertEqual(statuses[renewed.fingerprint], CryptographicKey.Status.ACTIVE)
+        self.assertEqual(statuses[self.key.fingerprint], CryptographicKey.Status.ACTIVE)
+        self.assertEqual(statuses[make_hash(b"inst-3-1-1")], CryptographicKey.Status.EXPIRING_SOON)
+        self.assertEqual(statuses[make_hash(b"inst-3-1-0")], CryptographicKey.Status.EXPIRED)
+
+        self.assertEqual(send_bulk.call_count, 3)  # un envoi par institution
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f"admin@inst-3-{i}.cm" for i in range(3)])
+        html = next(m for m in mail.outbox if m.to == ["admin@inst-3-1.cm"]).alternatives[0][0]
+        self.assertIn(f"<li><code>{make_hash(b'inst-3-1-1')[:16]}</code>", html)
+        self.assertIn("<strong>Institution 1</strong>", html)
+        self.assertNotIn("&lt;", html)
+
+        with mock.patch('apps.cryptography.lifecycle.EmailService.send_bulk') as send_bulk:
+            self.assertEqual(KeyLifecycle().run()['expiring_soon'], 0)
+        send_bulk.assert_not_called()
+
+    def test_keys_revoked_during_the_pass_are_not_reported(self):
+        self.make_institutions(1)
+        expired = CryptographicKey.objects.get(fingerprint=make_hash(b"inst-1-0-0"))
+        update_status = KeyLifecycle._update_status
+
+        def revoke_first(ids, previous, status):
+            # Révocation concurrente entre la lecture de la fenêtre et l'UPDATE
+            if status == CryptographicKey.Status.EXPIRED:
+                CryptographicKey.objects.filter(pk=expired.pk).update(status=CryptographicKey.Status.REVOKED)
+            return update_status(ids, previous, status)
+
+        with mock.patch.object(KeyLifecycle, '_update_status', side_effect=revoke_first), \
+                mock.patch('apps.cryptography.lifecycle.EmailService.send_bulk') as send_bulk:
+            report = KeyLifecycle().run()
+
+        self.assertEqual((report['expired'], report['expiring_soon']), (0, 1))
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, CryptographicKey.Status.REVOKED)
+        message = send_bulk.call_args.kwargs['context']['notification_message']
+        self.assertNotIn(expired.fingerprint[:16], message)
+
+    def test_pass_cost_does_not_depend_on_key_count(self):
+        self.make_institutions(5, admin=False)
+        with mock.patch('apps.cryptography.lifecycle.EmailService.send_bulk') as send_bulk:
+            # 3 fenêtres, 2 UPDATE (aucune clé renouvelée) et 2 requêtes de destinataires, quel que soit le volume
+            with self.assertNumQueries(7):
+                KeyLifecycle({'CHUNK_SIZE': 1000}).run()
+        self.assertEqual(  # adresse de l'institution
+            sorted(call.kwargs['recipients'][0]['email'] for call in send_bulk.call_args_list),
+            [f"contact{i}@inst.cm" for i in range(5)],
+        )
+
+        self.make_institutions(200, admin=False)
+        with mock.patch('apps.cryptography.lifecycle.EmailService.send_bulk'):
+            with self.assertNumQueries(7):
+                KeyLifecycle({'CHUNK_SIZE': 1000}).run()
+
+
+def rfc6962_root(leaves):
+    """Définition récursive de la RFC 6962 (MTH), pour comparaison."""
+    if len(leaves) == 1:
+        return leaf_hash(leaves[0])
+    split = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return node_hash(rfc6962_root(leaves[:split]), rfc6962_root(leaves[split:]))
+
+
+class MerkleTreeTestCase(SimpleTestCase):
+
+    def test_every_leaf_proof_reaches_the_rfc6962_root(self):
+        for size in list(range(1, 10)) + [33]:
+            leaves = [hashlib.sha256(f"{size}-{i}".encode()).hexdigest() for i in range(size)]
+            tree = MerkleTree.build(leaves)
+            with self.subTest(size=size):
+                self.assertEqual(tree.root, rfc6962_root(leaves).hex())
+                for index, leaf in enumerate(leaves):
+                    proof = tree.proof(index)
+                    self.assertLessEqual(len(proof), (size - 1).bit_length())
+                    self.assertTrue(verify_proof(leaf, proof, tree.root))
+                restored = MerkleTree.from_bytes(tree.to_bytes(), size)
+                self.assertEqual(restored.proof(size - 1), tree.proof(size - 1))
+
+    def test_tampered_proofs_are_rejected(self):
+        leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(5)]
+        tree = MerkleTree.build(leaves)
+        proof = tree.proof(2)
+        self.assertFalse(verify_proof(leaves[3], proof, tree.root))
+        self.assertFalse(verify_proof(leaves[2], proof[:-1], tree.root))
+        self.assertFalse(verify_proof(leaves[2], [('left', 'zz')] + proof, tree.root))
+        # Un nœud interne n'est pas une feuille (préfixes de la RFC 6962)
+        self.assertFalse(verify_proof(tree.node(1, 0).hex(), tree.proof(0)[1:], tree.root))
+        with self.assertRaises(ValueError):
+            MerkleTree.from_bytes(tree.to_bytes()[:-1], 5)
@@ -0,0 +1,261 @@
+# apps/documents/api.py
+import json
+from typing import Optional
+from uuid import UUID
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from ninja import File, Path, Query, Router
+from ninja.decorators import decorate_view
+from ninja.errors import AuthorizationError, HttpError
+from ninja.files import UploadedFile
+from ninja.security import django_auth
+
+from apps.core.api.exceptions import PayloadTooLargeException
+from apps.core.models import AuditLog
+from apps.core.utils import get_client_ip
+from apps.cryptography.models import CryptographicKey
+from apps.institutions.models import Institution, InstitutionUser
+from apps.verifications.schemas import SHA256_PATTERN
+
+from .batches import document_batches
+from .hash_filter import document_filter
+from .ingest import document_ingest, ndjson_lines
+from .models import SignedDocument
+from .rendering import KINDS, render_cache
+from .revocation import FORMAT_VERSION, RevocationSnapshot, revocation_index
+from .schemas import (
+    DocumentBatchResultSchema, DocumentBatchSchema, DocumentDigestSchema, HashFilterStatsSchema, RevocationIndexSchema
+)
+from .steganography import document_steganography
+from .upload import stream_hashed_uploads
+
+router = Router(tags=["Documents"])
+
+
+@router.get("/filter/stats", response=HashFilterStatsSchema, auth=django_auth)
+def hash_filter_stats(request: HttpRequest):
+    """
+    Métriques du filtre de Bloom de ce worker : taille, taux de faux positifs estimé,
+    durée de la dernière construction et nombre de hashes rejetés.
+    """
+    if not request.user.is_staff:
+        raise AuthorizationError()
+    return document_filter.stats()
+
+
+@router.post("/hash", response=DocumentDigestSchema, auth=django_auth)
+@decorate_view(stream_hashed_uploads(reject_registered=True))
+def hash_document(request: HttpRequest, file: UploadedFile = File(...)):
+    """
+    Calcule les empreintes d'un document avant son enregistrement (DOCUMENT_UPLOAD['ALGORITHMS']),
+    en une passe pendant la réception, sans conserver le fichier.
+    Refuse un document déjà enregistré (409) : avant l'envoi du corps si son hash
+    est annoncé dans l'en-tête X-Document-Hash, sinon à la fin du fichier.
+    """
+    return {
+        'file_name': file.name,
+        'content_type': file.content_type,
+        'size': file.size,
+        'digests': file.digests,
+    }
+
+
+@router.post("/bulk", auth=django_auth)
+def bulk_register_documents(request: HttpRequest, institution_id: UUID):
+    """
+    Enregistrement en masse des documents signés d'une institution.
+
+    Corps : NDJSON (une ligne BulkDocumentRecordSchema par document), éventuellement
+    compressé en gzip (Content-Encoding: gzip, ou détecté par son en-tête). Le corps
+    est lu et traité par tranches pendant l'envoi de la réponse.
+    Réponse : flux NDJSON d'un résultat par document (CREATED, DUPLICATE,
+    INVALID_RECORD, UNKNOWN_KEY, INVALID_SIGNATURE), puis une ligne
+    {"summary": ...} avec les compteurs et le débit d'enregistrement.
+    Réservé aux administrateurs et signataires de l'institution.
+    """
+    institution = get_object_or_404(Institution, pk=institution_id, status=Institution.Status.ACTIVE)
+    if not request.user.is_staff and not InstitutionUser.objects.filter(
+        institution=institution, user=request.user, is_active=True,
+        role__in=[InstitutionUser.Role.ADMIN, InstitutionUser.Role.SIGNER],
+    ).exists():
+        raise AuthorizationError()
+
+    gzipped = True if request.headers.get('Content-Encoding', '').lower() == 'gzip' else None
+    lines = ndjson_lines(request, gzipped, document_ingest.config['MAX_LINE_BYTES'])
+    user, ip_address = request.user, get_client_ip(request)
+
+    def results():
+        summary = {}
+        for result in document_ingest.run(institution, lines, summary=summary):
+            yield json.dumps(result) + "\n"
+        AuditLog.objects.create(
+            user=user, action_type=AuditLog.ActionType.SIGN, resource_type=AuditLog.ResourceType.INSTITUTION,
+            resource_id=institution.pk, ip_address=ip_address, user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            details={'bulk': True, **summary},
+        )
+        yield json.dumps({'summary': summary}, cls=DjangoJSONEncoder) + "\n"
+
+    return StreamingHttpResponse(results(), content_type="application/x-ndjson")
+
+
+@router.post("/batches", response={201: DocumentBatchResultSchema}, auth=django_auth)
+def register_document_batch(request: HttpRequest, institution_id: UUID, payload: DocumentBatchSchema):
+    """
+    Enregistre un lot de documents signé une seule fois : la signature porte sur la
+    racine de l'arbre de Merkle de leurs hashes (RFC 6962, feuilles dans l'ordre de
+    documents ; voir apps.cryptography.merkle). Chaque vérification d'un de ces
+    documents renvoie sa preuve d'inclusion.
+    Le lot est enregistré en entier ou pas du tout (409 si un hash est déjà enregistré).
+    Réservé aux administrateurs et signataires de l'institution.
+    """
+    institution = get_object_or_404(Institution, pk=institution_id, status=Institution.Status.ACTIVE)
+    if not request.user.is_staff and not InstitutionUser.objects.filter(
+        institution=institution, user=request.user, is_active=True,
+        role__in=[InstitutionUser.Role.ADMIN, InstitutionUser.Role.SIGNER],
+    ).exists():
+        raise AuthorizationError()
+
+    if payload.key_id is not None:
+        key = CryptographicKey.objects.filter(institution=institution, pk=payload.key_id).first()
+    else:
+        key = CryptographicKey.objects.filter(institution=institution, fingerprint=payload.key_fingerprint).first()
+    if key is None:
+        raise HttpError(400, "Clé de signature inconnue pour cette institution.")
+
+    batch = document_batches.register(institution, key, payload.signature, payload.documents, payload.merkle_root)
+    AuditLog.objects.create(
+        user=request.user, action_type=AuditLog.ActionType.SIGN, resource_type=AuditLog.ResourceType.INSTITUTION,
+        resource_id=institution.pk, ip_address=get_client_ip(request), user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        details={'batch_id': str(batch.pk), 'merkle_root': batch.merkle_root, 'documents': batch.leaf_count},
+    )
+    return 201, batch
+
+
+@router.get("/revocations", response=RevocationIndexSchema)
+def revocation_index_manifest(request: HttpRequest):
+    """
+    Version publiée de l'index de révocation, pour les vérifieurs hors ligne :
+    un client sans version télécharge l'instantané, puis suit le flux de deltas.
+    Format binaire : voir apps.documents.revocation (en-tête, préfixes triés de 8 octets + statut).
+    """
+    meta = revocation_index.read_meta()
+    if meta is None:
+        raise Http404
+    deltas = sorted(int(version) for version in meta['deltas'])
+    return {
+        **meta,
+        'format': FORMAT_VERSION,
+        'snapshot_url': f"{request.path}/snapshot/{meta['version']}.bin",
+        'delta_url': f"{request.path}/delta?since={{version}}",
+        'oldest_delta_base': deltas[0] - 1 if deltas else None,
+    }
+
+
+@router.get("/revocations/snapshot/{version}.bin")
+def revocation_index_snapshot(request: HttpRequest, version: int):
+    """
+    Instantané complet d'une version de l'index (immuable ; seules les deux dernières versions sont conservées).
+    """
+    name = revocation_index.snapshot_name(version)
+    if name is None or not revocation_index.storage.exists(name):
+        raise Http404
+    response = FileResponse(
+        revocation_index.storage.open(name, 'rb'), as_attachment=True,
+        filename=f"revocations-v{version}.bin", content_type='application/octet-stream',
+    )
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+@router.get("/revocations/delta")
+def revocation_index_delta(request: HttpRequest, since: int = Query(..., ge=0)):
+    """
+    Changements depuis la version since jusqu'à la version courante (en-tête X-Revocation-Version).
+    410 si les deltas intermédiaires ne sont plus conservés : télécharger l'instantané.
+    """
+    data = revocation_index.delta_since(since)
+    if data is None:
+        raise HttpError(410, "Deltas non disponibles depuis cette version : télécharger l'instantané.")
+    response = HttpResponse(data, content_type='application/octet-stream')
+    response['X-Revocation-Version'] = str(RevocationSnapshot(data).version)
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+def serve_render(request: HttpRequest, kind: str, document_hash: str, version: Optional[int]) -> HttpResponse:
+    """
+    Sert un rendu du cache adressé par contenu.
+    URL versionnée (?v=<version courante>) : immuable pour les CDN ; sinon revalidation horaire par ETag.
+    """
+    document_hash = document_hash.lower()
+    headers = {
+        'ETag': render_cache.etag(kind, document_hash),
+        'Cache-Control': (
+            'public, max-age=31536000, immutable' if version == render_cache.version else 'public, max-age=3600'
+        ),
+    }
+    if request.headers.get('If-None-Match') == headers['ETag']:
+        response = HttpResponseNotModified()
+    else:
+        data = document_filter.might_contain(document_hash) and render_cache.get_or_render(kind, document_hash)
+        if not data:
+            raise Http404
+        response = HttpResponse(data, content_type=KINDS[kind][1])
+        if kind == 'certificate':
+            headers['Content-Disposition'] = f'inline; filename="certificat-{document_hash[:16]}.pdf"'
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+@router.get("/{document_hash}/qr.png")
+def document_qr_code(request: HttpRequest, document_hash: str = Path(..., pattern=SHA256_PATTERN), v: Optional[int] = None):
+    """
+    QR code de vérification (PNG) d'un document enregistré.
+    """
+    return serve_render(request, 'qr', document_hash, v)
+
+
+@router.get("/{document_hash}/certificate.pdf")
+def document_certificate(request: HttpRequest, document_hash: str = Path(..., pattern=SHA256_PATTERN), v: Optional[int] = None):
+    """
+    Certificat de vérification (PDF) d'un document enregistré : informations
+    d'enregistrement et QR code renvoyant vers la vérification en ligne.
+    """
+    return serve_render(request, 'certificate', document_hash, v)
+
+
+@router.post("/{document_hash}/steganography", auth=django_auth)
+def embed_document_steganography(request: HttpRequest, document_hash: str = Path(..., pattern=SHA256_PATTERN),
+                                 file: UploadedFile = File(...)):
+    """
+    Marque l'image d'un document enregistré (multipart, champ « file ») avec son hash
+    et sa signature, dans les coefficients DCT de ses blocs 8x8 (PNG en réponse).
+    La copie marquée se vérifie par POST /api/v1/verify/steganography, y compris
+    après recompression JPEG.
+    Réservé aux administrateurs et signataires de l'institution du document.
+    """
+    document = get_object_or_404(SignedDocument.objects.select_related('institution'), document_hash=document_hash.lower())
+    if not request.user.is_staff and not InstitutionUser.objects.filter(
+        institution=document.institution, user=request.user, is_active=True,
+        role__in=[InstitutionUser.Role.ADMIN, InstitutionUser.Role.SIGNER],
+    ).exists():
+        raise AuthorizationError()
+    if file.size > document_steganography.config['MAX_IMAGE_SIZE']:
+        raise PayloadTooLargeException()
+
+    try:
+        marked = document_steganography.embed(file.read(), document.document_hash, document.signature)
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    SignedDocument.objects.filter(pk=document.pk).update(has_steganography=True, steganography_method='DCT')
+    AuditLog.objects.create(
+        user=request.user, action_type=AuditLog.ActionType.SIGN, resource_type=AuditLog.ResourceType.DOCUMENT,
+        resource_id=document.pk, ip_address=get_client_ip(request), user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        details={'steganography': 'DCT', 'size': len(marked)},
+    )
+    response = HttpResponse(marked, content_type='image/png')
+    response['Content-Disposition'] = f'attachment; filename="document-{document.document_hash[:16]}.png"'
+    return response
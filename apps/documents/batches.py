@@ -0,0 +1,172 @@
+# apps/documents/batches.py
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.api.exceptions import BadRequestException, ConflictException
+from apps.core.cache import LRUCache
+from apps.cryptography.engine import signature_engine
+from apps.cryptography.merkle import MerkleTree, verify_proof
+from apps.cryptography.models import CryptographicKey
+
+from .ingest import USABLE_KEY_STATUSES, document_ingest
+from .models import DocumentBatch, SignedDocument
+from .phash import hex_to_db
+from .signals import documents_registered
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'MAX_SIZE': 10000,
+    'TREE_CACHE_SIZE': 64,  # Arbres conservés en mémoire par processus
+    'TREE_CACHE_TTL': 3600,
+    'LOOKUP_CHUNK_SIZE': 1000,
+}
+
+
+class DocumentBatches:
+    """
+    Enregistrement et vérification des lots de documents signés par leur racine
+    de Merkle (POST /api/v1/documents/batches).
+
+    - Enregistrement : l'arbre est construit à partir des hashes, dans l'ordre
+      du lot ; une seule signature (celle de la racine) est vérifiée, au lieu
+      d'une par document. Le lot est refusé en entier si un hash est déjà
+      enregistré : la racine engage tous ses documents.
+    - Stockage : l'arbre complet tient dans une ligne DocumentBatch (nœuds de
+      32 octets) ; chaque document ne garde que son rang dans l'arbre.
+    - Vérification : la preuve d'inclusion (log2(N) voisins) est extraite de
+      l'arbre, mis en cache par processus, et recalculée jusqu'à la racine ; la
+      signature de la racine est vérifiée une fois par lot grâce au cache des
+      résultats du moteur de signature.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.trees = LRUCache(maxsize=self.config['TREE_CACHE_SIZE'], ttl=self.config['TREE_CACHE_TTL'])
+
+    # ------------------------------------------
+    # Enregistrement
+    # ------------------------------------------
+
+    def register(self, institution, key: CryptographicKey, signature: str, records: List[Any],
+                 merkle_root: Optional[str] = None) -> DocumentBatch:
+        """
+        Enregistre un lot (records : BatchDocumentSchema, dans l'ordre des feuilles).
+
+        Raises:
+            BadRequestException: clé inutilisable, hash en double, racine ou signature invalide
+            ConflictException: un document du lot est déjà enregistré
+        """
+        started = time.perf_counter()
+        if key.status not in USABLE_KEY_STATUSES or key.expires_at <= timezone.now():
+            raise BadRequestException("Clé de signature révoquée ou expirée.")
+        hashes = [record.document_hash.lower() for record in records]
+        if len(set(hashes)) != len(hashes):
+            raise BadRequestException("Le lot contient plusieurs fois le même hash.")
+
+        tree = MerkleTree.build(hashes)
+        if merkle_root is not None and merkle_root.lower() != tree.root:
+            raise BadRequestException("La racine de Merkle fournie ne correspond pas aux hashes du lot.")
+        if not signature_engine.verify_with_key(key, signature, tree.root):
+            raise BadRequestException("Signature de la racine de Merkle invalide.")
+
+        existing = self._registered(hashes)
+        if existing:
+            raise ConflictException(
+                f"{len(existing)} document(s) du lot déjà enregistré(s), dont {', '.join(sorted(existing)[:3])}."
+            )
+
+        now = timezone.now()
+        with transaction.atomic():
+            batch = DocumentBatch.objects.create(
+                institution=institution, key=key, merkle_root=tree.root, signature=signature,
+                leaf_count=tree.leaf_count, tree=tree.to_bytes(),
+            )
+            documents = [
+                SignedDocument(
+                    id=uuid.uuid4(), institution=institution, key=key, document_hash=document_hash,
+                    signature='', batch=batch, batch_index=index, file_type=record.file_type,
+                    original_filename=record.original_filename, file_size=record.file_size,
+                    perceptual_hash=hex_to_db(record.perceptual_hash),
+                    expires_at=record.expires_at, metadata=record.metadata, created_at=now, updated_at=now,
+                )
+                for index, (document_hash, record) in enumerate(zip(hashes, records))
+            ]
+            # Hash enregistré entre le contrôle et l'insertion : le lot entier est annulé
+            if len(document_ingest.insert(documents)) != len(documents):
+                raise ConflictException("Des documents du lot ont été enregistrés entre-temps.")
+
+        self.trees.set(str(batch.pk), tree)
+        documents_registered.send(sender=SignedDocument, documents=documents)
+        logger.info(
+            f"Lot {tree.root[:16]} enregistré pour {institution.pk}: {tree.leaf_count} documents, "
+            f"1 signature, {time.perf_counter() - started:.3f}s"
+        )
+        return batch
+
+    def _registered(self, hashes: List[str]) -> set:
+        """Hashes du lot déjà enregistrés (une requête par tranche)."""
+        chunk_size = self.config['LOOKUP_CHUNK_SIZE']
+        existing = set()
+        for start in range(0, len(hashes), chunk_size):
+            existing.update(SignedDocument.objects.filter(
+                document_hash__in=hashes[start:start + chunk_size]
+            ).values_list('document_hash', flat=True))
+        return existing
+
+    # ------------------------------------------
+    # Vérification
+    # ------------------------------------------
+
+    def tree(self, batch_id) -> MerkleTree:
+        tree = self.trees.get(str(batch_id))
+        if tree is None:
+            tree = self._parse(*DocumentBatch.objects.values_list('tree', 'leaf_count').get(pk=batch_id))
+            self.trees.set(str(batch_id), tree)
+        return tree
+
+    async def atree(self, batch_id) -> MerkleTree:
+        """Version async de tree (ORM async)."""
+        tree = self.trees.get(str(batch_id))
+        if tree is None:
+            tree = self._parse(*await DocumentBatch.objects.values_list('tree', 'leaf_count').aget(pk=batch_id))
+            self.trees.set(str(batch_id), tree)
+        return tree
+
+    @staticmethod
+    def _parse(data, leaf_count: int) -> MerkleTree:
+        return MerkleTree.from_bytes(bytes(data), leaf_count)
+
+    def verify_document(self, document: SignedDocument, tree: Optional[MerkleTree] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Preuve d'inclusion d'un document d'un lot (chargé avec select_related('batch', 'key'))
+        et validité de sa signature : preuve rattachée à la racine, racine signée par la clé.
+
+        Returns:
+            (preuve publiable, signature valide)
+        """
+        batch = document.batch
+        tree = tree or self.tree(batch.pk)
+        path = tree.proof(document.batch_index)
+        valid = verify_proof(document.document_hash, path, batch.merkle_root) and signature_engine.verify_with_key(
+            document.key, batch.signature, batch.merkle_root
+        )
+        proof = {
+            'batch_id': str(batch.pk),
+            'merkle_root': batch.merkle_root,
+            'root_signature': batch.signature,
+            'key_fingerprint': document.key.fingerprint,
+            'leaf_index': document.batch_index,
+            'leaf_count': batch.leaf_count,
+            'path': [{'position': side, 'hash': sibling} for side, sibling in path],
+        }
+        return proof, valid
+
+
+document_batches = DocumentBatches(getattr(settings, 'DOCUMENT_BATCHES', None))
@@ -0,0 +1,104 @@
+# apps/documents/bloom.py
+import hashlib
+import math
+import os
+import struct
+import threading
+from typing import Iterable
+
+# En-tête de sérialisation : nombre de bits, nombre de fonctions de hachage, éléments, sel
+_HEADER = struct.Struct('>QIQ16s')
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom compact (tableau de bits en bytearray).
+
+    Répond « certainement absent » ou « peut-être présent » : aucun faux négatif,
+    un taux de faux positifs borné par la taille choisie. Les positions sont
+    dérivées d'un BLAKE2b salé (double hachage), ce qui empêche de fabriquer
+    des hashes ciblant les bits déjà positionnés.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int, salt: bytes = None):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.salt = salt or os.urandom(16)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float) -> "BloomFilter":
+        """Dimensionne le filtre pour `capacity` éléments au taux de faux positifs `fp_rate`."""
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    @property
+    def capacity(self) -> int:
+        """Nombre d'éléments pour lequel le filtre a été dimensionné."""
+        return int(self.num_bits * (math.log(2) ** 2) / -math.log(self.design_fp_rate))
+
+    @property
+    def design_fp_rate(self) -> float:
+        return math.exp(-self.num_hashes * math.log(2))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+    def estimated_fp_rate(self) -> float:
+        """Taux de faux positifs attendu pour le nombre d'éléments actuellement insérés."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16, key=self.salt).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> bool:
+        """
+        Ajoute un élément.
+
+        Returns:
+            bool: True si l'élément était nouveau (au moins un bit positionné)
+        """
+        positions = self._positions(item)
+        bits = self.bits
+        with self._lock:
+            added = False
+            for position in positions:
+                byte, mask = position >> 3, 1 << (position & 7)
+                if not bits[byte] & mask:
+                    bits[byte] |= mask
+                    added = True
+            if added:
+                self.count += 1
+        return added
+
+    def update(self, items: Iterable[str]) -> int:
+        """Ajoute plusieurs éléments et retourne le nombre d'éléments nouveaux."""
+        return sum(1 for item in items if self.add(item))
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def to_bytes(self) -> bytes:
+        with self._lock:
+            return _HEADER.pack(self.num_bits, self.num_hashes, self.count, self.salt) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        num_bits, num_hashes, count, salt = _HEADER.unpack_from(data)
+        bloom = cls(num_bits, num_hashes, salt)
+        bloom.bits = bytearray(data[_HEADER.size:])
+        bloom.count = count
+        return bloom
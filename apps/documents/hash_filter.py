@@ -0,0 +1,255 @@
+# apps/documents/hash_filter.py
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .bloom import BloomFilter
+from .models import SignedDocument
+
+logger = logging.getLogger('app')
+
+BLOB_KEY = 'documents:filter:blob'
+META_KEY = 'documents:filter:meta'
+GENERATION_KEY = 'documents:filter:generation'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'FALSE_POSITIVE_RATE': 0.001,
+    'MIN_CAPACITY': 100000,
+    'GROWTH_FACTOR': 2,
+    'CHECK_INTERVAL': 1.0,
+    'REFRESH_OVERLAP': 60,
+    'CHUNK_SIZE': 5000,
+}
+
+
+class DocumentHashFilter:
+    """
+    Pré-filtre de Bloom de tous les hashes SignedDocument connus.
+
+    Permet au chemin de vérification de rejeter un hash certainement inconnu
+    (fautes de frappe, fuzzing, faux documents) sans accès cache ni base.
+
+    - La tâche Huey périodique construit le filtre et le publie dans le cache
+      partagé ; chaque worker le charge au premier usage, sans parcourir la table.
+    - L'enregistrement d'un document incrémente une « génération » partagée :
+      les workers qui l'observent (au plus une fois par CHECK_INTERVAL) ajoutent
+      les documents créés depuis leur filigrane (created_at).
+    - Sans filtre publié (cache froid, clé évincée), aucune requête ne parcourt la
+      table : le hash « peut appartenir » à un document et la vérification passe
+      par le cache et la base, jusqu'à la construction par warm() ou la tâche Huey.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.bloom: Optional[BloomFilter] = None
+        self.version = 0
+        self.watermark = None
+        self.build_seconds: Optional[float] = None
+        self.built_at = None
+        self.checks = 0
+        self.rejections = 0
+        self._generation = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def shared(self):
+        return caches[self.config['ALIAS']]
+
+    # ------------------------------------------
+    # Consultation (chemin de vérification)
+    # ------------------------------------------
+
+    def might_contain(self, document_hash: str) -> bool:
+        """False uniquement si le hash n'appartient certainement à aucun document."""
+        if not self.config['ENABLED']:
+            return True
+        try:
+            self._ensure_current()
+        except Exception as e:
+            logger.error(f"Filtre de hashes indisponible: {e}", exc_info=True)
+            return True
+        bloom = self.bloom
+        if bloom is None:
+            return True
+        self.checks += 1
+        if document_hash in bloom:
+            return True
+        self.rejections += 1
+        return False
+
+    async def amight_contain(self, document_hash: str) -> bool:
+        """Version async : le rechargement périodique du filtre (cache partagé, base) passe par un thread."""
+        if self.config['ENABLED'] and time.monotonic() - self._checked_at >= self.config['CHECK_INTERVAL']:
+            return await sync_to_async(self.might_contain)(document_hash)
+        return self.might_contain(document_hash)
+
+    def add(self, document_hash: str) -> None:
+        """Ajoute un hash au filtre local (document enregistré dans ce processus)."""
+        bloom = self.bloom
+        if bloom is not None:
+            bloom.add(document_hash)
+
+    def notify_new_documents(self) -> None:
+        """Signale aux autres workers que de nouveaux documents ont été enregistrés."""
+        shared = self.shared
+        shared.add(GENERATION_KEY, 0, None)
+        shared.incr(GENERATION_KEY)
+
+    def warm(self) -> None:
+        """
+        Charge le filtre au démarrage d'un worker (appelé depuis wsgi.py / asgi.py),
+        ou le construit et le publie si aucun n'est publié.
+        """
+        if not self.config['ENABLED']:
+            return
+        try:
+            self._ensure_current(build=True)
+        except Exception as e:
+            logger.error(f"Préchargement du filtre de hashes impossible: {e}", exc_info=True)
+
+    def _ensure_current(self, build: bool = False) -> None:
+        """Suit le filtre publié (au plus une fois par CHECK_INTERVAL) ; ne le construit que si build."""
+        now = time.monotonic()
+        if not build and now - self._checked_at < self.config['CHECK_INTERVAL']:
+            return
+        with self._lock:
+            if not build and now - self._checked_at < self.config['CHECK_INTERVAL']:
+                return
+            self._checked_at = now
+
+            values = self.shared.get_many([META_KEY, GENERATION_KEY])
+            meta = values.get(META_KEY)
+            generation = values.get(GENERATION_KEY, 0)
+
+            loaded = False
+            if meta is not None and meta['version'] > self.version:
+                loaded = self._load_published(meta)
+            if self.bloom is None:
+                if build:
+                    self.publish(self.build())
+            elif loaded or generation != self._generation:
+                # Documents enregistrés après le filigrane du filtre publié
+                self._refresh_from_db(self.bloom)
+            self._generation = generation
+
+    def _load_published(self, meta: Dict[str, Any]) -> bool:
+        blob = self.shared.get(BLOB_KEY)
+        if blob is None:
+            return False
+        self._install(BloomFilter.from_bytes(blob), meta)
+        logger.info(f"Filtre de hashes v{self.version} chargé ({self.bloom.count} documents)")
+        return True
+
+    def _install(self, bloom: BloomFilter, meta: Dict[str, Any]) -> None:
+        self.bloom = bloom
+        self.version = meta['version']
+        self.watermark = meta['watermark']
+        self.build_seconds = meta['build_seconds']
+        self.built_at = meta['built_at']
+
+    # ------------------------------------------
+    # Construction et publication (tâches Huey)
+    # ------------------------------------------
+
+    def build(self) -> BloomFilter:
+        """Construit un filtre complet à partir de la table des documents."""
+        started = time.perf_counter()
+        total = SignedDocument.objects.count()
+        capacity = max(self.config['MIN_CAPACITY'], total * self.config['GROWTH_FACTOR'])
+        bloom = BloomFilter.for_capacity(capacity, self.config['FALSE_POSITIVE_RATE'])
+        self.watermark = None
+        self._refresh_from_db(bloom)
+        self.build_seconds = time.perf_counter() - started
+        self.built_at = timezone.now()
+        logger.info(
+            f"Filtre de hashes construit: {bloom.count} documents, "
+            f"{bloom.size_bytes} octets, {self.build_seconds:.2f}s"
+        )
+        return bloom
+
+    def refresh(self) -> BloomFilter:
+        """
+        Met à jour le filtre publié avec les documents créés depuis son filigrane.
+        Reconstruit entièrement le filtre s'il est absent ou a dépassé sa capacité.
+        """
+        with self._lock:
+            meta = self.shared.get(META_KEY)
+            if meta is not None and meta['version'] != self.version:
+                self._load_published(meta)
+            if self.bloom is None or self.bloom.count >= self.bloom.capacity:
+                return self.publish(self.build())
+            started = time.perf_counter()
+            added = self._refresh_from_db(self.bloom)
+            self.build_seconds = time.perf_counter() - started
+            self.built_at = timezone.now()
+            logger.info(f"Filtre de hashes mis à jour: {added} nouveaux documents")
+            return self.publish(self.bloom)
+
+    def _refresh_from_db(self, bloom: BloomFilter) -> int:
+        queryset = SignedDocument.objects.order_by()
+        if self.watermark is not None:
+            # Recouvrement : une transaction validée tardivement peut porter un created_at antérieur
+            overlap = timedelta(seconds=self.config['REFRESH_OVERLAP'])
+            queryset = queryset.filter(created_at__gte=self.watermark - overlap)
+        added = 0
+        watermark = self.watermark
+        rows = queryset.values_list('document_hash', 'created_at').iterator(
+            chunk_size=self.config['CHUNK_SIZE']
+        )
+        for document_hash, created_at in rows:
+            if bloom.add(document_hash):
+                added += 1
+            if watermark is None or created_at > watermark:
+                watermark = created_at
+        self.watermark = watermark
+        return added
+
+    def publish(self, bloom: BloomFilter) -> BloomFilter:
+        """Publie le filtre dans le cache partagé pour les autres workers."""
+        with self._lock:
+            meta = self.shared.get(META_KEY) or {'version': 0}
+            self.bloom = bloom
+            self.version = meta['version'] + 1
+            self.shared.set(BLOB_KEY, bloom.to_bytes(), None)
+            self.shared.set(META_KEY, {
+                'version': self.version,
+                'watermark': self.watermark,
+                'build_seconds': self.build_seconds,
+                'built_at': self.built_at,
+            }, None)
+        return bloom
+
+    # ------------------------------------------
+    # Métriques
+    # ------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        bloom = self.bloom
+        if bloom is None:
+            return {'loaded': False}
+        return {
+            'loaded': True,
+            'version': self.version,
+            'count': bloom.count,
+            'capacity': bloom.capacity,
+            'size_bytes': bloom.size_bytes,
+            'num_hashes': bloom.num_hashes,
+            'estimated_fp_rate': bloom.estimated_fp_rate(),
+            'build_seconds': self.build_seconds,
+            'built_at': self.built_at,
+            'checks': self.checks,
+            'rejections': self.rejections,
+        }
+
+
+document_filter = DocumentHashFilter(getattr(settings, 'DOCUMENT_FILTER', None))
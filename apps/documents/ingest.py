@@ -0,0 +1,280 @@
+# apps/documents/ingest.py
+import gzip
+import io
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from pydantic import ValidationError
+
+from apps.cryptography.engine import signature_engine
+from apps.cryptography.models import CryptographicKey
+from apps.cryptography.services import SignatureService
+
+from .models import SignedDocument
+from .phash import hex_to_db
+from .schemas import BulkDocumentRecordSchema
+from .signals import documents_registered
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'CHUNK_SIZE': 1000,
+    'WORKERS': None,  # None = nombre de cœurs
+    'MAX_RECORDS': 100000,
+    'MAX_LINE_BYTES': 64 * 1024,
+}
+
+# Statut de chaque enregistrement dans le flux de résultats
+CREATED = 'CREATED'
+DUPLICATE = 'DUPLICATE'
+INVALID_RECORD = 'INVALID_RECORD'
+UNKNOWN_KEY = 'UNKNOWN_KEY'
+INVALID_SIGNATURE = 'INVALID_SIGNATURE'
+
+USABLE_KEY_STATUSES = (CryptographicKey.Status.ACTIVE, CryptographicKey.Status.EXPIRING_SOON)
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class _RawStream(io.RawIOBase):
+    """Adapte un objet à read() (requête Django) pour io.BufferedReader."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def ndjson_lines(stream, gzipped: Optional[bool] = None, max_line_bytes: int = DEFAULTS['MAX_LINE_BYTES']) -> Iterator[bytes]:
+    """
+    Lignes non vides d'un flux NDJSON, éventuellement compressé en gzip (détecté
+    par son en-tête si gzipped vaut None). Le flux est lu au fil de l'eau ; une
+    ligne de plus de max_line_bytes est tronquée, et sera rejetée à l'analyse.
+    """
+    reader = io.BufferedReader(_RawStream(stream))
+    if gzipped is None:
+        gzipped = reader.peek(2)[:2] == GZIP_MAGIC
+    if gzipped:
+        reader = io.BufferedReader(gzip.GzipFile(fileobj=reader, mode='rb'))
+    while True:
+        line = reader.readline(max_line_bytes)
+        if not line:
+            return
+        if len(line) == max_line_bytes and not line.endswith(b'\n'):
+            # Fin de la ligne trop longue ignorée
+            rest = line
+            while rest and not rest.endswith(b'\n'):
+                rest = reader.readline(max_line_bytes)
+        if line.strip():
+            yield line
+
+
+class DocumentIngest:
+    """
+    Enregistrement en masse de documents signés (POST /api/v1/documents/bulk).
+
+    Le flux NDJSON est traité par tranches de CHUNK_SIZE enregistrements :
+
+    - les signatures sont vérifiées en parallèle (pool de threads : cryptography
+      libère le GIL), chaque clé de l'institution étant analysée une seule fois ;
+    - l'unicité des hashes est contrôlée par une seule requête par tranche,
+      les doublons internes à une tranche étant écartés à l'insertion ;
+    - l'insertion se fait par COPY dans une table temporaire puis
+      INSERT ... ON CONFLICT DO NOTHING sous PostgreSQL (psycopg 3), par
+      bulk_create(ignore_conflicts=True) ailleurs : un hash enregistré entre le
+      contrôle et l'insertion est signalé comme doublon.
+
+    Les signaux post_save ne sont pas émis : documents_registered l'est une fois
+    par tranche (filtre de hashes, cache des vérifications, rendus).
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    def run(self, institution, lines: Iterable[bytes], workers: Optional[int] = None,
+            summary: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Enregistre les documents décrits par les lignes NDJSON pour l'institution.
+
+        Produit un résultat par enregistrement (line : rang dans le flux, document_hash,
+        status, document_id, error), dans l'ordre du flux. Le bilan (compteurs, débit)
+        est écrit dans summary à la fin du flux.
+        """
+        workers = workers or self.config['WORKERS'] or os.cpu_count() or 1
+        chunk_size = self.config['CHUNK_SIZE']
+        summary = summary if summary is not None else {}
+        summary.update({'total': 0, 'created': 0, 'duplicates': 0, 'rejected': 0})
+        keys = self._usable_keys(institution)
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as executor:
+            chunk: List[Tuple[int, bytes]] = []
+            for number, line in enumerate(lines, start=1):
+                if number > self.config['MAX_RECORDS']:
+                    summary['truncated'] = True
+                    break
+                chunk.append((number, line))
+                if len(chunk) >= chunk_size:
+                    yield from self._ingest_chunk(institution, keys, chunk, executor, workers, summary)
+                    chunk = []
+            if chunk:
+                yield from self._ingest_chunk(institution, keys, chunk, executor, workers, summary)
+
+        seconds = time.perf_counter() - started
+        summary['seconds'] = round(seconds, 3)
+        summary['per_second'] = round(summary['total'] / seconds) if seconds else None
+        logger.info(
+            f"Enregistrement en masse pour {institution.pk}: {summary['total']} documents, "
+            f"{summary['created']} créés, {summary['rejected']} rejetés, {summary['per_second']}/s"
+        )
+
+    @staticmethod
+    def _usable_keys(institution) -> Dict[str, CryptographicKey]:
+        """Clés de signature utilisables de l'institution, par id et par empreinte."""
+        keys = {}
+        for key in CryptographicKey.objects.filter(
+            institution=institution, status__in=USABLE_KEY_STATUSES, expires_at__gt=timezone.now()
+        ):
+            keys[str(key.pk)] = keys[key.fingerprint] = key
+        return keys
+
+    def _ingest_chunk(self, institution, keys, chunk, executor, workers, summary) -> List[Dict[str, Any]]:
+        results: Dict[int, Dict[str, Any]] = {}
+        candidates: List[Tuple[int, BulkDocumentRecordSchema, CryptographicKey]] = []
+
+        for number, line in chunk:
+            try:
+                record = BulkDocumentRecordSchema.model_validate_json(line)
+            except ValidationError as e:
+                error = '; '.join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()[:3])
+                results[number] = self._result(number, None, INVALID_RECORD, error=error)
+                continue
+            record.document_hash = record.document_hash.lower()
+            key = keys.get(str(record.key_id) if record.key_id else record.key_fingerprint)
+            if key is None:
+                results[number] = self._result(number, record.document_hash, UNKNOWN_KEY)
+            else:
+                candidates.append((number, record, key))
+
+        # Unicité : une requête pour toute la tranche (les tranches précédentes sont déjà insérées) ;
+        # les doublons internes à la tranche sont écartés à l'insertion
+        existing = set(SignedDocument.objects.filter(
+            document_hash__in=[record.document_hash for _, record, _ in candidates]
+        ).values_list('document_hash', flat=True))
+
+        to_verify = []
+        for number, record, key in candidates:
+            if record.document_hash in existing:
+                results[number] = self._result(number, record.document_hash, DUPLICATE)
+            else:
+                to_verify.append((number, record, key))
+
+        documents = []
+        now = timezone.now()
+        for (number, record, key), valid in zip(to_verify, self._verify(to_verify, executor, workers)):
+            if not valid:
+                results[number] = self._result(number, record.document_hash, INVALID_SIGNATURE)
+                continue
+            document = SignedDocument(
+                id=uuid.uuid4(), institution=institution, key=key, document_hash=record.document_hash,
+                signature=record.signature, file_type=record.file_type,
+                original_filename=record.original_filename, file_size=record.file_size,
+                perceptual_hash=hex_to_db(record.perceptual_hash),
+                expires_at=record.expires_at, metadata=record.metadata, created_at=now, updated_at=now,
+            )
+            documents.append((number, document))
+
+        inserted = self.insert([document for _, document in documents]) if documents else set()
+        created = []
+        for number, document in documents:
+            if document.pk in inserted:
+                created.append(document)
+                results[number] = self._result(number, document.document_hash, CREATED, document_id=str(document.pk))
+            else:
+                # Doublon dans la tranche, ou hash enregistré entre le contrôle et l'insertion
+                results[number] = self._result(number, document.document_hash, DUPLICATE)
+        if created:
+            documents_registered.send(sender=SignedDocument, documents=created)
+
+        summary['total'] += len(chunk)
+        summary['created'] += len(created)
+        summary['duplicates'] += sum(1 for result in results.values() if result['status'] == DUPLICATE)
+        summary['rejected'] = summary['total'] - summary['created'] - summary['duplicates']
+        return [results[number] for number, _ in chunk]
+
+    @staticmethod
+    def _verify(candidates, executor, workers) -> List[bool]:
+        """Vérifie les signatures en parallèle, par sous-lots (un par worker)."""
+        def verify(batch):
+            outcomes = []
+            for _, record, key in batch:
+                try:
+                    public_key = signature_engine.load_key(key.fingerprint, key.public_key)
+                except (ValueError, TypeError):
+                    outcomes.append(False)
+                    continue
+                outcomes.append(SignatureService.verify_with_public_key(
+                    public_key, key.algorithm, record.signature, record.document_hash
+                ))
+            return outcomes
+
+        size = max(1, -(-len(candidates) // workers))
+        batches = [candidates[i:i + size] for i in range(0, len(candidates), size)]
+        return [valid for outcomes in executor.map(verify, batches) for valid in outcomes]
+
+    def insert(self, documents: List[SignedDocument]) -> Set[uuid.UUID]:
+        """Insère les documents, sans erreur sur un hash déjà présent ; retourne les id insérés."""
+        if connection.vendor == 'postgresql':
+            from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+            if is_psycopg3:
+                return self._copy_insert(documents)
+        with transaction.atomic():
+            SignedDocument.objects.bulk_create(documents, ignore_conflicts=True)
+            return set(SignedDocument.objects.filter(
+                pk__in=[document.pk for document in documents]
+            ).values_list('pk', flat=True))
+
+    @staticmethod
+    def _copy_insert(documents: List[SignedDocument]) -> Set[uuid.UUID]:
+        """COPY dans une table temporaire, puis insertion ensembliste avec ON CONFLICT DO NOTHING."""
+        quote = connection.ops.quote_name
+        fields = SignedDocument._meta.concrete_fields
+        table = quote(SignedDocument._meta.db_table)
+        columns = ', '.join(quote(field.column) for field in fields)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS signed_documents_ingest "
+                f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            with cursor.copy(f"COPY signed_documents_ingest ({columns}) FROM STDIN") as copy:
+                for document in documents:
+                    copy.write_row([
+                        field.get_db_prep_save(getattr(document, field.attname), connection) for field in fields
+                    ])
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM signed_documents_ingest "
+                f"ON CONFLICT (document_hash) DO NOTHING RETURNING id"
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    @staticmethod
+    def _result(line: int, document_hash: Optional[str], status: str,
+                document_id: Optional[str] = None, error: Optional[str] = None) -> Dict[str, Any]:
+        return {'line': line, 'document_hash': document_hash, 'status': status, 'document_id': document_id, 'error': error}
+
+
+document_ingest = DocumentIngest(getattr(settings, 'DOCUMENT_INGEST', None))
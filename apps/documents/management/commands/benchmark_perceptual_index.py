@@ -0,0 +1,104 @@
+# apps/documents/management/commands/benchmark_perceptual_index.py
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.documents.phash import BITS, MultiIndexHash
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure l'index des empreintes perceptuelles sur un corpus synthétique : "
+        "construction, rappel et latence des recherches par rayon, comparés à un parcours linéaire"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fingerprints', type=int, default=1_000_000, help="Taille du corpus")
+        parser.add_argument('--queries', type=int, default=1000, help="Recherches par rayon")
+        parser.add_argument('--radius', type=int, nargs='+', default=[6, 10, 12], help="Rayons mesurés")
+        parser.add_argument('--noise', type=int, default=4, help="Bits modifiés au-delà du rayon (rappel hors rayon)")
+        parser.add_argument('--chunks', type=int, default=4)
+        parser.add_argument('--linear-queries', type=int, default=10, help="Recherches par parcours linéaire")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Corpus en mémoire uniquement : empreintes aléatoires (aucune écriture en base)
+        corpus = [rng.getrandbits(BITS) for _ in range(options['fingerprints'])]
+
+        started = time.perf_counter()
+        index = MultiIndexHash(options['chunks'])
+        for code in corpus:
+            index.add(code)
+        build_seconds = time.perf_counter() - started
+
+        results = []
+        for radius in options['radius']:
+            # Requête = empreinte du corpus dont 0 à radius + noise bits sont inversés (rescan, photo)
+            queries = []
+            for _ in range(options['queries']):
+                original = rng.choice(corpus)
+                flips = rng.randint(0, radius + options['noise'])
+                query = original
+                for position in rng.sample(range(BITS), flips):
+                    query ^= 1 << position
+                queries.append((original, query, flips))
+
+            latencies = []
+            found = {True: 0, False: 0}
+            total = {True: 0, False: 0}
+            for original, query, flips in queries:
+                started = time.perf_counter()
+                matches = index.search(query, radius)
+                latencies.append(time.perf_counter() - started)
+                within = flips <= radius
+                total[within] += 1
+                found[within] += any(code == original for code, _ in matches)
+
+            # Référence exacte : parcours linéaire, sur un sous-ensemble des requêtes
+            linear = []
+            exact = True
+            for _, query, _ in queries[:options['linear_queries']]:
+                started = time.perf_counter()
+                expected = sorted(code for code in corpus if (code ^ query).bit_count() <= radius)
+                linear.append(time.perf_counter() - started)
+                exact &= expected == sorted(code for code, _ in index.search(query, radius))
+
+            latencies.sort()
+            results.append({
+                'radius': radius,
+                'queries': len(queries),
+                'recall_within_radius': round(found[True] / total[True], 4) if total[True] else None,
+                'recall_beyond_radius': round(found[False] / total[False], 4) if total[False] else None,
+                'p50_ms': round(statistics.median(latencies) * 1000, 3),
+                'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+                'linear_p50_ms': round(statistics.median(linear) * 1000, 1) if linear else None,
+                'matches_linear_scan': exact,
+            })
+
+        report = {
+            'fingerprints': len(index),
+            'chunks': options['chunks'],
+            'build_seconds': round(build_seconds, 2),
+            'size_bytes': index.size_bytes(),
+            'results': results,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f"{report['fingerprints']} empreintes, {report['chunks']} sous-chaînes : "
+            f"construction {report['build_seconds']}s, ~{report['size_bytes'] // 2**20} Mio"
+        )
+        self.stdout.write(
+            f"{'rayon':>5} {'rappel<=r':>10} {'rappel>r':>9} {'p50 ms':>8} {'p99 ms':>8} {'linéaire ms':>12} {'exact':>6}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['radius']:>5} {r['recall_within_radius']!s:>10} {r['recall_beyond_radius']!s:>9} "
+                f"{r['p50_ms']:>8} {r['p99_ms']:>8} {r['linear_p50_ms']!s:>12} {r['matches_linear_scan']!s:>6}"
+            )
@@ -0,0 +1,72 @@
+# apps/documents/management/commands/benchmark_renders.py
+import hashlib
+import json
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.cryptography.models import CryptographicKey
+from apps.documents.models import SignedDocument
+from apps.documents.rendering import KINDS, RenderCache
+from apps.institutions.models import Institution
+
+
+class Command(BaseCommand):
+    help = "Compare les rendus par seconde (QR code, certificat) : à froid, depuis le cache sur disque, ETag (304)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=200, help="Documents distincts par mesure")
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        # Documents en mémoire, jamais enregistrés : aucune écriture en base
+        institution = Institution(name="Université de Maroua", slug="univ-maroua")
+        key = CryptographicKey(
+            institution=institution, fingerprint=hashlib.sha256(b"cle").hexdigest(),
+            algorithm=CryptographicKey.Algorithm.ECDSA_P384, expires_at=timezone.now() + timedelta(days=365),
+        )
+        documents = [
+            SignedDocument(
+                institution=institution, key=key, file_type=SignedDocument.FileType.PDF,
+                document_hash=hashlib.sha256(f"document-{i}".encode()).hexdigest(), created_at=timezone.now(),
+            )
+            for i in range(options['documents'])
+        ]
+
+        results = []
+        with tempfile.TemporaryDirectory() as location:
+            cache = RenderCache({'STORAGE_OPTIONS': {'location': location}})
+            for kind in KINDS:
+                def cold():
+                    for document in documents:
+                        cache.save(kind, document.document_hash, cache.render(kind, document))
+
+                def cached():
+                    for document in documents:
+                        assert cache.get(kind, document.document_hash)
+
+                def not_modified():
+                    # Revalidation : l'ETag se calcule sans lire le stockage
+                    for document in documents:
+                        cache.etag(kind, document.document_hash)
+
+                row = {'kind': kind, 'documents': len(documents)}
+                for label, run in (('cold', cold), ('cached', cached), ('etag', not_modified)):
+                    started = time.perf_counter()
+                    run()
+                    row[f'{label}_per_sec'] = round(len(documents) / (time.perf_counter() - started))
+                row['size_bytes'] = len(cache.get(kind, documents[0].document_hash))
+                results.append(row)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'rendu':<12} {'froid/s':>10} {'cache/s':>10} {'ETag/s':>12} {'octets':>8}")
+        for r in results:
+            self.stdout.write(
+                f"{r['kind']:<12} {r['cold_per_sec']:>10} {r['cached_per_sec']:>10} "
+                f"{r['etag_per_sec']:>12} {r['size_bytes']:>8}"
+            )
@@ -0,0 +1,120 @@
+# apps/documents/management/commands/benchmark_steganography.py
+import base64
+import hashlib
+import io
+import json
+import random
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from apps.documents.steganography import (
+    DocumentSteganography, block_coefficients, embed_signature_dct, extract_signature_dct, pack_payload,
+)
+
+
+def page(width: int, height: int, seed: int) -> Image.Image:
+    """Page synthétique : fond blanc, blocs de texte et tampons en niveaux de gris."""
+    rng = random.Random(seed)
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for _ in range(width * height // 30000):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle((x, y, x + rng.randrange(20, 300), y + rng.randrange(5, 60)), fill=(rng.randrange(256),) * 3)
+    return image
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le marquage et la lecture DCT en mégapixels par seconde : tableau seul, "
+        "fichier JPEG complet (décodage inclus) et lots répartis sur un pool de processus"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--width', type=int, default=4032, help="Photo de 12 Mpx par défaut (4032x3024)")
+        parser.add_argument('--height', type=int, default=3024)
+        parser.add_argument('--images', type=int, default=8, help="Images par lot")
+        parser.add_argument('--repeat', type=int, default=5, help="Mesures par image isolée")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="Tailles de pool mesurées")
+        parser.add_argument('--quality', type=int, default=85, help="Qualité JPEG des copies lues")
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        steganography = DocumentSteganography()
+        megapixels = options['width'] * options['height'] / 1e6
+        data = pack_payload(hashlib.sha256(b"document").hexdigest(), base64.b64encode(bytes(104)).decode())
+
+        def jpeg(image):
+            output = io.BytesIO()
+            image.save(output, 'JPEG', quality=options['quality'])
+            return output.getvalue()
+
+        original = page(options['width'], options['height'], 0)
+        marked = embed_signature_dct(original, data)
+        content = jpeg(marked)
+        luma = np.asarray(marked.convert('L'), dtype=np.float32)
+
+        def timed(run):
+            durations = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                run()
+                durations.append(time.perf_counter() - started)
+            return statistics.median(durations)
+
+        single = {
+            'coefficients': timed(lambda: block_coefficients(luma, steganography.config['COEFFICIENT'])),
+            'embed': timed(lambda: embed_signature_dct(original, data)),
+            'extract_jpeg': timed(lambda: extract_signature_dct(Image.open(io.BytesIO(content)))),
+        }
+        assert extract_signature_dct(Image.open(io.BytesIO(content))) == data
+
+        # Lots : images distinctes, marquées puis recompressées en JPEG
+        items = [(jpeg(page(options['width'], options['height'], seed)), hashlib.sha256(bytes([seed])).hexdigest(), '')
+                 for seed in range(options['images'])]
+        batches = []
+        for workers in options['workers']:
+            started = time.perf_counter()
+            outputs = steganography.embed_many(items, workers)
+            embed_seconds = time.perf_counter() - started
+            copies = [jpeg(Image.open(io.BytesIO(output))) for output in outputs]
+            started = time.perf_counter()
+            extracted = steganography.extract_many(copies, workers)
+            extract_seconds = time.perf_counter() - started
+            batches.append({
+                'workers': workers,
+                'embed_mpx_per_sec': round(megapixels * len(items) / embed_seconds, 1),
+                'extract_mpx_per_sec': round(megapixels * len(items) / extract_seconds, 1),
+                'recovered': sum(result is not None and result[0] == document_hash
+                                 for result, (_, document_hash, _) in zip(extracted, items)),
+            })
+
+        report = {
+            'megapixels': round(megapixels, 1),
+            'payload_bytes': len(data),
+            'jpeg_quality': options['quality'],
+            'single': {
+                name: {'ms': round(seconds * 1000, 1), 'mpx_per_sec': round(megapixels / seconds, 1)}
+                for name, seconds in single.items()
+            },
+            'batches': batches,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f"Image de {report['megapixels']} Mpx, charge de {report['payload_bytes']} octets, "
+            f"copies JPEG q{report['jpeg_quality']}"
+        )
+        self.stdout.write(f"{'image isolée':<16} {'ms':>8} {'Mpx/s':>8}")
+        for name, row in report['single'].items():
+            self.stdout.write(f"{name:<16} {row['ms']:>8} {row['mpx_per_sec']:>8}")
+        self.stdout.write(f"{'processus':>9} {'marquage Mpx/s':>15} {'lecture Mpx/s':>14} {'relus':>8}")
+        for row in batches:
+            self.stdout.write(
+                f"{row['workers']:>9} {row['embed_mpx_per_sec']:>15} {row['extract_mpx_per_sec']:>14} "
+                f"{row['recovered']:>4}/{len(items)}"
+            )
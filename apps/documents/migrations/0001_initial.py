@@ -0,0 +1,98 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cryptography', '0001_initial'),
+        ('institutions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignedDocument',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_hash', models.CharField(db_index=True, max_length=128, unique=True)),
+                ('signature', models.TextField()),
+                ('file_type', models.CharField(choices=[('PDF', 'PDF'), ('JPEG', 'JPEG/JPG'), ('PNG', 'PNG'), ('DOCX', 'DOCX'), ('XML', 'XML')], max_length=10)),
+                ('original_filename', models.CharField(blank=True, max_length=255)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('qr_code_data', models.TextField(blank=True)),
+                ('has_steganography', models.BooleanField(default=False)),
+                ('steganography_method', models.CharField(blank=True, max_length=50)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Valide'), ('REVOKED', 'Révoqué'), ('EXPIRED', 'Expiré'), ('SUSPENDED', 'Suspendu')], default='ACTIVE', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('revoked_at', models.DateTimeField(blank=True, null=True)),
+                ('revocation_reason', models.TextField(blank=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('external_url', models.URLField(blank=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='institutions.institution')),
+                ('key', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='signed_documents', to='cryptography.cryptographickey')),
+                ('revoked_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revoked_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'signed_documents',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentVerification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('provided_hash', models.CharField(max_length=128)),
+                ('verifier_ip', models.GenericIPAddressField()),
+                ('verifier_user_agent', models.TextField(blank=True)),
+                ('verifier_country', models.CharField(blank=True, max_length=2)),
+                ('method', models.CharField(choices=[('UPLOAD', 'Upload fichier'), ('QR_SCAN', 'Scan QR code'), ('HASH_INPUT', 'Saisie hash manuel'), ('STEGANOGRAPHY', 'Extraction stéganographique'), ('API', 'Vérification API')], max_length=20)),
+                ('result', models.CharField(choices=[('AUTHENTIC', 'Authentique'), ('INVALID_SIGNATURE', 'Signature invalide'), ('NOT_FOUND', 'Document non trouvé'), ('REVOKED', 'Document révoqué'), ('EXPIRED', 'Document expiré'), ('KEY_EXPIRED', 'Clé expirée')], max_length=30)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('verification_duration_ms', models.IntegerField(null=True)),
+                ('certificate_url', models.URLField(blank=True)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='verifications', to='documents.signeddocument')),
+            ],
+            options={
+                'db_table': 'document_verifications',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='signeddocument',
+            index=models.Index(fields=['institution', 'status'], name='signed_docu_institu_47241b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signeddocument',
+            index=models.Index(fields=['created_at'], name='signed_docu_created_5574c6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='signeddocument',
+            index=models.Index(fields=['status', 'expires_at'], name='signed_docu_status_88a690_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentverification',
+            index=models.Index(fields=['document', 'timestamp'], name='document_ve_documen_166818_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentverification',
+            index=models.Index(fields=['provided_hash'], name='document_ve_provide_5cf0da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentverification',
+            index=models.Index(fields=['verifier_ip', 'timestamp'], name='document_ve_verifie_166983_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentverification',
+            index=models.Index(fields=['result', 'timestamp'], name='document_ve_result_58661c_idx'),
+        ),
+    ]
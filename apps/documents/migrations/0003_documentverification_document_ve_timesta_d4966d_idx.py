@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_alter_documentverification_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentverification',
+            index=models.Index(fields=['timestamp'], name='document_ve_timesta_d4966d_idx'),
+        ),
+    ]
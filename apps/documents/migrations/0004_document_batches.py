@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-17 02:37
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cryptography', '0002_key_status_expires_at_index'),
+        ('documents', '0003_documentverification_document_ve_timesta_d4966d_idx'),
+        ('institutions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signeddocument',
+            name='batch_index',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='DocumentBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('merkle_root', models.CharField(max_length=64, unique=True)),
+                ('signature', models.TextField()),
+                ('leaf_count', models.PositiveIntegerField()),
+                ('tree', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_batches', to='institutions.institution')),
+                ('key', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='document_batches', to='cryptography.cryptographickey')),
+            ],
+            options={
+                'db_table': 'document_batches',
+            },
+        ),
+        migrations.AddField(
+            model_name='signeddocument',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documents', to='documents.documentbatch'),
+        ),
+        migrations.AddConstraint(
+            model_name='signeddocument',
+            constraint=models.UniqueConstraint(fields=('batch', 'batch_index'), name='unique_document_batch_leaf'),
+        ),
+        migrations.AddIndex(
+            model_name='documentbatch',
+            index=models.Index(fields=['institution', 'created_at'], name='document_ba_institu_fb57f2_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-17 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_batches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signeddocument',
+            name='perceptual_hash',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
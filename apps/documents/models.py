@@ -1,3 +1,176 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from apps.institutions.models import Institution
+from apps.cryptography.models import CryptographicKey
+import uuid
 
-# Create your models here.
+
+class DocumentBatch(models.Model):
+    """
+    Lot de documents signés en une fois : l'institution signe la racine de
+    l'arbre de Merkle des hashes (apps.cryptography.merkle), pas chaque document.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='document_batches')
+    key = models.ForeignKey(CryptographicKey, on_delete=models.PROTECT, related_name='document_batches')
+
+    merkle_root = models.CharField(max_length=64, unique=True)  # SHA-256 (hexadécimal)
+    signature = models.TextField()  # Signature de la racine (base64)
+    leaf_count = models.PositiveIntegerField()
+    # Nœuds de 32 octets, niveau par niveau des feuilles à la racine (MerkleTree.to_bytes)
+    tree = models.BinaryField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'document_batches'
+        indexes = [
+            models.Index(fields=['institution', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Lot {self.merkle_root[:16]} ({self.leaf_count} documents)"
+
+
+class SignedDocument(models.Model):
+    """Document signé avec métadonnées"""
+
+    class FileType(models.TextChoices):
+        PDF = 'PDF', 'PDF'
+        JPEG = 'JPEG', 'JPEG/JPG'
+        PNG = 'PNG', 'PNG'
+        DOCX = 'DOCX', 'DOCX'
+        XML = 'XML', 'XML'
+
+    class Status(models.TextChoices):
+        ACTIVE = 'ACTIVE', 'Valide'
+        REVOKED = 'REVOKED', 'Révoqué'
+        EXPIRED = 'EXPIRED', 'Expiré'
+        SUSPENDED = 'SUSPENDED', 'Suspendu'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    institution = models.ForeignKey(Institution, on_delete=models.CASCADE, related_name='documents')
+    key = models.ForeignKey(CryptographicKey, on_delete=models.PROTECT, related_name='signed_documents')
+
+    # Identifiants du document
+    document_hash = models.CharField(max_length=128, unique=True, db_index=True)  # SHA-256
+    signature = models.TextField()  # Signature numérique (base64) ; vide pour un document d'un lot
+
+    # Lot signé par sa racine de Merkle (la signature est alors celle du lot)
+    batch = models.ForeignKey(
+        DocumentBatch, on_delete=models.PROTECT, null=True, blank=True, related_name='documents'
+    )
+    batch_index = models.PositiveIntegerField(null=True, blank=True)  # Rang de la feuille dans l'arbre
+
+    # Type et métadonnées
+    file_type = models.CharField(max_length=10, choices=FileType.choices)
+    original_filename = models.CharField(max_length=255, blank=True)
+    file_size = models.BigIntegerField(null=True, blank=True)  # En octets
+    # Empreinte perceptuelle 64 bits de l'image du document (apps.documents.phash), stockée signée
+    perceptual_hash = models.BigIntegerField(null=True, blank=True, db_index=True)
+
+    # QR Code et stéganographie
+    qr_code_data = models.TextField(blank=True)  # Données encodées dans QR
+    has_steganography = models.BooleanField(default=False)
+    steganography_method = models.CharField(max_length=50, blank=True)  # DCT, LSB, etc.
+
+    # Statut
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+
+    # Dates
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+    revoked_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='revoked_documents'
+    )
+    revocation_reason = models.TextField(blank=True)
+
+    # Métadonnées additionnelles
+    metadata = models.JSONField(default=dict, blank=True)  # Données contextuelles
+
+    # URL externe (optionnel, si document stocké ailleurs)
+    external_url = models.URLField(blank=True)
+
+    class Meta:
+        db_table = 'signed_documents'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['institution', 'status']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'expires_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['batch', 'batch_index'], name='unique_document_batch_leaf'),
+        ]
+
+    def __str__(self):
+        return f"{self.institution.name} - {self.document_hash[:16]}"
+
+
+class DocumentVerification(models.Model):
+    """Enregistrement de chaque vérification de document"""
+
+    class Method(models.TextChoices):
+        UPLOAD = 'UPLOAD', 'Upload fichier'
+        QR_SCAN = 'QR_SCAN', 'Scan QR code'
+        HASH_INPUT = 'HASH_INPUT', 'Saisie hash manuel'
+        STEGANOGRAPHY = 'STEGANOGRAPHY', 'Extraction stéganographique'
+        API = 'API', 'Vérification API'
+
+    class Result(models.TextChoices):
+        AUTHENTIC = 'AUTHENTIC', 'Authentique'
+        INVALID_SIGNATURE = 'INVALID_SIGNATURE', 'Signature invalide'
+        NOT_FOUND = 'NOT_FOUND', 'Document non trouvé'
+        REVOKED = 'REVOKED', 'Document révoqué'
+        EXPIRED = 'EXPIRED', 'Document expiré'
+        KEY_EXPIRED = 'KEY_EXPIRED', 'Clé expirée'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    document = models.ForeignKey(
+        SignedDocument,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='verifications'
+    )
+
+    # Hash fourni par le vérifieur (peut différer du hash stocké si invalide)
+    provided_hash = models.CharField(max_length=128)
+
+    # Informations vérifieur
+    verifier_ip = models.GenericIPAddressField()
+    verifier_user_agent = models.TextField(blank=True)
+    verifier_country = models.CharField(max_length=2, blank=True)  # GeoIP
+
+    # Méthode et résultat
+    method = models.CharField(max_length=20, choices=Method.choices)
+    result = models.CharField(max_length=30, choices=Result.choices)
+
+    # Timing (heure de la vérification, fournie par l'écriture différée)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+    verification_duration_ms = models.IntegerField(null=True)  # Durée en ms
+
+    # Certificat généré (URL vers PDF)
+    certificate_url = models.URLField(blank=True)
+
+    # Métadonnées
+    details = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        db_table = 'document_verifications'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp']),
+            models.Index(fields=['document', 'timestamp']),
+            models.Index(fields=['provided_hash']),
+            models.Index(fields=['verifier_ip', 'timestamp']),
+            models.Index(fields=['result', 'timestamp']),
+        ]
@@ -0,0 +1,182 @@
+# apps/documents/phash.py
+"""
+Empreintes perceptuelles d'images (64 bits) et index de recherche par
+distance de Hamming.
+
+- phash : DCT 2D d'une vignette 32x32 en niveaux de gris ; bit = coefficient
+  basse fréquence (8x8) supérieur à leur médiane. Robuste au rééchantillonnage,
+  à la compression et aux variations de luminosité d'un rescan ou d'une photo.
+- dhash : signe des différences horizontales d'une vignette 9x8, plus rapide
+  et un peu moins robuste.
+
+Deux images proches ont des empreintes à faible distance de Hamming.
+"""
+import math
+from array import array
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+BITS = 64
+HASH_SIZE = 8  # Côté de la grille de bits
+PHASH_SIZE = HASH_SIZE * 4  # Côté de la vignette dont on prend la DCT
+
+PHASH_PATTERN = r'^[0-9a-fA-F]{16}$'
+
+# Cosinus de la DCT-II, limités aux HASH_SIZE premières fréquences : COS[k][n]
+COS = [
+    [math.cos(math.pi * k * (2 * n + 1) / (2 * PHASH_SIZE)) for n in range(PHASH_SIZE)]
+    for k in range(HASH_SIZE)
+]
+
+
+def load_image(file, size: int = PHASH_SIZE) -> Image.Image:
+    """
+    Ouvre une image en niveaux de gris, redressée selon son orientation EXIF (photos).
+    Un JPEG est décodé directement à échelle réduite (draft) : le coût ne dépend
+    presque plus de la résolution de la photo.
+
+    Raises:
+        ValueError: fichier illisible ou trop grand (bombe de décompression)
+    """
+    try:
+        image = Image.open(file)
+        image.draft('L', (size * 4, size * 4))
+        return ImageOps.exif_transpose(image).convert('L')
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Image illisible: {e}") from e
+
+
+def _bits(values) -> int:
+    code = 0
+    for value in values:
+        code = (code << 1) | bool(value)
+    return code
+
+
+def phash(image: Image.Image) -> int:
+    pixels = list(image.convert('L').resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS).getdata())
+    rows = [pixels[y * PHASH_SIZE:(y + 1) * PHASH_SIZE] for y in range(PHASH_SIZE)]
+    # DCT séparable : colonnes (fréquences verticales k), puis lignes (fréquences horizontales l)
+    columns = [
+        [sum(c * row[x] for c, row in zip(COS[k], rows)) for x in range(PHASH_SIZE)]
+        for k in range(HASH_SIZE)
+    ]
+    coefficients = [sum(c * v for c, v in zip(COS[l], line)) for line in columns for l in range(HASH_SIZE)]
+    ordered = sorted(coefficients)
+    median = (ordered[len(ordered) // 2 - 1] + ordered[len(ordered) // 2]) / 2
+    return _bits(value > median for value in coefficients)
+
+
+def dhash(image: Image.Image) -> int:
+    pixels = list(image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS).getdata())
+    width = HASH_SIZE + 1
+    return _bits(
+        pixels[y * width + x + 1] > pixels[y * width + x] for y in range(HASH_SIZE) for x in range(HASH_SIZE)
+    )
+
+
+ALGORITHMS = {'phash': phash, 'dhash': dhash}
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def to_hex(code: int) -> str:
+    return f"{code:016x}"
+
+
+def to_db(code: int) -> int:
+    """Empreinte non signée -> entier signé 64 bits (BigIntegerField)."""
+    return code - (1 << BITS) if code >= 1 << (BITS - 1) else code
+
+
+def from_db(value: int) -> int:
+    return value & ((1 << BITS) - 1)
+
+
+def hex_to_db(value: Optional[str]) -> Optional[int]:
+    return to_db(int(value, 16)) if value else None
+
+
+@lru_cache(maxsize=None)
+def flip_masks(bits: int, flips: int) -> Tuple[int, ...]:
+    """Masques XOR d'au plus flips bits parmi bits (0 inclus)."""
+    return tuple(
+        sum(1 << position for position in positions)
+        for count in range(flips + 1)
+        for positions in combinations(range(bits), count)
+    )
+
+
+class MultiIndexHash:
+    """
+    Index de recherche par rayon de Hamming (multi-index hashing, Norouzi et al.).
+
+    Chaque empreinte est découpée en CHUNKS sous-chaînes, chacune indexée dans
+    sa propre table. Deux empreintes à distance <= r ont au moins une sous-chaîne
+    à distance <= r // CHUNKS (principe des tiroirs) : la recherche n'examine
+    que les seaux de ces variantes, puis calcule la distance exacte des
+    candidats. Le résultat est exact (rappel de 100 % dans le rayon) et le
+    nombre de candidats examinés croît bien moins vite que la collection.
+    Les ajouts sont incrémentaux.
+    """
+
+    def __init__(self, chunks: int = 4):
+        if BITS % chunks:
+            raise ValueError(f"{BITS} bits ne se découpent pas en {chunks} sous-chaînes")
+        self.chunks = chunks
+        self.chunk_bits = BITS // chunks
+        self.mask = (1 << self.chunk_bits) - 1
+        self.codes = array('Q')
+        self.tables: List[Dict[int, array]] = [{} for _ in range(chunks)]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _parts(self, code: int) -> List[int]:
+        return [(code >> (index * self.chunk_bits)) & self.mask for index in range(self.chunks)]
+
+    def __contains__(self, code: int) -> bool:
+        bucket = self.tables[0].get(code & self.mask, ())
+        return any(self.codes[position] == code for position in bucket)
+
+    def add(self, code: int) -> bool:
+        """Ajoute une empreinte ; False si elle était déjà présente."""
+        if code in self:
+            return False
+        position = len(self.codes)
+        self.codes.append(code)
+        for table, part in zip(self.tables, self._parts(code)):
+            bucket = table.get(part)
+            if bucket is None:
+                table[part] = array('I', (position,))
+            else:
+                bucket.append(position)
+        return True
+
+    def search(self, code: int, radius: int) -> List[Tuple[int, int]]:
+        """Empreintes à distance <= radius : [(empreinte, distance)], les plus proches d'abord."""
+        masks = flip_masks(self.chunk_bits, radius // self.chunks)
+        codes = self.codes
+        seen = set()
+        results = []
+        for table, part in zip(self.tables, self._parts(code)):
+            for mask in masks:
+                for position in table.get(part ^ mask, ()):
+                    if position in seen:
+                        continue
+                    seen.add(position)
+                    distance = (codes[position] ^ code).bit_count()
+                    if distance <= radius:
+                        results.append((codes[position], distance))
+        results.sort(key=lambda result: result[1])
+        return results
+
+    def size_bytes(self) -> int:
+        """Mémoire approximative (tableaux et seaux, hors surcoût des dictionnaires)."""
+        buckets = sum(len(bucket) * bucket.itemsize + 64 for table in self.tables for bucket in table.values())
+        return len(self.codes) * self.codes.itemsize + buckets
@@ -0,0 +1,193 @@
+# apps/documents/rendering.py
+import io
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .models import SignedDocument
+
+DEFAULTS = {
+    # À incrémenter à chaque modification du rendu : les URL versionnées changent
+    'TEMPLATE_VERSION': 1,
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {},
+    'VERIFY_URL': 'http://localhost:8000/api/v1/verify/{document_hash}',
+    'PREGENERATE': True,
+    'QR_BOX_SIZE': 10,
+    'QR_BORDER': 4,
+}
+
+# Type de rendu -> (extension, type MIME)
+KINDS = {
+    'qr': ('png', 'image/png'),
+    'certificate': ('pdf', 'application/pdf'),
+}
+
+
+def generate_verification_qr(document_hash: str, verify_url: str, box_size: int = 10, border: int = 4) -> bytes:
+    """
+    QR code (PNG) de vérification d'un document.
+    Il ne contient que des données immuables pour ce hash (pas le nom de
+    l'institution) : le rendu peut être mis en cache sans limite de durée.
+    """
+    import qrcode
+    from qrcode.constants import ERROR_CORRECT_H
+
+    qr = qrcode.QRCode(version=None, error_correction=ERROR_CORRECT_H, box_size=box_size, border=border)
+    qr.add_data(json.dumps({'hash': document_hash, 'verify_url': verify_url, 'version': '1.0'}, separators=(',', ':')))
+    qr.make(fit=True)
+    output = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(output, format='PNG')
+    return output.getvalue()
+
+
+def generate_verification_certificate(document: SignedDocument, qr_png: bytes, verify_url: str) -> bytes:
+    """
+    Certificat (PDF A4) des informations d'enregistrement d'un document, avec son
+    QR code. Le statut courant n'y figure pas : le certificat est mis en cache
+    durablement et renvoie vers la vérification en ligne.
+    Le rendu est déterministe (invariant) : mêmes données, mêmes octets.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    output = io.BytesIO()
+    c = canvas.Canvas(output, pagesize=A4, invariant=1)
+    c.setTitle(f"Certificat de vérification {document.document_hash[:16]}")
+    width, height = A4
+
+    c.setFont("Helvetica-Bold", 22)
+    c.drawString(50, height - 70, "Certificat de Vérification")
+    c.setFont("Helvetica", 10)
+    c.drawString(50, height - 90, settings.SITE_NAME)
+
+    # (libellé, valeur, chasse fixe)
+    rows = [
+        ("Empreinte SHA-256", document.document_hash, True),
+        ("Institution", document.institution.name, False),
+        ("Signé le", document.created_at.strftime('%d/%m/%Y %H:%M UTC'), False),
+        ("Type de fichier", document.get_file_type_display(), False),
+        ("Algorithme de signature", document.key.get_algorithm_display(), False),
+        ("Empreinte de la clé", document.key.fingerprint[:32], True),
+    ]
+    y = height - 140
+    for label, value, monospace in rows:
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(50, y, f"{label} :")
+        c.setFont(*(("Courier", 9) if monospace else ("Helvetica", 11)))
+        c.drawString(210, y, value)
+        y -= 24
+
+    c.setFont("Helvetica", 11)
+    c.drawString(50, y - 10, "Statut en temps réel (révocation, expiration) : scannez le QR code ou ouvrez")
+    c.setFont("Courier", 9)
+    c.drawString(50, y - 26, verify_url)
+    c.drawImage(ImageReader(io.BytesIO(qr_png)), 50, y - 210, width=160, height=160)
+
+    c.setFont("Helvetica", 8)
+    c.drawString(50, 50, f"Ce certificat a été généré automatiquement par {settings.SITE_NAME}.")
+    c.showPage()
+    c.save()
+    return output.getvalue()
+
+
+class RenderCache:
+    """
+    Cache des rendus (QR codes, certificats) adressé par contenu : un rendu est
+    identifié par (type, hash du document, version du gabarit) et stocké une fois
+    pour toutes dans le stockage configuré (disque ou stockage objet).
+
+    - L'ETag se déduit de la clé, sans lire le fichier : un If-None-Match
+      concordant est servi (304) sans accès au stockage.
+    - Changer de gabarit = incrémenter TEMPLATE_VERSION ; les anciens rendus
+      ne sont plus référencés.
+    - Les rendus sont pré-générés en tâche de fond à l'enregistrement d'un
+      document (apps.documents.tasks) ; un rendu absent est produit à la demande.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    @cached_property
+    def storage(self):
+        return import_string(self.config['STORAGE_BACKEND'])(**self.config['STORAGE_OPTIONS'])
+
+    @property
+    def version(self) -> int:
+        return self.config['TEMPLATE_VERSION']
+
+    def path(self, kind: str, document_hash: str) -> str:
+        extension, _ = KINDS[kind]
+        return f"v{self.version}/{kind}/{document_hash[:2]}/{document_hash}.{extension}"
+
+    def etag(self, kind: str, document_hash: str) -> str:
+        return f'"{kind}-v{self.version}-{document_hash}"'
+
+    def verify_url(self, document_hash: str) -> str:
+        return self.config['VERIFY_URL'].format(document_hash=document_hash)
+
+    def get(self, kind: str, document_hash: str) -> Optional[bytes]:
+        """Rendu déjà stocké, ou None."""
+        try:
+            with self.storage.open(self.path(kind, document_hash), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get_or_render(self, kind: str, document_hash: str) -> Optional[bytes]:
+        """Rendu stocké, ou produit et stocké ; None si le document n'existe pas."""
+        data = self.get(kind, document_hash)
+        if data is not None:
+            return data
+        document = SignedDocument.objects.select_related('institution', 'key').filter(
+            document_hash=document_hash
+        ).first()
+        if document is None:
+            return None
+        rendered = self.render_all(document, missing_only=True)
+        return rendered.get(kind) or self.get(kind, document_hash)
+
+    def render(self, kind: str, document: SignedDocument, qr_png: Optional[bytes] = None) -> bytes:
+        verify_url = self.verify_url(document.document_hash)
+        qr_png = qr_png or generate_verification_qr(
+            document.document_hash, verify_url, self.config['QR_BOX_SIZE'], self.config['QR_BORDER']
+        )
+        if kind == 'qr':
+            return qr_png
+        return generate_verification_certificate(document, qr_png, verify_url)
+
+    def render_all(self, document: SignedDocument, missing_only: bool = False) -> Dict[str, bytes]:
+        """Produit et stocke tous les rendus d'un document (le QR code est réutilisé par le certificat)."""
+        rendered = {}
+        qr_png = self.get('qr', document.document_hash) if missing_only else None
+        for kind in KINDS:
+            if missing_only and self.storage.exists(self.path(kind, document.document_hash)):
+                continue
+            rendered[kind] = self.render(kind, document, qr_png)
+            if kind == 'qr':
+                qr_png = rendered[kind]
+            self.save(kind, document.document_hash, rendered[kind])
+        return rendered
+
+    def save(self, kind: str, document_hash: str, data: bytes) -> None:
+        path = self.path(kind, document_hash)
+        name = self.storage.save(path, ContentFile(data))
+        if name != path:
+            # Rendu concurrent déjà stocké sous ce nom : même contenu, copie inutile
+            self.storage.delete(name)
+
+    def pregenerate(self, document_ids: Iterable) -> int:
+        """Produit les rendus manquants des documents ; retourne le nombre de rendus écrits."""
+        written = 0
+        documents = SignedDocument.objects.select_related('institution', 'key').filter(pk__in=list(document_ids))
+        for document in documents.iterator(chunk_size=500):
+            written += len(self.render_all(document, missing_only=True))
+        return written
+
+
+render_cache = RenderCache(getattr(settings, 'DOCUMENT_RENDERS', None))
@@ -0,0 +1,523 @@
+# apps/documents/revocation.py
+import bisect
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from apps.cryptography.models import CryptographicKey
+
+from .models import SignedDocument
+
+logger = logging.getLogger('app')
+
+META_KEY = 'documents:revocations:meta'
+MANIFEST_NAME = 'manifest.json'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {},
+    'LOCAL_DIR': None,  # Copie locale des instantanés d'un stockage distant (None = répertoire temporaire)
+    'CHECK_INTERVAL': 1.0,
+    'REFRESH_OVERLAP': 60,
+    'CHUNK_SIZE': 5000,
+    'KEEP_VERSIONS': 1440,
+}
+
+# Format binaire (gros-boutiste), commun aux instantanés et aux deltas :
+# en-tête, enregistrements des documents triés (préfixe de 8 octets du hash, statut),
+# puis enregistrements des clés triés (préfixe de 8 octets de l'empreinte, id, statut).
+# Dans un delta, le statut NONE retire l'entrée.
+FORMAT_VERSION = 1
+SNAPSHOT_MAGIC = b'LCRS'
+DELTA_MAGIC = b'LCRD'
+# magic, format, réservé, version, version de base (delta), filigrane (epoch), nb documents, nb clés
+HEADER = struct.Struct('>4sHHQQdII')
+DOCUMENT_RECORD = struct.Struct('>8sB')
+KEY_RECORD = struct.Struct('>8s16sB')
+PREFIX_BYTES = 8
+
+NONE, REVOKED, SUSPENDED = 0, 1, 2
+DOCUMENT_CODES = {SignedDocument.Status.REVOKED: REVOKED, SignedDocument.Status.SUSPENDED: SUSPENDED}
+DOCUMENT_STATUSES = {code: status for status, code in DOCUMENT_CODES.items()}
+KEY_CODES = {CryptographicKey.Status.REVOKED: REVOKED}
+
+DocumentRecord = Tuple[bytes, int]
+KeyRecord = Tuple[bytes, bytes, int]
+
+
+def hash_prefix(value: str) -> bytes:
+    """Préfixe de 8 octets d'un hash hexadécimal (collision entre deux hashes : ~n/2^64)."""
+    return bytes.fromhex(value[:PREFIX_BYTES * 2])
+
+
+def key_prefix(fingerprint: str) -> bytes:
+    try:
+        return hash_prefix(fingerprint)
+    except ValueError:
+        return hashlib.sha256(fingerprint.encode()).digest()[:PREFIX_BYTES]
+
+
+def write_index(fileobj, magic: bytes, version: int, base_version: int, watermark: Optional[datetime],
+                documents: Iterable[DocumentRecord], keys: List[KeyRecord]) -> int:
+    """Écrit un instantané ou un delta (documents triés, éventuellement en flux) ; retourne le nombre de documents."""
+    start = fileobj.tell()
+    fileobj.write(b'\0' * HEADER.size)
+    count = 0
+    for prefix, status in documents:
+        fileobj.write(DOCUMENT_RECORD.pack(prefix, status))
+        count += 1
+    for record in keys:
+        fileobj.write(KEY_RECORD.pack(*record))
+    end = fileobj.tell()
+    fileobj.seek(start)
+    fileobj.write(HEADER.pack(
+        magic, FORMAT_VERSION, 0, version, base_version,
+        watermark.timestamp() if watermark else 0.0, count, len(keys),
+    ))
+    fileobj.seek(end)
+    return count
+
+
+class _Prefixes:
+    """Séquence des préfixes d'une section, pour bisect, sans copie des données."""
+
+    def __init__(self, buffer, offset: int, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self.offset + index * DOCUMENT_RECORD.size
+        return self.buffer[start:start + PREFIX_BYTES]
+
+
+class RevocationSnapshot:
+    """
+    Instantané (ou delta) de l'index de révocation, projeté en mémoire (mmap) :
+    seules les pages consultées sont lues, et partagées entre les processus
+    d'une même machine. Une recherche est une dichotomie sur les préfixes triés.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        (magic, format_version, _, self.version, self.base_version, watermark,
+         self.document_count, self.key_count) = HEADER.unpack_from(buffer)
+        if magic not in (SNAPSHOT_MAGIC, DELTA_MAGIC) or format_version != FORMAT_VERSION:
+            raise ValueError("Fichier d'index de révocation invalide")
+        self.is_delta = magic == DELTA_MAGIC
+        self.watermark = datetime.fromtimestamp(watermark, dt_timezone.utc) if watermark else None
+        self.size_bytes = len(buffer)
+        self._keys_offset = HEADER.size + self.document_count * DOCUMENT_RECORD.size
+        self._prefixes = _Prefixes(buffer, HEADER.size, self.document_count)
+        self.revoked_key_ids = {
+            uuid.UUID(bytes=key_id) for _, key_id, status in self.key_records() if status != NONE
+        }
+
+    @classmethod
+    def open(cls, path: str) -> 'RevocationSnapshot':
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def document_status(self, document_hash: str) -> int:
+        prefix = hash_prefix(document_hash)
+        index = bisect.bisect_left(self._prefixes, prefix)
+        if index < self.document_count and self._prefixes[index] == prefix:
+            return self.buffer[HEADER.size + index * DOCUMENT_RECORD.size + PREFIX_BYTES]
+        return NONE
+
+    def document_records(self) -> Iterator[DocumentRecord]:
+        return DOCUMENT_RECORD.iter_unpack(memoryview(self.buffer)[HEADER.size:self._keys_offset])
+
+    def key_records(self) -> List[KeyRecord]:
+        return list(KEY_RECORD.iter_unpack(self.buffer[self._keys_offset:]))
+
+
+def _merge(old: Iterable[DocumentRecord], changes: List[DocumentRecord], delta: List[DocumentRecord]) -> Iterator[DocumentRecord]:
+    """Applique des changements triés (NONE = retrait) à des enregistrements triés ; les changements effectifs vont dans delta."""
+    changes = iter(changes)
+    change = next(changes, None)
+    for prefix, status in old:
+        while change is not None and change[0] < prefix:
+            if change[1] != NONE:
+                delta.append(change)
+                yield change
+            change = next(changes, None)
+        if change is not None and change[0] == prefix:
+            if change[1] != status:
+                delta.append(change)
+            if change[1] != NONE:
+                yield change
+            change = next(changes, None)
+        else:
+            yield prefix, status
+    while change is not None:
+        if change[1] != NONE:
+            delta.append(change)
+            yield change
+        change = next(changes, None)
+
+
+def _diff(old: Iterable[DocumentRecord], new: Iterable[DocumentRecord]) -> Iterator[DocumentRecord]:
+    """Changements (NONE = retrait) qui transforment des enregistrements triés en d'autres."""
+    old, new = iter(old), iter(new)
+    a, b = next(old, None), next(new, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            yield a[0], NONE
+            a = next(old, None)
+        elif a is None or b[0] < a[0]:
+            yield b
+            b = next(new, None)
+        else:
+            if a[1] != b[1]:
+                yield b
+            a, b = next(old, None), next(new, None)
+
+
+def _key_diff(old: List[KeyRecord], new: List[KeyRecord]) -> List[KeyRecord]:
+    current = {record[:2]: record for record in new}
+    removed = [(prefix, key_id, NONE) for prefix, key_id, _ in old if (prefix, key_id) not in current]
+    return sorted(set(new) - set(old)) + removed
+
+
+class RevocationIndex:
+    """
+    Index des documents révoqués ou suspendus et des clés révoquées, consulté
+    en mémoire par le chemin de vérification et publié pour les vérifieurs hors ligne.
+
+    - Instantané binaire compact et trié (9 octets par document), projeté en
+      mémoire (mmap) par chaque worker : statut en O(log n) sans accès au cache
+      ni à la base, pour des millions de documents.
+    - La tâche Huey périodique (refresh) fusionne dans l'instantané précédent les
+      documents modifiés depuis son filigrane (updated_at), publie une nouvelle
+      version et le delta correspondant ; rebuild() reconstruit depuis la table.
+    - Les versions sont publiées dans le stockage configuré, le manifeste dans
+      le cache partagé (et manifest.json) : un worker charge une nouvelle
+      version au plus CHECK_INTERVAL secondes après sa publication.
+    - Flux de deltas : un client à la version N télécharge delta_since(N), ou
+      l'instantané complet si les deltas intermédiaires ne sont plus conservés.
+
+    Les mises à jour par queryset.update() doivent renseigner updated_at pour
+    être vues du rafraîchissement incrémental. Sans instantané publié, l'index
+    ne répond rien : le statut de l'instantané de vérification fait foi.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.snapshot: Optional[RevocationSnapshot] = None
+        self.meta: Optional[Dict[str, Any]] = None
+        self.hits = 0
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def shared(self):
+        return caches[self.config['ALIAS']]
+
+    @cached_property
+    def storage(self):
+        return import_string(self.config['STORAGE_BACKEND'])(**self.config['STORAGE_OPTIONS'])
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version if self.snapshot is not None else 0
+
+    # ------------------------------------------
+    # Consultation (chemin de vérification)
+    # ------------------------------------------
+
+    def document_status(self, document_hash: str) -> Optional[str]:
+        """Statut (REVOKED, SUSPENDED) d'un document révoqué ou suspendu, sinon None."""
+        snapshot = self._current()
+        if snapshot is None:
+            return None
+        try:
+            code = snapshot.document_status(document_hash)
+        except ValueError:
+            return None
+        if code == NONE:
+            return None
+        self.hits += 1
+        return DOCUMENT_STATUSES[code]
+
+    def key_revoked(self, key_id) -> bool:
+        snapshot = self._current()
+        if snapshot is None or key_id is None:
+            return False
+        return uuid.UUID(str(key_id)) in snapshot.revoked_key_ids
+
+    async def aensure_current(self) -> None:
+        """À appeler depuis une vue async : le contrôle périodique (cache partagé, stockage) passe par un thread."""
+        if self.config['ENABLED'] and time.monotonic() - self._checked_at >= self.config['CHECK_INTERVAL']:
+            await sync_to_async(self._current)()
+
+    def warm(self) -> None:
+        """Charge l'instantané au démarrage d'un worker (appelé depuis wsgi.py / asgi.py)."""
+        self._current()
+
+    def _current(self) -> Optional[RevocationSnapshot]:
+        if not self.config['ENABLED']:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.config['CHECK_INTERVAL']:
+            try:
+                self._ensure_current(now)
+            except Exception as e:
+                logger.error(f"Index de révocation indisponible: {e}", exc_info=True)
+        return self.snapshot
+
+    def _ensure_current(self, now: float) -> None:
+        with self._lock:
+            if now - self._checked_at < self.config['CHECK_INTERVAL']:
+                return
+            self._checked_at = now
+            meta = self.read_meta(fallback=self.snapshot is None)
+            if meta is not None and meta['version'] > self.version:
+                self._load(meta)
+
+    def _load(self, meta: Dict[str, Any]) -> None:
+        self.snapshot = RevocationSnapshot.open(self._local_path(meta['snapshot']))
+        self.meta = meta
+        logger.info(
+            f"Index de révocation v{self.snapshot.version} chargé "
+            f"({self.snapshot.document_count} documents, {self.snapshot.key_count} clés)"
+        )
+
+    def _local_path(self, name: str) -> str:
+        try:
+            return self.storage.path(name)
+        except NotImplementedError:
+            # Stockage distant : copie locale, projetée en mémoire
+            local_dir = self.config['LOCAL_DIR'] or os.path.join(tempfile.gettempdir(), 'revocations')
+            os.makedirs(local_dir, exist_ok=True)
+            path = os.path.join(local_dir, os.path.basename(name))
+            if not os.path.exists(path):
+                with self.storage.open(name, 'rb') as source, tempfile.NamedTemporaryFile(dir=local_dir, delete=False) as f:
+                    for chunk in source.chunks():
+                        f.write(chunk)
+                os.replace(f.name, path)
+            return path
+
+    def read_meta(self, fallback: bool = True) -> Optional[Dict[str, Any]]:
+        """Manifeste de la version publiée : cache partagé, sinon manifest.json du stockage."""
+        meta = self.shared.get(META_KEY)
+        if meta is None and fallback and self.storage.exists(MANIFEST_NAME):
+            with self.storage.open(MANIFEST_NAME, 'rb') as f:
+                meta = json.load(f)
+            meta['watermark'] = datetime.fromisoformat(meta['watermark']) if meta['watermark'] else None
+            self.shared.set(META_KEY, meta, None)
+        return meta
+
+    # ------------------------------------------
+    # Construction et publication (tâches Huey)
+    # ------------------------------------------
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Reconstruit l'index depuis les tables et le publie, avec le delta depuis la version précédente."""
+        with self._lock:
+            previous, _ = self._published()
+            watermark = SignedDocument.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+            rows = SignedDocument.objects.filter(status__in=list(DOCUMENT_CODES)).order_by(
+                'document_hash'
+            ).values_list('document_hash', 'status').iterator(chunk_size=self.config['CHUNK_SIZE'])
+            documents = self._document_records(rows)
+            return self._publish(previous, watermark, documents, diff=True)
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fusionne dans l'index publié les documents modifiés depuis son filigrane."""
+        with self._lock:
+            previous, meta = self._published()
+            if previous is None or meta.get('watermark') is None:
+                return self.rebuild()
+
+            overlap = timedelta(seconds=self.config['REFRESH_OVERLAP'])
+            watermark = meta['watermark']
+            changes: Dict[bytes, int] = {}
+            rows = SignedDocument.objects.order_by().filter(updated_at__gte=watermark - overlap).values_list(
+                'document_hash', 'status', 'updated_at'
+            ).iterator(chunk_size=self.config['CHUNK_SIZE'])
+            for document_hash, status, updated_at in rows:
+                try:
+                    changes[hash_prefix(document_hash)] = DOCUMENT_CODES.get(status, NONE)
+                except ValueError:
+                    continue
+                watermark = max(watermark, updated_at)
+
+            delta: List[DocumentRecord] = []
+            documents = _merge(previous.document_records(), sorted(changes.items()), delta)
+            return self._publish(previous, watermark, documents, delta=delta)
+
+    def _published(self) -> Tuple[Optional[RevocationSnapshot], Optional[Dict[str, Any]]]:
+        meta = self.read_meta()
+        if meta is not None and meta['version'] > self.version:
+            self._load(meta)
+        return self.snapshot, meta
+
+    @staticmethod
+    def _document_records(rows) -> Iterator[DocumentRecord]:
+        for document_hash, status in rows:
+            try:
+                yield hash_prefix(document_hash), DOCUMENT_CODES[status]
+            except ValueError:
+                logger.warning(f"Hash non hexadécimal ignoré par l'index de révocation: {document_hash[:16]}")
+
+    @staticmethod
+    def _key_records() -> List[KeyRecord]:
+        keys = CryptographicKey.objects.filter(status__in=list(KEY_CODES)).values_list('pk', 'fingerprint', 'status')
+        return sorted((key_prefix(fingerprint), pk.bytes, KEY_CODES[status]) for pk, fingerprint, status in keys)
+
+    def _publish(self, previous: Optional[RevocationSnapshot], watermark, documents: Iterable[DocumentRecord],
+                 delta: Optional[List[DocumentRecord]] = None, diff: bool = False) -> Dict[str, Any]:
+        started = time.perf_counter()
+        meta = self.read_meta() or {'version': 0, 'deltas': {}}
+        version = meta['version'] + 1
+        keys = self._key_records()
+        old_keys = previous.key_records() if previous is not None else []
+        key_delta = _key_diff(old_keys, keys)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            snapshot_path = os.path.join(workdir, 'snapshot.bin')
+            with open(snapshot_path, 'w+b') as f:
+                write_index(f, SNAPSHOT_MAGIC, version, 0, watermark, documents, keys)
+            if diff:
+                delta = list(_diff(
+                    previous.document_records() if previous is not None else [],
+                    RevocationSnapshot.open(snapshot_path).document_records(),
+                ))
+
+            if previous is not None and not delta and not key_delta:
+                # Rien de nouveau : seul le filigrane avance
+                meta['watermark'] = watermark
+                self._write_meta(meta)
+                self.meta = meta
+                return meta
+
+            with open(snapshot_path, 'rb') as f:
+                snapshot_name = self.storage.save(f"snapshots/revocations-v{version}.bin", File(f))
+            deltas = dict(meta.get('deltas', {}))
+            if previous is not None:
+                delta_file = io.BytesIO()
+                write_index(delta_file, DELTA_MAGIC, version, previous.version, watermark, delta, key_delta)
+                deltas[str(version)] = self.storage.save(f"deltas/revocations-v{version}.bin", ContentFile(delta_file.getvalue()))
+
+        new = RevocationSnapshot.open(self._local_path(snapshot_name))
+        meta = {
+            'version': version,
+            'snapshot': snapshot_name,
+            'previous_snapshot': meta.get('snapshot'),
+            'deltas': self._prune(meta, deltas, version),
+            'watermark': watermark,
+            'built_at': timezone.now().isoformat(),
+            'build_seconds': round(time.perf_counter() - started, 3),
+            'documents': new.document_count,
+            'keys': new.key_count,
+            'size_bytes': new.size_bytes,
+        }
+        self._write_meta(meta)
+        self.snapshot, self.meta = new, meta
+        logger.info(
+            f"Index de révocation v{version} publié: {new.document_count} documents, {new.key_count} clés, "
+            f"{len(delta or [])} changements, {meta['build_seconds']}s"
+        )
+        return meta
+
+    def _prune(self, meta: Dict[str, Any], deltas: Dict[str, str], version: int) -> Dict[str, str]:
+        """
+        Supprime les versions trop anciennes : les instantanés sauf les deux derniers
+        (un téléchargement peut être en cours), les deltas au-delà de KEEP_VERSIONS.
+        """
+        if meta.get('previous_snapshot'):
+            self.storage.delete(meta['previous_snapshot'])
+        kept = {}
+        for delta_version, name in deltas.items():
+            if int(delta_version) > version - self.config['KEEP_VERSIONS']:
+                kept[delta_version] = name
+            else:
+                self.storage.delete(name)
+        return kept
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        self.shared.set(META_KEY, meta, None)
+        manifest = {**meta, 'watermark': meta['watermark'].isoformat() if meta['watermark'] else None}
+        self.storage.delete(MANIFEST_NAME)
+        self.storage.save(MANIFEST_NAME, ContentFile(json.dumps(manifest).encode()))
+
+    # ------------------------------------------
+    # Flux publié (téléchargement)
+    # ------------------------------------------
+
+    def snapshot_name(self, version: int) -> Optional[str]:
+        meta = self.read_meta()
+        if meta is None or meta['version'] != version:
+            return None
+        return meta['snapshot']
+
+    def delta_since(self, since: int) -> Optional[bytes]:
+        """
+        Delta cumulé de la version since à la version courante (dernier statut
+        connu par entrée), ou None si un delta intermédiaire n'est plus conservé.
+        """
+        meta = self.read_meta()
+        if meta is None or since > meta['version'] or since < 0:
+            return None
+        documents: Dict[bytes, int] = {}
+        keys: Dict[Tuple[bytes, bytes], int] = {}
+        for version in range(since + 1, meta['version'] + 1):
+            name = meta['deltas'].get(str(version))
+            if name is None:
+                return None
+            with self.storage.open(name, 'rb') as f:
+                delta = RevocationSnapshot(f.read())
+            documents.update(delta.document_records())
+            keys.update(((prefix, key_id), status) for prefix, key_id, status in delta.key_records())
+        output = io.BytesIO()
+        write_index(
+            output, DELTA_MAGIC, meta['version'], since, meta['watermark'],
+            sorted(documents.items()), sorted((prefix, key_id, status) for (prefix, key_id), status in keys.items()),
+        )
+        return output.getvalue()
+
+    # ------------------------------------------
+    # Métriques
+    # ------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {'loaded': False}
+        return {
+            'loaded': True,
+            'version': snapshot.version,
+            'documents': snapshot.document_count,
+            'keys': snapshot.key_count,
+            'size_bytes': snapshot.size_bytes,
+            'watermark': snapshot.watermark,
+            'hits': self.hits,
+        }
+
+
+revocation_index = RevocationIndex(getattr(settings, 'REVOCATION_INDEX', None))
@@ -0,0 +1,97 @@
+# apps/documents/schemas.py
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from django.conf import settings
+from ninja import Schema
+from pydantic import Field
+
+from apps.verifications.schemas import SHA256_PATTERN
+
+from .models import SignedDocument
+from .phash import PHASH_PATTERN
+
+
+class HashFilterStatsSchema(Schema):
+    loaded: bool
+    version: Optional[int] = None
+    count: Optional[int] = None
+    capacity: Optional[int] = None
+    size_bytes: Optional[int] = None
+    num_hashes: Optional[int] = None
+    estimated_fp_rate: Optional[float] = None
+    build_seconds: Optional[float] = None
+    built_at: Optional[datetime] = None
+    checks: Optional[int] = None
+    rejections: Optional[int] = None
+
+
+class DocumentDigestSchema(Schema):
+    file_name: str
+    content_type: Optional[str] = None
+    size: int
+    digests: Dict[str, str]
+
+
+class RevocationIndexSchema(Schema):
+    version: int
+    format: int
+    watermark: Optional[datetime] = None
+    built_at: datetime
+    documents: int
+    keys: int
+    size_bytes: int
+    snapshot_url: str
+    delta_url: str
+    oldest_delta_base: Optional[int] = None
+
+
+class BulkDocumentRecordSchema(Schema):
+    """
+    Une ligne du flux NDJSON d'enregistrement en masse (POST /documents/bulk).
+    La clé de signature est désignée par key_id ou par key_fingerprint.
+    """
+    document_hash: str = Field(..., pattern=SHA256_PATTERN)
+    signature: str = Field(..., min_length=1, max_length=4096)
+    key_id: Optional[UUID] = None
+    key_fingerprint: Optional[str] = Field(None, max_length=128)
+    file_type: SignedDocument.FileType
+    original_filename: str = Field('', max_length=255)
+    file_size: Optional[int] = Field(None, ge=0)
+    perceptual_hash: Optional[str] = Field(None, pattern=PHASH_PATTERN)  # 64 bits en hexadécimal
+    expires_at: Optional[datetime] = None
+    metadata: Dict[str, Any] = {}
+
+
+
+class BatchDocumentSchema(Schema):
+    """Un document d'un lot signé par sa racine de Merkle."""
+    document_hash: str = Field(..., pattern=SHA256_PATTERN)
+    file_type: SignedDocument.FileType
+    original_filename: str = Field('', max_length=255)
+    file_size: Optional[int] = Field(None, ge=0)
+    perceptual_hash: Optional[str] = Field(None, pattern=PHASH_PATTERN)  # 64 bits en hexadécimal
+    expires_at: Optional[datetime] = None
+    metadata: Dict[str, Any] = {}
+
+
+class DocumentBatchSchema(Schema):
+    """
+    Lot de documents (POST /documents/batches) : les feuilles de l'arbre sont les
+    hashes, dans l'ordre de documents ; signature porte sur la racine (hexadécimal).
+    La clé de signature est désignée par key_id ou par key_fingerprint.
+    """
+    key_id: Optional[UUID] = None
+    key_fingerprint: Optional[str] = Field(None, max_length=128)
+    merkle_root: Optional[str] = Field(None, pattern=SHA256_PATTERN)
+    signature: str = Field(..., min_length=1, max_length=4096)
+    documents: List[BatchDocumentSchema] = Field(..., min_length=1, max_length=settings.DOCUMENT_BATCHES['MAX_SIZE'])
+
+
+class DocumentBatchResultSchema(Schema):
+    id: UUID
+    merkle_root: str
+    leaf_count: int
+    key_id: UUID
+    created_at: datetime
@@ -0,0 +1,66 @@
+# apps/documents/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import Signal, receiver
+
+from .hash_filter import document_filter
+from .models import SignedDocument
+from .rendering import render_cache
+from .similarity import perceptual_index
+from .tasks import pregenerate_document_renders
+
+# Documents insérés en masse (apps.documents.ingest), sans post_save : envoyé avec documents=[SignedDocument]
+documents_registered = Signal()
+
+
+@receiver(post_save, sender=SignedDocument)
+def register_document_hash(sender, instance: SignedDocument, created: bool, **kwargs):
+    """
+    Rend un nouveau document immédiatement visible du filtre de hashes. Les autres
+    workers ne sont prévenus qu'après la validation : ils relisent les documents en base.
+    """
+    if created:
+        document_filter.add(instance.document_hash)
+        transaction.on_commit(document_filter.notify_new_documents)
+
+
+@receiver(post_save, sender=SignedDocument)
+def index_perceptual_hash(sender, instance: SignedDocument, created: bool, **kwargs):
+    """Rend l'empreinte perceptuelle d'un nouveau document consultable dès sa validation."""
+    if created:
+        perceptual_hash = instance.perceptual_hash
+        transaction.on_commit(lambda: perceptual_index.add(perceptual_hash))
+
+
+@receiver(post_save, sender=SignedDocument)
+def schedule_document_renders(sender, instance: SignedDocument, created: bool, **kwargs):
+    """Planifie le rendu du QR code et du certificat d'un nouveau document."""
+    if created and render_cache.config['PREGENERATE']:
+        document_id = str(instance.pk)
+        transaction.on_commit(lambda: pregenerate_document_renders([document_id]))
+
+
+@receiver(documents_registered)
+def register_document_hashes(sender, documents, **kwargs):
+    """Équivalent de register_document_hash pour une insertion en masse."""
+    for document in documents:
+        document_filter.add(document.document_hash)
+    transaction.on_commit(document_filter.notify_new_documents)
+
+
+@receiver(documents_registered)
+def index_perceptual_hashes(sender, documents, **kwargs):
+    perceptual_hashes = [document.perceptual_hash for document in documents]
+
+    def add():
+        for perceptual_hash in perceptual_hashes:
+            perceptual_index.add(perceptual_hash)
+    transaction.on_commit(add)
+
+
+@receiver(documents_registered)
+def schedule_bulk_document_renders(sender, documents, **kwargs):
+    """Une seule tâche de rendu par lot de documents insérés en masse."""
+    if render_cache.config['PREGENERATE']:
+        document_ids = [str(document.pk) for document in documents]
+        transaction.on_commit(lambda: pregenerate_document_renders(document_ids))
@@ -0,0 +1,175 @@
+# apps/documents/similarity.py
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .hash_filter import GENERATION_KEY
+from .models import SignedDocument
+from .phash import ALGORITHMS, MultiIndexHash, from_db, load_image, to_db
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'ALGORITHM': 'phash',
+    'RADIUS': 10,
+    'CHUNKS': 4,
+    'MAX_CANDIDATES': 10,
+    'MAX_IMAGE_SIZE': 20 * 1024 * 1024,
+    'CHECK_INTERVAL': 1.0,
+    'REFRESH_OVERLAP': 60,
+    'CHUNK_SIZE': 5000,
+}
+
+
+class PerceptualIndex:
+    """
+    Index des empreintes perceptuelles des documents (SignedDocument.perceptual_hash),
+    pour retrouver l'original d'un rescan ou d'une photo (POST /api/v1/verify/similar).
+
+    - Chaque processus charge l'index (MultiIndexHash) au premier usage, puis
+      n'ajoute que les documents créés depuis son filigrane (created_at), quand
+      la génération partagée du filtre de hashes a changé (au plus une fois par
+      CHECK_INTERVAL). Les documents enregistrés dans le processus sont ajoutés
+      directement par les signaux.
+    - L'index ne contient que les empreintes ; les documents correspondants
+      sont lus en base, par une requête indexée sur perceptual_hash.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.index: Optional[MultiIndexHash] = None
+        self.watermark = None
+        self.build_seconds: Optional[float] = None
+        self.searches = 0
+        self._generation = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def shared(self):
+        return caches[self.config['ALIAS']]
+
+    # ------------------------------------------
+    # Recherche
+    # ------------------------------------------
+
+    def fingerprint(self, file) -> int:
+        """
+        Empreinte (ALGORITHM) d'une image envoyée.
+
+        Raises:
+            ValueError: image illisible
+        """
+        return ALGORITHMS[self.config['ALGORITHM']](load_image(file))
+
+    def search(self, code: int, radius: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Empreintes indexées à distance <= radius : [(empreinte, distance)], les plus proches d'abord."""
+        if not self.config['ENABLED']:
+            return []
+        self._ensure_current()
+        self.searches += 1
+        return self.index.search(code, self.config['RADIUS'] if radius is None else radius)
+
+    def find(self, code: int, radius: Optional[int] = None, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Documents candidats : [(document_hash, distance)], au plus limit (MAX_CANDIDATES)."""
+        limit = limit or self.config['MAX_CANDIDATES']
+        distances = dict(self.search(code, radius)[:limit])
+        if not distances:
+            return []
+        rows = SignedDocument.objects.order_by().filter(
+            perceptual_hash__in=[to_db(candidate) for candidate in distances]
+        ).values_list('document_hash', 'perceptual_hash')
+        candidates = [(document_hash, distances[from_db(value)]) for document_hash, value in rows]
+        candidates.sort(key=lambda candidate: (candidate[1], candidate[0]))
+        return candidates[:limit]
+
+    def add(self, value: Optional[int]) -> None:
+        """Ajoute l'empreinte (valeur en base) d'un document enregistré dans ce processus."""
+        index = self.index
+        if index is not None and value is not None:
+            with self._lock:
+                index.add(from_db(value))
+
+    def warm(self) -> None:
+        """Charge l'index au démarrage d'un worker."""
+        if not self.config['ENABLED']:
+            return
+        try:
+            self._ensure_current()
+        except Exception as e:
+            logger.error(f"Préchargement de l'index perceptuel impossible: {e}", exc_info=True)
+
+    # ------------------------------------------
+    # Construction et mise à jour
+    # ------------------------------------------
+
+    def _ensure_current(self) -> None:
+        now = time.monotonic()
+        if self.index is not None and now - self._checked_at < self.config['CHECK_INTERVAL']:
+            return
+        with self._lock:
+            if self.index is not None and now - self._checked_at < self.config['CHECK_INTERVAL']:
+                return
+            self._checked_at = now
+            generation = self.shared.get(GENERATION_KEY, 0)
+            if self.index is None:
+                self.index = self.build()
+            elif generation != self._generation:
+                self._refresh_from_db(self.index)
+            self._generation = generation
+
+    def build(self) -> MultiIndexHash:
+        """Construit l'index complet à partir de la table des documents."""
+        started = time.perf_counter()
+        index = MultiIndexHash(self.config['CHUNKS'])
+        self.watermark = None
+        self._refresh_from_db(index)
+        self.build_seconds = time.perf_counter() - started
+        logger.info(
+            f"Index perceptuel construit: {len(index)} empreintes, "
+            f"{index.size_bytes()} octets, {self.build_seconds:.2f}s"
+        )
+        return index
+
+    def _refresh_from_db(self, index: MultiIndexHash) -> int:
+        queryset = SignedDocument.objects.order_by().filter(perceptual_hash__isnull=False)
+        if self.watermark is not None:
+            # Recouvrement : une transaction validée tardivement peut porter un created_at antérieur
+            overlap = timedelta(seconds=self.config['REFRESH_OVERLAP'])
+            queryset = queryset.filter(created_at__gte=self.watermark - overlap)
+        added = 0
+        watermark = self.watermark
+        rows = queryset.values_list('perceptual_hash', 'created_at').iterator(chunk_size=self.config['CHUNK_SIZE'])
+        for value, created_at in rows:
+            if index.add(from_db(value)):
+                added += 1
+            if watermark is None or created_at > watermark:
+                watermark = created_at
+        self.watermark = watermark
+        return added
+
+    # ------------------------------------------
+    # Métriques
+    # ------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        index = self.index
+        if index is None:
+            return {'loaded': False}
+        return {
+            'loaded': True,
+            'count': len(index),
+            'size_bytes': index.size_bytes(),
+            'build_seconds': self.build_seconds,
+            'searches': self.searches,
+        }
+
+
+perceptual_index = PerceptualIndex(getattr(settings, 'PERCEPTUAL_INDEX', None))
@@ -0,0 +1,264 @@
+# apps/documents/steganography.py
+"""
+Signature cachée dans l'image d'un document (DCT par blocs 8x8, architecture § 11.3).
+
+Chaque bloc 8x8 de la luminance porte un bit, par modulation d'indice de
+quantification (QIM) d'un coefficient DCT de moyenne fréquence : le
+coefficient est déplacé sur la grille de pas STEP (bit 0) ou sur la grille
+décalée d'un demi-pas (bit 1).
+
+La DCT 8x8 étant orthonormée, un seul coefficient par bloc se calcule (et se
+modifie) par deux produits séparables sur le tableau de l'image entière, sans
+transformer les 64 coefficients ni parcourir les blocs en Python.
+
+Disposition : un bloc sur HEADER_STRIDE porte l'en-tête (MAGIC, longueur), les
+autres portent la charge (données + CRC32), répétées sur toute l'image ; la
+lecture somme des votes pondérés par la distance à chaque grille. Le marquage
+résiste à la recompression JPEG et aux retouches locales, pas au recadrage ni
+au redimensionnement (la grille des blocs est perdue).
+"""
+import base64
+import io
+import logging
+import multiprocessing
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from PIL import Image, ImageOps
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'STEP': 24.0,  # Pas de quantification (robustesse contre visibilité)
+    'COEFFICIENT': (2, 3),  # Fréquences (verticale, horizontale) du coefficient marqué
+    'HEADER_STRIDE': 8,  # Un bloc sur HEADER_STRIDE porte l'en-tête
+    'MIN_REPETITIONS': 5,  # Copies minimales de chaque bit de la charge
+    'ITERATIONS': 3,  # Corrections après écrêtage aux pixels saturés (fond blanc)
+    'WORKERS': None,  # Processus des traitements par lot (None = nombre de cœurs)
+    'MAX_IMAGE_SIZE': 40 * 1024 * 1024,  # Octets
+    'PNG_COMPRESS_LEVEL': 1,
+}
+
+BLOCK = 8
+MAGIC = 0xD75E
+HEADER_BITS = 32  # MAGIC (16 bits) + longueur de la charge en octets (16 bits)
+PAYLOAD_VERSION = 1
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# Matrice de la DCT-II orthonormée 8x8 : DCT[k, n]
+DCT = np.array([
+    [np.sqrt((1 if k == 0 else 2) / BLOCK) * np.cos(np.pi * (2 * n + 1) * k / (2 * BLOCK)) for n in range(BLOCK)]
+    for k in range(BLOCK)
+], dtype=np.float32)
+
+
+# ----------------------------------------------------------------------
+# Coefficients par blocs (tableaux numpy de l'image entière)
+# ----------------------------------------------------------------------
+
+def block_coefficients(luma: np.ndarray, coefficient: Tuple[int, int]) -> np.ndarray:
+    """Coefficient (u, v) de la DCT de chaque bloc 8x8 complet : tableau (lignes, colonnes) de blocs."""
+    u, v = coefficient
+    rows, columns = luma.shape[0] // BLOCK, luma.shape[1] // BLOCK
+    blocks = luma[:rows * BLOCK, :columns * BLOCK].reshape(rows, BLOCK, columns, BLOCK)
+    # Σ_i Σ_j DCT[u, i] · X[i, j] · DCT[v, j], colonnes puis lignes
+    return np.tensordot(blocks @ DCT[v], DCT[u], axes=([1], [0]))
+
+
+def _block_pattern(deltas: np.ndarray, coefficient: Tuple[int, int]) -> np.ndarray:
+    """Variation des pixels qui ajoute deltas au coefficient de chaque bloc (base DCT orthonormée)."""
+    u, v = coefficient
+    basis = np.outer(DCT[u], DCT[v])
+    rows, columns = deltas.shape
+    return (deltas[:, None, :, None] * basis[None, :, None, :]).reshape(rows * BLOCK, columns * BLOCK)
+
+
+def _luma(pixels: np.ndarray) -> np.ndarray:
+    return pixels @ LUMA if pixels.ndim == 3 else pixels
+
+
+def _layout(block_count: int, stride: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Blocs de l'en-tête (un sur stride) et rang du bit d'en-tête porté par chacun d'eux."""
+    index = np.arange(block_count)
+    header = index % stride == 0
+    return header, (index[header] // stride) % HEADER_BITS
+
+
+def _to_bits(data: bytes) -> np.ndarray:
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+
+def _votes(scores: np.ndarray, positions: np.ndarray, size: int) -> np.ndarray:
+    """Décision par bit : somme des votes pondérés (+1 = grille du bit 0, -1 = grille du bit 1)."""
+    return (np.bincount(positions, weights=scores, minlength=size) < 0).astype(np.uint8)
+
+
+def embed_signature_dct(image: Image.Image, data: bytes, config: Optional[Dict[str, Any]] = None) -> Image.Image:
+    """
+    Retourne une copie de l'image portant data (au plus 65535 octets) dans ses coefficients DCT.
+
+    Raises:
+        ValueError: image trop petite pour MIN_REPETITIONS copies de la charge
+    """
+    config = {**DEFAULTS, **(config or {})}
+    step, coefficient, stride = config['STEP'], tuple(config['COEFFICIENT']), config['HEADER_STRIDE']
+    image = ImageOps.exif_transpose(image)
+    mode = 'L' if image.mode in ('1', 'L', 'LA', 'I', 'I;16') else 'RGB'
+    # Conversion depuis la vue uint8 : np.asarray(image, dtype=float32) passe par un chemin lent
+    pixels = np.asarray(image.convert(mode)).astype(np.float32)
+
+    frame = data + struct.pack('>I', zlib.crc32(data))
+    payload = _to_bits(frame)
+    rows, columns = pixels.shape[0] // BLOCK, pixels.shape[1] // BLOCK
+    header, header_positions = _layout(rows * columns, stride)
+    # Blocs de la charge : bits de la trame, répétés
+    payload_positions = np.arange(rows * columns - header_positions.size) % payload.size
+    if payload_positions.size < payload.size * config['MIN_REPETITIONS']:
+        raise ValueError(
+            f"Image trop petite ({image.width}x{image.height}) pour {len(data)} octets "
+            f"répétés {config['MIN_REPETITIONS']} fois"
+        )
+
+    bits = np.empty(rows * columns, dtype=np.float32)
+    bits[header] = _to_bits(struct.pack('>HH', MAGIC, len(frame)))[header_positions]
+    bits[~header] = payload[payload_positions]
+    bits = bits.reshape(rows, columns)
+
+    # Point le plus proche de la grille du bit : pas STEP, décalée d'un demi-pas pour 1
+    dither = bits * (step / 2)
+    coefficients = block_coefficients(_luma(pixels), coefficient)
+    targets = step * np.round((coefficients - dither) / step) + dither
+
+    area = (slice(0, rows * BLOCK), slice(0, columns * BLOCK))
+    for _ in range(config['ITERATIONS']):
+        pattern = _block_pattern(targets - coefficients, coefficient)
+        # Même variation sur chaque canal : la luminance varie d'autant
+        pixels[area] += pattern[:, :, None] if pixels.ndim == 3 else pattern
+        np.clip(pixels, 0, 255, out=pixels)
+        coefficients = block_coefficients(_luma(pixels), coefficient)
+        # Écart résiduel dû à l'écrêtage seulement : inutile de corriger en deçà de STEP / 8
+        if np.abs(targets - coefficients).max() < step / 8:
+            break
+    pixels += 0.5
+    return Image.fromarray(pixels.astype(np.uint8), mode)
+
+
+def extract_signature_dct(image: Image.Image, config: Optional[Dict[str, Any]] = None) -> Optional[bytes]:
+    """Données portées par l'image (None si aucune charge intacte n'est détectée)."""
+    config = {**DEFAULTS, **(config or {})}
+    step, coefficient, stride = config['STEP'], tuple(config['COEFFICIENT']), config['HEADER_STRIDE']
+    if image.format == 'JPEG':
+        # Décodage de la seule luminance, sans conversion de couleurs
+        image.draft('L', image.size)
+    luma = np.asarray(image.convert('L')).astype(np.float32)
+    # Vote : +1 sur la grille du bit 0, -1 sur celle du bit 1
+    scores = np.cos(2 * np.pi * block_coefficients(luma, coefficient).ravel() / step)
+
+    header, header_positions = _layout(scores.size, stride)
+    if header_positions.size < HEADER_BITS:
+        return None
+    magic, length = struct.unpack('>HH', np.packbits(_votes(scores[header], header_positions, HEADER_BITS)).tobytes())
+    payload_scores = scores[~header]
+    if magic != MAGIC or length <= 4 or payload_scores.size < length * 8:
+        return None
+    positions = np.arange(payload_scores.size) % (length * 8)
+    frame = np.packbits(_votes(payload_scores, positions, length * 8)).tobytes()
+    data, checksum = frame[:-4], struct.unpack('>I', frame[-4:])[0]
+    return data if zlib.crc32(data) == checksum else None
+
+
+# ----------------------------------------------------------------------
+# Charge : hash du document et signature
+# ----------------------------------------------------------------------
+
+def pack_payload(document_hash: str, signature: str) -> bytes:
+    """Version, hash SHA-256 (32 octets) et signature brute (base64 décodée, éventuellement vide)."""
+    return bytes([PAYLOAD_VERSION]) + bytes.fromhex(document_hash) + base64.b64decode(signature or '')
+
+
+def unpack_payload(data: bytes) -> Optional[Tuple[str, str]]:
+    """(document_hash, signature en base64) ou None si la charge est d'une autre version."""
+    if len(data) < 33 or data[0] != PAYLOAD_VERSION:
+        return None
+    return data[1:33].hex(), base64.b64encode(data[33:]).decode()
+
+
+# Fonctions des processus de travail : octets en entrée et en sortie (pas de tableaux à transférer)
+
+def _embed_file(content: bytes, data: bytes, config: Dict[str, Any]) -> bytes:
+    marked = embed_signature_dct(Image.open(io.BytesIO(content)), data, config)
+    output = io.BytesIO()
+    marked.save(output, 'PNG', compress_level=config['PNG_COMPRESS_LEVEL'])
+    return output.getvalue()
+
+
+def _extract_file(content: bytes, config: Dict[str, Any]) -> Optional[bytes]:
+    try:
+        return extract_signature_dct(Image.open(io.BytesIO(content)), config)
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        return None
+
+
+class DocumentSteganography:
+    """
+    Marquage des images de documents par leur hash et leur signature, et lecture
+    de ce marquage à la vérification (POST /api/v1/verify/steganography).
+
+    Une image isolée est traitée dans le processus appelant (la lecture d'une
+    photo de 12 Mpx reste dans le budget d'une vérification) ; les lots sont
+    répartis sur un pool de processus, image par image.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+
+    def embed(self, content: bytes, document_hash: str, signature: str) -> bytes:
+        """
+        Image PNG marquée à partir du contenu d'une image.
+
+        Raises:
+            ValueError: image illisible ou trop petite
+        """
+        try:
+            return _embed_file(content, pack_payload(document_hash, signature), self.config)
+        except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+            raise ValueError(f"Image illisible: {e}") from e
+
+    def extract(self, content: bytes) -> Optional[Tuple[str, str]]:
+        """(document_hash, signature) portés par l'image, ou None."""
+        started = time.perf_counter()
+        data = _extract_file(content, self.config)
+        logger.debug(f"Extraction stéganographique: {time.perf_counter() - started:.3f}s")
+        return unpack_payload(data) if data is not None else None
+
+    def embed_many(self, items: List[Tuple[bytes, str, str]], workers: Optional[int] = None) -> List[bytes]:
+        """embed pour chaque (contenu, document_hash, signature), en parallèle, dans l'ordre."""
+        with self._pool(workers) as pool:
+            return list(pool.map(
+                _embed_file,
+                [content for content, _, _ in items],
+                [pack_payload(document_hash, signature) for _, document_hash, signature in items],
+                [self.config] * len(items),
+            ))
+
+    def extract_many(self, contents: List[bytes], workers: Optional[int] = None) -> List[Optional[Tuple[str, str]]]:
+        """extract pour chaque image, en parallèle, dans l'ordre."""
+        with self._pool(workers) as pool:
+            results = pool.map(_extract_file, contents, [self.config] * len(contents))
+            return [unpack_payload(data) if data is not None else None for data in results]
+
+    def _pool(self, workers: Optional[int]) -> ProcessPoolExecutor:
+        # spawn : pas de copie de l'état du processus web (connexions, threads)
+        return ProcessPoolExecutor(
+            max_workers=workers or self.config['WORKERS'] or os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+
+
+document_steganography = DocumentSteganography(getattr(settings, 'DOCUMENT_STEGANOGRAPHY', None))
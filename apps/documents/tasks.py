@@ -0,0 +1,66 @@
+# apps/documents/tasks.py
+import logging
+
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task, db_task, lock_task
+
+from apps.core.queues import PRIORITY_BULK, PRIORITY_DEFAULT
+
+from .hash_filter import document_filter
+from .rendering import render_cache
+from .revocation import revocation_index
+
+logger = logging.getLogger('app')
+
+
+# ==========================================
+# TÂCHES HUEY (BACKGROUND TASKS)
+# ==========================================
+
+@db_periodic_task(crontab(minute='*'), priority=PRIORITY_DEFAULT)
+def refresh_document_filter():
+    """
+    Ajoute au filtre de hashes publié les documents enregistrés depuis le dernier passage.
+    """
+    document_filter.refresh()
+    logger.info(f"Filtre de hashes: {document_filter.stats()}")
+
+
+@db_periodic_task(crontab(hour='3', minute='0'), priority=PRIORITY_BULK)
+def rebuild_document_filter():
+    """
+    Reconstruction complète quotidienne : redimensionne le filtre et oublie les documents supprimés.
+    """
+    document_filter.publish(document_filter.build())
+    logger.info(f"Filtre de hashes reconstruit: {document_filter.stats()}")
+
+
+@db_task(retries=2, retry_delay=30, priority=PRIORITY_BULK)
+def pregenerate_document_renders(document_ids):
+    """
+    Produit les QR codes et certificats des documents enregistrés, avant leur première consultation.
+    """
+    written = render_cache.pregenerate(document_ids)
+    logger.info(f"Rendus pré-générés: {written} pour {len(document_ids)} documents")
+
+
+@db_periodic_task(crontab(minute='*'), priority=PRIORITY_DEFAULT)
+@lock_task('revocation-index')
+def refresh_revocation_index():
+    """
+    Publie une nouvelle version de l'index de révocation si des documents ont été
+    révoqués, suspendus ou rétablis depuis le dernier passage. Verrou partagé avec
+    la reconstruction : une seule publication à la fois.
+    """
+    meta = revocation_index.refresh()
+    logger.info(f"Index de révocation v{meta['version']}: {revocation_index.stats()}")
+
+
+@db_periodic_task(crontab(hour='3', minute='30'), priority=PRIORITY_BULK)
+@lock_task('revocation-index')
+def rebuild_revocation_index():
+    """
+    Reconstruction complète quotidienne depuis les tables (mises à jour sans updated_at, suppressions).
+    """
+    meta = revocation_index.rebuild()
+    logger.info(f"Index de révocation reconstruit: v{meta['version']}")
@@ -1,3 +1,619 @@
-from django.test import TestCase
+import base64
+import gzip
+import hashlib
+import io
+import json
+import random
+import tempfile
+import tracemalloc
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+from huey.contrib.djhuey import HUEY
+from huey.exceptions import TaskLockedException
+from PIL import Image, ImageDraw, ImageEnhance
+
+from apps.core.models import AuditLog
+from apps.cryptography.merkle import MerkleTree, verify_proof
+from apps.cryptography.models import CryptographicKey
+from apps.cryptography.reverification import signature_reverification
+from apps.cryptography.services import SignatureService
+from apps.institutions.models import Institution, InstitutionUser
+from apps.verifications.services import VerificationService
+
+from .batches import document_batches
+from .bloom import BloomFilter
+from .hash_filter import GENERATION_KEY, DocumentHashFilter, document_filter
+from .ingest import document_ingest
+from .models import DocumentBatch, DocumentVerification, SignedDocument
+from .phash import MultiIndexHash, hamming, load_image, phash, to_db
+from .rendering import RenderCache
+from .revocation import NONE, REVOKED, RevocationIndex, RevocationSnapshot, hash_prefix
+from .similarity import perceptual_index
+from .steganography import embed_signature_dct, extract_signature_dct
+from .tasks import rebuild_revocation_index, refresh_revocation_index
+from .upload import HashedUploadedFile, HashingUploadHandler
+
+
+def make_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class BloomFilterTestCase(SimpleTestCase):
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter.for_capacity(10000, 0.01)
+        members = [make_hash(str(i).encode()) for i in range(10000)]
+        bloom.update(members)
+        self.assertTrue(all(member in bloom for member in members))
+        false_positives = sum(make_hash(f"x{i}".encode()) in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.02)
+        self.assertAlmostEqual(bloom.estimated_fp_rate(), 0.01, delta=0.005)
+
+    def test_serialization_roundtrip(self):
+        bloom = BloomFilter.for_capacity(100, 0.01)
+        bloom.add(make_hash(b"diplome"))
+        restored = BloomFilter.from_bytes(bloom.to_bytes())
+        self.assertIn(make_hash(b"diplome"), restored)
+        self.assertEqual(restored.count, 1)
+        self.assertEqual(restored.num_bits, bloom.num_bits)
+
+
+class DocumentHashFilterTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_worker_loads_published_filter_without_scanning_table(self):
+        builder = DocumentHashFilter({'MIN_CAPACITY': 1000})
+        bloom = builder.build()
+        bloom.add(make_hash(b"diplome"))
+        builder.publish(bloom)
+
+        worker = DocumentHashFilter({'MIN_CAPACITY': 1000})
+        with self.assertNumQueries(1):  # rafraîchissement incrémental, pas de reconstruction
+            self.assertTrue(worker.might_contain(make_hash(b"diplome")))
+        self.assertFalse(worker.might_contain(make_hash(b"inconnu")))
+        stats = worker.stats()
+        self.assertEqual(stats['version'], 1)
+        self.assertEqual(stats['rejections'], 1)
+
+    def test_requests_never_build_a_missing_filter(self):
+        worker = DocumentHashFilter({'MIN_CAPACITY': 1000})
+        # Cache froid : « peut contenir », sans parcours de la table
+        with self.assertNumQueries(0):
+            self.assertTrue(worker.might_contain(make_hash(b"inconnu")))
+            self.assertTrue(async_to_sync(worker.amight_contain)(make_hash(b"inconnu")))
+        self.assertEqual(worker.stats(), {'loaded': False})
+
+        worker.warm()
+        self.assertEqual(worker.stats()['version'], 1)
+        self.assertFalse(worker.might_contain(make_hash(b"inconnu")))
+
+
+class DocumentTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        institution = Institution.objects.create(
+            name="Université de Test", legal_name="Université de Test", slug="univ-test",
+            type=Institution.Type.UNIVERSITY, email="contact@univ-test.cm",
+            address_line1="BP 1", city="Maroua", postal_code="000", country_code="CM",
+            status=Institution.Status.ACTIVE,
+        )
+        key = CryptographicKey.objects.create(
+            institution=institution, public_key="-", fingerprint=make_hash(b"cle"),
+            algorithm=CryptographicKey.Algorithm.ECDSA_P384, key_size=384,
+            expires_at=timezone.now() + timedelta(days=365),
+        )
+        cls.document = SignedDocument.objects.create(
+            institution=institution, key=key, document_hash=make_hash(b"diplome"),
+            signature="-", file_type=SignedDocument.FileType.PDF,
+        )
+
+    def setUp(self):
+        cache.clear()
+        document_filter.bloom = None
+
+
+class HashingUploadTestCase(DocumentTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_user(username='signataire', password='x')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_large_upload_is_hashed_without_buffering(self):
+        content = bytes(range(256)) * (64 * 1024)  # 16 Mo
+        request = RequestFactory().post('/', {'file': SimpleUploadedFile('gros.pdf', content)})
+        request.upload_handlers = [HashingUploadHandler(request, {'ALGORITHMS': ('sha256', 'sha512')})]
+
+        tracemalloc.start()
+        try:
+            upload = request.FILES['file']
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertIsInstance(upload, HashedUploadedFile)
+        self.assertEqual(upload.size, len(content))
+        self.assertEqual(upload.digests, {
+            'sha256': hashlib.sha256(content).hexdigest(), 'sha512': hashlib.sha512(content).hexdigest(),
+        })
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+    def test_hash_service_returns_digests(self):
+        response = self.client.post('/api/v1/documents/hash', {'file': SimpleUploadedFile('releve.pdf', b"releve")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['digests'], {'sha256': make_hash(b"releve")})
+        self.assertEqual(response.json()['size'], 6)
+
+    def test_registered_document_is_refused(self):
+        response = self.client.post('/api/v1/documents/hash', {'file': SimpleUploadedFile('diplome.pdf', b"diplome")})
+        self.assertEqual(response.status_code, 409)
+
+    def test_declared_registered_hash_is_refused_before_reading_body(self):
+        with mock.patch.object(HashingUploadHandler, 'receive_data_chunk') as receive:
+            response = self.client.post(
+                '/api/v1/documents/hash', {'file': SimpleUploadedFile('diplome.pdf', b"diplome")},
+                HTTP_X_DOCUMENT_HASH=make_hash(b"diplome"),
+            )
+        self.assertEqual(response.status_code, 409)
+        receive.assert_not_called()
+
+    def test_declared_hash_must_match_content(self):
+        response = self.client.post(
+            '/api/v1/documents/hash', {'file': SimpleUploadedFile('releve.pdf', b"releve")},
+            HTTP_X_DOCUMENT_HASH=make_hash(b"autre"),
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class RenderCacheTestCase(DocumentTestCase):
+
+    def setUp(self):
+        super().setUp()
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        self.render_cache = RenderCache({'STORAGE_OPTIONS': {'location': location.name}})
+        patcher = mock.patch('apps.documents.api.render_cache', self.render_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = f'/api/v1/documents/{self.document.document_hash}'
+
+    def test_renders_are_produced_once_then_served_from_storage(self):
+        response = self.client.get(f'{self.url}/certificate.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        with mock.patch.object(RenderCache, 'render') as render, self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f'{self.url}/certificate.pdf').content, response.content)
+            qr = self.client.get(f'{self.url}/qr.png')
+        render.assert_not_called()
+        self.assertEqual(qr['Content-Type'], 'image/png')
+
+    def test_versioned_urls_are_immutable(self):
+        response = self.client.get(f'{self.url}/qr.png', {'v': self.render_cache.version})
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(self.client.get(f'{self.url}/qr.png')['Cache-Control'], 'public, max-age=3600')
+
+    def test_matching_etag_is_not_modified_without_storage_access(self):
+        etag = self.client.get(f'{self.url}/qr.png')['ETag']
+        with mock.patch.object(RenderCache, 'get') as get:
+            response = self.client.get(f'{self.url}/qr.png', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        get.assert_not_called()
+
+    def test_unknown_document_is_not_found(self):
+        self.assertEqual(self.client.get(f'/api/v1/documents/{make_hash(b"inconnu")}/qr.png').status_code, 404)
+
+    def test_renders_are_pregenerated_when_a_document_is_signed(self):
+        with mock.patch('apps.documents.signals.render_cache', self.render_cache), \
+                mock.patch.dict(self.render_cache.config, {'PREGENERATE': True}), \
+                mock.patch('apps.documents.signals.pregenerate_document_renders') as task, \
+                self.captureOnCommitCallbacks(execute=True):
+            document = SignedDocument.objects.create(
+                institution=self.document.institution, key=self.document.key, document_hash=make_hash(b"releve"),
+                signature="-", file_type=SignedDocument.FileType.PDF,
+            )
+        task.assert_called_once_with([str(document.pk)])
+        self.assertEqual(self.render_cache.pregenerate(task.call_args.args[0]), 2)
+        self.assertIsNotNone(self.render_cache.get('certificate', document.document_hash))
+        self.assertEqual(self.render_cache.pregenerate([document.pk]), 0)
+
+
+class BulkIngestTestCase(DocumentTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.private_key = ec.generate_private_key(ec.SECP384R1())
+        cls.signing_key = CryptographicKey.objects.create(
+            institution=cls.document.institution, fingerprint=make_hash(b"cle-signature"),
+            public_key=cls.private_key.public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode(),
+            algorithm=CryptographicKey.Algorithm.ECDSA_P384, key_size=384,
+            expires_at=timezone.now() + timedelta(days=365),
+        )
+        cls.user = get_user_model().objects.create_user(username='signataire', password='x')
+        InstitutionUser.objects.create(
+            institution=cls.document.institution, user=cls.user, role=InstitutionUser.Role.SIGNER,
+        )
+        cls.url = f'/api/v1/documents/bulk?institution_id={cls.document.institution.pk}'
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    @classmethod
+    def record(cls, document_hash: str, signed_hash: str = None, **fields) -> bytes:
+        signature = cls.private_key.sign((signed_hash or document_hash).encode(), ec.ECDSA(hashes.SHA384()))
+        return json.dumps({
+            'document_hash': document_hash, 'signature': base64.b64encode(signature).decode(),
+            'key_id': str(cls.signing_key.pk), 'file_type': 'PDF', **fields,
+        }).encode() + b"\n"
+
+    def ingest(self, body: bytes, **extra):
+        response = self.client.post(self.url, body, content_type='application/x-ndjson', **extra)
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        return lines[:-1], lines[-1]['summary']
+
+    def test_each_record_gets_a_result(self):
+        body = b''.join([
+            self.record(make_hash(b"releve"), original_filename='releve.pdf'),
+            self.record(self.document.document_hash),
+            self.record(make_hash(b"attestation"), signed_hash=make_hash(b"autre")),
+            self.record(make_hash(b"certificat"), key_id=None, key_fingerprint=make_hash(b"inconnue")),
+            b'{"document_hash": "pas-un-hash"}\n',
+            self.record(make_hash(b"releve")),
+            self.record(
+                make_hash(b"bulletin").upper(), make_hash(b"bulletin"),
+                key_id=None, key_fingerprint=self.signing_key.fingerprint,
+            ),
+        ])
+        with mock.patch.dict(document_ingest.config, {'CHUNK_SIZE': 2}):
+            results, summary = self.ingest(body)
+
+        self.assertEqual([result['status'] for result in results], [
+            'CREATED', 'DUPLICATE', 'INVALID_SIGNATURE', 'UNKNOWN_KEY', 'INVALID_RECORD', 'DUPLICATE', 'CREATED',
+        ])
+        self.assertEqual([result['line'] for result in results], list(range(1, 8)))
+        document = SignedDocument.objects.get(document_hash=make_hash(b"releve"))
+        self.assertEqual(results[0]['document_id'], str(document.pk))
+        self.assertEqual((document.key, document.original_filename), (self.signing_key, 'releve.pdf'))
+        self.assertTrue(SignedDocument.objects.filter(document_hash=make_hash(b"bulletin")).exists())
+        self.assertEqual(
+            (summary['total'], summary['created'], summary['duplicates'], summary['rejected']), (7, 2, 2, 3)
+        )
+        self.assertIsNotNone(summary['per_second'])
+        self.assertTrue(AuditLog.objects.filter(
+            action_type=AuditLog.ActionType.SIGN, resource_id=self.document.institution.pk, details__created=2,
+        ).exists())
+
+    def test_gzip_stream_is_detected(self):
+        body = gzip.compress(self.record(make_hash(b"releve")) + self.record(make_hash(b"bulletin")))
+        results, summary = self.ingest(body)
+        self.assertEqual([result['status'] for result in results], ['CREATED', 'CREATED'])
+        self.assertEqual(SignedDocument.objects.filter(key=self.signing_key).count(), 2)
+
+    def test_records_inserted_concurrently_are_duplicates(self):
+        record = self.record(make_hash(b"releve"))
+        with mock.patch.object(type(document_ingest), 'insert', return_value=set()):
+            results, summary = self.ingest(record)
+        self.assertEqual(results[0]['status'], 'DUPLICATE')
+        self.assertEqual(summary['created'], 0)
+
+    def test_non_members_are_refused(self):
+        self.client.force_login(get_user_model().objects.create_user(username='public', password='x'))
+        response = self.client.post(self.url, self.record(make_hash(b"releve")), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(SignedDocument.objects.filter(document_hash=make_hash(b"releve")).exists())
+
+
+class RevocationIndexTestCase(DocumentTestCase):
+
+    def setUp(self):
+        super().setUp()
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        self.index = RevocationIndex({'STORAGE_OPTIONS': {'location': location.name}, 'CHECK_INTERVAL': 0})
+        for target in ('apps.documents.api.revocation_index', 'apps.verifications.services.revocation_index'):
+            patcher = mock.patch(target, self.index)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def sign(self, content: bytes, **fields) -> SignedDocument:
+        return SignedDocument.objects.create(
+            institution=self.document.institution, key=self.document.key, document_hash=make_hash(content),
+            signature="-", file_type=SignedDocument.FileType.PDF, **fields,
+        )
+
+    def test_statuses_are_answered_from_memory(self):
+        self.document.status = SignedDocument.Status.REVOKED
+        self.document.save()
+        suspended = self.sign(b"releve", status=SignedDocument.Status.SUSPENDED)
+        self.sign(b"attestation")
+        self.index.rebuild()
+
+        worker = RevocationIndex({**self.index.config})
+        with self.assertNumQueries(0):
+            self.assertEqual(worker.document_status(self.document.document_hash), 'REVOKED')
+            self.assertEqual(worker.document_status(suspended.document_hash), 'SUSPENDED')
+            self.assertIsNone(worker.document_status(make_hash(b"attestation")))
+            self.assertFalse(worker.key_revoked(self.document.key_id))
+        self.assertEqual(worker.stats()['documents'], 2)
+
+    def test_refresh_merges_changes_and_publishes_a_delta(self):
+        self.document.status = SignedDocument.Status.REVOKED
+        self.document.save()
+        self.assertEqual(self.index.rebuild()['version'], 1)
+
+        self.document.status = SignedDocument.Status.ACTIVE
+        self.document.save()
+        revoked = self.sign(b"releve", status=SignedDocument.Status.REVOKED)
+        CryptographicKey.objects.filter(pk=self.document.key_id).update(status=CryptographicKey.Status.REVOKED)
+        meta = self.index.refresh()
+
+        self.assertEqual(meta['version'], 2)
+        self.assertIsNone(self.index.document_status(self.document.document_hash))
+        self.assertEqual(self.index.document_status(revoked.document_hash), 'REVOKED')
+        self.assertTrue(self.index.key_revoked(self.document.key_id))
+        delta = RevocationSnapshot(self.index.delta_since(1))
+        self.assertEqual(sorted(delta.document_records()), sorted([
+            (hash_prefix(revoked.document_hash), REVOKED), (hash_prefix(self.document.document_hash), NONE),
+        ]))
+        self.assertEqual(self.index.refresh()['version'], 2)  # aucun changement : pas de nouvelle version
+
+    def test_feed_endpoints(self):
+        self.assertEqual(self.client.get('/api/v1/documents/revocations').status_code, 404)
+        self.index.rebuild()
+        self.sign(b"releve", status=SignedDocument.Status.REVOKED)
+        self.index.refresh()
+
+        manifest = self.client.get('/api/v1/documents/revocations').json()
+        self.assertEqual((manifest['version'], manifest['documents'], manifest['oldest_delta_base']), (2, 1, 1))
+        response = self.client.get(manifest['snapshot_url'])
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        snapshot = RevocationSnapshot(b''.join(response.streaming_content))
+        self.assertEqual(snapshot.document_status(make_hash(b"releve")), REVOKED)
+
+        response = self.client.get('/api/v1/documents/revocations/delta', {'since': 1})
+        self.assertEqual(response['X-Revocation-Version'], '2')
+        self.assertEqual(RevocationSnapshot(response.content).document_count, 1)
+        self.assertEqual(self.client.get('/api/v1/documents/revocations/delta', {'since': 0}).status_code, 410)
+
+    def test_published_revocation_overrides_cached_snapshot(self):
+        snapshot = VerificationService.load_snapshot(self.document.document_hash)
+        SignedDocument.objects.filter(pk=self.document.pk).update(
+            status=SignedDocument.Status.REVOKED, updated_at=timezone.now()
+        )
+        self.index.rebuild()
+        self.assertEqual(
+            VerificationService.resolve_result(snapshot, document_hash=self.document.document_hash), 'REVOKED'
+        )
+
+    def test_refresh_and_rebuild_never_publish_concurrently(self):
+        with mock.patch('apps.documents.tasks.revocation_index', self.index), \
+                mock.patch.object(self.index, 'refresh') as refresh, HUEY.lock_task('revocation-index'):
+            with self.assertRaises(TaskLockedException):
+                refresh_revocation_index.call_local()
+            with self.assertRaises(TaskLockedException):
+                rebuild_revocation_index.call_local()
+        refresh.assert_not_called()
+
+
+class DocumentBatchTestCase(DocumentTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.private_key = ec.generate_private_key(ec.SECP384R1())
+        cls.signing_key = CryptographicKey.objects.create(
+            institution=cls.document.institution, fingerprint=make_hash(b"cle-lot"),
+            public_key=cls.private_key.public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode(),
+            algorithm=CryptographicKey.Algorithm.ECDSA_P384, key_size=384,
+            expires_at=timezone.now() + timedelta(days=365),
+        )
+        cls.user = get_user_model().objects.create_user(username='signataire-lot', password='x')
+        InstitutionUser.objects.create(
+            institution=cls.document.institution, user=cls.user, role=InstitutionUser.Role.SIGNER,
+        )
+        cls.url = f'/api/v1/documents/batches?institution_id={cls.document.institution.pk}'
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        document_batches.trees.clear()
+
+    @classmethod
+    def payload(cls, document_hashes, signed_root=None, **fields):
+        root = signed_root or MerkleTree.build(document_hashes).root
+        signature = cls.private_key.sign(root.encode(), ec.ECDSA(hashes.SHA384()))
+        return {
+            'key_id': str(cls.signing_key.pk), 'signature': base64.b64encode(signature).decode(),
+            'documents': [{'document_hash': h, 'file_type': 'PDF'} for h in document_hashes], **fields,
+        }
+
+    def test_one_signature_per_batch_and_inclusion_proofs(self):
+        hashes = [make_hash(f"diplome-{i}".encode()) for i in range(7)]
+        with mock.patch(
+            'apps.cryptography.engine.SignatureService.verify_with_public_key',
+            wraps=SignatureService.verify_with_public_key,
+        ) as verify:
+            response = self.client.post(self.url, self.payload(hashes), content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+            results = list(VerificationService.verify_batch(hashes, 'API', '127.0.0.1'))
+        self.assertEqual(verify.call_count, 1)
+
+        root = response.json()['merkle_root']
+        self.assertEqual(root, MerkleTree.build(hashes).root)
+        for index, (document_hash, result) in enumerate(zip(hashes, results)):
+            self.assertEqual(result['result'], 'AUTHENTIC')
+            proof = result['document']['merkle_proof']
+            self.assertEqual((proof['merkle_root'], proof['leaf_index']), (root, index))
+            path = [(step['position'], step['hash']) for step in proof['path']]
+            self.assertLessEqual(len(path), 3)
+            self.assertTrue(verify_proof(document_hash, path, root))
+
+        # Un lot compte pour une signature à la re-vérification
+        report = signature_reverification.run(key_id=self.signing_key.pk, mode='serial', write_report=False)
+        self.assertEqual((report['total'], report['valid']), (1, 1))
+
+    def test_invalid_batches_are_rejected_whole(self):
+        hashes = [make_hash(b"releve"), make_hash(b"bulletin")]
+        cases = [
+            (self.payload(hashes, signed_root=make_hash(b"autre")), 400),
+            (self.payload(hashes, merkle_root=make_hash(b"autre")), 400),
+            (self.payload(hashes + hashes[:1]), 400),
+            (self.payload(hashes + [self.document.document_hash]), 409),
+        ]
+        for payload, status in cases:
+            with self.subTest(status=status):
+                response = self.client.post(self.url, payload, content_type='application/json')
+                self.assertEqual(response.status_code, status)
+        self.assertFalse(DocumentBatch.objects.exists())
+        self.assertFalse(SignedDocument.objects.filter(document_hash__in=hashes).exists())
+
+
+def document_image(seed: int) -> Image.Image:
+    """Page synthétique : blocs de texte et tampons à des positions aléatoires."""
+    rng = random.Random(seed)
+    image = Image.new('L', (620, 877), 255)
+    draw = ImageDraw.Draw(image)
+    for _ in range(25):
+        x, y = rng.randrange(40, 500), rng.randrange(40, 800)
+        draw.rectangle((x, y, x + rng.randrange(40, 200), y + rng.randrange(8, 60)), fill=rng.randrange(0, 160))
+    return image
+
+
+def rescan(image: Image.Image) -> bytes:
+    """Copie légèrement tournée, réduite, assombrie et compressée en JPEG."""
+    copy = ImageEnhance.Brightness(image.rotate(1, fillcolor=255).resize((413, 585))).enhance(0.85)
+    buffer = io.BytesIO()
+    copy.convert('RGB').save(buffer, 'JPEG', quality=50)
+    return buffer.getvalue()
+
+
+class PerceptualHashTestCase(SimpleTestCase):
+
+    def test_rescan_is_close_and_other_document_is_far(self):
+        for seed in range(3):
+            original = phash(document_image(seed))
+            self.assertLessEqual(hamming(original, phash(load_image(io.BytesIO(rescan(document_image(seed)))))), 6)
+            self.assertGreater(hamming(original, phash(document_image(seed + 100))), 20)
+        with self.assertRaises(ValueError):
+            load_image(io.BytesIO(b"%PDF-1.7"))
+
+    def test_index_search_matches_linear_scan(self):
+        rng = random.Random(0)
+        codes = [rng.getrandbits(64) for _ in range(3000)]
+        # Quasi-doublons : quelques bits inversés
+        codes += [code ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for code in codes[:500]]
+        index = MultiIndexHash()
+        for code in codes:
+            index.add(code)
+        self.assertFalse(index.add(codes[0]))
+        for radius in (0, 3, 7, 10, 13):
+            for query in codes[:50]:
+                expected = sorted({code for code in codes if hamming(code, query) <= radius})
+                with self.subTest(radius=radius):
+                    self.assertEqual(sorted(code for code, _ in index.search(query, radius)), expected)
+
+
+class PerceptualIndexTestCase(DocumentTestCase):
+
+    def setUp(self):
+        super().setUp()
+        perceptual_index.index = None
+
+    def test_similar_endpoint_finds_registered_original(self):
+        SignedDocument.objects.filter(pk=self.document.pk).update(perceptual_hash=to_db(phash(document_image(1))))
+        photo = SimpleUploadedFile('photo.jpg', rescan(document_image(1)), content_type='image/jpeg')
+        response = self.client.post('/api/v1/verify/similar', {'file': photo})
+        self.assertEqual(response.status_code, 200)
+        candidates = response.json()['candidates']
+        self.assertEqual([c['document_hash'] for c in candidates], [self.document.document_hash])
+        self.assertLessEqual(candidates[0]['distance'], 6)
+        self.assertEqual(candidates[0]['document']['institution']['name'], "Université de Test")
+
+        # Document enregistré après le chargement de l'index : visible sans reconstruction, après validation
+        with self.captureOnCommitCallbacks() as callbacks:
+            SignedDocument.objects.create(
+                institution=self.document.institution, key=self.document.key, document_hash=make_hash(b"releve"),
+                signature="-", file_type=SignedDocument.FileType.JPEG, perceptual_hash=to_db(phash(document_image(2))),
+            )
+        self.assertEqual(perceptual_index.find(phash(document_image(2))), [])
+        generation = cache.get(GENERATION_KEY, 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(cache.get(GENERATION_KEY), generation + 1)
+        with mock.patch.dict(perceptual_index.config, {'CHECK_INTERVAL': 3600}), self.assertNumQueries(1):
+            found = perceptual_index.find(phash(load_image(io.BytesIO(rescan(document_image(2))))))
+        self.assertEqual([document_hash for document_hash, _ in found], [make_hash(b"releve")])
+
+        response = self.client.post('/api/v1/verify/similar', {
+            'file': SimpleUploadedFile('document.pdf', b"%PDF-1.7", content_type='application/pdf'),
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class SteganographyTestCase(DocumentTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_user(username='signataire-image', password='x')
+        InstitutionUser.objects.create(
+            institution=cls.document.institution, user=cls.user, role=InstitutionUser.Role.SIGNER,
+        )
+        SignedDocument.objects.filter(pk=cls.document.pk).update(signature=base64.b64encode(bytes(104)).decode())
+
+    def upload(self, image: Image.Image, image_format: str = 'PNG', **options) -> SimpleUploadedFile:
+        buffer = io.BytesIO()
+        image.convert('RGB').save(buffer, image_format, **options)
+        return SimpleUploadedFile(f'page.{image_format.lower()}', buffer.getvalue())
+
+    def test_marked_image_survives_jpeg_and_is_verified(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            f'/api/v1/documents/{self.document.document_hash}/steganography', {'file': self.upload(document_image(3))},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(SignedDocument.objects.filter(pk=self.document.pk, has_steganography=True).exists())
+
+        # Copie recompressée en JPEG, sans session
+        self.client.logout()
+        marked = Image.open(io.BytesIO(response.content))
+        response = self.client.post('/api/v1/verify/steganography', {'file': self.upload(marked, 'JPEG', quality=75)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['document']['institution']['name'], "Université de Test")
+        verification = DocumentVerification.objects.get()
+        self.assertEqual(verification.provided_hash, self.document.document_hash)
+        self.assertEqual(verification.method, DocumentVerification.Method.STEGANOGRAPHY)
+
+        response = self.client.post('/api/v1/verify/steganography', {'file': self.upload(document_image(3))})
+        self.assertEqual(response.status_code, 400)
+
+    def test_payload_needs_enough_blocks(self):
+        page = document_image(4)
+        self.assertIsNone(extract_signature_dct(page))
+        self.assertEqual(extract_signature_dct(embed_signature_dct(page, b"charge")), b"charge")
+        with self.assertRaises(ValueError):
+            embed_signature_dct(page.resize((64, 64)), b"charge")
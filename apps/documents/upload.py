@@ -0,0 +1,141 @@
+# apps/documents/upload.py
+import hashlib
+import logging
+from functools import wraps
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from apps.core.api.exceptions import BadRequestException, ConflictException, PayloadTooLargeException
+
+from .hash_filter import document_filter
+from .models import SignedDocument
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'MAX_SIZE': 128 * 1024 * 1024,
+    'ALGORITHMS': ('sha256',),
+    'CHUNK_SIZE': 256 * 1024,
+    # Marge pour l'enveloppe multipart et les autres champs dans le Content-Length
+    'ENVELOPE_SIZE': 64 * 1024,
+}
+
+# Hash SHA-256 annoncé par le client : contrôle des doublons avant la lecture du corps
+DECLARED_HASH_HEADER = 'HTTP_X_DOCUMENT_HASH'
+
+
+def is_registered(document_hash: str) -> bool:
+    """Document déjà enregistré ? Filtre de Bloom d'abord, base ensuite."""
+    return document_filter.might_contain(document_hash) and SignedDocument.objects.filter(
+        document_hash=document_hash
+    ).exists()
+
+
+class HashedUploadedFile(UploadedFile):
+    """
+    Fichier reçu dont seul le condensé est conservé : aucun octet du contenu
+    n'est gardé en mémoire ni écrit sur disque.
+    """
+
+    def __init__(self, name: str, content_type: str, size: int, charset, content_type_extra, digests: Dict[str, str]):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.digests = digests
+
+    @property
+    def sha256(self) -> Optional[str]:
+        return self.digests.get('sha256')
+
+    def open(self, mode=None):
+        raise ValueError("Le contenu d'un fichier haché à la volée n'est pas conservé.")
+
+    def chunks(self, chunk_size=None):
+        raise ValueError("Le contenu d'un fichier haché à la volée n'est pas conservé.")
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Gestionnaire d'upload qui hache les fichiers au fil de la réception.
+
+    - Plusieurs condensés (ALGORITHMS) sont calculés en une seule passe, par blocs
+      de CHUNK_SIZE : la mémoire utilisée ne dépend pas de la taille du fichier.
+    - Un Content-Length supérieur à MAX_SIZE est refusé avant toute lecture du
+      corps ; un fichier qui dépasse MAX_SIZE en cours de réception est refusé
+      sans lire la suite.
+    - reject_registered : un document déjà enregistré est refusé, avant la lecture
+      du corps si le client annonce son hash (en-tête X-Document-Hash, vérifié
+      ensuite), sinon dès la fin du fichier.
+
+    Les refus lèvent une BaseAPIException, convertie en réponse par l'API. Sous
+    ASGI, Django reçoit le corps (sur disque au-delà de FILE_UPLOAD_MAX_MEMORY_SIZE)
+    avant d'appeler la vue : seuls le hachage et le contrôle sont alors à la volée.
+    """
+
+    def __init__(self, request=None, config: Optional[Dict[str, Any]] = None,
+                 algorithms: Optional[Iterable[str]] = None, reject_registered: bool = False):
+        super().__init__(request)
+        self.config = {**DEFAULTS, **(config or {})}
+        self.chunk_size = self.config['CHUNK_SIZE']
+        self.algorithms = tuple(algorithms or self.config['ALGORITHMS'])
+        if 'sha256' not in self.algorithms:
+            self.algorithms = ('sha256',) + self.algorithms
+        self.reject_registered = reject_registered
+        self.declared_hash: Optional[str] = None
+        self.hashers: Dict[str, Any] = {}
+        self.received = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.config['MAX_SIZE'] + self.config['ENVELOPE_SIZE']:
+            raise PayloadTooLargeException()
+        declared = META.get(DECLARED_HASH_HEADER, '').strip().lower()
+        if declared:
+            self.declared_hash = declared
+            if self.reject_registered and is_registered(declared):
+                raise ConflictException("Ce document est déjà enregistré.")
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hashers = {algorithm: hashlib.new(algorithm) for algorithm in self.algorithms}
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.config['MAX_SIZE']:
+            logger.info(f"Upload de {self.file_name} interrompu au-delà de {self.config['MAX_SIZE']} octets")
+            raise PayloadTooLargeException()
+        for hasher in self.hashers.values():
+            hasher.update(raw_data)
+        # Rien n'est transmis aux gestionnaires suivants : le contenu n'est pas conservé
+        return None
+
+    def file_complete(self, file_size):
+        digests = {algorithm: hasher.hexdigest() for algorithm, hasher in self.hashers.items()}
+        sha256 = digests['sha256']
+        if self.declared_hash and self.declared_hash != sha256:
+            raise BadRequestException("Le hash annoncé ne correspond pas au fichier reçu.")
+        if self.reject_registered and not self.declared_hash and is_registered(sha256):
+            raise ConflictException("Ce document est déjà enregistré.")
+        return HashedUploadedFile(
+            self.file_name, self.content_type, file_size, self.charset, self.content_type_extra, digests
+        )
+
+
+def stream_hashed_uploads(algorithms: Optional[Iterable[str]] = None, reject_registered: bool = False):
+    """
+    Décorateur de vue (ninja.decorators.decorate_view) : les fichiers de la requête
+    sont hachés au fil de l'eau par HashingUploadHandler. Il agit avant
+    l'authentification, dont le contrôle CSRF lit déjà le corps de la requête.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            request.upload_handlers = [HashingUploadHandler(
+                request, getattr(settings, 'DOCUMENT_UPLOAD', None),
+                algorithms=algorithms, reject_registered=reject_registered,
+            )]
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,138 @@
+# apps/verifications/api.py
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, StreamingHttpResponse
+from ninja import File, Path, Router
+from ninja.decorators import decorate_view
+from ninja.errors import HttpError
+from ninja.files import UploadedFile
+
+from apps.core.api.exceptions import PayloadTooLargeException
+from apps.core.api.throttling import charge_throttles
+from apps.core.utils import get_client_ip
+from apps.documents.models import DocumentVerification
+from apps.documents.phash import to_hex
+from apps.documents.similarity import perceptual_index
+from apps.documents.steganography import document_steganography
+from apps.documents.upload import stream_hashed_uploads
+
+from .schemas import (
+    SHA256_PATTERN, SimilarDocumentsSchema, VerificationResultSchema, VerifyBatchSchema, VerifyHashSchema,
+)
+from .services import VerificationService
+
+logger = logging.getLogger('app')
+
+router = Router(tags=["Vérifications"])
+
+
+@router.post("/hash", response=VerificationResultSchema)
+async def verify_hash(request: HttpRequest, payload: VerifyHashSchema):
+    """
+    Vérifie l'authenticité d'un document à partir de son hash SHA-256.
+    """
+    return await VerificationService.averify_hash(
+        document_hash=payload.document_hash.lower(),
+        method=payload.method,
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        referer=request.META.get('HTTP_REFERER', ''),
+    )
+
+
+@router.post("/upload", response=VerificationResultSchema)
+@decorate_view(stream_hashed_uploads())
+def verify_upload(request: HttpRequest, file: UploadedFile = File(...)):
+    """
+    Vérifie un document envoyé en multipart (champ « file »).
+    Le fichier est haché pendant la réception et n'est jamais conservé ;
+    au-delà de DOCUMENT_UPLOAD['MAX_SIZE'], l'envoi est refusé (413).
+    """
+    return VerificationService.verify_hash(
+        document_hash=file.digests['sha256'],
+        method=DocumentVerification.Method.UPLOAD,
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        referer=request.META.get('HTTP_REFERER', ''),
+    )
+
+
+@router.post("/similar", response=SimilarDocumentsSchema)
+def verify_similar(request: HttpRequest, file: UploadedFile = File(...)):
+    """
+    Recherche l'original d'un rescan ou d'une photo de document (image en multipart,
+    champ « file ») parmi les documents enregistrés avec une empreinte perceptuelle.
+    Les candidats, à distance de Hamming <= PERCEPTUAL_INDEX['RADIUS'], sont à
+    confirmer par une vérification de leur hash.
+    """
+    if file.size > perceptual_index.config['MAX_IMAGE_SIZE']:
+        raise PayloadTooLargeException()
+    try:
+        code = perceptual_index.fingerprint(file)
+    except ValueError:
+        raise HttpError(400, "Image illisible ou format non pris en charge.")
+    return {
+        'perceptual_hash': to_hex(code),
+        'radius': perceptual_index.config['RADIUS'],
+        'candidates': VerificationService.similar_documents(code),
+    }
+
+
+@router.post("/steganography", response=VerificationResultSchema)
+def verify_steganography(request: HttpRequest, file: UploadedFile = File(...)):
+    """
+    Vérifie une image marquée par POST /documents/{hash}/steganography (multipart,
+    champ « file ») : le hash qu'elle porte est vérifié comme par /verify/hash.
+    400 si l'image ne porte aucune marque lisible (recadrée, redimensionnée, non marquée).
+    """
+    if file.size > document_steganography.config['MAX_IMAGE_SIZE']:
+        raise PayloadTooLargeException()
+    extracted = document_steganography.extract(file.read())
+    if extracted is None:
+        raise HttpError(400, "Aucune signature stéganographique lisible dans cette image.")
+    return VerificationService.verify_hash(
+        document_hash=extracted[0],
+        method=DocumentVerification.Method.STEGANOGRAPHY,
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        referer=request.META.get('HTTP_REFERER', ''),
+    )
+
+
+@router.post("/batch")
+def verify_batch(request: HttpRequest, payload: VerifyBatchSchema):
+    """
+    Vérifie un lot de hashes en un seul appel.
+    Le lot est compté selon sa taille par les limites de débit de l'API.
+    Les résultats sont renvoyés en flux NDJSON (une ligne BatchVerificationItemSchema par hash).
+    """
+    hashes = [document_hash.lower() for document_hash in payload.hashes]
+    charge_throttles(request, len(hashes))
+    ip_address = get_client_ip(request)
+    logger.info(f"Vérification par lot de {len(hashes)} hashes depuis {ip_address}")
+
+    results = VerificationService.verify_batch(
+        document_hashes=hashes,
+        method=payload.method,
+        ip_address=ip_address,
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        referer=request.META.get('HTTP_REFERER', ''),
+    )
+    lines = (json.dumps(item, cls=DjangoJSONEncoder) + "\n" for item in results)
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
+@router.get("/{document_hash}", response=VerificationResultSchema)
+async def verify_hash_lookup(request: HttpRequest, document_hash: str = Path(..., pattern=SHA256_PATTERN)):
+    """
+    Vérifie un document par hash passé dans l'URL (liens de vérification des QR codes).
+    """
+    return await VerificationService.averify_hash(
+        document_hash=document_hash.lower(),
+        method=DocumentVerification.Method.QR_SCAN,
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        referer=request.META.get('HTTP_REFERER', ''),
+    )
@@ -0,0 +1,281 @@
+# apps/verifications/cache.py
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.core.cache import AsyncCache, LRUCache, count_cache_access
+
+logger = logging.getLogger('app')
+
+# Marqueur stocké pour les hashes inconnus (cache négatif)
+NOT_FOUND = '__not_found__'
+
+KEY_PREFIX = 'verif:doc:'
+EPOCH_KEY = 'verif:epoch'
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'LOCAL_MAXSIZE': 50000,
+    'LOCAL_TTL': 60,
+    'SHARED_TTL': 3600,
+    'NEGATIVE_TTL': 60,
+    'EPOCH_CHECK_INTERVAL': 1.0,
+}
+
+
+class VerificationCache:
+    """
+    Cache à deux niveaux des instantanés de vérification, indexé par hash SHA-256.
+
+    1. LRU en mémoire locale au processus (borné, TTL court)
+    2. Cache Django partagé entre les workers (Redis en production)
+
+    Les hashes inconnus sont mis en cache négatif avec un TTL plus court.
+    Une invalidation supprime l'entrée du cache partagé et incrémente une
+    « époque » partagée : chaque processus vide son LRU local dès qu'il
+    observe un changement d'époque (vérifié au plus une fois par
+    EPOCH_CHECK_INTERVAL secondes).
+
+    Les méthodes a*() servent les vues async : le cache partagé y est lu
+    par un client async (apps.core.cache.AsyncCache) et le chargeur est une coroutine.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.local = LRUCache(
+            maxsize=self.config['LOCAL_MAXSIZE'],
+            ttl=self.config['LOCAL_TTL'],
+        )
+        self._epoch: Optional[int] = None
+        self._epoch_checked_at = 0.0
+        self._epoch_lock = threading.Lock()
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.async_shared = AsyncCache(self.config['ALIAS'])
+
+    @property
+    def shared(self):
+        return caches[self.config['ALIAS']]
+
+    @staticmethod
+    def make_key(document_hash: str) -> str:
+        return f"{KEY_PREFIX}{document_hash}"
+
+    # ------------------------------------------
+    # Lecture
+    # ------------------------------------------
+
+    def get_or_load(self, document_hash: str, loader: Callable[[str], Optional[dict]]) -> Optional[dict]:
+        """
+        Retourne l'instantané du document pour ce hash, en le chargeant via
+        loader (accès base de données) uniquement en cas d'absence dans les deux niveaux.
+
+        Returns:
+            dict de l'instantané, ou None si le hash est inconnu
+        """
+        self._sync_epoch()
+
+        value = self.local.get(document_hash)
+        if value is not None:
+            return None if value == NOT_FOUND else value
+
+        key = self.make_key(document_hash)
+        value = self.shared.get(key)
+        if value is not None:
+            self.shared_hits += 1
+            count_cache_access(hits=1)
+            self._store_local(document_hash, value)
+            return None if value == NOT_FOUND else value
+
+        self.shared_misses += 1
+        count_cache_access(misses=1)
+        snapshot = loader(document_hash)
+        self.set(document_hash, snapshot)
+        return snapshot
+
+    async def aget_or_load(
+        self,
+        document_hash: str,
+        loader: Callable[[str], Awaitable[Optional[dict]]]
+    ) -> Optional[dict]:
+        """Version async de get_or_load (loader est une coroutine)."""
+        await self._async_sync_epoch()
+
+        value = self.local.get(document_hash)
+        if value is not None:
+            return None if value == NOT_FOUND else value
+
+        value = await self.async_shared.get(self.make_key(document_hash))
+        if value is not None:
+            self.shared_hits += 1
+            count_cache_access(hits=1)
+            self._store_local(document_hash, value)
+            return None if value == NOT_FOUND else value
+
+        self.shared_misses += 1
+        count_cache_access(misses=1)
+        snapshot = await loader(document_hash)
+        await self.aset(document_hash, snapshot)
+        return snapshot
+
+    def get_many_or_load(
+        self,
+        document_hashes: List[str],
+        loader: Callable[[List[str]], Dict[str, dict]]
+    ) -> Dict[str, Optional[dict]]:
+        """
+        Version ensembliste de get_or_load : un seul aller-retour vers le cache
+        partagé et un seul appel à loader pour l'ensemble des hashes manquants.
+
+        Args:
+            document_hashes: Hashes à résoudre (sans doublons)
+            loader: Fonction retournant {hash: instantané} pour les hashes connus
+
+        Returns:
+            dict {hash: instantané ou None}
+        """
+        self._sync_epoch()
+
+        found: Dict[str, Optional[dict]] = {}
+        missing = []
+        for document_hash in document_hashes:
+            value = self.local.get(document_hash)
+            if value is None:
+                missing.append(document_hash)
+            else:
+                found[document_hash] = None if value == NOT_FOUND else value
+
+        if missing:
+            shared_values = self.shared.get_many([self.make_key(h) for h in missing])
+            still_missing = []
+            for document_hash in missing:
+                value = shared_values.get(self.make_key(document_hash))
+                if value is None:
+                    still_missing.append(document_hash)
+                    continue
+                self._store_local(document_hash, value)
+                found[document_hash] = None if value == NOT_FOUND else value
+            self.shared_hits += len(missing) - len(still_missing)
+            self.shared_misses += len(still_missing)
+            count_cache_access(len(missing) - len(still_missing), len(still_missing))
+
+            if still_missing:
+                snapshots = loader(still_missing)
+                self.set_many({h: snapshots.get(h) for h in still_missing})
+                found.update({h: snapshots.get(h) for h in still_missing})
+        return found
+
+    def set(self, document_hash: str, snapshot: Optional[dict]) -> None:
+        """Enregistre un instantané (ou None pour un hash inconnu) dans les deux niveaux."""
+        value = NOT_FOUND if snapshot is None else snapshot
+        ttl = self.config['NEGATIVE_TTL'] if snapshot is None else self.config['SHARED_TTL']
+        self.shared.set(self.make_key(document_hash), value, ttl)
+        self._store_local(document_hash, value)
+
+    async def aset(self, document_hash: str, snapshot: Optional[dict]) -> None:
+        """Version async de set."""
+        value = NOT_FOUND if snapshot is None else snapshot
+        ttl = self.config['NEGATIVE_TTL'] if snapshot is None else self.config['SHARED_TTL']
+        await self.async_shared.set(self.make_key(document_hash), value, ttl)
+        self._store_local(document_hash, value)
+
+    def set_many(self, snapshots: Dict[str, Optional[dict]]) -> None:
+        """Enregistre plusieurs instantanés ; les hashes inconnus (None) prennent le TTL négatif."""
+        positive = {}
+        negative = {}
+        for document_hash, snapshot in snapshots.items():
+            if snapshot is None:
+                negative[self.make_key(document_hash)] = NOT_FOUND
+                self._store_local(document_hash, NOT_FOUND)
+            else:
+                positive[self.make_key(document_hash)] = snapshot
+                self._store_local(document_hash, snapshot)
+        if positive:
+            self.shared.set_many(positive, self.config['SHARED_TTL'])
+        if negative:
+            self.shared.set_many(negative, self.config['NEGATIVE_TTL'])
+
+    def _store_local(self, document_hash: str, value: Any) -> None:
+        ttl = None
+        if value == NOT_FOUND:
+            ttl = min(self.config['LOCAL_TTL'], self.config['NEGATIVE_TTL'])
+        self.local.set(document_hash, value, ttl)
+
+    # ------------------------------------------
+    # Invalidation
+    # ------------------------------------------
+
+    def invalidate(self, document_hashes: Iterable[str], propagate: bool = True) -> None:
+        """
+        Supprime les hashes des deux niveaux et propage l'invalidation aux autres processus.
+        propagate=False : sans changement d'époque, les LRU des autres processus gardent
+        leur entrée jusqu'à expiration (utilisé pour les invalidations par tranches).
+        """
+        keys = []
+        for document_hash in document_hashes:
+            self.local.delete(document_hash)
+            keys.append(self.make_key(document_hash))
+        if keys:
+            self.shared.delete_many(keys)
+        if propagate:
+            self._bump_epoch()
+
+    def forget_not_found(self, document_hashes: Iterable[str]) -> None:
+        """
+        Nouveaux documents : supprime leur entrée « non trouvé » sans toucher aux autres
+        entrées ni à l'époque. Un LRU d'un autre processus peut encore la servir au plus
+        min(LOCAL_TTL, NEGATIVE_TTL) secondes ; rare, le filtre de hashes écartant les
+        hashes inconnus avant le cache (seuls ses faux positifs y sont mis en cache négatif).
+        """
+        self.invalidate(document_hashes, propagate=False)
+
+    def clear(self) -> None:
+        """Vide le cache local et invalide les caches locaux des autres processus."""
+        self.local.clear()
+        self._bump_epoch()
+
+    def _bump_epoch(self) -> None:
+        shared = self.shared
+        # add() est sans effet si la clé existe : incr() reste atomique entre workers
+        shared.add(EPOCH_KEY, 0, None)
+        epoch = shared.incr(EPOCH_KEY)
+        with self._epoch_lock:
+            # Une invalidation d'un autre processus n'a pas encore été observée
+            if self._epoch is None or epoch != self._epoch + 1:
+                self.local.clear()
+            self._epoch = epoch
+            self._epoch_checked_at = time.monotonic()
+
+    def _sync_epoch(self) -> None:
+        now = time.monotonic()
+        if now - self._epoch_checked_at < self.config['EPOCH_CHECK_INTERVAL']:
+            return
+        self._apply_epoch(self.shared.get(EPOCH_KEY, 0), now)
+
+    async def _async_sync_epoch(self) -> None:
+        now = time.monotonic()
+        if now - self._epoch_checked_at < self.config['EPOCH_CHECK_INTERVAL']:
+            return
+        self._apply_epoch(await self.async_shared.get(EPOCH_KEY, 0), now)
+
+    def _apply_epoch(self, epoch: int, now: float) -> None:
+        with self._epoch_lock:
+            if self._epoch is not None and epoch != self._epoch:
+                logger.debug(f"Époque de vérification modifiée ({self._epoch} -> {epoch}), cache local vidé")
+                self.local.clear()
+            self._epoch = epoch
+            self._epoch_checked_at = now
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'local': self.local.stats(),
+            'shared_hits': self.shared_hits,
+            'shared_misses': self.shared_misses,
+        }
+
+
+verification_cache = VerificationCache(getattr(settings, 'VERIFICATION_CACHE', None))
@@ -0,0 +1,344 @@
+# apps/verifications/log_pipeline.py
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.dateparse import parse_datetime
+
+from apps.core.models import AuditLog
+from apps.documents.models import DocumentVerification
+
+from .models import VerificationRequest
+
+logger = logging.getLogger('app')
+
+DEFAULTS = {
+    'IMMEDIATE': False,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL_MS': 200,
+    'MAX_PENDING': 20000,
+    'BLOCK_TIMEOUT_MS': 50,
+    'SPOOL_DIR': 'var/spool/verifications',
+    'RECOVERY_AGE': 300,
+}
+
+SPOOL_SUFFIX = '.ndjson'
+PENDING_SUFFIX = '.pending'
+FAILED_SUFFIX = '.failed'
+
+# Démarrage paresseux des pipelines : un seul thread initialise l'état du processus
+_start_lock = threading.Lock()
+
+
+def _reset_start_lock() -> None:
+    # Un fork peut survenir pendant qu'un autre thread du parent détient le verrou
+    global _start_lock
+    _start_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_start_lock)
+
+
+def write_records(records: List[Dict[str, Any]]) -> None:
+    """
+    Insère un lot d'enregistrements de vérification : une ligne DocumentVerification,
+    VerificationRequest et AuditLog par enregistrement, par bulk_create.
+    Les trois lignes partagent l'identifiant de la vérification ; un rejeu
+    (reprise après arrêt brutal) est donc idempotent.
+    """
+    verifications = []
+    requests = []
+    audit_logs = []
+    for record in records:
+        timestamp = record['timestamp']
+        if isinstance(timestamp, str):
+            timestamp = parse_datetime(timestamp)
+        authentic = record['result'] == DocumentVerification.Result.AUTHENTIC
+        details = {'batch': True} if record.get('batch') else {}
+        verifications.append(DocumentVerification(
+            id=record['id'],
+            document_id=record['document_id'],
+            provided_hash=record['document_hash'],
+            verifier_ip=record['ip'],
+            verifier_user_agent=record['user_agent'],
+            method=record['method'],
+            result=record['result'],
+            timestamp=timestamp,
+            verification_duration_ms=record['duration_ms'],
+            details=details,
+        ))
+        requests.append(VerificationRequest(
+            id=record['id'],
+            document_hash=record['document_hash'],
+            uploader_ip=record['ip'],
+            user_agent=record['user_agent'],
+            referer=record.get('referer', '')[:200],
+            status=VerificationRequest.Status.SUCCESS if authentic else VerificationRequest.Status.FAILURE,
+            matched_document_id=record['document_id'],
+            timestamp=timestamp,
+            processing_time_ms=record['duration_ms'],
+            details={'result': record['result'], 'method': record['method'], **details},
+        ))
+        audit_logs.append(AuditLog(
+            id=record['id'],
+            action_type=AuditLog.ActionType.VERIFY,
+            resource_type=AuditLog.ResourceType.DOCUMENT,
+            resource_id=record['document_id'],
+            ip_address=record['ip'],
+            user_agent=record['user_agent'],
+            success=authentic,
+            details={'result': record['result'], 'document_hash': record['document_hash']},
+            timestamp=timestamp,
+        ))
+
+    with transaction.atomic():
+        DocumentVerification.objects.bulk_create(verifications, ignore_conflicts=True)
+        VerificationRequest.objects.bulk_create(requests, ignore_conflicts=True)
+        AuditLog.objects.bulk_create(audit_logs, ignore_conflicts=True)
+
+
+class VerificationLogPipeline:
+    """
+    Écriture différée (write-behind) du journal des vérifications.
+
+    Les vues déposent des enregistrements compacts dans un tampon en mémoire ;
+    un thread de vidage les insère par bulk_create tous les BATCH_SIZE
+    enregistrements ou toutes les FLUSH_INTERVAL_MS millisecondes. La réponse
+    de vérification n'attend donc plus les insertions.
+
+    - Durabilité : chaque enregistrement est aussi ajouté à un fichier de spool
+      local au processus. Si le processus meurt avant le vidage, la tâche Huey
+      recover_verification_spool rejoue le fichier (insertions idempotentes).
+    - Contre-pression : tampon plein, l'appelant attend au plus BLOCK_TIMEOUT_MS,
+      puis le surplus est confié à une tâche Huey.
+    - IMMEDIATE : écriture synchrone (tests, débogage), comme Huey en mode immediate.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.spool_dir = Path(self.config['SPOOL_DIR'])
+        self.flushed = 0
+        self.overflowed = 0
+        self._pid = None
+
+    def _start(self) -> None:
+        """
+        Initialise l'état du processus (au premier usage, et après un fork).
+        _pid est affecté en dernier : les lectures sans verrou de _pid ne voient
+        qu'un état complet.
+        """
+        if self._pid == os.getpid():
+            return
+        with _start_lock:
+            if self._pid != os.getpid():
+                self._initialize()
+
+    def _initialize(self) -> None:
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._pending: deque = deque()
+        self._seq = 0
+        self._spool = None
+        self._stopped = False
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._open_spool()
+        self._thread = threading.Thread(target=self._run, name='verification-log-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        self._pid = os.getpid()
+
+    def _open_spool(self) -> None:
+        self._seq += 1
+        name = f"verif-{socket.gethostname()}-{os.getpid()}-{self._seq}{SPOOL_SUFFIX}"
+        self._spool_path = self.spool_dir / name
+        self._spool = open(self._spool_path, 'a', encoding='utf-8')
+
+    # ------------------------------------------
+    # Dépôt (chemin de vérification)
+    # ------------------------------------------
+
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        self.enqueue_many([record])
+
+    def enqueue_many(self, records: List[Dict[str, Any]]) -> None:
+        """Dépose des enregistrements ; ne bloque au plus que BLOCK_TIMEOUT_MS si le tampon est plein."""
+        if not records:
+            return
+        if self.config['IMMEDIATE']:
+            write_records(records)
+            return
+        self._start()
+
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        overflow = []
+        with self._lock:
+            max_pending = self.config['MAX_PENDING']
+            if len(self._pending) + len(records) > max_pending:
+                self._not_empty.notify()
+                self._not_full.wait(self.config['BLOCK_TIMEOUT_MS'] / 1000)
+            room = max(0, max_pending - len(self._pending))
+            accepted, overflow = records[:room], records[room:]
+            if accepted:
+                if len(accepted) < len(records):
+                    lines = ''.join(json.dumps(record, default=str) + '\n' for record in accepted)
+                self._spool.write(lines)
+                self._spool.flush()
+                self._pending.extend(accepted)
+                if len(self._pending) >= self.config['BATCH_SIZE']:
+                    self._not_empty.notify()
+
+        if overflow:
+            from .tasks import write_verification_logs
+            self.overflowed += len(overflow)
+            logger.warning(f"Tampon de journalisation plein : {len(overflow)} vérifications confiées à Huey")
+            write_verification_logs(overflow)
+
+    async def aenqueue(self, record: Dict[str, Any]) -> None:
+        """
+        Version async de enqueue : dépôt direct dans le tampon (mémoire et spool local) s'il
+        a de la place ; écriture immédiate, attente sur tampon plein et débordement vers
+        Huey passent par un thread.
+        """
+        if self.config['IMMEDIATE'] or self._pid != os.getpid() or not self._offer(record):
+            await sync_to_async(self.enqueue_many)([record])
+
+    def _offer(self, record: Dict[str, Any]) -> bool:
+        """Dépôt sans attente ; False si le tampon est plein."""
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            if len(self._pending) >= self.config['MAX_PENDING']:
+                return False
+            self._spool.write(line)
+            self._spool.flush()
+            self._pending.append(record)
+            if len(self._pending) >= self.config['BATCH_SIZE']:
+                self._not_empty.notify()
+        return True
+
+    # ------------------------------------------
+    # Vidage
+    # ------------------------------------------
+
+    def _run(self) -> None:
+        interval = self.config['FLUSH_INTERVAL_MS'] / 1000
+        while True:
+            with self._lock:
+                if not self._stopped and len(self._pending) < self.config['BATCH_SIZE']:
+                    self._not_empty.wait(interval)
+                stopped = self._stopped
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+            if stopped:
+                return
+
+    def flush(self) -> int:
+        """Insère tous les enregistrements en attente ; retourne leur nombre."""
+        if self._pid != os.getpid():
+            return 0
+        with self._lock:
+            if not self._pending:
+                return 0
+            records = list(self._pending)
+            self._pending.clear()
+            self._spool.close()
+            flushed_path = self._spool_path.with_suffix(PENDING_SUFFIX)
+            try:
+                self._spool_path.rename(flushed_path)
+            except FileNotFoundError:
+                # Déjà rejoué par recover_verification_spool (insertions idempotentes)
+                flushed_path.touch()
+            self._open_spool()
+            self._not_full.notify_all()
+
+        try:
+            for start in range(0, len(records), self.config['BATCH_SIZE']):
+                write_records(records[start:start + self.config['BATCH_SIZE']])
+        except Exception as e:
+            logger.error(f"Échec de l'écriture de {len(records)} vérifications, spool conservé: {e}", exc_info=True)
+            flushed_path.rename(flushed_path.with_suffix(FAILED_SUFFIX))
+            return 0
+        flushed_path.unlink(missing_ok=True)
+        self.flushed += len(records)
+        return len(records)
+
+    def stop(self) -> None:
+        """Arrête le thread de vidage après un dernier vidage (atexit)."""
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            self._stopped = True
+            self._not_empty.notify()
+        self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, int]:
+        pending = len(self._pending) if self._pid == os.getpid() else 0
+        return {'pending': pending, 'flushed': self.flushed, 'overflowed': self.overflowed}
+
+    # ------------------------------------------
+    # Reprise (tâche Huey)
+    # ------------------------------------------
+
+    def recover(self) -> int:
+        """
+        Rejoue les fichiers de spool orphelins : échecs d'écriture, et fichiers
+        non modifiés depuis RECOVERY_AGE secondes (processus arrêté brutalement).
+        """
+        if not self.spool_dir.exists():
+            return 0
+        now = time.time()
+        recovered = 0
+        for path in sorted(self.spool_dir.iterdir()):
+            if path.suffix != FAILED_SUFFIX:
+                if self._owner_alive(path):
+                    continue
+                if now - path.stat().st_mtime < self.config['RECOVERY_AGE']:
+                    continue
+            records = list(self._read_spool(path))
+            for start in range(0, len(records), self.config['BATCH_SIZE']):
+                write_records(records[start:start + self.config['BATCH_SIZE']])
+            path.unlink(missing_ok=True)
+            recovered += len(records)
+            logger.info(f"{len(records)} vérifications rejouées depuis {path.name}")
+        return recovered
+
+    @staticmethod
+    def _owner_alive(path: Path) -> bool:
+        """Le processus auteur du fichier (même hôte) est-il encore en vie ?"""
+        host_prefix = f"verif-{socket.gethostname()}-"
+        if not path.name.startswith(host_prefix):
+            return False
+        try:
+            pid = int(path.name[len(host_prefix):].split('-', 1)[0])
+            os.kill(pid, 0)
+        except (ValueError, ProcessLookupError):
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def _read_spool(path: Path) -> Iterable[Dict[str, Any]]:
+        with open(path, encoding='utf-8') as spool:
+            for line in spool:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un arrêt brutal
+                    continue
+
+
+verification_log = VerificationLogPipeline(getattr(settings, 'VERIFICATION_LOG', None))
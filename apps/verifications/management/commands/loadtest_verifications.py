@@ -0,0 +1,245 @@
+# apps/verifications/management/commands/loadtest_verifications.py
+import asyncio
+import json
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.documents.models import SignedDocument
+
+# Un seul processus worker par serveur : on compare ce qu'un worker absorbe
+SERVERS = {
+    'wsgi': lambda host, port, threads: [
+        sys.executable, '-m', 'gunicorn', 'config.wsgi:application', '--bind', f'{host}:{port}',
+        '--workers', '1', '--worker-class', 'gthread', '--threads', str(threads), '--log-level', 'warning',
+    ],
+    'asgi': lambda host, port, threads: [
+        sys.executable, '-m', 'uvicorn', 'config.asgi:application', '--host', host, '--port', str(port),
+        '--workers', '1', '--log-level', 'warning', '--no-access-log',
+    ],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class LoadClient:
+    """
+    Client HTTP/1.1 asyncio minimal (connexions persistantes), sans dépendance.
+
+    Chaque client virtuel enchaîne ses requêtes sur sa connexion. Un client
+    « lent » (slow_body_ms) envoie le corps du POST en deux fois, comme un
+    mobile sur un réseau médiocre : un serveur à threads garde un thread
+    bloqué pendant ce temps, un serveur async non.
+    """
+
+    def __init__(self, host: str, port: int, hashes: List[str], post_ratio: float, slow_body_ms: int):
+        self.host = host
+        self.port = port
+        self.hashes = hashes
+        self.post_ratio = post_ratio
+        self.slow_body = slow_body_ms / 1000
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.recording = False
+
+    def build(self) -> Tuple[bytes, bytes]:
+        """Requête (en-têtes, corps) ; X-Forwarded-For aléatoire : un vérifieur distinct par requête."""
+        document_hash = random.choice(self.hashes)
+        forwarded = f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
+        common = (
+            f"Host: {self.host}\r\nX-Forwarded-For: {forwarded}\r\nX-Forwarded-Proto: https\r\n"
+            f"User-Agent: loadtest\r\nConnection: keep-alive\r\n"
+        )
+        if random.random() < self.post_ratio:
+            body = json.dumps({'document_hash': document_hash}).encode()
+            head = (
+                f"POST /api/v1/verify/hash HTTP/1.1\r\n{common}"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            )
+            return head.encode(), body
+        return f"GET /api/v1/verify/{document_hash} HTTP/1.1\r\n{common}\r\n".encode(), b''
+
+    async def request(self, reader, writer) -> Tuple[int, bool]:
+        head, body = self.build()
+        if body and self.slow_body:
+            writer.write(head + body[:len(body) // 2])
+            await writer.drain()
+            await asyncio.sleep(self.slow_body)
+            writer.write(body[len(body) // 2:])
+        else:
+            writer.write(head + body)
+        await writer.drain()
+
+        header_block = await reader.readuntil(b"\r\n\r\n")
+        lines = header_block.decode('latin-1').split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+            keep_alive = headers.get('connection', '').lower() != 'close'
+        else:
+            await reader.read()
+            keep_alive = False
+        return status, keep_alive
+
+    async def run(self, deadline: float) -> None:
+        reader = writer = None
+        while time.monotonic() < deadline:
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                started = time.perf_counter()
+                status, keep_alive = await self.request(reader, writer)
+                if self.recording:
+                    self.latencies.append(time.perf_counter() - started)
+                    self.statuses[status] += 1
+                if not keep_alive:
+                    writer.close()
+                    writer = None
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                if self.recording:
+                    self.errors += 1
+                if writer is not None:
+                    writer.close()
+                writer = None
+                await asyncio.sleep(0.05)
+        if writer is not None:
+            writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge des vérifications publiques (GET /verify/<hash>, POST /verify/hash) : "
+        "même application servie en WSGI (gunicorn gthread) puis en ASGI (uvicorn), un worker chacun ; "
+        "débit et latences p50/p99 par niveau de concurrence"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', action='append', choices=list(SERVERS), dest='servers',
+                            help="Serveur à mesurer (répétable ; défaut : wsgi et asgi)")
+        parser.add_argument('--concurrency', type=int, action='append',
+                            help="Clients simultanés (répétable ; défaut : 50 et 500)")
+        parser.add_argument('--duration', type=float, default=10.0, help="Durée de mesure par palier (s)")
+        parser.add_argument('--warmup', type=float, default=2.0, help="Durée de chauffe non mesurée (s)")
+        parser.add_argument('--threads', type=int, default=8, help="Threads du worker WSGI")
+        parser.add_argument('--slow-body-ms', type=int, default=0,
+                            help="Pause au milieu du corps des POST (clients mobiles lents)")
+        parser.add_argument('--post-ratio', type=float, default=0.5, help="Part des POST /verify/hash")
+        parser.add_argument('--known-hashes', type=int, default=1000,
+                            help="Hashes de documents existants tirés de la base")
+        parser.add_argument('--unknown-ratio', type=float, default=0.2, help="Part de hashes inconnus")
+        parser.add_argument('--settings-module', default='config.settings.production',
+                            help="Profil de configuration des serveurs")
+        parser.add_argument('--json', action='store_true', help="Affiche les résultats en JSON")
+
+    def handle(self, *args, **options):
+        hashes = list(SignedDocument.objects.values_list('document_hash', flat=True)[:options['known_hashes']])
+        unknown = max(1, int(len(hashes) * options['unknown_ratio'] / max(1e-9, 1 - options['unknown_ratio'])))
+        hashes += [secrets.token_hex(32) for _ in range(unknown if hashes else 1000)]
+        if not options['json']:
+            self.stdout.write(
+                "Les vérifications de ce test sont journalisées : utiliser une base jetable (DATABASE_URL)."
+            )
+
+        results = []
+        for server in options['servers'] or list(SERVERS):
+            host, port = '127.0.0.1', free_port()
+            process = subprocess.Popen(
+                SERVERS[server](host, port, options['threads']),
+                cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': options['settings_module']},
+            )
+            try:
+                asyncio.run(self.wait_ready(host, port, process))
+                for concurrency in options['concurrency'] or [50, 500]:
+                    row = asyncio.run(self.measure(host, port, hashes, concurrency, options))
+                    results.append({'server': server, **row})
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'serveur':<8} {'clients':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+            f"{'erreurs':>8}  statuts"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['server']:<8} {r['concurrency']:>8} {r['rps']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+                f"{r['max_ms']:>8} {r['errors']:>8}  {r['statuses']}"
+            )
+
+    @staticmethod
+    async def wait_ready(host: str, port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Le serveur s'est arrêté au démarrage (code {process.returncode})")
+            try:
+                _, writer = await asyncio.open_connection(host, port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.2)
+        raise CommandError(f"Serveur injoignable sur {host}:{port} après {timeout}s")
+
+    @staticmethod
+    async def measure(host: str, port: int, hashes: List[str], concurrency: int, options) -> Dict:
+        clients = [
+            LoadClient(host, port, hashes, options['post_ratio'], options['slow_body_ms'])
+            for _ in range(concurrency)
+        ]
+        deadline = time.monotonic() + options['warmup'] + options['duration']
+        tasks = [asyncio.create_task(client.run(deadline)) for client in clients]
+        await asyncio.sleep(options['warmup'])
+        for client in clients:
+            client.recording = True
+        started = time.monotonic()
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+        latencies = sorted(latency for client in clients for latency in client.latencies)
+        statuses = sum((client.statuses for client in clients), Counter())
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            'concurrency': concurrency,
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed),
+            'p50_ms': ms(percentile(latencies, 0.50)),
+            'p99_ms': ms(percentile(latencies, 0.99)),
+            'max_ms': ms(latencies[-1] if latencies else None),
+            'errors': sum(client.errors for client in clients),
+            'statuses': dict(sorted(statuses.items())),
+            'slow_body_ms': options['slow_body_ms'],
+        }
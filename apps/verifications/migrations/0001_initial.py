@@ -0,0 +1,65 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('documents', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuspiciousReport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_hash', models.CharField(max_length=128)),
+                ('report_type', models.CharField(choices=[('FAKE', 'Faux document'), ('ALTERED', 'Document modifié'), ('UNAUTHORIZED', 'Utilisation non autorisée'), ('OTHER', 'Autre')], max_length=20)),
+                ('reason', models.TextField()),
+                ('reporter_ip', models.GenericIPAddressField()),
+                ('reporter_email', models.EmailField(blank=True, max_length=254)),
+                ('reporter_name', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('UNDER_REVIEW', 'En cours de révision'), ('CONFIRMED', 'Confirmé frauduleux'), ('REJECTED', 'Rejeté (non frauduleux)'), ('CLOSED', 'Clos')], default='PENDING', max_length=20)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('admin_notes', models.TextField(blank=True)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('evidence_urls', models.JSONField(blank=True, default=list)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='documents.signeddocument')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'suspicious_reports',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['status', 'timestamp'], name='suspicious__status_6d3a68_idx'), models.Index(fields=['document', 'status'], name='suspicious__documen_855125_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VerificationRequest',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('document_hash', models.CharField(db_index=True, max_length=128)),
+                ('uploader_ip', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True)),
+                ('referer', models.URLField(blank=True)),
+                ('status', models.CharField(choices=[('SUCCESS', 'Succès'), ('FAILURE', 'Échec'), ('ERROR', 'Erreur système')], max_length=10)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('processing_time_ms', models.IntegerField(null=True)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('matched_document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='documents.signeddocument')),
+            ],
+            options={
+                'db_table': 'verification_requests',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['document_hash', 'timestamp'], name='verificatio_documen_2c4f71_idx'), models.Index(fields=['uploader_ip', 'timestamp'], name='verificatio_uploade_28a154_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('verifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='verificationrequest',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,3 +1,111 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from apps.documents.models import SignedDocument
+import uuid
 
-# Create your models here.
+
+class VerificationRequest(models.Model):
+    """Requête de vérification (traçabilité complète)"""
+
+    class Status(models.TextChoices):
+        SUCCESS = 'SUCCESS', 'Succès'
+        FAILURE = 'FAILURE', 'Échec'
+        ERROR = 'ERROR', 'Erreur système'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Hash fourni
+    document_hash = models.CharField(max_length=128, db_index=True)
+
+    # Informations requête
+    uploader_ip = models.GenericIPAddressField()
+    user_agent = models.TextField(blank=True)
+    referer = models.URLField(blank=True)
+
+    # Résultat
+    status = models.CharField(max_length=10, choices=Status.choices)
+    matched_document = models.ForeignKey(
+        SignedDocument,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+
+    # Timing (heure de la vérification, fournie par l'écriture différée)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+    processing_time_ms = models.IntegerField(null=True)
+
+    # Détails additionnels
+    details = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        db_table = 'verification_requests'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['document_hash', 'timestamp']),
+            models.Index(fields=['uploader_ip', 'timestamp']),
+        ]
+
+
+class SuspiciousReport(models.Model):
+    """Signalement de document suspect ou frauduleux"""
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'En attente'
+        UNDER_REVIEW = 'UNDER_REVIEW', 'En cours de révision'
+        CONFIRMED = 'CONFIRMED', 'Confirmé frauduleux'
+        REJECTED = 'REJECTED', 'Rejeté (non frauduleux)'
+        CLOSED = 'CLOSED', 'Clos'
+
+    class ReportType(models.TextChoices):
+        FAKE_DOCUMENT = 'FAKE', 'Faux document'
+        ALTERED = 'ALTERED', 'Document modifié'
+        UNAUTHORIZED = 'UNAUTHORIZED', 'Utilisation non autorisée'
+        OTHER = 'OTHER', 'Autre'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    document = models.ForeignKey(
+        SignedDocument,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='reports'
+    )
+
+    # Informations signalement
+    document_hash = models.CharField(max_length=128)  # Au cas où document pas trouvé
+    report_type = models.CharField(max_length=20, choices=ReportType.choices)
+    reason = models.TextField()
+
+    # Informations signaleur
+    reporter_ip = models.GenericIPAddressField()
+    reporter_email = models.EmailField(blank=True)  # Optionnel
+    reporter_name = models.CharField(max_length=100, blank=True)  # Optionnel
+
+    # Statut
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    reviewed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    admin_notes = models.TextField(blank=True)
+
+    # Dates
+    timestamp = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Métadonnées
+    evidence_urls = models.JSONField(default=list, blank=True)  # Screenshots, etc.
+    metadata = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        db_table = 'suspicious_reports'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['status', 'timestamp']),
+            models.Index(fields=['document', 'status']),
+        ]
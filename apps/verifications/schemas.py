@@ -0,0 +1,86 @@
+# apps/verifications/schemas.py
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from django.conf import settings
+from ninja import Schema
+from pydantic import Field
+from typing_extensions import Annotated
+
+from apps.documents.models import DocumentVerification
+
+SHA256_PATTERN = r'^[0-9a-fA-F]{64}$'
+
+
+class VerifyHashSchema(Schema):
+    document_hash: str = Field(..., pattern=SHA256_PATTERN)
+    method: DocumentVerification.Method = DocumentVerification.Method.HASH_INPUT
+
+
+DocumentHash = Annotated[str, Field(pattern=SHA256_PATTERN)]
+
+
+class VerifyBatchSchema(Schema):
+    hashes: List[DocumentHash] = Field(..., min_length=1, max_length=settings.VERIFICATION_BATCH['MAX_SIZE'])
+    method: DocumentVerification.Method = DocumentVerification.Method.API
+
+
+class InstitutionSchema(Schema):
+    name: str
+    logo_url: Optional[str] = None
+    country_code: str
+    type: str
+
+
+class MerkleProofStepSchema(Schema):
+    position: Literal['left', 'right']  # Côté du voisin
+    hash: str
+
+
+class MerkleProofSchema(Schema):
+    """
+    Preuve d'inclusion d'un document signé par lot : en partant de
+    SHA-256(0x00 || hash), chaque étape calcule SHA-256(0x01 || gauche || droite)
+    jusqu'à merkle_root, signée (root_signature) comme un hash de document.
+    """
+    batch_id: str
+    merkle_root: str
+    root_signature: str
+    key_fingerprint: str
+    leaf_index: int
+    leaf_count: int
+    path: List[MerkleProofStepSchema]
+
+
+class DocumentInfoSchema(Schema):
+    institution: InstitutionSchema
+    signed_at: datetime
+    file_type: str
+    key_algorithm: str
+    status: str
+    merkle_proof: Optional[MerkleProofSchema] = None  # Documents signés par lot
+
+
+class VerificationResultSchema(Schema):
+    result: DocumentVerification.Result
+    document: Optional[DocumentInfoSchema] = None
+    verification_id: str
+    verified_at: datetime
+
+
+class BatchVerificationItemSchema(VerificationResultSchema):
+    """Ligne NDJSON de la réponse de vérification par lot."""
+    document_hash: str
+
+
+class SimilarDocumentSchema(Schema):
+    document_hash: str
+    distance: int  # Bits différents entre les empreintes perceptuelles
+    result: DocumentVerification.Result
+    document: Optional[DocumentInfoSchema] = None
+
+
+class SimilarDocumentsSchema(Schema):
+    perceptual_hash: str  # Empreinte de l'image envoyée (hexadécimal)
+    radius: int
+    candidates: List[SimilarDocumentSchema]
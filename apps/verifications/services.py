@@ -0,0 +1,404 @@
+# apps/verifications/services.py
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from apps.cryptography.models import CryptographicKey
+from apps.cryptography.engine import signature_engine
+from apps.documents.batches import document_batches
+from apps.documents.hash_filter import document_filter
+from apps.documents.models import DocumentVerification, SignedDocument
+from apps.documents.revocation import revocation_index
+from apps.documents.similarity import perceptual_index
+
+from .cache import verification_cache
+from .log_pipeline import verification_log
+
+logger = logging.getLogger('app')
+
+Result = DocumentVerification.Result
+
+# Taille des lots de suppression lors de l'invalidation d'une clé
+INVALIDATION_CHUNK_SIZE = 1000
+
+
+class VerificationService:
+    """
+    Vérification publique des documents par hash SHA-256.
+    Les instantanés de documents sont servis par le cache à deux niveaux
+    (apps.verifications.cache) : les vérifications répétées d'un même
+    document ne touchent pas la base de données. La journalisation est
+    différée (apps.verifications.log_pipeline).
+    """
+
+    @staticmethod
+    def documents():
+        """Documents chargés avec ce qu'exige build_snapshot (l'arbre d'un lot est lu à part, et mis en cache)."""
+        return SignedDocument.objects.select_related('institution', 'key', 'batch').defer('batch__tree')
+
+    @staticmethod
+    def build_snapshot(document: SignedDocument, tree=None) -> Dict[str, Any]:
+        """
+        Construit l'instantané nécessaire à la vérification d'un document
+        (chargé par documents()).
+        La signature est vérifiée une seule fois ici, puis mise en cache avec l'instantané.
+        Document d'un lot : preuve d'inclusion vérifiée jusqu'à la racine signée
+        (tree : arbre du lot déjà chargé, sinon lu via le cache des arbres).
+        """
+        key = document.key
+        institution = document.institution
+        merkle_proof = None
+        if document.batch_id is not None:
+            merkle_proof, signature_valid = document_batches.verify_document(document, tree)
+        else:
+            signature_valid = signature_engine.verify_with_key(key, document.signature, document.document_hash)
+        return {
+            'document_id': str(document.id),
+            'document_status': document.status,
+            'expires_at': document.expires_at,
+            'signed_at': document.created_at,
+            'file_type': document.file_type,
+            'key_id': str(key.id),
+            'key_status': key.status,
+            'key_expires_at': key.expires_at,
+            'key_algorithm': key.algorithm,
+            'signature_valid': signature_valid,
+            'merkle_proof': merkle_proof,
+            'institution': {
+                'name': institution.name,
+                'logo_url': institution.logo.url if institution.logo else None,
+                'country_code': institution.country_code,
+                'type': institution.type,
+            },
+        }
+
+    @staticmethod
+    def load_snapshot(document_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Charge depuis la base l'instantané d'un hash.
+
+        Returns:
+            dict de l'instantané, ou None si aucun document ne correspond
+        """
+        try:
+            document = VerificationService.documents().get(document_hash=document_hash)
+        except SignedDocument.DoesNotExist:
+            return None
+        return VerificationService.build_snapshot(document)
+
+    @staticmethod
+    def load_snapshots(document_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Charge les instantanés d'un ensemble de hashes en une seule requête."""
+        documents = VerificationService.documents().filter(document_hash__in=document_hashes)
+        return {
+            document.document_hash: VerificationService.build_snapshot(document)
+            for document in documents
+        }
+
+    @staticmethod
+    def lookup(document_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'instantané du document via le cache (None si hash inconnu).
+        Les hashes rejetés par le filtre de Bloom ne consultent ni le cache ni la base.
+        """
+        if not document_filter.might_contain(document_hash):
+            return None
+        return verification_cache.get_or_load(document_hash, VerificationService.load_snapshot)
+
+    @staticmethod
+    async def aload_snapshot(document_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Version async de load_snapshot (ORM async). La vérification de la signature
+        (ou de la preuve d'inclusion) tourne dans un thread, hors de la boucle d'événements :
+        build_snapshot n'accède pas à la base, tout étant chargé ici.
+        """
+        try:
+            document = await VerificationService.documents().aget(document_hash=document_hash)
+        except SignedDocument.DoesNotExist:
+            return None
+        tree = await document_batches.atree(document.batch_id) if document.batch_id is not None else None
+        return await sync_to_async(VerificationService.build_snapshot, thread_sensitive=False)(document, tree)
+
+    @staticmethod
+    async def alookup(document_hash: str) -> Optional[Dict[str, Any]]:
+        """Version async de lookup."""
+        if not await document_filter.amight_contain(document_hash):
+            return None
+        return await verification_cache.aget_or_load(document_hash, VerificationService.aload_snapshot)
+
+    @staticmethod
+    def resolve_result(
+        snapshot: Optional[Dict[str, Any]],
+        now: Optional[datetime] = None,
+        document_hash: Optional[str] = None
+    ) -> str:
+        """
+        Calcule le résultat de la vérification à partir d'un instantané.
+        Les dates d'expiration sont évaluées à chaque appel : un instantané en cache
+        reste donc correct lorsqu'un document ou une clé expire. Une révocation
+        publiée par l'index de révocation (en mémoire) l'emporte sur un instantané
+        en cache antérieur.
+        """
+        if snapshot is None:
+            return Result.NOT_FOUND
+
+        now = now or timezone.now()
+        status = snapshot['document_status']
+        if status in (SignedDocument.Status.REVOKED, SignedDocument.Status.SUSPENDED):
+            return Result.REVOKED
+        if document_hash is not None and revocation_index.document_status(document_hash) is not None:
+            return Result.REVOKED
+        if status == SignedDocument.Status.EXPIRED or (
+            snapshot['expires_at'] is not None and snapshot['expires_at'] <= now
+        ):
+            return Result.EXPIRED
+
+        key_status = snapshot['key_status']
+        if key_status == CryptographicKey.Status.REVOKED or revocation_index.key_revoked(snapshot['key_id']):
+            return Result.REVOKED
+        if key_status == CryptographicKey.Status.EXPIRED or snapshot['key_expires_at'] <= now:
+            return Result.KEY_EXPIRED
+
+        if not snapshot['signature_valid']:
+            return Result.INVALID_SIGNATURE
+        return Result.AUTHENTIC
+
+    @staticmethod
+    def verify_hash(
+        document_hash: str,
+        method: str,
+        ip_address: str,
+        user_agent: str = '',
+        referer: str = ''
+    ) -> Dict[str, Any]:
+        """
+        Vérifie un hash de document et journalise la vérification.
+
+        Args:
+            document_hash: Hash SHA-256 (hexadécimal, minuscules)
+            method: Méthode de vérification (DocumentVerification.Method)
+            ip_address: Adresse IP du vérifieur
+            user_agent: User-Agent du vérifieur
+            referer: En-tête Referer de la requête
+
+        Returns:
+            dict conforme à VerificationResultSchema
+        """
+        started = time.perf_counter()
+        snapshot = VerificationService.lookup(document_hash)
+        record, response = VerificationService._outcome(
+            document_hash, snapshot, started, method, ip_address, user_agent, referer
+        )
+        verification_log.enqueue(record)
+        return response
+
+    @staticmethod
+    async def averify_hash(
+        document_hash: str,
+        method: str,
+        ip_address: str,
+        user_agent: str = '',
+        referer: str = ''
+    ) -> Dict[str, Any]:
+        """
+        Version async de verify_hash (vues async sous ASGI) : cache partagé,
+        base et journal sont attendus sans occuper de thread dans le cas courant.
+        """
+        started = time.perf_counter()
+        snapshot = await VerificationService.alookup(document_hash)
+        await revocation_index.aensure_current()
+        record, response = VerificationService._outcome(
+            document_hash, snapshot, started, method, ip_address, user_agent, referer
+        )
+        await verification_log.aenqueue(record)
+        return response
+
+    @staticmethod
+    def _outcome(
+        document_hash: str,
+        snapshot: Optional[Dict[str, Any]],
+        started: float,
+        method: str,
+        ip_address: str,
+        user_agent: str,
+        referer: str
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Résultat d'une vérification : (enregistrement du journal, réponse VerificationResultSchema)."""
+        now = timezone.now()
+        result = VerificationService.resolve_result(snapshot, now, document_hash)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+
+        verification_id = uuid.uuid4()
+        record = VerificationService.log_record(
+            verification_id=verification_id,
+            document_hash=document_hash,
+            snapshot=snapshot,
+            method=method,
+            result=result,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            referer=referer,
+            duration_ms=duration_ms,
+            timestamp=now,
+        )
+        return record, {
+            'result': result,
+            'document': VerificationService.document_info(snapshot),
+            'verification_id': str(verification_id),
+            'verified_at': now,
+        }
+
+    @staticmethod
+    def verify_batch(
+        document_hashes: List[str],
+        method: str,
+        ip_address: str,
+        user_agent: str = '',
+        referer: str = ''
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Vérifie un lot de hashes, par tranches de VERIFICATION_BATCH['CHUNK_SIZE'].
+        Chaque tranche est résolue par le cache puis par une seule requête
+        ensembliste, et transmise d'un bloc au journal différé.
+
+        Yields:
+            dict par hash, dans l'ordre de la requête (doublons inclus)
+        """
+        chunk_size = settings.VERIFICATION_BATCH['CHUNK_SIZE']
+        for start in range(0, len(document_hashes), chunk_size):
+            chunk = document_hashes[start:start + chunk_size]
+            started = time.perf_counter()
+            candidates = [h for h in dict.fromkeys(chunk) if document_filter.might_contain(h)]
+            snapshots = verification_cache.get_many_or_load(candidates, VerificationService.load_snapshots)
+            now = timezone.now()
+            duration_ms = int((time.perf_counter() - started) * 1000)
+
+            records = []
+            items = []
+            for document_hash in chunk:
+                snapshot = snapshots.get(document_hash)
+                result = VerificationService.resolve_result(snapshot, now, document_hash)
+                verification_id = uuid.uuid4()
+                records.append(VerificationService.log_record(
+                    verification_id=verification_id,
+                    document_hash=document_hash,
+                    snapshot=snapshot,
+                    method=method,
+                    result=result,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    referer=referer,
+                    duration_ms=duration_ms,
+                    timestamp=now,
+                    batch=True,
+                ))
+                items.append({
+                    'document_hash': document_hash,
+                    'result': result,
+                    'document': VerificationService.document_info(snapshot),
+                    'verification_id': str(verification_id),
+                    'verified_at': now,
+                })
+            verification_log.enqueue_many(records)
+            yield from items
+
+    @staticmethod
+    def similar_documents(code: int) -> List[Dict[str, Any]]:
+        """
+        Documents dont l'empreinte perceptuelle est proche de code (SimilarDocumentSchema),
+        du plus proche au plus éloigné. Le résultat de chacun est celui d'une vérification
+        de son hash, sans journalisation : le client vérifie ensuite le candidat retenu.
+        """
+        now = timezone.now()
+        candidates = []
+        for document_hash, distance in perceptual_index.find(code):
+            snapshot = VerificationService.lookup(document_hash)
+            candidates.append({
+                'document_hash': document_hash,
+                'distance': distance,
+                'result': VerificationService.resolve_result(snapshot, now, document_hash),
+                'document': VerificationService.document_info(snapshot),
+            })
+        return candidates
+
+    @staticmethod
+    def document_info(snapshot: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Informations publiques du document (DocumentInfoSchema) extraites d'un instantané."""
+        if snapshot is None:
+            return None
+        return {
+            'institution': snapshot['institution'],
+            'signed_at': snapshot['signed_at'],
+            'file_type': snapshot['file_type'],
+            'key_algorithm': snapshot['key_algorithm'],
+            'status': snapshot['document_status'],
+            'merkle_proof': snapshot.get('merkle_proof'),
+        }
+
+    @staticmethod
+    def log_record(
+        verification_id: uuid.UUID,
+        document_hash: str,
+        snapshot: Optional[Dict[str, Any]],
+        method: str,
+        result: str,
+        ip_address: str,
+        user_agent: str,
+        referer: str,
+        duration_ms: int,
+        timestamp: datetime,
+        batch: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Enregistrement compact (sérialisable en JSON) d'une vérification,
+        écrit par le journal différé dans DocumentVerification, VerificationRequest et AuditLog.
+        """
+        return {
+            'id': str(verification_id),
+            'document_id': snapshot['document_id'] if snapshot else None,
+            'document_hash': document_hash,
+            'ip': ip_address,
+            'user_agent': user_agent,
+            'referer': referer,
+            'method': method,
+            'result': result,
+            'duration_ms': duration_ms,
+            'timestamp': timestamp.isoformat(),
+            'batch': batch,
+        }
+
+    # ------------------------------------------
+    # Invalidation
+    # ------------------------------------------
+
+    @staticmethod
+    def invalidate_documents(document_hashes: Iterable[str]) -> None:
+        """Invalide les instantanés en cache des hashes donnés (révocation, modification)."""
+        verification_cache.invalidate(document_hashes)
+
+    @staticmethod
+    def forget_not_found(document_hashes: Iterable[str]) -> None:
+        """Oublie les résultats « non trouvé » en cache de documents nouvellement enregistrés."""
+        verification_cache.forget_not_found(document_hashes)
+
+    @staticmethod
+    def invalidate_key(key_id) -> None:
+        """Invalide les instantanés de tous les documents signés avec une clé (révocation, rotation)."""
+        hashes = SignedDocument.objects.filter(key_id=key_id).values_list(
+            'document_hash', flat=True
+        ).iterator(chunk_size=INVALIDATION_CHUNK_SIZE)
+        chunk = []
+        for document_hash in hashes:
+            chunk.append(document_hash)
+            if len(chunk) >= INVALIDATION_CHUNK_SIZE:
+                verification_cache.invalidate(chunk, propagate=False)
+                chunk = []
+        # Une seule nouvelle époque pour la clé : les autres processus vident leur LRU une fois
+        verification_cache.invalidate(chunk)
+        logger.info(f"Cache de vérification invalidé pour la clé {key_id}")
@@ -0,0 +1,57 @@
+# apps/verifications/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.cryptography.models import CryptographicKey
+from apps.documents.models import SignedDocument
+from apps.documents.signals import documents_registered
+
+from .services import VerificationService
+
+# Champs de la clé repris dans les instantanés de vérification (statut, révocation, échéance, algorithme)
+KEY_SNAPSHOT_FIELDS = ('status', 'revoked_at', 'expires_at', 'algorithm', 'public_key')
+
+
+@receiver(post_save, sender=SignedDocument)
+@receiver(post_delete, sender=SignedDocument)
+def invalidate_document_cache(sender, instance: SignedDocument, created: bool = False, **kwargs):
+    """
+    Un document modifié (révocation) ou supprimé ne doit plus être servi depuis le cache ;
+    un document créé n'a en cache que son éventuel résultat « non trouvé ».
+    """
+    if created:
+        VerificationService.forget_not_found([instance.document_hash])
+    else:
+        VerificationService.invalidate_documents([instance.document_hash])
+
+
+@receiver(documents_registered)
+def invalidate_registered_documents_cache(sender, documents, **kwargs):
+    """Documents insérés en masse : oublie les résultats « non trouvé » mis en cache."""
+    VerificationService.forget_not_found([document.document_hash for document in documents])
+
+
+@receiver(pre_save, sender=CryptographicKey)
+def remember_key_state(sender, instance: CryptographicKey, raw: bool = False, update_fields=None, **kwargs):
+    """Relit les champs en cache d'une clé modifiée : seul un changement de valeur invalide le cache."""
+    instance._snapshot_state = None
+    if instance._state.adding or raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(KEY_SNAPSHOT_FIELDS):
+        instance._snapshot_state = False  # Aucun champ en cache enregistré
+        return
+    instance._snapshot_state = CryptographicKey.objects.filter(pk=instance.pk).values_list(
+        *KEY_SNAPSHOT_FIELDS
+    ).first()
+
+
+@receiver(post_save, sender=CryptographicKey)
+def invalidate_key_cache(sender, instance: CryptographicKey, created: bool, **kwargs):
+    """Une clé modifiée (révocation, rotation, expiration) invalide les documents qu'elle a signés."""
+    if created:
+        return
+    previous = getattr(instance, '_snapshot_state', None)
+    if previous is False:
+        return
+    if previous is None or previous != tuple(getattr(instance, field) for field in KEY_SNAPSHOT_FIELDS):
+        VerificationService.invalidate_key(instance.pk)
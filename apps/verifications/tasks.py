@@ -0,0 +1,33 @@
+# apps/verifications/tasks.py
+import logging
+
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task, db_task
+
+from apps.core.queues import PRIORITY_CRITICAL
+
+from .log_pipeline import verification_log, write_records
+
+logger = logging.getLogger('app')
+
+
+# ==========================================
+# TÂCHES HUEY (BACKGROUND TASKS)
+# ==========================================
+
+@db_task(retries=3, retry_delay=10, priority=PRIORITY_CRITICAL)
+def write_verification_logs(records):
+    """
+    Écrit les vérifications qui ont débordé du tampon en mémoire d'un worker web.
+    """
+    write_records(records)
+
+
+@db_periodic_task(crontab(minute='*/5'), priority=PRIORITY_CRITICAL)
+def recover_verification_spool():
+    """
+    Rejoue les fichiers de spool laissés par un worker arrêté avant son vidage.
+    """
+    recovered = verification_log.recover()
+    if recovered:
+        logger.warning(f"{recovered} vérifications rejouées depuis le spool")
@@ -1,3 +1,380 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.core.models import AuditLog
+from apps.core.ratelimit import rate_limiter
+from apps.cryptography.models import CryptographicKey
+from apps.documents.hash_filter import document_filter
+from apps.documents.models import DocumentVerification, SignedDocument
+from apps.institutions.models import Institution
+
+from .cache import verification_cache
+from .log_pipeline import VerificationLogPipeline, verification_log
+from .models import VerificationRequest
+from .services import VerificationService
+
+
+def make_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class VerificationTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_pem = cls.private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        cls.institution = Institution.objects.create(
+            name="Université de Test", legal_name="Université de Test", slug="univ-test",
+            type=Institution.Type.UNIVERSITY, email="contact@univ-test.cm",
+            address_line1="BP 1", city="Maroua", postal_code="000", country_code="CM",
+            status=Institution.Status.ACTIVE,
+        )
+        cls.key = CryptographicKey.objects.create(
+            institution=cls.institution, public_key=public_pem, fingerprint=make_hash(public_pem.encode()),
+            algorithm=CryptographicKey.Algorithm.RSA_2048, key_size=2048,
+            expires_at=timezone.now() + timedelta(days=365),
+        )
+        cls.document_hash = make_hash(b"diplome")
+        cls.document = SignedDocument.objects.create(
+            institution=cls.institution, key=cls.key, document_hash=cls.document_hash,
+            signature=cls.sign(cls.document_hash), file_type=SignedDocument.FileType.PDF,
+        )
+
+    @classmethod
+    def sign(cls, document_hash: str) -> str:
+        signature = cls.private_key.sign(
+            document_hash.encode(),
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+            hashes.SHA256(),
+        )
+        return base64.b64encode(signature).decode()
+
+    def setUp(self):
+        cache.clear()
+        verification_cache.local.clear()
+        rate_limiter.blocked.clear()
+
+    def verify(self, document_hash: str):
+        return self.client.post(
+            '/api/v1/verify/hash', {'document_hash': document_hash}, content_type='application/json'
+        )
+
+    def test_authentic_document_verification(self):
+        """Vérification document authentique retourne AUTHENTIC"""
+        response = self.verify(self.document_hash)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['result'], 'AUTHENTIC')
+        self.assertEqual(data['document']['institution']['name'], "Université de Test")
+        self.assertTrue(DocumentVerification.objects.filter(id=data['verification_id']).exists())
+
+    def test_invalid_hash_format_is_rejected(self):
+        response = self.verify('invalid_hash_123')
+        self.assertEqual(response.status_code, 422)
+
+    def test_unknown_hash_returns_not_found(self):
+        """Hash inexistant retourne NOT_FOUND"""
+        response = self.verify(make_hash(b"inconnu"))
+        self.assertEqual(response.json()['result'], 'NOT_FOUND')
+
+    def test_verify_by_upload(self):
+        response = self.client.post('/api/v1/verify/upload', {'file': SimpleUploadedFile('diplome.pdf', b"diplome")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['result'], 'AUTHENTIC')
+        verification = DocumentVerification.objects.get(id=response.json()['verification_id'])
+        self.assertEqual(verification.method, DocumentVerification.Method.UPLOAD)
+
+    @override_settings(DOCUMENT_UPLOAD={'MAX_SIZE': 1024})
+    def test_oversized_upload_is_refused(self):
+        response = self.client.post('/api/v1/verify/upload', {'file': SimpleUploadedFile('gros.pdf', b"x" * 200_000)})
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(DocumentVerification.objects.exists())
+
+    def test_lookup_by_url(self):
+        response = self.client.get(f'/api/v1/verify/{self.document_hash.upper()}')
+        self.assertEqual(response.json()['result'], 'AUTHENTIC')
+
+    def test_repeated_lookup_does_not_query_database(self):
+        VerificationService.lookup(self.document_hash)
+        with self.assertNumQueries(0):
+            snapshot = VerificationService.lookup(self.document_hash)
+        self.assertEqual(snapshot['document_id'], str(self.document.id))
+
+    async def test_async_endpoints_under_asgi(self):
+        response = await self.async_client.get(f'/api/v1/verify/{self.document_hash}')
+        self.assertEqual(response.json()['result'], 'AUTHENTIC')
+        response = await self.async_client.post(
+            '/api/v1/verify/hash', {'document_hash': make_hash(b"inconnu")}, content_type='application/json'
+        )
+        self.assertEqual(response.json()['result'], 'NOT_FOUND')
+        self.assertEqual(await DocumentVerification.objects.acount(), 2)
+
+    async def test_async_lookup_shares_the_cache(self):
+        await sync_to_async(VerificationService.lookup)(self.document_hash)
+        verification_cache.local.clear()
+        with mock.patch.object(VerificationService, 'aload_snapshot') as aload_snapshot:
+            snapshot = await VerificationService.alookup(self.document_hash)
+        aload_snapshot.assert_not_called()
+        self.assertEqual(snapshot['document_id'], str(self.document.id))
+
+    async def test_async_lookup_verifies_signatures_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        build_snapshot = VerificationService.build_snapshot
+        threads = []
+
+        def record_thread(document, tree=None):
+            threads.append(threading.get_ident())
+            return build_snapshot(document, tree)
+
+        with mock.patch.object(VerificationService, 'build_snapshot', side_effect=record_thread):
+            snapshot = await VerificationService.alookup(self.document_hash)
+        self.assertTrue(snapshot['signature_valid'])
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+
+    @mock.patch('apps.verifications.services.document_filter.might_contain', return_value=True)
+    def test_unknown_hash_is_negatively_cached(self, might_contain):
+        """Faux positif du filtre de Bloom : le cache négatif protège la base"""
+        unknown = make_hash(b"frauduleux")
+        self.assertIsNone(VerificationService.lookup(unknown))
+        with self.assertNumQueries(0):
+            self.assertIsNone(VerificationService.lookup(unknown))
+        # Le cache partagé sert les autres processus
+        verification_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertIsNone(VerificationService.lookup(unknown))
+
+    def test_unknown_hash_is_rejected_by_filter_without_cache_access(self):
+        document_filter.warm()
+        unknown = make_hash(b"faute de frappe")
+        with self.assertNumQueries(0), mock.patch.object(verification_cache, 'get_or_load') as get_or_load:
+            self.assertIsNone(VerificationService.lookup(unknown))
+        get_or_load.assert_not_called()
+
+    def test_registration_invalidates_negative_cache(self):
+        document_hash = make_hash(b"nouveau")
+        self.assertIsNone(VerificationService.lookup(document_hash))
+        SignedDocument.objects.create(
+            institution=self.institution, key=self.key, document_hash=document_hash,
+            signature=self.sign(document_hash), file_type=SignedDocument.FileType.PDF,
+        )
+        self.assertEqual(self.verify(document_hash).json()['result'], 'AUTHENTIC')
+
+    def test_revoked_document_verification(self):
+        """Document révoqué retourne REVOKED, même après mise en cache"""
+        self.assertEqual(self.verify(self.document_hash).json()['result'], 'AUTHENTIC')
+        self.document.status = SignedDocument.Status.REVOKED
+        self.document.save()
+        self.assertEqual(self.verify(self.document_hash).json()['result'], 'REVOKED')
+
+    def test_key_revocation_invalidates_documents(self):
+        self.assertEqual(self.verify(self.document_hash).json()['result'], 'AUTHENTIC')
+        self.key.status = CryptographicKey.Status.REVOKED
+        self.key.save()
+        self.assertEqual(self.verify(self.document_hash).json()['result'], 'REVOKED')
+
+    def test_only_cached_key_changes_invalidate_documents(self):
+        with mock.patch.object(VerificationService, 'invalidate_key') as invalidate_key:
+            self.key.validated_at = timezone.now()
+            self.key.save()
+            self.key.save(update_fields=['revocation_reason'])
+            invalidate_key.assert_not_called()
+            self.key.expires_at += timedelta(days=30)
+            self.key.save()
+        invalidate_key.assert_called_once_with(self.key.pk)
+
+    def test_key_invalidation_bumps_the_epoch_once(self):
+        SignedDocument.objects.bulk_create([
+            SignedDocument(
+                institution=self.institution, key=self.key, document_hash=make_hash(str(number).encode()),
+                signature="-", file_type=SignedDocument.FileType.PDF,
+            )
+            for number in range(25)
+        ])
+        with mock.patch('apps.verifications.services.INVALIDATION_CHUNK_SIZE', 10), \
+                mock.patch.object(verification_cache, '_bump_epoch') as bump_epoch:
+            VerificationService.invalidate_key(self.key.pk)
+        bump_epoch.assert_called_once_with()
+
+    def test_registration_keeps_other_cached_documents(self):
+        VerificationService.lookup(self.document_hash)
+        with mock.patch.object(verification_cache, '_bump_epoch') as bump_epoch:
+            SignedDocument.objects.create(
+                institution=self.institution, key=self.key, document_hash=make_hash(b"nouveau"),
+                signature="-", file_type=SignedDocument.FileType.PDF,
+            )
+        bump_epoch.assert_not_called()
+        with self.assertNumQueries(0):
+            VerificationService.lookup(self.document_hash)
+
+    def test_tampered_signature_returns_invalid_signature(self):
+        document_hash = make_hash(b"falsifie")
+        SignedDocument.objects.create(
+            institution=self.institution, key=self.key, document_hash=document_hash,
+            signature=self.sign(self.document_hash), file_type=SignedDocument.FileType.PDF,
+        )
+        self.assertEqual(self.verify(document_hash).json()['result'], 'INVALID_SIGNATURE')
+
+    def verify_batch(self, hashes):
+        response = self.client.post(
+            '/api/v1/verify/batch', {'hashes': hashes}, content_type='application/json'
+        )
+        if response.status_code != 200:
+            return response, None
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        return response, [json.loads(line) for line in lines]
+
+    def test_batch_verification_streams_results_in_order(self):
+        unknown = make_hash(b"inconnu")
+        with self.assertNumQueries(1), mock.patch.object(verification_log, 'enqueue_many') as enqueue_many:
+            response, items = self.verify_batch([self.document_hash, unknown, self.document_hash])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(
+            [(item['document_hash'], item['result']) for item in items],
+            [(self.document_hash, 'AUTHENTIC'), (unknown, 'NOT_FOUND'), (self.document_hash, 'AUTHENTIC')],
+        )
+        # Une seule requête ensembliste ; la journalisation est différée, en un bloc
+        records = enqueue_many.call_args.args[0]
+        self.assertEqual([record['id'] for record in records], [item['verification_id'] for item in items])
+
+    def test_batch_is_throttled_by_size(self):
+        hashes = [make_hash(str(i).encode()) for i in range(10)]
+        response, items = self.verify_batch(hashes)
+        self.assertEqual(len(items), 10)
+        # Le lot a consommé la capacité anonyme (10/s) : la requête suivante est refusée
+        self.assertEqual(self.verify(self.document_hash).status_code, 429)
+
+
+class VerificationLogPipelineTestCase(TestCase):
+
+    def setUp(self):
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool_dir.cleanup)
+        self.pipeline = VerificationLogPipeline({
+            'SPOOL_DIR': self.spool_dir.name, 'FLUSH_INTERVAL_MS': 60000, 'BATCH_SIZE': 1000,
+        })
+
+    def record(self, i: int, result: str = 'NOT_FOUND'):
+        return VerificationService.log_record(
+            verification_id=uuid.uuid4(), document_hash=make_hash(str(i).encode()), snapshot=None,
+            method=DocumentVerification.Method.API, result=result, ip_address='10.0.0.1',
+            user_agent='test', referer='', duration_ms=1, timestamp=timezone.now(),
+        )
+
+    def test_records_are_buffered_then_written_in_bulk(self):
+        records = [self.record(i) for i in range(20)]
+        with self.assertNumQueries(0):
+            self.pipeline.enqueue_many(records)
+        self.addCleanup(self.pipeline.stop)
+        self.assertEqual(self.pipeline.stats()['pending'], 20)
+
+        self.assertEqual(self.pipeline.flush(), 20)
+        ids = [record['id'] for record in records]
+        self.assertEqual(DocumentVerification.objects.filter(id__in=ids).count(), 20)
+        self.assertEqual(VerificationRequest.objects.filter(id__in=ids, status='FAILURE').count(), 20)
+        self.assertEqual(AuditLog.objects.filter(id__in=ids, action_type=AuditLog.ActionType.VERIFY).count(), 20)
+        # L'horodatage est celui de la vérification, pas celui de l'insertion
+        stored = DocumentVerification.objects.get(id=ids[0]).timestamp
+        self.assertEqual(stored.isoformat(), records[0]['timestamp'])
+        # Les fichiers de spool vidés sont supprimés
+        self.assertEqual([p for p in os.listdir(self.spool_dir.name) if not p.endswith('.ndjson')], [])
+
+    async def test_async_enqueue_never_blocks_the_event_loop(self):
+        self.pipeline.config.update({'MAX_PENDING': 2, 'BLOCK_TIMEOUT_MS': 1})
+        self.addCleanup(self.pipeline.stop)
+        loop_thread = threading.get_ident()
+        enqueue_many = self.pipeline.enqueue_many
+        threads = []
+
+        def record_thread(records):
+            threads.append(threading.get_ident())
+            enqueue_many(records)
+
+        # Tampon maintenu plein : le thread de vidage, réveillé, ne libère pas de place
+        with mock.patch.object(self.pipeline, 'enqueue_many', side_effect=record_thread), \
+                mock.patch.object(self.pipeline, 'flush', return_value=0), \
+                mock.patch('apps.verifications.tasks.write_verification_logs') as write_verification_logs:
+            for i in range(3):
+                await self.pipeline.aenqueue(self.record(i))
+
+        self.assertEqual(self.pipeline.stats()['pending'], 2)
+        # Démarrage du tampon puis débordement vers Huey : dans un thread, pas sur la boucle
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+        self.assertEqual(len(write_verification_logs.call_args.args[0]), 1)
+        # Écrits ici, dans la transaction du test, et non par le thread de vidage à l'arrêt
+        self.assertEqual(await sync_to_async(self.pipeline.flush)(), 2)
+
+    def test_concurrent_first_enqueues_start_the_pipeline_once(self):
+        self.addCleanup(self.pipeline.stop)
+        open_spool = VerificationLogPipeline._open_spool
+        barrier = threading.Barrier(8)
+
+        def slow_open_spool(pipeline):
+            time.sleep(0.01)  # élargit la fenêtre de course du démarrage
+            open_spool(pipeline)
+
+        def enqueue(i):
+            records = [self.record(i * 10 + k) for k in range(10)]
+            barrier.wait()
+            self.pipeline.enqueue_many(records)
+
+        with mock.patch.object(VerificationLogPipeline, '_open_spool', autospec=True,
+                               side_effect=slow_open_spool) as opened:
+            workers = [threading.Thread(target=enqueue, args=(i,)) for i in range(8)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        opened.assert_called_once()
+        self.assertEqual(self.pipeline.stats()['pending'], 80)
+        with open(self.pipeline._spool_path, encoding='utf-8') as spool:
+            self.assertEqual(len(spool.readlines()), 80)
+        self.assertEqual(self.pipeline.flush(), 80)
+
+    def test_orphan_spool_is_replayed_idempotently(self):
+        records = [self.record(i) for i in range(5)]
+        path = os.path.join(self.spool_dir.name, 'verif-autre-hote-4242-1.ndjson')
+        with open(path, 'w') as spool:
+            spool.writelines(json.dumps(record) + '\n' for record in records)
+            spool.write('{"id": "tronqué')  # dernière ligne interrompue par l'arrêt brutal
+        old = timezone.now().timestamp() - 3600
+        os.utime(path, (old, old))
+
+        self.assertEqual(self.pipeline.recover(), 5)
+        self.assertFalse(os.path.exists(path))
+        # Un second rejeu (ex. vidage concurrent) n'insère pas de doublons
+        self.pipeline.config['RECOVERY_AGE'] = 0
+        with open(path, 'w') as spool:
+            spool.writelines(json.dumps(record) + '\n' for record in records)
+        self.assertEqual(self.pipeline.recover(), 5)
+        self.assertEqual(DocumentVerification.objects.filter(id__in=[r['id'] for r in records]).count(), 5)
+
+    def test_recent_spool_of_running_worker_is_not_replayed(self):
+        self.pipeline.enqueue(self.record(1))
+        self.addCleanup(self.pipeline.stop)
+        self.addCleanup(self.pipeline.flush)
+        self.pipeline.config['RECOVERY_AGE'] = 0
+        self.assertEqual(self.pipeline.recover(), 0)
+        self.assertEqual(self.pipeline.stats()['pending'], 1)
@@ -2,11 +2,17 @@
 from django.http import Http404, HttpRequest
 from django.conf import settings
 from ninja import NinjaAPI
-from ninja.throttling import AnonRateThrottle, AuthRateThrottle
 from ninja.errors import ValidationError, HttpError, AuthenticationError, AuthorizationError
 
 import logging
+from apps.analytics.api import router as analytics_router
+from apps.analytics.instrumentation import instrument_operation
+from apps.core.api.audit import router as audit_router
 from apps.core.api.exceptions import BaseAPIException
+from apps.core.api.exports import router as exports_router
+from apps.core.api.throttling import RateLimitThrottle
+from apps.documents.api import router as documents_router
+from apps.verifications.api import router as verifications_router
 from apps.core.api.schemas import (
     ValidationErrorResponse,
     AuthenticationErrorResponse,
@@ -27,12 +33,24 @@ api_v1 = NinjaAPI(
     title="Let's Check API V1",
     version="1.0.0",
     description="API V1 for Let's Check platform.",
+    # Débits par palier : settings.RATE_LIMITING['TIERS']
     throttle=[
-        AnonRateThrottle('10/s'),
-        AuthRateThrottle('100/s')
+        RateLimitThrottle('ip'),
+        RateLimitThrottle('api_key'),
+        RateLimitThrottle('institution'),
     ]
 )
 
+# Mesure du temps passé dans les endpoints (apps.analytics.instrumentation)
+api_v1.add_decorator(instrument_operation)
+
+# Routeurs des applications
+api_v1.add_router("/verify/", verifications_router)
+api_v1.add_router("/documents/", documents_router)
+api_v1.add_router("/analytics/", analytics_router)
+api_v1.add_router("/audit/", audit_router)
+api_v1.add_router("/exports/", exports_router)
+
 # Gestionnaires d'exceptions globaux avec schémas pour docs Swagger
 @api_v1.exception_handler(ValidationError)
 def validation_errors(request: HttpRequest, exc: ValidationError):
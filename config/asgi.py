@@ -1,5 +1,5 @@
 """
-ASGI config for letscheck_web project.
+ASGI config for enspm_hub project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
@@ -8,9 +8,28 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
+import threading
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'letscheck_web.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 
 application = get_asgi_application()
+
+# Préchargement du filtre de hashes des documents dans chaque worker.
+# Uvicorn importe ce module depuis sa boucle d'événements, où l'ORM synchrone
+# est interdit : le préchargement se fait dans un thread, attendu ici.
+from apps.documents.hash_filter import document_filter  # noqa: E402
+from apps.documents.revocation import revocation_index  # noqa: E402
+from apps.documents.similarity import perceptual_index  # noqa: E402
+
+
+def warm():
+    document_filter.warm()
+    revocation_index.warm()
+    perceptual_index.warm()
+
+
+warm_up = threading.Thread(target=warm, name='hash-filter-warm-up')
+warm_up.start()
+warm_up.join()
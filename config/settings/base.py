@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
 import re
+import sys
 from pathlib import Path
 
 import environ
@@ -29,6 +30,9 @@ env.read_env(os.path.join(BASE_DIR, ".env"))
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = env('SECRET_KEY')
 
+# Exécution de la suite de tests (manage.py test)
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 # ==========================================
 # CONFIGURATION EMAIL
 # ==========================================
@@ -47,6 +51,11 @@ DEFAULT_FROM_EMAIL = env.str('DEFAULT_FROM_EMAIL', default='noreply@enspmhub.com
 SERVER_EMAIL = env.str('SERVER_EMAIL', default='enspmhub@enspmhub.com') # type: ignore
 SUPPORT_EMAIL = env.str('SUPPORT_EMAIL', default='enspmhub@enspmhub.com') # type: ignore
 
+# Envois groupés (EmailService.send_bulk) : destinataires par tâche Huey et par connexion SMTP
+EMAIL_BULK = {
+    'GROUP_SIZE': env.int('EMAIL_BULK_GROUP_SIZE', default=100), # type: ignore
+}
+
 # Informations du site
 SITE_NAME = env.str('SITE_NAME', default='ENSPM Hub') # type: ignore
 SITE_URL = env.str('SITE_URL', default='http://localhost:8000') # type: ignore
@@ -56,18 +65,38 @@ SITE_URL = env.str('SITE_URL', default='http://localhost:8000') # type: ignore
 # CONFIGURATION HUEY (TASK QUEUE)
 # ==========================================
 
-# Configuration Huey avec SQLite (pour débuter)
+# Backend de la file de tâches :
+# - 'sqlite' : un seul fichier verrouillé, pour le développement et les petits déploiements
+# - 'redis'  : production, plusieurs processus workers et priorités (pip install redis)
+# - 'memory' : file en mémoire du processus (tests, benchmarks)
+HUEY_BACKEND = env.str('HUEY_BACKEND', default='sqlite') # type: ignore
+
+HUEY_BACKENDS = {
+    'sqlite': {
+        'huey_class': 'huey.SqliteHuey',
+        'filename': env.str('HUEY_SQLITE_PATH', default=os.path.join(BASE_DIR, 'huey.db')), # type: ignore
+    },
+    'redis': {
+        'huey_class': 'huey.PriorityRedisHuey',
+        'url': env.str('HUEY_REDIS_URL', default='redis://localhost:6379/0'), # type: ignore
+        'blocking': True,  # BRPOP : pas d'attente active des workers
+    },
+    'memory': {
+        'huey_class': 'huey.MemoryHuey',
+    },
+}
+
 HUEY = {
-    'huey_class': 'huey.SqliteHuey',
+    **HUEY_BACKENDS[HUEY_BACKEND],
     'name': 'enspm_hub_tasks',
-    'filename': os.path.join(BASE_DIR, 'huey.db'),
     'results': True,
     'store_none': False,
     'immediate': False,  # False = mode asynchrone, True = mode synchrone (pour tests)
     'utc': True,
     'consumer': {
         'workers': env.int('HUEY_WORKERS', default=1), # type: ignore  # Nombre de workers pour traiter les tâches
-        'worker_type': 'thread',  # 'thread', 'process' ou 'greenlet'
+        # 'thread', 'process' ou 'greenlet' ; 'process' contourne le GIL (backend redis recommandé)
+        'worker_type': env.str('HUEY_WORKER_TYPE', default='thread'), # type: ignore
         'initial_delay': 0.1,
         'backoff': 1.15,
         'max_delay': 10.0,
@@ -78,26 +107,6 @@ HUEY = {
     },
 }
 
-# Alternative : Configuration Huey avec Redis (pour production)
-# Décommenter et installer redis-py: pip install redis
-"""
-HUEY = {
-    'huey_class': 'huey.RedisHuey',
-    'name': 'enspm_hub_tasks',
-    'connection': {
-        'host': 'localhost',
-        'port': 6379,
-        'db': 0,
-        'max_connections': 20,
-    },
-    'immediate': False,
-    'consumer': {
-        'workers': 4,
-        'worker_type': 'thread',
-    },
-}
-"""
-
 
 
 # Application definition
@@ -109,7 +118,6 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    "debug_toolbar",
     'huey.contrib.djhuey',
     "django_vite",
     "inertia",
@@ -125,16 +133,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.analytics.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    'apps.core.middleware.WhiteNoiseMiddleware',  # Versions async des middlewares tiers (apps.core.middleware)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "inertia.middleware.InertiaMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    'apps.core.middleware.InertiaMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -173,6 +181,206 @@ else:
     }
 
 
+# Modèle utilisateur personnalisé (rôles et statuts)
+AUTH_USER_MODEL = 'core.User'
+
+
+# ==========================================
+# CONFIGURATION CACHE
+# ==========================================
+
+# CACHE_URL accepte les formats django-environ (ex: redis://localhost:6379/1)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Limitation de débit de l'API (apps.core.ratelimit) : GCRA atomique (script Lua) sur Redis,
+# fenêtre glissante à compteurs atomiques sur les autres backends
+RATE_LIMITING = {
+    'ALIAS': 'default',
+    'TIERS': {
+        'ip': env.str('RATE_LIMIT_IP', default='10/s'), # type: ignore  # Requêtes anonymes, par adresse IP
+        'api_key': env.str('RATE_LIMIT_API_KEY', default='100/s'), # type: ignore  # Requêtes authentifiées, par identité
+        'institution': env.str('RATE_LIMIT_INSTITUTION', default='300/s'), # type: ignore  # Budget commun aux membres d'une institution
+    },
+    'LOCAL_BLOCK_MAXSIZE': 10000,  # Clients refusés retenus en mémoire (rejet sans aller-retour)
+    'FAIL_OPEN': True,  # Cache indisponible : requêtes admises
+}
+
+# Cache à deux niveaux des vérifications publiques (apps.verifications.cache)
+VERIFICATION_CACHE = {
+    'ALIAS': 'default',
+    'LOCAL_MAXSIZE': env.int('VERIFICATION_CACHE_LOCAL_MAXSIZE', default=50000), # type: ignore  # Entrées LRU par processus
+    'LOCAL_TTL': env.int('VERIFICATION_CACHE_LOCAL_TTL', default=60), # type: ignore  # Secondes
+    'SHARED_TTL': env.int('VERIFICATION_CACHE_SHARED_TTL', default=3600), # type: ignore  # Secondes
+    'NEGATIVE_TTL': env.int('VERIFICATION_CACHE_NEGATIVE_TTL', default=60), # type: ignore  # Secondes, hashes inconnus
+    'EPOCH_CHECK_INTERVAL': 1.0,  # Délai max de propagation d'une invalidation entre processus
+}
+
+# Moteur de vérification des signatures (apps.cryptography.engine)
+SIGNATURE_ENGINE = {
+    'KEY_CACHE_SIZE': 1000,  # Clés publiques analysées, par processus
+    'KEY_TTL': 3600,  # Secondes
+    'OUTCOME_CACHE_SIZE': env.int('SIGNATURE_ENGINE_OUTCOME_CACHE_SIZE', default=100000), # type: ignore  # Résultats mémorisés
+    'OUTCOME_TTL': 3600,  # Secondes
+}
+
+# Re-vérification en masse des signatures (apps.cryptography.reverification)
+SIGNATURE_REVERIFICATION = {
+    'MODE': env.str('SIGNATURE_REVERIFICATION_MODE', default='process'), # type: ignore  # 'process', 'thread' ou 'serial'
+    'WORKERS': env.int('SIGNATURE_REVERIFICATION_WORKERS', default=None), # type: ignore  # None = nombre de cœurs
+    'CHUNK_SIZE': 1000,  # Documents par lecture en base et par tâche du pool
+    'MAX_REPORTED_FAILURES': 1000,  # Échecs détaillés dans le rapport
+    'REPORT_DIR': env.str('SIGNATURE_REVERIFICATION_REPORT_DIR', default=os.path.join(BASE_DIR, 'var', 'reports', 'reverification')), # type: ignore
+}
+
+# Filtre de Bloom des hashes de documents connus (apps.documents.hash_filter)
+DOCUMENT_FILTER = {
+    'ENABLED': env.bool('DOCUMENT_FILTER_ENABLED', default=True), # type: ignore
+    'ALIAS': 'default',
+    'FALSE_POSITIVE_RATE': env.float('DOCUMENT_FILTER_FP_RATE', default=0.001), # type: ignore
+    'MIN_CAPACITY': 100000,  # Documents, avant redimensionnement
+    'GROWTH_FACTOR': 2,  # Marge de capacité à chaque reconstruction
+    'CHECK_INTERVAL': 1.0,  # Délai max avant qu'un worker voie un nouveau document
+    'REFRESH_OVERLAP': 60,  # Secondes de recouvrement des rafraîchissements incrémentaux
+}
+
+# Cycle de vie des clés : expiration et avertissements (apps.cryptography.lifecycle)
+KEY_LIFECYCLE = {
+    'WARNING_DAYS': env.int('KEY_LIFECYCLE_WARNING_DAYS', default=30), # type: ignore  # Passage à EXPIRING_SOON et avertissement
+    'CHUNK_SIZE': 1000,  # Clés par UPDATE
+    'NOTIFY': True,
+    'ACTION_URL': SITE_URL,  # Lien « Gérer mes clés » des emails
+}
+
+# Journal d'audit : partitions mensuelles (PostgreSQL), pagination et archivage (apps.core.audit)
+AUDIT_LOG = {
+    'MONTHS_AHEAD': 2,  # Partitions créées à l'avance
+    'RETENTION_MONTHS': env.int('AUDIT_LOG_RETENTION_MONTHS', default=12), # type: ignore  # Mois conservés en base (archive_audit_logs)
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {
+        'location': env.str('AUDIT_LOG_ARCHIVE_DIR', default=os.path.join(BASE_DIR, 'var', 'audit-archive')), # type: ignore
+    },
+    'PAGE_SIZE': 50,
+    'MAX_PAGE_SIZE': 500,
+    'SCAN_WINDOW': 3600,  # Secondes de la première fenêtre lue par page (x4 ensuite)
+}
+
+# Exports CSV/NDJSON en flux et exports en tâche de fond (apps.core.exports)
+DATA_EXPORT = {
+    'CHUNK_SIZE': 2000,  # Lignes lues par aller-retour
+    'WINDOW': 86400,  # Secondes par requête triée
+    'PART_ROWS': 1000000,  # Lignes par fichier d'un export en tâche de fond
+    'STALE_AFTER': 900,  # Secondes sans progrès avant reprise (resume_stale_exports)
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {
+        'location': env.str('DATA_EXPORT_DIR', default=os.path.join(BASE_DIR, 'var', 'exports')), # type: ignore
+    },
+}
+
+# Index de révocation en mémoire et flux de deltas publié (apps.documents.revocation)
+REVOCATION_INDEX = {
+    'ENABLED': env.bool('REVOCATION_INDEX_ENABLED', default=not TESTING), # type: ignore
+    'ALIAS': 'default',  # Cache partagé du manifeste de la version publiée
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {
+        'location': env.str('REVOCATION_INDEX_DIR', default=os.path.join(BASE_DIR, 'var', 'revocations')), # type: ignore
+    },
+    'CHECK_INTERVAL': 1.0,  # Délai max avant qu'un worker charge une nouvelle version
+    'REFRESH_OVERLAP': 60,  # Secondes de recouvrement des rafraîchissements incrémentaux
+    'KEEP_VERSIONS': env.int('REVOCATION_INDEX_KEEP_VERSIONS', default=1440), # type: ignore  # Deltas conservés (1 version/min)
+}
+
+# Documents reçus en upload, hachés à la volée sans être conservés (apps.documents.upload)
+DOCUMENT_UPLOAD = {
+    'MAX_SIZE': env.int('DOCUMENT_UPLOAD_MAX_SIZE', default=128 * 1024 * 1024), # type: ignore  # Octets par fichier
+    'ALGORITHMS': tuple(env.list('DOCUMENT_UPLOAD_ALGORITHMS', default=['sha256'])), # type: ignore  # Condensés calculés en une passe
+    'CHUNK_SIZE': 256 * 1024,  # Octets lus et hachés à la fois
+    'ENVELOPE_SIZE': 64 * 1024,  # Marge multipart tolérée dans le Content-Length
+}
+
+# QR codes et certificats de vérification, rendus une fois et mis en cache (apps.documents.rendering)
+DOCUMENT_RENDERS = {
+    'TEMPLATE_VERSION': 1,  # À incrémenter à chaque modification des gabarits
+    'STORAGE_BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'STORAGE_OPTIONS': {
+        'location': env.str('DOCUMENT_RENDERS_DIR', default=os.path.join(BASE_DIR, 'var', 'renders')), # type: ignore
+    },
+    'VERIFY_URL': SITE_URL.rstrip('/') + '/api/v1/verify/{document_hash}',  # Lien encodé dans les QR codes
+    'PREGENERATE': env.bool('DOCUMENT_RENDERS_PREGENERATE', default=not TESTING), # type: ignore  # Rendus produits par Huey à l'enregistrement
+}
+
+# Enregistrement en masse de documents signés (POST /api/v1/documents/bulk, apps.documents.ingest)
+DOCUMENT_INGEST = {
+    'CHUNK_SIZE': env.int('DOCUMENT_INGEST_CHUNK_SIZE', default=1000), # type: ignore  # Enregistrements par requête d'unicité et par insertion
+    'WORKERS': env.int('DOCUMENT_INGEST_WORKERS', default=None), # type: ignore  # Threads de vérification des signatures (None = nombre de cœurs)
+    'MAX_RECORDS': env.int('DOCUMENT_INGEST_MAX_RECORDS', default=100000), # type: ignore  # Enregistrements par appel
+    'MAX_LINE_BYTES': 64 * 1024,  # Taille maximale d'une ligne NDJSON
+}
+
+# Lots de documents signés par leur racine de Merkle (POST /api/v1/documents/batches, apps.documents.batches)
+DOCUMENT_BATCHES = {
+    'MAX_SIZE': env.int('DOCUMENT_BATCHES_MAX_SIZE', default=10000), # type: ignore  # Documents par lot
+    'TREE_CACHE_SIZE': 64,  # Arbres gardés en mémoire par processus pour les preuves d'inclusion
+    'TREE_CACHE_TTL': 3600,
+}
+
+# Index des empreintes perceptuelles (POST /api/v1/verify/similar, apps.documents.similarity)
+PERCEPTUAL_INDEX = {
+    'ENABLED': env.bool('PERCEPTUAL_INDEX_ENABLED', default=True), # type: ignore
+    'ALIAS': 'default',
+    'ALGORITHM': env.str('PERCEPTUAL_INDEX_ALGORITHM', default='phash'), # type: ignore  # phash ou dhash
+    'RADIUS': env.int('PERCEPTUAL_INDEX_RADIUS', default=10), # type: ignore  # Distance de Hamming max (bits sur 64)
+    'CHUNKS': 4,  # Sous-chaînes de 16 bits de l'index multiple
+    'MAX_CANDIDATES': 10,
+    'MAX_IMAGE_SIZE': 20 * 1024 * 1024,  # Octets
+    'CHECK_INTERVAL': 1.0,  # Délai max avant qu'un worker voie un nouveau document
+    'REFRESH_OVERLAP': 60,  # Secondes de recouvrement des rafraîchissements incrémentaux
+}
+
+# Signature cachée dans l'image des documents (DCT 8x8, apps.documents.steganography)
+DOCUMENT_STEGANOGRAPHY = {
+    'STEP': env.float('DOCUMENT_STEGANOGRAPHY_STEP', default=24.0), # type: ignore  # Pas de quantification : robustesse contre visibilité
+    'COEFFICIENT': (2, 3),  # Coefficient DCT marqué dans chaque bloc
+    'MIN_REPETITIONS': 5,  # Copies minimales de chaque bit
+    'WORKERS': env.int('DOCUMENT_STEGANOGRAPHY_WORKERS', default=None), # type: ignore  # Processus des traitements par lot (None = nombre de cœurs)
+    'MAX_IMAGE_SIZE': 40 * 1024 * 1024,  # Octets
+}
+
+# Vérification par lot (POST /api/v1/verify/batch)
+VERIFICATION_BATCH = {
+    'MAX_SIZE': env.int('VERIFICATION_BATCH_MAX_SIZE', default=10000), # type: ignore  # Hashes par appel
+    'CHUNK_SIZE': 500,  # Hashes par requête SQL et par bulk_create
+}
+
+# Journalisation différée des vérifications (apps.verifications.log_pipeline)
+VERIFICATION_LOG = {
+    'IMMEDIATE': env.bool('VERIFICATION_LOG_IMMEDIATE', default=TESTING), # type: ignore  # True = écriture synchrone
+    'BATCH_SIZE': env.int('VERIFICATION_LOG_BATCH_SIZE', default=500), # type: ignore  # Enregistrements par bulk_create
+    'FLUSH_INTERVAL_MS': env.int('VERIFICATION_LOG_FLUSH_INTERVAL_MS', default=200), # type: ignore
+    'MAX_PENDING': 20000,  # Taille max du tampon en mémoire, par processus
+    'BLOCK_TIMEOUT_MS': 50,  # Attente max d'une vue quand le tampon est plein (puis débordement Huey)
+    'SPOOL_DIR': env.str('VERIFICATION_LOG_SPOOL_DIR', default=os.path.join(BASE_DIR, 'var', 'spool', 'verifications')), # type: ignore
+    'RECOVERY_AGE': 300,  # Secondes avant reprise d'un spool orphelin
+}
+
+# Agrégats des vérifications pour les tableaux de bord (apps.analytics.rollups)
+ANALYTICS_ROLLUP = {
+    'REPROCESS_HOURS': env.int('ANALYTICS_ROLLUP_REPROCESS_HOURS', default=2), # type: ignore  # Heures recalculées à chaque passage (écritures tardives)
+    'BACKFILL_CHUNK_HOURS': 24,  # Heures par requête GROUP BY lors d'un rattrapage
+    'LATE_DAYS': env.int('ANALYTICS_ROLLUP_LATE_DAYS', default=7), # type: ignore  # Jours recomptés chaque nuit (écritures très tardives)
+}
+
+# Mesures de performance par endpoint (apps.analytics.instrumentation)
+PERFORMANCE_METRICS = {
+    'ENABLED': env.bool('PERFORMANCE_METRICS_ENABLED', default=True), # type: ignore
+    'FLUSH_INTERVAL': env.int('PERFORMANCE_METRICS_FLUSH_INTERVAL', default=0 if TESTING else 60), # type: ignore  # Secondes entre deux écritures PerformanceMetric
+    'LATENCY_BUCKETS_MS': (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+    'EXCLUDED_PREFIXES': ('/static/', '/__debug__/'),
+    'METRICS_TOKEN': env.str('PERFORMANCE_METRICS_TOKEN', default=''), # type: ignore  # Jeton Bearer du collecteur Prometheus
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
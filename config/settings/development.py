@@ -1,3 +1,5 @@
+import importlib.util
+
 from .base import *
 
 
@@ -15,7 +17,17 @@ DJANGO_VITE = {
     }
 }
 
-# Debug toolbar settings
+# Debug toolbar : développement uniquement, si installé, hors tests
+DEBUG_TOOLBAR = (
+    env.bool('DEBUG_TOOLBAR', default=True) # type: ignore
+    and not TESTING
+    and importlib.util.find_spec('debug_toolbar') is not None
+)
+
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS += ["debug_toolbar"]
+    MIDDLEWARE += ["debug_toolbar.middleware.DebugToolbarMiddleware"]
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -1,7 +1,19 @@
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *
 
 DEBUG = False
 
+# Cache partagé entre workers obligatoire : époque d'invalidation des vérifications,
+# génération du filtre de hashes, index de révocation. locmem est propre à chaque processus.
+if CACHES['default']['BACKEND'] in (
+    'django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache',
+):
+    raise ImproperlyConfigured("CACHE_URL doit désigner un cache partagé (Redis) en production.")
+
+# Aller-retour Redis borné : les throttles l'attendent depuis la boucle async (RATE_LIMITING['FAIL_OPEN'])
+CACHES['default'].setdefault('OPTIONS', {}).setdefault('socket_timeout', 0.25)
+
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
 # Django security checklist settings
@@ -14,9 +14,9 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from debug_toolbar.toolbar import debug_toolbar_urls
 from .api import api_v1
 
 
@@ -24,4 +24,10 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('apps.home.urls')),
     path('api/v1/', api_v1.urls),
-] + debug_toolbar_urls()
+]
+
+# Debug toolbar : profil de développement uniquement (config/settings/development.py)
+if getattr(settings, 'DEBUG_TOOLBAR', False):
+    from debug_toolbar.toolbar import debug_toolbar_urls
+
+    urlpatterns += debug_toolbar_urls()
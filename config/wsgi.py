@@ -11,6 +11,15 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 
 application = get_wsgi_application()
+
+# Préchargement du filtre de hashes des documents dans chaque worker
+from apps.documents.hash_filter import document_filter  # noqa: E402
+from apps.documents.revocation import revocation_index  # noqa: E402
+from apps.documents.similarity import perceptual_index  # noqa: E402
+
+document_filter.warm()
+revocation_index.warm()
+perceptual_index.warm()
@@ -0,0 +1,15 @@
+# perf/bench_hot_paths.py
+import pytest
+
+from apps.core.perf.cases import CASES
+from apps.verifications.log_pipeline import verification_log
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', list(CASES))
+def test_hot_path(benchmark, perf_context, name):
+    case = CASES[name]
+    benchmark.group = name
+    benchmark.extra_info.update({'operations': case.operations, 'description': case.description})
+    benchmark.pedantic(case.build(perf_context, case.operations), rounds=20, warmup_rounds=2)
+    verification_log.flush()
@@ -0,0 +1,47 @@
+# perf/conftest.py
+# Modules Django importés dans les fixtures : ce fichier est aussi chargé par un pytest lancé
+# à la racine du dépôt, sans perf/pytest.ini ni DJANGO_SETTINGS_MODULE.
+import os
+from unittest import mock
+
+import pytest
+
+
+def synthetic_data():
+    from apps.core.perf.seed import SyntheticData
+
+    return SyntheticData({
+        'SEED': int(os.environ.get('PERF_SEED', 0)),
+        'DOCUMENTS': int(os.environ.get('PERF_DOCUMENTS', 20000)),
+        'VERIFICATIONS': int(os.environ.get('PERF_VERIFICATIONS', 50000)),
+        'DAYS': int(os.environ.get('PERF_DAYS', 30)),
+    })
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """Base de test créée par pytest-django, remplie une fois par session."""
+    with django_db_blocker.unblock():
+        synthetic_data().seed()
+
+
+@pytest.fixture(scope='session')
+def perf_context(django_db_setup, django_db_blocker):
+    from apps.core.perf.cases import load_context
+
+    with django_db_blocker.unblock():
+        return load_context(synthetic_data())
+
+
+@pytest.fixture(scope='session', autouse=True)
+def verification_log_flushed_by_tests():
+    """
+    La base de test n'est accessible qu'au thread des tests : le thread de vidage du
+    journal des vérifications reste en attente, le journal est écrit après chaque cas.
+    """
+    from apps.verifications.log_pipeline import verification_log
+
+    with mock.patch.dict(verification_log.config, {
+        'FLUSH_INTERVAL_MS': 24 * 3600 * 1000, 'BATCH_SIZE': verification_log.config['MAX_PENDING'],
+    }):
+        yield